@@ -21,6 +21,14 @@ class Settings(BaseSettings):
     SUPABASE_URL: str = ""
     SUPABASE_SERVICE_ROLE_KEY: str = ""
 
+    # Data backend: "supabase", "local" (SQLite + filesystem) or "auto"
+    # (Supabase when SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY are set,
+    # otherwise the SQLite file at LOCAL_DB_PATH, but only in development with
+    # REQUIRE_AUTH=false; production and authenticated installs fail at
+    # startup unless DATA_BACKEND=local is set). The selection is logged.
+    DATA_BACKEND: str = "auto"
+    LOCAL_DB_PATH: Path = Path("./data/local.sqlite3")
+
     # Directories
     TEMP_DIR: Path = Path("/tmp")
     DOWNLOADS_DIR: Path = Path("./downloads")
@@ -29,9 +37,21 @@ class Settings(BaseSettings):
     MAX_BUILD_TIME: int = 120
     MAVEN_PATH: str = "mvn"
     MAX_CONCURRENT_BUILDS: int = 3
+    BUILD_RETRY_AFTER_SECONDS: int = 10
     BUILD_JOB_TIMEOUT_MINUTES: int = 10
     ARTIFACT_EXPIRY_HOURS: int = 24
 
+    # Async build codegen (0 = generate on a thread in the API process)
+    CODEGEN_PROCESSES: int = 0
+    CODEGEN_FANOUT_MIN_CLASSES: int = 200
+
+    # Sync build downloads (DOWNLOADS_MAX_BYTES <= 0 disables the byte budget)
+    DOWNLOAD_EXPIRY_HOURS: int = 24
+    DOWNLOADS_MAX_BYTES: int = 1024 * 1024 * 1024
+
+    # Code preview
+    PREVIEW_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+
     # Auth / Environment
     REQUIRE_AUTH: bool = False
     ENVIRONMENT: str = "development"
@@ -10,11 +10,13 @@ from slowapi.errors import RateLimitExceeded
 
 from app.config import settings
 from app.middleware.rate_limit import limiter
-from app.models.exceptions import BuildError, GenerationError, ValidationError
+from app.models.exceptions import BuildCapacityError, BuildError, GenerationError, ValidationError
 from app.models.request import HealthResponse
 from app.routes.build_jobs import router as build_jobs_router
 from app.routes.plugin import router as plugin_router
+from app.services.build_capacity import build_executor
 from app.services.build_worker import build_worker, cleanup_orphaned_build_dirs
+from app.services.codegen_pool import codegen_pool
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -28,18 +30,22 @@ async def lifespan(app):
             "FATAL: REQUIRE_AUTH=false is not allowed in production. "
             "Set REQUIRE_AUTH=true or ENVIRONMENT=development."
         )
-    if settings.REQUIRE_AUTH:
-        from app.services.supabase_client import get_supabase_admin
-        if not get_supabase_admin():
-            raise RuntimeError(
-                "FATAL: REQUIRE_AUTH=true but Supabase admin client failed to initialize. "
-                "Ensure SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY are set and "
-                "the `supabase` Python package is installed in the active environment."
-            )
+    from app.services.job_backend import get_job_backend
+    job_backend = get_job_backend()
+    logger.info("Data backend: %s (DATA_BACKEND=%s)", job_backend.name, settings.DATA_BACKEND)
+    if settings.REQUIRE_AUTH and not job_backend.is_configured():
+        raise RuntimeError(
+            "FATAL: REQUIRE_AUTH=true but Supabase admin client failed to initialize. "
+            "Ensure SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY are set and "
+            "the `supabase` Python package is installed in the active environment."
+        )
     cleanup_orphaned_build_dirs()
+    await codegen_pool.start()
     await build_worker.start()
     yield
     await build_worker.stop()
+    codegen_pool.shutdown()
+    build_executor.shutdown(wait=False)
 
 
 app = FastAPI(
@@ -88,6 +94,17 @@ async def build_exception_handler(request: Request, exc: BuildError) -> JSONResp
     return JSONResponse(status_code=500, content={"detail": f"Build failed: {str(exc)}"})
 
 
+@app.exception_handler(BuildCapacityError)
+async def build_capacity_exception_handler(request: Request, exc: BuildCapacityError) -> JSONResponse:
+    """Handle saturated build capacity with 503 so clients back off and retry."""
+    logger.warning("Build rejected: %s", exc)
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(settings.BUILD_RETRY_AFTER_SECONDS)},
+    )
+
+
 @app.get("/health", response_model=HealthResponse)
 async def health_check() -> HealthResponse:
     """Health check endpoint."""
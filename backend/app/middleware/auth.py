@@ -16,7 +16,8 @@ async def require_auth(request: Request) -> dict:
 
     When REQUIRE_AUTH is False (local dev), returns a stub user.
     When REQUIRE_AUTH is True, validates the Authorization header
-    against Supabase and returns the authenticated user dict.
+    against the data backend (Supabase Auth or the local backend's API
+    tokens) and returns the authenticated user dict.
     """
     if not settings.REQUIRE_AUTH:
         return LOCAL_DEV_USER
@@ -28,35 +29,12 @@ async def require_auth(request: Request) -> dict:
 
     token = auth_header.replace("Bearer ", "")
 
-    try:
-        from app.services.supabase_client import get_supabase_admin
-        supabase = get_supabase_admin()
-        if not supabase:
-            raise RuntimeError("Supabase not configured")
-        user_response = supabase.auth.get_user(token)
-        user = user_response.user
-        user_id = str(user.id)
-        user_dict = {"id": user_id, "email": user.email}
-
-        # Fetch subscription tier from profiles table
-        try:
-            profile = supabase.table("profiles").select(
-                "subscription_tier, subscription_status, cancel_at_period_end, current_period_end"
-            ).eq("id", user_id).single().execute()
-            if profile.data:
-                if profile.data.get("subscription_tier"):
-                    user_dict["subscription_tier"] = profile.data["subscription_tier"]
-                user_dict["subscription_status"] = profile.data.get("subscription_status")
-                user_dict["cancel_at_period_end"] = bool(profile.data.get("cancel_at_period_end", False))
-                user_dict["current_period_end"] = profile.data.get("current_period_end")
-        except Exception as profile_err:
-            logger.warning("Failed to fetch profile for tier info: %s", profile_err)
-
-        return user_dict
-    except Exception as e:
-        logger.warning("Auth failed: %s", e)
+    from app.services.job_backend import get_job_backend
+    user = await get_job_backend().authenticate(token)
+    if user is None:
         from fastapi import HTTPException
         raise HTTPException(status_code=401, detail="Invalid or expired token")
+    return user
 
 
 async def optional_auth(request: Request) -> dict | None:
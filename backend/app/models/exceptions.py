@@ -19,3 +19,8 @@ class GenerationError(PluginBuilderException):
 class BuildError(PluginBuilderException):
     """Maven build failed."""
     pass
+
+
+class BuildCapacityError(PluginBuilderException):
+    """No build slot is free on this node."""
+    pass
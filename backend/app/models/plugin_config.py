@@ -19,8 +19,12 @@ class PluginConfig(BaseModel):
     author: str
     blocks: List[Block]
     paper_version: str = "1.21.1"
+    server_platform: str = "paper"
+    # Group event blocks of the same event type into one listener class
+    merge_listeners: bool = False
 
     SUPPORTED_PAPER_VERSIONS: ClassVar[Set[str]] = {"1.20.1", "1.20.4", "1.20.6", "1.21.1", "1.21.4"}
+    SUPPORTED_SERVER_PLATFORMS: ClassVar[Set[str]] = {"paper", "folia"}
 
     @field_validator("paper_version")
     @classmethod
@@ -29,6 +33,13 @@ class PluginConfig(BaseModel):
             raise ValueError(f"Unsupported Paper version: {v}. Supported: {', '.join(sorted(cls.SUPPORTED_PAPER_VERSIONS))}")
         return v
 
+    @field_validator("server_platform")
+    @classmethod
+    def validate_server_platform(cls, v: str) -> str:
+        if v not in cls.SUPPORTED_SERVER_PLATFORMS:
+            raise ValueError(f"Unsupported server platform: {v}. Supported: {', '.join(sorted(cls.SUPPORTED_SERVER_PLATFORMS))}")
+        return v
+
     @field_validator("name")
     @classmethod
     def validate_name(cls, v: str) -> str:
@@ -1,9 +1,11 @@
 """Request and response DTOs."""
 
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 from pydantic import BaseModel
 
+from app.models.plugin_config import PluginConfig
+
 
 class GenerateResponse(BaseModel):
     """Response for plugin generation."""
@@ -31,6 +33,29 @@ class PreviewResponse(BaseModel):
     """Response for code preview."""
     status: str
     files: Dict[str, str]  # filename -> content
+    version: Optional[str] = None  # pass back as base_version for diffs
+
+
+class PreviewDiffRequest(BaseModel):
+    """Request for an incremental preview against an earlier version."""
+    config: PluginConfig
+    base_version: str
+    changed_block_ids: List[str] = []
+
+
+class PreviewDiffResponse(BaseModel):
+    """Files that differ from the base preview version.
+
+    ``full`` is True when the base version was no longer cached; every file
+    is then listed under ``added``.
+    """
+    status: str
+    version: str
+    base_version: str
+    full: bool
+    added: Dict[str, str]
+    changed: Dict[str, str]
+    removed: List[str]
 
 
 class WorldsResponse(BaseModel):
@@ -13,7 +13,7 @@ from app.services.artifact_storage import artifact_storage
 from app.services.block_catalog import resolve_catalog_id
 from app.services.entitlements import evaluate_block_ids
 from app.services.tier_limits import TIER_LIMITS
-from app.services.supabase_client import get_supabase_admin
+from app.utils.hashing import config_fingerprint
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -28,12 +28,14 @@ async def create_build_job(config: PluginConfig, request: Request, user: dict =
     logger.info("Build job submitted by user %s: %s", user_id, config.name)
 
     # 1. Reserve build quota
+    watermark = False
     if user_id and settings.REQUIRE_AUTH:
         profile = await build_job_service.get_user_profile(user_id)
         tier = profile.get("subscription_tier", "free")
         max_builds = TIER_LIMITS.get(tier, TIER_LIMITS["free"])["builds_per_period"]
         max_events = TIER_LIMITS.get(tier, TIER_LIMITS["free"])["max_events"]
         max_actions = TIER_LIMITS.get(tier, TIER_LIMITS["free"])["max_actions"]
+        watermark = TIER_LIMITS.get(tier, TIER_LIMITS["free"]).get("watermark", False)
 
         event_count = sum(1 for b in config.blocks if b.type.value == "event")
         action_count = sum(1 for b in config.blocks if b.type.value != "event")
@@ -53,12 +55,9 @@ async def create_build_job(config: PluginConfig, request: Request, user: dict =
         if violations:
             raise HTTPException(403, {"code": "ENTITLEMENT_VIOLATION", "violations": violations})
 
-        supabase = get_supabase_admin()
-        if supabase and max_builds != -1:
-            quota_ok = supabase.rpc(
-                "increment_build_count", {"p_user_id": user_id, "p_max_builds": max_builds}
-            ).execute()
-            if not quota_ok.data:
+        if max_builds != -1:
+            quota_ok = await build_job_service.increment_build_count(user_id, max_builds)
+            if not quota_ok:
                 raise HTTPException(403, "Monthly build limit reached. Upgrade your plan for more builds.")
 
     # 2. Enqueue job
@@ -67,14 +66,13 @@ async def create_build_job(config: PluginConfig, request: Request, user: dict =
             config=config.model_dump(),
             user_id=user_id if user_id != "local-dev-user" else None,
             plugin_name=config.name,
+            config_hash=config_fingerprint(config, watermark=watermark),
         )
     except Exception as e:
         # Refund quota if enqueue fails
         if user_id and settings.REQUIRE_AUTH:
             try:
-                supabase = get_supabase_admin()
-                if supabase:
-                    supabase.rpc("decrement_build_count", {"p_user_id": user_id}).execute()
+                await build_job_service.decrement_build_count(user_id)
             except Exception:
                 pass
         if "Queue limit exceeded" in str(e):
@@ -2,19 +2,30 @@
 
 import os
 
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from fastapi.responses import FileResponse
 
 from app.config import settings
 from app.middleware.auth import optional_auth, require_auth
 from app.middleware.rate_limit import limiter
 from app.models.plugin_config import PluginConfig
-from app.models.request import BlocksResponse, EntitlementsResponse, GenerateResponse, PreviewResponse, WorldsResponse
+from app.models.request import (
+    BlocksResponse,
+    EntitlementsResponse,
+    GenerateResponse,
+    PreviewDiffRequest,
+    PreviewDiffResponse,
+    PreviewResponse,
+    WorldsResponse,
+)
 from app.services.block_catalog import get_all_blocks, get_catalog_copy, resolve_catalog_id
 from app.services.code_generator import CodeGeneratorService
 from app.services.entitlements import evaluate_block_ids, resolve_entitlements
 from app.services.plugin_generator import PluginGeneratorService, get_download_path
+from app.services.preview_cache import preview_cache
+from app.services.preview_service import PreviewService, diff_files
 from app.services.tier_limits import TIER_LIMITS
+from app.utils.hashing import config_fingerprint
 
 # Use require_auth when auth is enabled, optional_auth otherwise (dev mode)
 _auth_dep = require_auth if settings.REQUIRE_AUTH else optional_auth
@@ -25,6 +36,7 @@ router = APIRouter(prefix="/api")
 
 plugin_generator = PluginGeneratorService()
 code_generator = CodeGeneratorService()
+preview_service = PreviewService(code_generator)
 
 
 def _enforce_entitlements(config: PluginConfig, user: dict | None):
@@ -60,30 +72,37 @@ def _enforce_entitlements(config: PluginConfig, user: dict | None):
         )
 
 
+def _enforce_tier_limits(config: PluginConfig, user: dict | None):
+    """Reject configs with more events/actions than the user's plan allows."""
+    if not (user and settings.REQUIRE_AUTH):
+        return
+    tier = user.get("subscription_tier", "free")
+    limits = TIER_LIMITS.get(tier, TIER_LIMITS["free"])
+    event_count = sum(1 for b in config.blocks if b.type.value == "event")
+    action_count = sum(1 for b in config.blocks if b.type.value != "event")
+    if limits["max_events"] != -1 and event_count > limits.get("max_events", 4):
+        raise HTTPException(403, f"Your plan allows {limits['max_events']} events max.")
+    if limits["max_actions"] != -1 and action_count > limits.get("max_actions", 8):
+        raise HTTPException(403, f"Your plan allows {limits['max_actions']} actions max.")
+
+
+def _watermark_for(user: dict | None) -> bool:
+    """Whether generated code for this user carries the watermark."""
+    if not (user and settings.REQUIRE_AUTH):
+        return False
+    tier = user.get("subscription_tier", "free")
+    limits = TIER_LIMITS.get(tier, TIER_LIMITS["free"])
+    return limits.get("watermark", False)
+
+
 @router.post("/generate-plugin", response_model=GenerateResponse)
 @limiter.limit("10/minute")
 async def generate_plugin(config: PluginConfig, request: Request, user: dict = Depends(_auth_dep)) -> GenerateResponse:
     """Generate a Minecraft plugin from block configuration."""
     logger.info("Generating plugin: %s", config.name)
     _enforce_entitlements(config, user)
-
-    # Tier limit checks when auth is enabled
-    if user and settings.REQUIRE_AUTH:
-        tier = user.get("subscription_tier", "free")
-        limits = TIER_LIMITS.get(tier, TIER_LIMITS["free"])
-        event_count = sum(1 for b in config.blocks if b.type.value == "event")
-        action_count = sum(1 for b in config.blocks if b.type.value != "event")
-        if limits["max_events"] != -1 and event_count > limits.get("max_events", 4):
-            raise HTTPException(403, f"Your plan allows {limits['max_events']} events max.")
-        if limits["max_actions"] != -1 and action_count > limits.get("max_actions", 8):
-            raise HTTPException(403, f"Your plan allows {limits['max_actions']} actions max.")
-
-    # Determine watermark based on tier
-    watermark = False
-    if user and settings.REQUIRE_AUTH:
-        tier = user.get("subscription_tier", "free")
-        limits = TIER_LIMITS.get(tier, TIER_LIMITS["free"])
-        watermark = limits.get("watermark", False)
+    _enforce_tier_limits(config, user)
+    watermark = _watermark_for(user)
 
     download_id = await plugin_generator.generate(config, watermark=watermark)
     jar_name = f"{config.artifact_id}-{config.version}.jar"
@@ -98,63 +117,96 @@ async def generate_plugin(config: PluginConfig, request: Request, user: dict = D
 
 @router.post("/preview-code", response_model=PreviewResponse)
 @limiter.limit("30/minute")
-async def preview_code(config: PluginConfig, request: Request, user: dict = Depends(_auth_dep)) -> PreviewResponse:
-    """Preview generated Java code without building."""
+async def preview_code(
+    config: PluginConfig,
+    request: Request,
+    response: Response,
+    user: dict = Depends(_auth_dep),
+) -> PreviewResponse:
+    """Preview generated Java code without building.
+
+    Results are memoized by config fingerprint and carry an ETag; a request
+    whose If-None-Match matches a cached preview gets an empty 304.
+    """
     logger.info("Previewing code for plugin: %s", config.name)
     _enforce_entitlements(config, user)
+    _enforce_tier_limits(config, user)
+    watermark = _watermark_for(user)
 
-    # Tier limit checks when auth is enabled
-    if user and settings.REQUIRE_AUTH:
-        tier = user.get("subscription_tier", "free")
-        limits = TIER_LIMITS.get(tier, TIER_LIMITS["free"])
-        event_count = sum(1 for b in config.blocks if b.type.value == "event")
-        action_count = sum(1 for b in config.blocks if b.type.value != "event")
-        if limits["max_events"] != -1 and event_count > limits.get("max_events", 4):
-            raise HTTPException(403, f"Your plan allows {limits['max_events']} events max.")
-        if limits["max_actions"] != -1 and action_count > limits.get("max_actions", 8):
-            raise HTTPException(403, f"Your plan allows {limits['max_actions']} actions max.")
-
-    # Determine watermark based on tier
-    watermark = False
-    if user and settings.REQUIRE_AUTH:
-        tier = user.get("subscription_tier", "free")
-        limits = TIER_LIMITS.get(tier, TIER_LIMITS["free"])
-        watermark = limits.get("watermark", False)
-
-    generated = code_generator.generate_all(config, watermark=watermark)
-
-    # Flatten files into a single dict with descriptive filenames
-    files = {}
-
-    # Main plugin class
-    main_class_path = f"src/main/java/{config.main_package.replace('.', '/')}/{config.main_class_name}.java"
-    files[main_class_path] = generated["main_java"]
-
-    # Listener classes
-    for filename, content in generated["listeners"].items():
-        listener_path = f"src/main/java/{config.main_package.replace('.', '/')}/listeners/{filename}"
-        files[listener_path] = content
-
-    # Command classes
-    for filename, content in generated.get("commands", {}).items():
-        command_path = f"src/main/java/{config.main_package.replace('.', '/')}/commands/{filename}"
-        files[command_path] = content
-
-    # Utility classes
-    for filename, content in generated.get("utilities", {}).items():
-        util_path = f"src/main/java/{config.main_package.replace('.', '/')}/util/{filename}"
-        files[util_path] = content
-
-    # Config files
-    files["src/main/resources/plugin.yml"] = generated["plugin_yml"]
-    files["pom.xml"] = generated["pom_xml"]
+    etag_key = config_fingerprint(config, watermark=watermark)
+    etag = f'"{etag_key}"'
+    snapshot = preview_cache.get(etag_key)
+    if snapshot is not None:
+        if _etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers={"ETag": etag})
+        response.headers["ETag"] = etag
+        return PreviewResponse(status="success", files=snapshot.files, version=etag_key)
 
+    snapshot = preview_service.full(config, watermark=watermark)
+    _log_preview(config, snapshot.files)
+
+    preview_cache.put(etag_key, snapshot)
+    response.headers["ETag"] = etag
+    return PreviewResponse(status="success", files=snapshot.files, version=etag_key)
+
+
+@router.post("/preview-code/diff", response_model=PreviewDiffResponse)
+@limiter.limit("60/minute")
+async def preview_code_diff(
+    body: PreviewDiffRequest,
+    request: Request,
+    user: dict = Depends(_auth_dep),
+) -> PreviewDiffResponse:
+    """Preview only the files that changed since ``base_version``.
+
+    Listener and command classes untouched by the edit are reused from the
+    cached base preview. If the base is no longer cached the full preview is
+    returned with every file under ``added``.
+    """
+    config = body.config
+    logger.info("Previewing code diff for plugin: %s", config.name)
+    _enforce_entitlements(config, user)
+    _enforce_tier_limits(config, user)
+    watermark = _watermark_for(user)
+
+    version = config_fingerprint(config, watermark=watermark)
+    base = preview_cache.get(body.base_version)
+    snapshot = preview_cache.get(version)
+    if snapshot is None:
+        if base is None:
+            snapshot = preview_service.full(config, watermark=watermark)
+        else:
+            snapshot = preview_service.incremental(
+                config, base, body.changed_block_ids, watermark=watermark
+            )
+        _log_preview(config, snapshot.files)
+        preview_cache.put(version, snapshot)
+
+    added, changed, removed = diff_files(base.files if base else {}, snapshot.files)
+    return PreviewDiffResponse(
+        status="success",
+        version=version,
+        base_version=body.base_version,
+        full=base is None,
+        added=added,
+        changed=changed,
+        removed=removed,
+    )
+
+
+def _log_preview(config: PluginConfig, files: dict):
     # Log the generated code for debugging
     logger.info("Generated %d files for %s", len(files), config.name)
     for filepath, content in files.items():
         logger.debug("--- %s ---\n%s", filepath, content)
 
-    return PreviewResponse(status="success", files=files)
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Return True if an If-None-Match header value covers ``etag``."""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or any(tag.removeprefix("W/") == etag for tag in candidates)
 
 
 @router.get("/blocks", response_model=BlocksResponse)
@@ -48,7 +48,9 @@ class BlockDefinitionService:
                     "type": "event",
                     "description": "Fired when a player moves or rotates",
                     "color": "#3498db",
-                    "properties": [],
+                    "properties": [
+                        {"name": "moveFilter", "type": "string", "required": False, "placeholder": "block (block, chunk, position or off)"},
+                    ],
                     "category": "player",
                 },
                 {
@@ -890,7 +892,7 @@ class BlockDefinitionService:
                     "id": "fill-region",
                     "name": "FillRegion",
                     "type": "action",
-                    "description": "Fill a region with a block type",
+                    "description": "Fill a region with a block type over several ticks",
                     "color": "#e67e22",
                     "properties": [
                         {"name": "x1", "type": "string", "required": True, "placeholder": "0"},
@@ -900,6 +902,9 @@ class BlockDefinitionService:
                         {"name": "y2", "type": "string", "required": True, "placeholder": "70"},
                         {"name": "z2", "type": "string", "required": True, "placeholder": "10"},
                         {"name": "blockType", "type": "string", "required": True, "placeholder": "STONE"},
+                        {"name": "blocksPerTick", "type": "string", "required": False, "placeholder": "2048"},
+                        {"name": "loadChunks", "type": "string", "required": False, "placeholder": "false"},
+                        {"name": "waitForCompletion", "type": "string", "required": False, "placeholder": "false"},
                     ],
                 },
                 {
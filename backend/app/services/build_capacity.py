@@ -0,0 +1,83 @@
+"""Build concurrency shared by the async job worker and the sync endpoint.
+
+Both build paths draw from the same ``MAX_CONCURRENT_BUILDS`` slots so a
+node never runs more Maven processes than configured, whichever route they
+came in through. Blocking sync builds run on ``build_executor`` so they never
+stall the event loop.
+"""
+
+import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Deque
+
+from app.config import settings
+
+
+class BuildSlots:
+    """Counting semaphore with a non-blocking admission path.
+
+    The worker waits for a slot with ``acquire``; request handlers use
+    ``try_acquire`` so a saturated node rejects work instead of queueing it
+    behind the event loop.
+
+    Not thread-safe: every call must come from the one event loop that owns
+    the instance. ``release`` resolves waiter futures directly, which is only
+    valid on their own loop. The build worker and the sync endpoint both run
+    on the API's loop; a blocking build gives its slot back from the loop
+    after ``run_in_executor`` returns, not from the executor thread.
+    """
+
+    def __init__(self, limit: int) -> None:
+        self._limit = limit
+        self._in_use = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def limit(self) -> int:
+        return self._limit
+
+    @property
+    def in_use(self) -> int:
+        return self._in_use
+
+    def try_acquire(self) -> bool:
+        """Take a slot if one is free right now. Never waits."""
+        if self._in_use >= self._limit or self._waiters:
+            return False
+        self._in_use += 1
+        return True
+
+    async def acquire(self) -> None:
+        """Wait until a slot is free and take it."""
+        if self.try_acquire():
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # A slot was handed over just before cancellation; give it back.
+                self.release()
+            else:
+                self._waiters.remove(waiter)
+            raise
+
+    def release(self) -> None:
+        """Return a slot, handing it straight to the oldest waiter if any."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._in_use = max(self._in_use - 1, 0)
+
+
+build_slots = BuildSlots(settings.MAX_CONCURRENT_BUILDS)
+
+# Threads for blocking sync builds (codegen, file writes, Maven, JAR copy).
+build_executor = ThreadPoolExecutor(
+    max_workers=settings.MAX_CONCURRENT_BUILDS,
+    thread_name_prefix="sync-build",
+)
@@ -1,119 +1,84 @@
 """CRUD operations for build_jobs table."""
 
+from datetime import datetime
 from typing import Optional
-from app.services.supabase_client import get_supabase_admin
+from app.services.job_backend import get_job_backend
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
 
 class BuildJobService:
-    """Manages build job records in Supabase."""
-
-    async def enqueue_job(self, config: dict, user_id: Optional[str], plugin_name: str) -> str:
-        """Insert a new build job. Returns job ID."""
-        supabase = get_supabase_admin()
-        if not supabase:
-            raise RuntimeError("Supabase not configured")
-
-        # Use the atomic enqueue function if available, else direct insert
-        try:
-            result = supabase.rpc('enqueue_build_job', {
-                'p_user_id': user_id,
-                'p_plugin_config': config,
-                'p_plugin_name': plugin_name,
-            }).execute()
-            if result.data:
-                return str(result.data)
-        except Exception as e:
-            if 'Queue limit exceeded' in str(e):
-                raise
-            logger.warning("enqueue_build_job RPC not available, using direct insert: %s", e)
-
-        # Fallback: direct insert
-        result = supabase.table('build_jobs').insert({
-            'user_id': user_id,
-            'plugin_config': config,
-            'plugin_name': plugin_name,
-        }).execute()
-        return str(result.data[0]['id'])
+    """Manages build job records in the configured data backend."""
+
+    async def enqueue_job(
+        self,
+        config: dict,
+        user_id: Optional[str],
+        plugin_name: str,
+        config_hash: Optional[str] = None,
+    ) -> str:
+        """Insert a new build job. Returns job ID.
+
+        ``config_hash`` lets the queue hold back duplicates of a build that
+        is already running so they can reuse its artifact.
+        """
+        return await get_job_backend().enqueue_job(config, user_id, plugin_name, config_hash)
 
     async def get_job(self, job_id: str) -> Optional[dict]:
         """Get a build job by ID."""
-        supabase = get_supabase_admin()
-        if not supabase:
-            return None
-        result = supabase.table('build_jobs').select('*').eq('id', job_id).single().execute()
-        return result.data
+        return await get_job_backend().get_job(job_id)
 
     async def update_job(self, job_id: str, **fields):
         """Update build job fields."""
-        supabase = get_supabase_admin()
-        if not supabase:
-            return
-        from datetime import datetime
-        fields['updated_at'] = datetime.utcnow().isoformat()
-        supabase.table('build_jobs').update(fields).eq('id', job_id).execute()
+        await get_job_backend().update_job(job_id, **fields)
 
     async def update_heartbeat(self, job_id: str):
         """Update heartbeat timestamp for a running job."""
-        supabase = get_supabase_admin()
-        if not supabase:
-            return
-        from datetime import datetime
-        supabase.table('build_jobs').update({
-            'heartbeat_at': datetime.utcnow().isoformat(),
-            'updated_at': datetime.utcnow().isoformat(),
-        }).eq('id', job_id).execute()
+        await get_job_backend().update_job(job_id, heartbeat_at=datetime.utcnow().isoformat())
+
+    async def claim_next_job(self, worker_id: str) -> Optional[str]:
+        """Claim the oldest claimable queued job for ``worker_id``."""
+        return await get_job_backend().claim_next_job(worker_id)
 
     async def recover_stuck_jobs(self) -> int:
         """Recover stuck jobs via DB function."""
-        supabase = get_supabase_admin()
-        if not supabase:
-            return 0
-        try:
-            from app.config import settings
-            result = supabase.rpc('recover_stuck_build_jobs', {
-                'p_timeout_minutes': settings.BUILD_JOB_TIMEOUT_MINUTES,
-            }).execute()
-            return result.data or 0
-        except Exception as e:
-            logger.error("recover_stuck_build_jobs failed: %s", e)
-            return 0
+        from app.config import settings
+        return await get_job_backend().recover_stuck_jobs(settings.BUILD_JOB_TIMEOUT_MINUTES)
 
     async def get_user_profile(self, user_id: str) -> dict:
         """Fetch user profile for tier info."""
-        supabase = get_supabase_admin()
-        if not supabase:
-            return {"subscription_tier": "free"}
-        result = supabase.table('profiles').select(
-            'subscription_tier, builds_used_this_period'
-        ).eq('id', user_id).single().execute()
-        return result.data or {"subscription_tier": "free"}
+        profile = await get_job_backend().get_user_profile(user_id)
+        return profile or {"subscription_tier": "free"}
+
+    async def find_reusable_artifact(self, config_hash: str) -> Optional[dict]:
+        """Return artifact fields of a succeeded, unexpired job with this config hash."""
+        return await get_job_backend().find_reusable_artifact(config_hash)
 
     async def get_expired_artifacts(self) -> list:
         """Get jobs with expired artifacts."""
-        supabase = get_supabase_admin()
-        if not supabase:
-            return []
-        from datetime import datetime
-        result = supabase.table('build_jobs').select(
-            'id, artifact_storage_path'
-        ).eq('status', 'succeeded').lt(
-            'artifact_expires_at', datetime.utcnow().isoformat()
-        ).not_.is_('artifact_storage_path', 'null').execute()
-        return result.data or []
+        return await get_job_backend().get_expired_artifacts()
 
     async def clear_artifact(self, job_id: str):
         """Clear artifact fields after expiry cleanup."""
-        supabase = get_supabase_admin()
-        if not supabase:
-            return
-        supabase.table('build_jobs').update({
-            'artifact_storage_path': None,
-            'jar_filename': None,
-            'artifact_size_bytes': None,
-        }).eq('id', job_id).execute()
+        await get_job_backend().update_job(
+            job_id, artifact_storage_path=None, jar_filename=None, artifact_size_bytes=None
+        )
+
+    async def count_artifact_references(self, storage_path: str, exclude_job_id: str) -> int:
+        """Count other jobs still pointing at an artifact (reused builds share it)."""
+        return await get_job_backend().count_artifact_references(storage_path, exclude_job_id)
+
+    async def increment_build_count(self, user_id: str, max_builds: int) -> bool:
+        """Reserve one build of the user's quota. False when the limit is reached.
+
+        Returns True when no data backend is configured (quota not enforced).
+        """
+        return await get_job_backend().increment_build_count(user_id, max_builds)
+
+    async def decrement_build_count(self, user_id: str) -> None:
+        """Refund one build of the user's quota."""
+        await get_job_backend().decrement_build_count(user_id)
 
 
 build_job_service = BuildJobService()
@@ -9,19 +9,18 @@ from pathlib import Path
 
 from app.config import settings
 from app.models.plugin_config import PluginConfig
+from app.services.build_capacity import build_slots
 from app.services.build_job_service import build_job_service
 from app.services.artifact_storage import artifact_storage
-from app.services.code_generator import CodeGeneratorService
-from app.services.file_writer import FileWriterService
-from app.services.supabase_client import get_supabase_admin
+from app.services.codegen_pool import codegen_pool
+from app.services.download_registry import download_registry
+from app.services.single_flight import SingleFlight
 from app.models.exceptions import BuildError
+from app.utils.hashing import config_fingerprint
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
-code_generator = CodeGeneratorService()
-file_writer = FileWriterService()
-
 
 def cleanup_orphaned_build_dirs():
     """Delete any leftover /tmp/builds/* dirs from previous crashes."""
@@ -34,10 +33,11 @@ def cleanup_orphaned_build_dirs():
 
 
 class BuildWorker:
-    """Async build worker with semaphore-controlled concurrency."""
+    """Async build worker sharing build slots with the sync endpoint."""
 
     def __init__(self):
-        self._semaphore = asyncio.Semaphore(settings.MAX_CONCURRENT_BUILDS)
+        self._slots = build_slots
+        self._build_flights = SingleFlight()
         self._wake_event = asyncio.Event()
         self._worker_id = f"worker-{uuid.uuid4().hex[:8]}"
         self._shutdown = False
@@ -80,23 +80,17 @@ class BuildWorker:
             self._wake_event.clear()
 
             while not self._shutdown:
-                await self._semaphore.acquire()
+                await self._slots.acquire()
                 job_id = await self._claim_job()
                 if not job_id:
-                    self._semaphore.release()
+                    self._slots.release()
                     break
                 asyncio.create_task(self._process_and_release(job_id))
 
     async def _claim_job(self) -> str | None:
         """Claim the next queued job via DB function."""
-        supabase = get_supabase_admin()
-        if not supabase:
-            return None
         try:
-            result = supabase.rpc('claim_next_build_job', {
-                'p_worker_id': self._worker_id,
-            }).execute()
-            return str(result.data) if result.data else None
+            return await build_job_service.claim_next_job(self._worker_id)
         except Exception as e:
             logger.error("Failed to claim job: %s", e)
             return None
@@ -105,7 +99,7 @@ class BuildWorker:
         try:
             await self._process_job(job_id)
         finally:
-            self._semaphore.release()
+            self._slots.release()
             self.notify()
 
     async def _process_job(self, job_id: str):
@@ -132,29 +126,18 @@ class BuildWorker:
                 tier = profile.get("subscription_tier", "free") if profile else "free"
                 watermark = TIER_LIMITS.get(tier, TIER_LIMITS["free"]).get("watermark", False)
 
-            # 3. Generate code
-            loop = asyncio.get_event_loop()
-            files = await loop.run_in_executor(
-                None, lambda: code_generator.generate_all(config, watermark=watermark)
+            # 3. Build the artifact, or reuse one from an identical build
+            config_hash = config_fingerprint(config, watermark=watermark)
+            await build_job_service.update_job(job_id, config_hash=config_hash)
+            artifact = await self._build_flights.run(
+                config_hash,
+                lambda: self._build_artifact(job_id, build_dir, config, watermark, config_hash),
             )
 
-            # 3. Write files
-            await loop.run_in_executor(None, file_writer.write_files, build_dir, config, files)
-
-            # 4. Maven build (non-blocking)
-            jar_path = await self._async_maven_build(build_dir)
-
-            # 5. Upload artifact
-            safe_name = self._sanitize_filename(jar_path.name)
-            storage_path = await artifact_storage.upload(job_id, jar_path, safe_name)
-
-            # 6. Mark succeeded
+            # 4. Mark succeeded
             await build_job_service.update_job(job_id,
                 status="succeeded",
-                artifact_storage_path=storage_path,
-                jar_filename=safe_name,
-                artifact_size_bytes=jar_path.stat().st_size,
-                artifact_expires_at=(datetime.utcnow() + timedelta(hours=settings.ARTIFACT_EXPIRY_HOURS)).isoformat(),
+                **artifact,
                 completed_at=datetime.utcnow().isoformat(),
             )
             logger.info("Build job %s succeeded", job_id)
@@ -176,10 +159,8 @@ class BuildWorker:
                     pass
             if user_id:
                 try:
-                    supabase = get_supabase_admin()
-                    if supabase:
-                        supabase.rpc("decrement_build_count", {"p_user_id": user_id}).execute()
-                        logger.info("Refunded build quota for user %s (job %s failed)", user_id, job_id)
+                    await build_job_service.decrement_build_count(user_id)
+                    logger.info("Refunded build quota for user %s (job %s failed)", user_id, job_id)
                 except Exception as refund_err:
                     logger.error("Failed to refund quota for user %s: %s", user_id, refund_err)
         finally:
@@ -188,6 +169,44 @@ class BuildWorker:
             if build_dir.exists():
                 shutil.rmtree(build_dir, ignore_errors=True)
 
+    async def _build_artifact(
+        self,
+        job_id: str,
+        build_dir: Path,
+        config: PluginConfig,
+        watermark: bool,
+        config_hash: str,
+    ) -> dict:
+        """Produce the artifact fields for a job.
+
+        Reuses the unexpired artifact of an earlier job with the same
+        config hash when one exists, otherwise generates, compiles and
+        uploads a fresh JAR.
+        """
+        reusable = await build_job_service.find_reusable_artifact(config_hash)
+        if reusable:
+            logger.info("Build job %s reuses artifact %s", job_id, reusable["artifact_storage_path"])
+            return reusable
+
+        # Generate code straight into the build directory
+        await codegen_pool.write_project(config, build_dir, watermark=watermark)
+
+        # Maven build (non-blocking)
+        jar_path = await self._async_maven_build(build_dir)
+
+        # Upload artifact
+        safe_name = self._sanitize_filename(jar_path.name)
+        storage_path = await artifact_storage.upload(job_id, jar_path, safe_name)
+
+        return {
+            "artifact_storage_path": storage_path,
+            "jar_filename": safe_name,
+            "artifact_size_bytes": jar_path.stat().st_size,
+            "artifact_expires_at": (
+                datetime.utcnow() + timedelta(hours=settings.ARTIFACT_EXPIRY_HOURS)
+            ).isoformat(),
+        }
+
     async def _async_maven_build(self, project_dir: Path) -> Path:
         """Non-blocking Maven build."""
         proc = await asyncio.create_subprocess_exec(
@@ -239,13 +258,18 @@ class BuildWorker:
                 logger.error("Stuck job recovery failed: %s", e)
 
     async def _artifact_cleanup_loop(self):
-        """Delete expired artifacts every hour."""
+        """Delete expired artifacts and sync build downloads every hour."""
         while not self._shutdown:
             await asyncio.sleep(3600)
             try:
                 await artifact_storage.cleanup_expired()
             except Exception as e:
                 logger.error("Artifact cleanup failed: %s", e)
+            try:
+                loop = asyncio.get_event_loop()
+                await loop.run_in_executor(None, download_registry.evict)
+            except Exception as e:
+                logger.error("Download registry eviction failed: %s", e)
 
 
 build_worker = BuildWorker()
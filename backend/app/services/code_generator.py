@@ -5,21 +5,29 @@ This module is a thin orchestrator that delegates to sub-modules in the
 used by routes and the plugin generator.
 """
 
-from typing import Any, Dict
+from typing import Any, Dict, Iterable, Iterator, Optional, Sequence, Tuple
 
-from app.models.block import BlockType
 from app.models.plugin_config import PluginConfig
 
+from .codegen.analysis import CommandUnit, ConfigAnalysis, ListenerUnit, analyze_config
 from .codegen.class_generators import (
+    generate_command_class,
     generate_commands,
+    generate_listener_class,
     generate_listeners,
     generate_main_plugin,
 )
+from .codegen.sinks import CodeSink
 from .codegen.template_generators import (
     generate_cooldown_manager,
+    generate_recipe_registry,
+    generate_region_filler,
+    generate_sidebar_boards,
+    generate_task_wheel,
     generate_plugin_yml,
     generate_pom_xml,
 )
+from .codegen.version_config import ServerTarget
 
 
 WATERMARK_COMMENT = """\
@@ -34,60 +42,178 @@ WATERMARK_COMMENT = """\
 """
 
 
+def java_root(config: PluginConfig) -> str:
+    """Project-relative directory of the plugin's Java package."""
+    return f"src/main/java/{config.main_package.replace('.', '/')}"
+
+
+def apply_watermark(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Prefix every Java file in a ``generate_all`` result with the watermark."""
+    result["main_java"] = WATERMARK_COMMENT + result["main_java"]
+    for key in ("listeners", "commands", "utilities"):
+        result[key] = {k: WATERMARK_COMMENT + v for k, v in result[key].items()}
+    return result
+
+
 class CodeGeneratorService:
     """Generates all Java source files for a Minecraft plugin."""
 
     def generate_all(self, config: PluginConfig, watermark: bool = False) -> Dict[str, Any]:
         """Generate all files needed for the plugin."""
+        analysis = analyze_config(config)
         result = {
-            "main_java": self.generate_main_plugin(config),
-            "listeners": self.generate_listeners(config),
-            "commands": self.generate_commands(config),
-            "plugin_yml": self.generate_plugin_yml(config),
+            "main_java": self.generate_main_plugin(config, analysis),
+            "listeners": self.generate_listeners(config, analysis),
+            "commands": self.generate_commands(config, analysis),
+            "plugin_yml": self.generate_plugin_yml(config, analysis),
             "pom_xml": self.generate_pom_xml(config),
-            "utilities": {},
+            "utilities": self.generate_utilities(config, analysis),
         }
 
-        # Generate shared CooldownManager if any block uses cooldowns
-        all_action_names = {
-            b.name for b in config.blocks if b.type == BlockType.ACTION
-        }
-        if all_action_names & {"SetCooldown", "CheckCooldown"}:
-            result["utilities"]["CooldownManager.java"] = (
-                self._generate_cooldown_manager(config.main_package)
-            )
-
         # Inject watermark comment into all Java files for free-tier users
         if watermark:
-            result["main_java"] = WATERMARK_COMMENT + result["main_java"]
-            result["listeners"] = {
-                k: WATERMARK_COMMENT + v for k, v in result["listeners"].items()
-            }
-            result["commands"] = {
-                k: WATERMARK_COMMENT + v for k, v in result["commands"].items()
-            }
-            result["utilities"] = {
-                k: WATERMARK_COMMENT + v for k, v in result["utilities"].items()
-            }
+            apply_watermark(result)
 
         return result
 
+    def iter_files(
+        self,
+        config: PluginConfig,
+        analysis: Optional[ConfigAnalysis] = None,
+        *,
+        listeners: slice = slice(None),
+        commands: slice = slice(None),
+        project_files: bool = True,
+    ) -> Iterator[Tuple[str, str]]:
+        """Yield ``(project_path, source)`` one file at a time.
+
+        ``listeners`` and ``commands`` select a range of the analysis units
+        and ``project_files`` toggles the main class, utilities, plugin.yml
+        and pom.xml, so a project can be generated in disjoint parts.
+        """
+        analysis = analysis or analyze_config(config)
+        package = config.main_package
+        root = java_root(config)
+
+        if project_files:
+            yield f"{root}/{config.main_class_name}.java", self.generate_main_plugin(config, analysis)
+        yield from self.iter_class_files(
+            root, package, analysis.target, analysis.listeners[listeners], analysis.commands[commands]
+        )
+        if project_files:
+            for filename, code in self.generate_utilities(config, analysis).items():
+                yield f"{root}/util/{filename}", code
+            yield "src/main/resources/plugin.yml", self.generate_plugin_yml(config, analysis)
+            yield "pom.xml", self.generate_pom_xml(config)
+
+    def iter_class_files(
+        self,
+        root: str,
+        package: str,
+        target: ServerTarget,
+        listeners: Sequence[ListenerUnit] = (),
+        commands: Sequence[CommandUnit] = (),
+    ) -> Iterator[Tuple[str, str]]:
+        """Yield the listener and command classes of the given analysis units.
+
+        Needs only the units' own blocks, not the whole config, so a shard of
+        units can be generated on its own.
+        """
+        for unit in listeners:
+            yield f"{root}/listeners/{unit.filename}", generate_listener_class(
+                package, unit.index, unit.event, unit.children,
+                mask=unit.mask, sections=unit.sections, target=target,
+            )
+        for unit in commands:
+            yield f"{root}/commands/{unit.filename}", generate_command_class(
+                package, unit.block, unit.children, unit.index,
+                mask=unit.mask, target=target,
+            )[0]
+
+    def generate_to(
+        self,
+        config: PluginConfig,
+        sink: CodeSink,
+        watermark: bool = False,
+        analysis: Optional[ConfigAnalysis] = None,
+        **parts: Any,
+    ) -> int:
+        """Stream project files into ``sink``. Returns the file count.
+
+        ``parts`` are passed on to ``iter_files``.
+        """
+        return self.write_to(sink, self.iter_files(config, analysis, **parts), watermark)
+
+    @staticmethod
+    def write_to(sink: CodeSink, files: Iterable[Tuple[str, str]], watermark: bool = False) -> int:
+        """Write ``(project_path, source)`` pairs into ``sink``. Returns the count.
+
+        Only one file is held in memory at a time; the watermark is written
+        to the sink as a separate header chunk.
+        """
+        count = 0
+        for path, source in files:
+            if watermark and path.endswith(".java"):
+                sink.write(path, (WATERMARK_COMMENT, source))
+            else:
+                sink.write(path, (source,))
+            count += 1
+        return count
+
+    def generate_utilities(
+        self, config: PluginConfig, analysis: Optional[ConfigAnalysis] = None
+    ) -> Dict[str, str]:
+        """Generate shared utility classes. Returns {filename: java_code}."""
+        analysis = analysis or analyze_config(config)
+        utilities: Dict[str, str] = {}
+
+        # Generate shared CooldownManager if any block uses cooldowns
+        if analysis.uses_cooldowns:
+            utilities["CooldownManager.java"] = (
+                self._generate_cooldown_manager(
+                    config.main_package, analysis.cooldowns, folia=analysis.target.folia
+                )
+            )
+        if analysis.uses_task_wheel:
+            utilities["TaskWheel.java"] = generate_task_wheel(
+                config.main_package, folia=analysis.target.folia
+            )
+        if analysis.uses_scoreboards:
+            utilities["SidebarBoards.java"] = generate_sidebar_boards(config.main_package)
+        if analysis.uses_region_fill:
+            utilities["RegionFiller.java"] = generate_region_filler(
+                config.main_package, folia=analysis.target.folia
+            )
+        if analysis.recipes:
+            utilities["RecipeRegistry.java"] = generate_recipe_registry(
+                config.main_package, analysis.recipes
+            )
+        return utilities
+
     # -- Delegation to sub-modules ------------------------------------------
 
-    def generate_main_plugin(self, config: PluginConfig) -> str:
-        return generate_main_plugin(config)
+    def generate_main_plugin(
+        self, config: PluginConfig, analysis: Optional[ConfigAnalysis] = None
+    ) -> str:
+        return generate_main_plugin(config, analysis)
 
-    def generate_listeners(self, config: PluginConfig) -> Dict[str, str]:
-        return generate_listeners(config)
+    def generate_listeners(
+        self, config: PluginConfig, analysis: Optional[ConfigAnalysis] = None
+    ) -> Dict[str, str]:
+        return generate_listeners(config, analysis)
 
-    def generate_commands(self, config: PluginConfig) -> Dict[str, str]:
-        return generate_commands(config)
+    def generate_commands(
+        self, config: PluginConfig, analysis: Optional[ConfigAnalysis] = None
+    ) -> Dict[str, str]:
+        return generate_commands(config, analysis)
 
-    def generate_plugin_yml(self, config: PluginConfig) -> str:
-        return generate_plugin_yml(config)
+    def generate_plugin_yml(
+        self, config: PluginConfig, analysis: Optional[ConfigAnalysis] = None
+    ) -> str:
+        return generate_plugin_yml(config, analysis)
 
     def generate_pom_xml(self, config: PluginConfig) -> str:
         return generate_pom_xml(config)
 
-    def _generate_cooldown_manager(self, package: str) -> str:
-        return generate_cooldown_manager(package)
+    def _generate_cooldown_manager(self, package: str, names: Sequence[str] = (), folia: bool = False) -> str:
+        return generate_cooldown_manager(package, names, folia)
@@ -3,507 +3,322 @@
 This is the core action-dispatch module: ``generate_action_code`` takes a list
 of ``Block`` objects and produces the Java statements that go inside an event
 handler or command executor method body.
+
+Each action name maps to an ``ActionSpec`` in ``ACTION_REGISTRY`` (defined at
+the bottom of this module) declaring its generator, the imports its code
+needs and which handler-scope variables (player, target entity/block, plugin,
+...) it relies on. Dispatch is a single dict lookup per block.
+
+Generators append statements and nested ``if``/block nodes to a
+``java_ir.Body``; the text never carries indentation or braces.
+``generate_action_code`` renders the tree once at method-body depth.
 """
 
 import re
-from typing import List
+from dataclasses import dataclass, field
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Sequence, Set, Tuple
 
 from app.models.block import Block, BlockType
 from app.utils.validators import sanitize_java_string
 
 from .constants import WORLD_EVENT_NAMES
-from .helpers import build_branch_if_expression, replace_arg_placeholders
-
-
-def generate_action_code(blocks: List[Block], event_name: str = "") -> str:
-    """Generate Java code for a list of action blocks."""
-    lines: List[str] = []
-    if_depth = 0
-    action_names = {b.name for b in blocks if b.type == BlockType.ACTION}
-    player_required_actions = action_names & {
-        "SendMessage",
-        "BroadcastMessage",
-        "SendConsoleMessage",
-        "GiveItem",
-        "RemoveItem",
-        "SetItemInHand",
-        "SetHealth",
-        "SetHunger",
-        "SetSaturation",
-        "PlaySound",
-        "TeleportPlayer",
-        "AddExperience",
-        "SetLevel",
-        "SetExperienceLevel",
-        "SendTitle",
-        "ConsoleLog",
-        "DropItem",
-        "SetGameMode",
-        "AddPotionEffect",
-        "ApplyPotionEffect",
-        "RemovePotionEffect",
-        "SetVelocity",
-        "SendActionBar",
-        "SpawnParticle",
-        "SpawnParticles",
-        "KillPlayer",
-        "DamagePlayer",
-        "ClearInventory",
-        "ExecuteCommand",
-        "ExecuteCommandAsPlayer",
-        "ExecuteConsoleCommand",
-        "KickPlayer",
-        "SetGlowing",
-        "SetInvisible",
-        "SetCustomName",
-        "AllowFlight",
-        "SetOnFire",
-        "GrantPermission",
-        "SetMetadata",
-        "DelayAction",
-        "RepeatAction",
-        "SetCooldown",
-        "CheckCooldown",
-        "BranchIf",
-        "CreateGUI",
-        "AddGUIItem",
-        "OpenGUI",
-        "CreateBossBar",
-        "RemoveBossBar",
-        "SetScoreboard",
-        "RemoveScoreboard",
-        "GetTempVar",
-        "SendConfigValue",
-        "HealPlayer",
-        "FeedPlayer",
-        "SetMaxHealth",
-        "SetArmor",
-        "LaunchProjectile",
-        "SpawnFirework",
-        "SetSpawnLocation",
-        "CloseInventory",
-        "SendTabHeaderFooter",
-        "SetWalkSpeed",
-        "SetFlySpeed",
-        "OpenBook",
-        "SetResourcePack",
-        "SetWorldBorder",
-        "SpawnFallingBlock",
-        "RideEntity",
-    }
-
-    needs_entity = bool(
-        action_names
-        & {
-            "DamageEntity",
-            "SetEntityHealth",
-            "TeleportEntity",
-            "SetEntityVelocity",
-            "ApplyEntityPotionEffect",
-            "SetEntityOnFire",
-            "SetEntityCustomName",
-            "SetEntityEquipment",
-            "SetTime",
-            "SetWeather",
-            "SetThunder",
-            "SpawnEntity",
-            "StrikeLightning",
-            "StrikeWithLightning",
-            "CreateExplosion",
-            "SpawnParticle",
-            "SpawnParticles",
-            "FillRegion",
-            "SetWorldBorder",
-            "SpawnFallingBlock",
-            "RideEntity",
-        }
-    )
-    needs_living = bool(
-        action_names
-        & {
-            "SetEntityHealth",
-            "ApplyEntityPotionEffect",
-            "SetEntityOnFire",
-            "SetEntityCustomName",
-            "SetEntityEquipment",
-        }
-    )
-    needs_block = bool(
-        action_names
-        & {
-            "SetBlockType",
-            "RemoveBlock",
-            "FillRegion",
-            "SetTime",
-            "SetWeather",
-            "SetThunder",
-            "SpawnEntity",
-            "StrikeLightning",
-            "StrikeWithLightning",
-            "CreateExplosion",
-            "SpawnParticle",
-            "SpawnParticles",
-            "SetWorldBorder",
-            "SpawnFallingBlock",
-        }
-    )
-    needs_plugin = bool(action_names & {"GrantPermission", "SetMetadata", "SaveConfig", "SendConfigValue", "CreateBossBar", "RemoveBossBar", "AddShapelessRecipe", "AddShapedRecipe"})
-    needs_gui = bool(action_names & {"CreateGUI", "AddGUIItem", "OpenGUI"})
-    needs_temp_vars = bool(action_names & {"SetTempVar", "GetTempVar"})
-
+from .helpers import build_branch_if_expression, cooldown_constant, replace_arg_placeholders, to_bool
+from .java_ir import Body, StaticFields, render
+from .version_config import ServerTarget
+
+
+@dataclass
+class ActionContext:
+    """State threaded through one ``generate_action_code`` call."""
+
+    event_name: str
+    is_command: bool
+    block: Optional[Block] = None
+    continuation: Optional[str] = None  # runnable for the blocks after a scheduler
+    fields: Optional[StaticFields] = None  # class constants; None keeps everything inline
+    target: ServerTarget = ServerTarget()
+    # Bodies of the open BranchIf arms around the segment body, innermost last
+    scopes: List[Body] = field(default_factory=list)
+
+    @property
+    def if_depth(self) -> int:
+        return max(len(self.scopes) - 1, 0)
+
+
+ActionGenerator = Callable[[Body, dict, ActionContext], None]
+
+
+@dataclass(frozen=True)
+class ActionSpec:
+    """How to generate one action and what its Java code depends on.
+
+    ``imports`` may contain ``{package}``, which is replaced with the plugin's
+    main package. ``prop_imports`` adds imports that depend on the block's
+    properties. ``consumes_rest`` marks scheduling actions: every following
+    block runs in the continuation they schedule. ``consumes_rest_if``
+    decides that per block from its properties instead. ``chains_completion``
+    marks asynchronous actions whose following blocks run on completion; they
+    only split at the top level of a segment, outside any ``BranchIf``.
+    """
+
+    generate: ActionGenerator
+    imports: FrozenSet[str] = frozenset()
+    prop_imports: Optional[Callable[[dict], Iterable[str]]] = None
+    needs_player: bool = False
+    needs_entity: bool = False
+    needs_living: bool = False
+    needs_block: bool = False
+    needs_plugin: bool = False
+    needs_gui: bool = False
+    needs_temp_vars: bool = False
+    consumes_rest: bool = False
+    consumes_rest_if: Optional[Callable[[dict], bool]] = None
+    chains_completion: bool = False
+
+    def splits_after(self, props: dict) -> bool:
+        """Whether the blocks after this one run in its continuation."""
+        if self.consumes_rest_if is not None:
+            return self.consumes_rest_if(props or {})
+        return self.consumes_rest
+
+
+def generate_action_code(
+    blocks: Sequence[Block],
+    event_name: str = "",
+    fields: Optional[StaticFields] = None,
+    target: Optional[ServerTarget] = None,
+    declared: int = 0,
+) -> str:
+    """Generate Java code for a list of action blocks.
+
+    Scheduling actions (``consumes_rest``) split the list into segments; each
+    segment after the first runs when the previous segment's scheduler fires.
+    Later segments are emitted as flat ``Runnable`` continuations declared
+    last-to-first, so every block is generated once and nesting depth stays
+    constant however long the delay chain is.
+
+    With ``fields``, values that are the same on every firing (such as fully
+    constant custom items) are built once as static fields of the enclosing
+    class; the caller must emit them.
+
+    ``target`` selects platform-specific calls (Folia schedulers, async
+    teleports); it defaults to the current Paper release.
+
+    ``declared`` holds requirement bits whose variables the caller already
+    has in scope (see ``prelude_parameters``); the leading prelude skips them.
+    """
     is_command = event_name == "CommandEvent"
+    target = target or ServerTarget()
 
-    if needs_plugin:
-        lines.append("        JavaPlugin plugin = JavaPlugin.getProvidingPlugin(getClass());")
-    if needs_gui:
-        lines.append("        Inventory gui = null;")
-    if needs_temp_vars:
-        lines.append("        java.util.HashMap<String, String> tempVars = new java.util.HashMap<>();")
-    if player_required_actions and not is_command:
-        lines.append("        if (player == null) return;")
+    # Single pass: split into segments at scheduling blocks. Branch depth is
+    # tracked per segment, as ``ActionContext.if_depth`` is.
+    segments: List[List[Block]] = [[]]
+    depth = 0
+    for block in blocks:
+        segments[-1].append(block)
+        spec = ACTION_REGISTRY.get(block.name) if block.type == BlockType.ACTION else None
+        if spec is None:
+            continue
+        if block.name == "BranchIf":
+            depth += 1
+        elif block.name == "BranchEndIf" and depth > 0:
+            depth -= 1
+        if spec.splits_after(block.properties) or (spec.chains_completion and depth == 0):
+            segments.append([])
+            depth = 0
+    if not segments[-1]:
+        segments.pop()
+
+    # Each segment's prelude covers everything that may run from it onward.
+    suffix_masks = [0] * len(segments)
+    mask = 0
+    for i in range(len(segments) - 1, -1, -1):
+        mask |= requirements_mask(segments[i])
+        suffix_masks[i] = mask
+
+    bodies = [
+        _generate_segment(segment, suffix_masks[i] & ~declared if i == 0 else suffix_masks[i],
+                          event_name, is_command,
+                          f"continuation{i + 1}" if i + 1 < len(segments) else None, fields, target)
+        for i, segment in enumerate(segments)
+    ]
+    if not bodies:
+        return ""
+
+    root, first_statements = bodies[0]
+    for i in range(len(bodies) - 1, 0, -1):
+        prelude, statements = bodies[i]
+        declaration = root.block(f"final Runnable continuation{i} = new Runnable() {{", "};")
+        declaration.append("@Override")
+        run = declaration.block("public void run() {")
+        run.extend(prelude)
+        run.extend(statements)
+    root.extend(first_statements)
+    return render(root, depth=2) if len(root) else ""
+
+
+def _generate_segment(
+    blocks: List[Block],
+    mask: int,
+    event_name: str,
+    is_command: bool,
+    continuation: Optional[str],
+    fields: Optional[StaticFields] = None,
+    target: Optional[ServerTarget] = None,
+) -> Tuple[Body, Body]:
+    """Return (prelude, statements) for one straight-line run of blocks."""
+    prelude = _generate_prelude(mask, is_command)
+    lines = Body()
+
+    ctx = ActionContext(
+        event_name=event_name, is_command=is_command, continuation=continuation,
+        fields=fields, target=target or ServerTarget(), scopes=[lines],
+    )
+    for block in blocks:
+        body = ctx.scopes[-1]
+        if block.type == BlockType.ACTION:
+            spec = ACTION_REGISTRY.get(block.name)
+            if spec is None:
+                continue
+            ctx.block = block
+            spec.generate(body, block.properties, ctx)
+        elif block.type == BlockType.CUSTOM_CONDITION:
+            code = block.custom_code or "true"
+            body.if_(code).append("// Custom condition body")
+        elif block.type == BlockType.CUSTOM_ACTION:
+            code = block.custom_code or "// custom action"
+            for line in code.split("\n"):
+                body.append(f"{line}")
+
+    # Branches still open at the end of the segment close with it
+    return prelude, lines
+
+
+def _generate_prelude(mask: int, is_command: bool) -> Body:
+    """Declare the handler-scope variables required by ``mask``."""
+    lines = Body()
+    needs_player = mask & NEEDS_PLAYER
+    needs_entity = mask & NEEDS_ENTITY
+    needs_living = mask & NEEDS_LIVING
+    needs_block = mask & NEEDS_BLOCK
+
+    if mask & NEEDS_PLUGIN:
+        lines.append("JavaPlugin plugin = JavaPlugin.getProvidingPlugin(getClass());")
+    if mask & NEEDS_GUI:
+        lines.append("Inventory gui = null;")
+    if mask & NEEDS_TEMP_VARS:
+        lines.append("java.util.HashMap<String, String> tempVars = new java.util.HashMap<>();")
+    if needs_player and not is_command:
+        lines.append("if (player == null) return;")
     if needs_entity and not is_command:
-        lines.append("        boolean hasEventEntity = event instanceof EntityEvent;")
-        lines.append("        Entity targetEntity = null;")
-        lines.append("        if (hasEventEntity) {")
-        lines.append("            targetEntity = ((EntityEvent) event).getEntity();")
-        lines.append("        } else if (player != null) {")
-        lines.append("            targetEntity = player;")
-        lines.append("        }")
+        lines.append("boolean hasEventEntity = event instanceof EntityEvent;")
+        lines.append("Entity targetEntity = null;")
+        lines.if_("hasEventEntity").append("targetEntity = ((EntityEvent) event).getEntity();")
+        lines.else_if("player != null").append("targetEntity = player;")
     elif needs_entity and is_command:
-        lines.append("        boolean hasEventEntity = true;")
-        lines.append("        Entity targetEntity = player;")
+        lines.append("boolean hasEventEntity = true;")
+        lines.append("Entity targetEntity = player;")
     if needs_living and not is_command:
         lines.append(
-            "        LivingEntity living = (targetEntity instanceof LivingEntity) ? (LivingEntity) targetEntity : null;"
+            "LivingEntity living = (targetEntity instanceof LivingEntity) ? (LivingEntity) targetEntity : null;"
         )
     elif needs_living and is_command:
-        lines.append("        LivingEntity living = player;")
+        lines.append("LivingEntity living = player;")
     if needs_block and not is_command:
-        lines.append("        boolean hasEventBlock = event instanceof BlockEvent;")
-        lines.append("        Block targetBlock = null;")
-        lines.append("        if (hasEventBlock) {")
-        lines.append("            targetBlock = ((BlockEvent) event).getBlock();")
-        lines.append("        } else if (player != null) {")
-        lines.append("            targetBlock = player.getLocation().getBlock();")
-        lines.append("        }")
+        lines.append("boolean hasEventBlock = event instanceof BlockEvent;")
+        lines.append("Block targetBlock = null;")
+        lines.if_("hasEventBlock").append("targetBlock = ((BlockEvent) event).getBlock();")
+        lines.else_if("player != null").append("targetBlock = player.getLocation().getBlock();")
     elif needs_block and is_command:
-        lines.append("        boolean hasEventBlock = true;")
-        lines.append("        Block targetBlock = player.getLocation().getBlock();")
+        lines.append("boolean hasEventBlock = true;")
+        lines.append("Block targetBlock = player.getLocation().getBlock();")
+    return lines
+
+
+def generate_prelude(mask: int, is_command: bool = False) -> str:
+    """Render the prelude for ``mask`` at method-body depth."""
+    return render(_generate_prelude(mask, is_command), depth=2)
+
+
+def prelude_parameters(mask: int) -> List[str]:
+    """Return ``Type name`` declarations for the prelude variables of ``mask``.
+
+    Methods that receive an already-computed prelude take these as parameters.
+    """
+    return [param for flag, params in _PRELUDE_VARIABLES if mask & flag for param in params]
+
 
+def requirements_mask(blocks: Sequence[Block]) -> int:
+    """OR together the compiled capability masks of ``blocks``."""
+    mask = 0
     for block in blocks:
         if block.type == BlockType.ACTION:
-            props = block.properties
-            if block.name == "SendMessage":
-                _gen_send_message(lines, props, is_command)
-            elif block.name == "BroadcastMessage":
-                _gen_broadcast_message(lines, props, is_command)
-            elif block.name == "SendConsoleMessage":
-                _gen_send_console_message(lines, props, is_command)
-            elif block.name == "GiveItem":
-                _gen_give_item(lines, props)
-            elif block.name == "RemoveItem":
-                _gen_remove_item(lines, props)
-            elif block.name == "SetItemInHand":
-                _gen_set_item_in_hand(lines, props)
-            elif block.name == "SetHealth":
-                lines.append(f"        player.setHealth({props.get('health', '20.0')});")
-            elif block.name == "SetHunger":
-                lines.append(f"        player.setFoodLevel({props.get('hunger', '20')});")
-            elif block.name == "SetSaturation":
-                lines.append(f"        player.setSaturation({props.get('saturation', '5.0')});")
-            elif block.name == "CancelEvent":
-                if not is_command:
-                    lines.append("        event.setCancelled(true);")
-            elif block.name == "PlaySound":
-                _gen_play_sound(lines, props)
-            elif block.name == "TeleportPlayer":
-                _gen_teleport_player(lines, props)
-            elif block.name == "AddExperience":
-                lines.append(f"        player.giveExp({props.get('amount', '10')});")
-            elif block.name == "SetLevel" or block.name == "SetExperienceLevel":
-                lines.append(f"        player.setLevel({props.get('level', '10')});")
-            elif block.name == "SendTitle":
-                _gen_send_title(lines, props)
-            elif block.name == "ConsoleLog":
-                _gen_console_log(lines, props, is_command)
-            elif block.name == "DropItem":
-                _gen_drop_item(lines, props)
-            elif block.name == "SetGameMode":
-                game_mode = sanitize_java_string(props.get("gameMode", "SURVIVAL")).upper()
-                lines.append(f"        player.setGameMode(GameMode.{game_mode});")
-            elif block.name == "AddPotionEffect" or block.name == "ApplyPotionEffect":
-                _gen_add_potion_effect(lines, props)
-            elif block.name == "RemovePotionEffect":
-                effect_type = sanitize_java_string(props.get("effectType", "SPEED")).upper()
-                lines.append(f"        player.removePotionEffect(PotionEffectType.{effect_type});")
-            elif block.name == "SetVelocity":
-                _gen_set_velocity(lines, props)
-            elif block.name == "SendActionBar":
-                _gen_send_action_bar(lines, props, is_command)
-            elif block.name == "SpawnParticle" or block.name == "SpawnParticles":
-                _gen_spawn_particle(lines, props, event_name, is_command)
-            elif block.name == "KillPlayer":
-                lines.append("        player.setHealth(0);")
-            elif block.name == "DamagePlayer":
-                lines.append(f"        player.damage({props.get('amount', '5.0')});")
-            elif block.name == "ClearInventory":
-                lines.append("        player.getInventory().clear();")
-            elif block.name == "ExecuteCommand" or block.name == "ExecuteCommandAsPlayer":
-                _gen_execute_command(lines, props, is_command)
-            elif block.name == "ExecuteConsoleCommand":
-                _gen_execute_console_command(lines, props, is_command)
-            elif block.name == "KickPlayer":
-                reason = sanitize_java_string(props.get("reason", "You have been kicked!"))
-                lines.append(f'        player.kickPlayer("{reason}");')
-            elif block.name == "SetTime":
-                _gen_set_time(lines, props, event_name, is_command)
-            elif block.name == "SetWeather":
-                _gen_set_weather(lines, props, event_name, is_command)
-            elif block.name == "SetThunder":
-                _gen_set_thunder(lines, props, event_name, is_command)
-            elif block.name == "SpawnEntity":
-                _gen_spawn_entity(lines, props, event_name, is_command)
-            elif block.name == "StrikeLightning" or block.name == "StrikeWithLightning":
-                _gen_strike_lightning(lines, props, event_name, is_command)
-            elif block.name == "CreateExplosion":
-                _gen_create_explosion(lines, props, event_name, is_command)
-            elif block.name == "SetBlockType":
-                block_type = sanitize_java_string(props.get("blockType", "STONE")).upper()
-                lines.append("        if (targetBlock != null) {")
-                lines.append(f"            targetBlock.setType(Material.{block_type});")
-                lines.append("        }")
-            elif block.name == "RemoveBlock":
-                lines.append("        if (targetBlock != null) {")
-                lines.append("            targetBlock.breakNaturally();")
-                lines.append("        }")
-            elif block.name == "FillRegion":
-                _gen_fill_region(lines, props, event_name, is_command)
-            elif block.name == "SetGlowing":
-                lines.append(f"        player.setGlowing({props.get('glowing', 'true').lower()});")
-            elif block.name == "SetInvisible":
-                lines.append(f"        player.setInvisible({props.get('invisible', 'true').lower()});")
-            elif block.name == "SetCustomName":
-                name = sanitize_java_string(props.get("name", ""))
-                lines.append(f'        player.setCustomName("{name}");')
-                lines.append("        player.setCustomNameVisible(true);")
-            elif block.name == "AllowFlight":
-                _gen_allow_flight(lines, props)
-            elif block.name == "SetOnFire":
-                lines.append(f"        player.setFireTicks({props.get('ticks', '100')});")
-            elif block.name == "GrantPermission":
-                _gen_grant_permission(lines, props)
-            elif block.name == "SetMetadata":
-                _gen_set_metadata(lines, props)
-            elif block.name == "DamageEntity":
-                _gen_damage_entity(lines, props)
-            elif block.name == "SetEntityHealth":
-                _gen_set_entity_health(lines, props)
-            elif block.name == "TeleportEntity":
-                _gen_teleport_entity(lines, props)
-            elif block.name == "SetEntityVelocity":
-                _gen_set_entity_velocity(lines, props)
-            elif block.name == "ApplyEntityPotionEffect":
-                _gen_apply_entity_potion_effect(lines, props)
-            elif block.name == "SetEntityOnFire":
-                _gen_set_entity_on_fire(lines, props)
-            elif block.name == "SetEntityCustomName":
-                _gen_set_entity_custom_name(lines, props)
-            elif block.name == "SetEntityEquipment":
-                _gen_set_entity_equipment(lines, props)
-            elif block.name == "CreateGUI":
-                _gen_create_gui(lines, props)
-            elif block.name == "AddGUIItem":
-                _gen_add_gui_item(lines, props)
-            elif block.name == "OpenGUI":
-                lines.append("        if (gui != null) player.openInventory(gui);")
-            elif block.name == "CreateBossBar":
-                _gen_create_boss_bar(lines, props)
-            elif block.name == "RemoveBossBar":
-                _gen_remove_boss_bar(lines, props)
-            elif block.name == "SetScoreboard":
-                _gen_set_scoreboard(lines, props)
-            elif block.name == "RemoveScoreboard":
-                lines.append("        player.setScoreboard(Bukkit.getScoreboardManager().getNewScoreboard());")
-            elif block.name == "SaveConfig":
-                _gen_save_config(lines, props, is_command)
-            elif block.name == "SendConfigValue":
-                _gen_send_config_value(lines, props, is_command)
-            elif block.name == "SetTempVar":
-                _gen_set_temp_var(lines, props, is_command)
-            elif block.name == "GetTempVar":
-                _gen_get_temp_var(lines, props, is_command)
-            elif block.name == "AddShapelessRecipe":
-                _gen_add_shapeless_recipe(lines, props)
-            elif block.name == "AddShapedRecipe":
-                _gen_add_shaped_recipe(lines, props)
-            elif block.name == "HealPlayer":
-                amount = props.get("amount", "5")
-                lines.append(f"        player.setHealth(Math.min(player.getHealth() + {amount}, player.getAttribute(org.bukkit.attribute.Attribute.GENERIC_MAX_HEALTH).getValue()));")
-            elif block.name == "FeedPlayer":
-                amount = props.get("amount", "5")
-                lines.append(f"        player.setFoodLevel(Math.min(player.getFoodLevel() + {amount}, 20));")
-            elif block.name == "SetMaxHealth":
-                amount = props.get("amount", "20")
-                lines.append(f"        player.getAttribute(org.bukkit.attribute.Attribute.GENERIC_MAX_HEALTH).setBaseValue({amount});")
-            elif block.name == "SetArmor":
-                _gen_set_armor(lines, props)
-            elif block.name == "LaunchProjectile":
-                _gen_launch_projectile(lines, props)
-            elif block.name == "SpawnFirework":
-                _gen_spawn_firework(lines, props)
-            elif block.name == "SetSpawnLocation":
-                _gen_set_spawn_location(lines, props)
-            elif block.name == "CloseInventory":
-                lines.append("        player.closeInventory();")
-            elif block.name == "SendTabHeaderFooter":
-                _gen_send_tab_header_footer(lines, props, is_command)
-            elif block.name == "SetWorldBorder":
-                _gen_set_world_border(lines, props, event_name, is_command)
-            elif block.name == "SpawnFallingBlock":
-                _gen_spawn_falling_block(lines, props, event_name, is_command)
-            elif block.name == "OpenBook":
-                _gen_open_book(lines, props, is_command)
-            elif block.name == "SetResourcePack":
-                _gen_set_resource_pack(lines, props)
-            elif block.name == "RideEntity":
-                lines.append("        if (targetEntity != null && targetEntity != player) {")
-                lines.append("            targetEntity.addPassenger(player);")
-                lines.append("        }")
-            elif block.name == "SetWalkSpeed":
-                speed = props.get("speed", "0.2")
-                lines.append(f"        player.setWalkSpeed({speed}f);")
-            elif block.name == "SetFlySpeed":
-                speed = props.get("speed", "0.1")
-                lines.append(f"        player.setFlySpeed({speed}f);")
-            elif block.name == "DelayAction":
-                _gen_delay_action(lines, blocks, block, event_name)
-                break  # remaining blocks are inside the runnable
-            elif block.name == "RepeatAction":
-                _gen_repeat_action(lines, blocks, block, event_name)
-                break
-            elif block.name == "SetCooldown":
-                _gen_set_cooldown(lines, props)
-            elif block.name == "CheckCooldown":
-                _gen_check_cooldown(lines, props)
-            # Condition blocks (guard clauses)
-            elif block.name == "HasPermission":
-                perm = sanitize_java_string(props.get("permission", ""))
-                if perm:
-                    lines.append(f'        if (player == null || !player.hasPermission("{perm}")) return;')
-            elif block.name == "HasItem":
-                item_type = sanitize_java_string(props.get("itemType", "DIAMOND")).upper()
-                amount = props.get("amount", "1")
-                lines.append(f'        if (player == null || !player.getInventory().contains(Material.{item_type}, {amount})) return;')
-            elif block.name == "HealthAbove":
-                lines.append(f'        if (player == null || player.getHealth() <= {props.get("health", "10")}) return;')
-            elif block.name == "HealthBelow":
-                lines.append(f'        if (player == null || player.getHealth() >= {props.get("health", "5")}) return;')
-            elif block.name == "GameModeEquals":
-                game_mode = sanitize_java_string(props.get("gameMode", "SURVIVAL")).upper()
-                lines.append(f'        if (player == null || player.getGameMode() != org.bukkit.GameMode.{game_mode}) return;')
-            elif block.name == "IsInWorld":
-                world = sanitize_java_string(props.get("world", "world"))
-                lines.append(f'        if (player == null || !player.getWorld().getName().equals("{world}")) return;')
-            elif block.name == "IsSneaking":
-                lines.append('        if (player == null || !player.isSneaking()) return;')
-            elif block.name == "IsFlying":
-                lines.append('        if (player == null || !player.isFlying()) return;')
-            elif block.name == "IsOp":
-                lines.append('        if (player == null || !player.isOp()) return;')
-            elif block.name == "HungerAbove":
-                lines.append(f'        if (player == null || player.getFoodLevel() <= {props.get("hunger", "10")}) return;')
-            elif block.name == "HungerBelow":
-                lines.append(f'        if (player == null || player.getFoodLevel() >= {props.get("hunger", "5")}) return;')
-            elif block.name == "LevelAbove":
-                lines.append(f'        if (player == null || player.getLevel() <= {props.get("level", "10")}) return;')
-            elif block.name == "IsHoldingItem":
-                item_type = sanitize_java_string(props.get("itemType", "DIAMOND")).upper()
-                lines.append(f'        if (player == null || player.getInventory().getItemInMainHand().getType() != Material.{item_type}) return;')
-            elif block.name == "IsRaining":
-                lines.append('        if (player == null || !player.getWorld().hasStorm()) return;')
-            elif block.name == "IsThundering":
-                lines.append('        if (player == null || !player.getWorld().isThundering()) return;')
-            elif block.name == "HasPotionEffect":
-                effect_type = sanitize_java_string(props.get("effectType", "SPEED")).upper()
-                lines.append(f'        if (player == null || !player.hasPotionEffect(PotionEffectType.{effect_type})) return;')
-            elif block.name == "IsOnGround":
-                lines.append('        if (player == null || !player.isOnGround()) return;')
-            elif block.name == "IsInWater":
-                lines.append('        if (player == null || !player.isInWater()) return;')
-            elif block.name == "RandomChance":
-                chance = props.get("chance", "50")
-                lines.append(f'        if (Math.random() * 100 >= {chance}) return;')
-            elif block.name == "BlockIsType":
-                block_type_val = sanitize_java_string(props.get("blockType", "STONE")).upper()
-                lines.append(f'        if (!(event instanceof org.bukkit.event.block.BlockEvent) || ((org.bukkit.event.block.BlockEvent) event).getBlock().getType() != Material.{block_type_val}) return;')
-            elif block.name == "TimeIsDay":
-                lines.append('        if (player == null || player.getWorld().getTime() >= 12300) return;')
-            elif block.name == "TimeIsNight":
-                lines.append('        if (player == null || player.getWorld().getTime() < 12300) return;')
-            elif block.name == "IsInBiome":
-                biome = sanitize_java_string(props.get("biome", "PLAINS")).upper()
-                lines.append(f'        if (player == null || player.getLocation().getBlock().getBiome() != org.bukkit.block.Biome.{biome}) return;')
-            elif block.name == "HasExperience":
-                amount = props.get("amount", "100")
-                lines.append(f'        if (player == null || player.getTotalExperience() < {amount}) return;')
-            elif block.name == "BranchIf":
-                expression = build_branch_if_expression(props)
-                lines.append(f"        if ({expression}) {{")
-                if_depth += 1
-            elif block.name == "BranchElse":
-                if if_depth > 0:
-                    lines.append("        } else {")
-            elif block.name == "BranchEndIf":
-                if if_depth > 0:
-                    lines.append("        }")
-                    if_depth -= 1
-            elif block.name in {"StringArg", "PlayerArg", "IntegerArg"}:
-                continue
-        elif block.type == BlockType.CUSTOM_CONDITION:
-            code = block.custom_code or "true"
-            lines.append(f"        if ({code}) {{")
-            lines.append("            // Custom condition body")
-            lines.append("        }")
-        elif block.type == BlockType.CUSTOM_ACTION:
-            code = block.custom_code or "// custom action"
-            for line in code.split("\n"):
-                lines.append(f"        {line}")
+            mask |= ACTION_MASKS.get(block.name, 0)
+        elif block.type in (BlockType.CUSTOM_ACTION, BlockType.CUSTOM_CONDITION):
+            mask |= _CUSTOM_CODE_MASK
+    return mask
+
+
+def collect_action_imports(
+    blocks: Sequence[Block], package: str, is_command: bool, mask: Optional[int] = None
+) -> Set[str]:
+    """Return the imports required by the action code generated for ``blocks``.
+
+    Pass ``mask`` when the blocks' requirement mask is already known.
+    """
+    if mask is None:
+        mask = requirements_mask(blocks)
+    imports: Set[str] = set()
+    import_bits = mask >> _IMPORT_SHIFT
+    while import_bits:
+        low = import_bits & -import_bits
+        imports.add(IMPORT_TABLE[low.bit_length() - 1])
+        import_bits ^= low
+
+    # Handler-scope variables that only listeners derive from the event
+    if not is_command:
+        if mask & NEEDS_ENTITY:
+            imports.add("org.bukkit.event.entity.EntityEvent")
+        if mask & NEEDS_BLOCK:
+            imports.add("org.bukkit.event.block.BlockEvent")
+
+    # Imports that depend on property values
+    for block in blocks:
+        if block.type == BlockType.ACTION and block.name in _PROP_IMPORT_ACTIONS:
+            imports.update(ACTION_REGISTRY[block.name].prop_imports(block.properties))
 
-    while if_depth > 0:
-        lines.append("        }")
-        if_depth -= 1
-    return "\n".join(lines) + "\n" if lines else ""
+    return {imp.replace("{package}", package) for imp in imports}
 
 
 # ---------------------------------------------------------------------------
 # Per-action helper functions
 # ---------------------------------------------------------------------------
 
-def _gen_send_message(lines: List[str], props: dict, is_command: bool) -> None:
+def _gen_send_message(lines: Body, props: dict, is_command: bool) -> None:
     msg = sanitize_java_string(props.get("message", "Hello!"))
     if "%player%" in msg:
         msg = msg.replace("%player%", '" + player.getName() + "')
     msg = replace_arg_placeholders(msg, is_command)
-    lines.append(f'        player.sendMessage("{msg}");')
+    lines.append(f'player.sendMessage("{msg}");')
 
 
-def _gen_broadcast_message(lines: List[str], props: dict, is_command: bool) -> None:
+def _gen_broadcast_message(lines: Body, props: dict, is_command: bool) -> None:
     msg = sanitize_java_string(props.get("message", ""))
     if "%player%" in msg:
         msg = msg.replace("%player%", '" + player.getName() + "')
     msg = replace_arg_placeholders(msg, is_command)
-    lines.append(f'        Bukkit.broadcastMessage("{msg}");')
+    lines.append(f'Bukkit.broadcastMessage("{msg}");')
 
 
-def _gen_send_console_message(lines: List[str], props: dict, is_command: bool) -> None:
+def _gen_send_console_message(lines: Body, props: dict, is_command: bool) -> None:
     msg = sanitize_java_string(props.get("message", ""))
     if "%player%" in msg:
         msg = msg.replace("%player%", '" + player.getName() + "')
     msg = replace_arg_placeholders(msg, is_command)
-    lines.append(f'        Bukkit.getConsoleSender().sendMessage("{msg}");')
+    lines.append(f'Bukkit.getConsoleSender().sendMessage("{msg}");')
 
 
-def _gen_give_item(lines: List[str], props: dict) -> None:
+def _gen_give_item(lines: Body, props: dict, fields: Optional[StaticFields]) -> None:
     item_type = sanitize_java_string(props.get("itemType", "DIAMOND")).upper()
     amount = props.get("amount", "1")
     display_name = props.get("displayName", "")
@@ -514,13 +329,12 @@ def _gen_give_item(lines: List[str], props: dict) -> None:
     has_meta = display_name or lore or enchantments or item_flags
 
     if has_meta:
-        lines.append(f"        ItemStack customItem = new ItemStack(Material.{item_type}, {amount});")
-        lines.append(f"        ItemMeta meta = customItem.getItemMeta();")
-        lines.append(f"        if (meta != null) {{")
+        meta_lines: List[str] = []
+        levels: List[str] = [amount]
 
         if display_name:
             safe_name = sanitize_java_string(display_name)
-            lines.append(f'            meta.setDisplayName(org.bukkit.ChatColor.translateAlternateColorCodes(\'&\', "{safe_name}"));')
+            meta_lines.append(f'meta.setDisplayName(org.bukkit.ChatColor.translateAlternateColorCodes(\'&\', "{safe_name}"));')
 
         if lore:
             lore_lines = [sanitize_java_string(l.strip()) for l in lore.split("|") if l.strip()]
@@ -529,7 +343,7 @@ def _gen_give_item(lines: List[str], props: dict) -> None:
                     f'org.bukkit.ChatColor.translateAlternateColorCodes(\'&\', "{l}")'
                     for l in lore_lines
                 )
-                lines.append(f"            meta.setLore(java.util.Arrays.asList({lore_java}));")
+                meta_lines.append(f"meta.setLore(java.util.Arrays.asList({lore_java}));")
 
         if enchantments:
             for ench_str in enchantments.split(","):
@@ -538,59 +352,92 @@ def _gen_give_item(lines: List[str], props: dict) -> None:
                     ench_name, level = ench_str.split(":", 1)
                     ench_name = sanitize_java_string(ench_name.strip()).upper()
                     level = level.strip()
-                    lines.append(f"            meta.addEnchant(org.bukkit.enchantments.Enchantment.{ench_name}, {level}, true);")
+                    levels.append(level)
+                    meta_lines.append(f"meta.addEnchant(org.bukkit.enchantments.Enchantment.{ench_name}, {level}, true);")
 
         if item_flags:
             for flag in item_flags.split(","):
                 flag = sanitize_java_string(flag.strip()).upper()
                 if flag:
-                    lines.append(f"            meta.addItemFlags(org.bukkit.inventory.ItemFlag.{flag});")
-
-        lines.append(f"            customItem.setItemMeta(meta);")
-        lines.append(f"        }}")
-        lines.append(f"        player.getInventory().addItem(customItem);")
+                    meta_lines.append(f"meta.addItemFlags(org.bukkit.inventory.ItemFlag.{flag});")
+
+        if fields is not None and all(_is_int_literal(value) for value in levels):
+            # Every firing gives the same item: build it once, hand out copies
+            template = _item_template(fields, item_type, amount, "meta", meta_lines)
+            lines.append(f"player.getInventory().addItem({template}.clone());")
+            return
+
+        lines.append(f"ItemStack customItem = new ItemStack(Material.{item_type}, {amount});")
+        lines.append("ItemMeta meta = customItem.getItemMeta();")
+        with_meta = lines.if_("meta != null")
+        for line in meta_lines:
+            with_meta.append(line)
+        with_meta.append("customItem.setItemMeta(meta);")
+        lines.append("player.getInventory().addItem(customItem);")
     else:
         lines.append(
-            f"        player.getInventory().addItem("
+            f"player.getInventory().addItem("
             f"new ItemStack(Material.{item_type}, {amount}));"
         )
 
 
-def _gen_remove_item(lines: List[str], props: dict) -> None:
+_INT_LITERAL = re.compile(r"^-?\d+$")
+
+
+def _is_int_literal(value: object) -> bool:
+    return bool(_INT_LITERAL.match(str(value).strip()))
+
+
+def _item_template(
+    fields: StaticFields, item_type: str, amount: str, meta_var: str, meta_lines: List[str]
+) -> str:
+    """Register a constant ``ItemStack`` whose meta is set by ``meta_lines``."""
+    factory = Body()
+    factory.append(f"ItemStack item = new ItemStack(Material.{item_type}, {amount.strip()});")
+    factory.append(f"ItemMeta {meta_var} = item.getItemMeta();")
+    with_meta = factory.if_(f"{meta_var} != null")
+    for line in meta_lines:
+        with_meta.append(line)
+    with_meta.append(f"item.setItemMeta({meta_var});")
+    factory.append("return item;")
+    return fields.add("ItemStack", "item", factory)
+
+
+def _gen_remove_item(lines: Body, props: dict) -> None:
     item_type = sanitize_java_string(props.get("itemType", "DIAMOND")).upper()
     amount = props.get("amount", "1")
     lines.append(
-        f"        player.getInventory().removeItem("
+        f"player.getInventory().removeItem("
         f"new ItemStack(Material.{item_type}, {amount}));"
     )
 
 
-def _gen_set_item_in_hand(lines: List[str], props: dict) -> None:
+def _gen_set_item_in_hand(lines: Body, props: dict) -> None:
     item_type = sanitize_java_string(props.get("itemType", "DIAMOND")).upper()
     hand = sanitize_java_string(props.get("hand", "MAIN_HAND")).upper()
     if hand == "OFF_HAND":
         lines.append(
-            f"        player.getInventory().setItemInOffHand("
+            f"player.getInventory().setItemInOffHand("
             f"new ItemStack(Material.{item_type}, 1));"
         )
     else:
         lines.append(
-            f"        player.getInventory().setItemInMainHand("
+            f"player.getInventory().setItemInMainHand("
             f"new ItemStack(Material.{item_type}, 1));"
         )
 
 
-def _gen_play_sound(lines: List[str], props: dict) -> None:
+def _gen_play_sound(lines: Body, props: dict) -> None:
     sound = sanitize_java_string(props.get("sound", "ENTITY_EXPERIENCE_ORB_PICKUP"))
     volume = props.get("volume", "1.0")
     pitch = props.get("pitch", "1.0")
     lines.append(
-        f"        player.playSound(player.getLocation(), "
+        f"player.playSound(player.getLocation(), "
         f"Sound.{sound}, {volume}f, {pitch}f);"
     )
 
 
-def _gen_teleport_player(lines: List[str], props: dict) -> None:
+def _gen_teleport_player(lines: Body, props: dict, ctx: ActionContext) -> None:
     x = props.get("x", "0")
     y = props.get("y", "64")
     z = props.get("z", "0")
@@ -598,482 +445,284 @@ def _gen_teleport_player(lines: List[str], props: dict) -> None:
     yaw = props.get("yaw", "0")
     pitch = props.get("pitch", "0")
     if world_name:
-        lines.append(
-            f'        if (Bukkit.getWorld("{world_name}") != null) {{'
-            f" player.teleport(new Location(Bukkit.getWorld(\"{world_name}\"), {x}, {y}, {z}, {yaw}f, {pitch}f)); }}"
+        _teleport(
+            lines.if_(f'Bukkit.getWorld("{world_name}") != null'), ctx, "player",
+            f'new Location(Bukkit.getWorld("{world_name}"), {x}, {y}, {z}, {yaw}f, {pitch}f)',
         )
+        _continue_otherwise(lines, ctx)
     else:
+        _teleport(lines, ctx, "player", f"new Location(player.getWorld(), {x}, {y}, {z}, {yaw}f, {pitch}f)")
+
+
+def _teleport(lines: Body, ctx: ActionContext, entity: str, location: str) -> None:
+    """Teleport ``entity``; the blocks after it run once it has arrived.
+
+    With async teleports the destination chunk is loaded off the main thread
+    and the continuation runs when the future completes (on the entity's
+    thread), whether or not the teleport succeeded.
+    """
+    continuation = _completion_continuation(ctx)
+    if not ctx.target.async_teleport:
+        lines.append(f"{entity}.teleport({location});")
+        if continuation:
+            lines.append(f"{continuation}.run();")
+    elif continuation:
         lines.append(
-            f"        player.teleport(new Location("
-            f"player.getWorld(), {x}, {y}, {z}, {yaw}f, {pitch}f));"
+            f"{entity}.teleportAsync({location})"
+            f".whenComplete((moved, error) -> {continuation}.run());"
         )
+    else:
+        lines.append(f"{entity}.teleportAsync({location});")
+
+
+def _completion_continuation(ctx: ActionContext) -> Optional[str]:
+    # Only top-level blocks split their segment (see ``chains_completion``)
+    return ctx.continuation if ctx.if_depth == 0 else None
 
 
-def _gen_send_title(lines: List[str], props: dict) -> None:
+def _continue_otherwise(lines: Body, ctx: ActionContext) -> None:
+    """Add an ``else`` to the guard around ``_teleport`` that runs the continuation if it failed."""
+    continuation = _completion_continuation(ctx)
+    if continuation:
+        lines.else_().append(f"{continuation}.run();")
+
+
+def _gen_send_title(lines: Body, props: dict) -> None:
     title = sanitize_java_string(props.get("title", ""))
     subtitle = sanitize_java_string(props.get("subtitle", ""))
     fade_in = props.get("fadeIn", "10")
     stay = props.get("stay", "70")
     fade_out = props.get("fadeOut", "20")
     lines.append(
-        f'        player.sendTitle("{title}", "{subtitle}", '
+        f'player.sendTitle("{title}", "{subtitle}", '
         f"{fade_in}, {stay}, {fade_out});"
     )
 
 
-def _gen_console_log(lines: List[str], props: dict, is_command: bool) -> None:
+def _gen_console_log(lines: Body, props: dict, is_command: bool) -> None:
     msg = sanitize_java_string(props.get("message", ""))
     if "%player%" in msg:
         msg = msg.replace("%player%", '" + player.getName() + "')
     msg = replace_arg_placeholders(msg, is_command)
-    lines.append(f'        Bukkit.getLogger().info("{msg}");')
+    lines.append(f'Bukkit.getLogger().info("{msg}");')
 
 
-def _gen_drop_item(lines: List[str], props: dict) -> None:
+def _gen_drop_item(lines: Body, props: dict) -> None:
     item_type = sanitize_java_string(props.get("itemType", "DIAMOND")).upper()
     amount = props.get("amount", "1")
     lines.append(
-        f"        player.getWorld().dropItemNaturally("
+        f"player.getWorld().dropItemNaturally("
         f"player.getLocation(), new ItemStack(Material.{item_type}, {amount}));"
     )
 
 
-def _gen_add_potion_effect(lines: List[str], props: dict) -> None:
+def _gen_add_potion_effect(lines: Body, props: dict) -> None:
     effect_type = sanitize_java_string(props.get("effectType", "SPEED")).upper()
     duration = props.get("duration", "200")
     amplifier = props.get("amplifier", "1")
     lines.append(
-        f"        player.addPotionEffect(new PotionEffect("
+        f"player.addPotionEffect(new PotionEffect("
         f"PotionEffectType.{effect_type}, {duration}, {amplifier}));"
     )
 
 
-def _gen_set_velocity(lines: List[str], props: dict) -> None:
+def _gen_set_velocity(lines: Body, props: dict) -> None:
     x = props.get("x", "0")
     y = props.get("y", "1")
     z = props.get("z", "0")
-    lines.append(f"        player.setVelocity(new Vector({x}, {y}, {z}));")
+    lines.append(f"player.setVelocity(new Vector({x}, {y}, {z}));")
 
 
-def _gen_send_action_bar(lines: List[str], props: dict, is_command: bool) -> None:
+def _gen_send_action_bar(lines: Body, props: dict, is_command: bool) -> None:
     msg = sanitize_java_string(props.get("message", ""))
     if "%player%" in msg:
         msg = msg.replace("%player%", '" + player.getName() + "')
     msg = replace_arg_placeholders(msg, is_command)
-    lines.append(f'        player.sendActionBar("{msg}");')
+    lines.append(f'player.sendActionBar("{msg}");')
 
 
-def _gen_spawn_particle(lines: List[str], props: dict, event_name: str, is_command: bool) -> None:
+def _gen_spawn_particle(lines: Body, props: dict, event_name: str, is_command: bool) -> None:
     particle = sanitize_java_string(props.get("particle", "HEART")).upper()
     count = props.get("count", "10")
     offset_x = props.get("offsetX", "0")
     offset_y = props.get("offsetY", "0")
     offset_z = props.get("offsetZ", "0")
     speed = props.get("speed", "0")
-    target = sanitize_java_string(props.get("target", "auto")).lower()
-    if target == "player":
-        lines.append("        if (player != null) {")
-        lines.append(
-            f"            player.getWorld().spawnParticle(Particle.{particle}, "
-            f"player.getLocation(), {count}, {offset_x}, {offset_y}, {offset_z}, {speed});"
-        )
-        lines.append("        }")
-    elif target == "event_entity":
-        lines.append("        if (hasEventEntity && targetEntity != null) {")
-        lines.append(
-            f"            targetEntity.getWorld().spawnParticle(Particle.{particle}, "
-            f"targetEntity.getLocation(), {count}, {offset_x}, {offset_y}, {offset_z}, {speed});"
-        )
-        lines.append("        }")
-    elif target == "event_block":
-        lines.append("        if (hasEventBlock && targetBlock != null) {")
-        lines.append(
-            f"            targetBlock.getWorld().spawnParticle(Particle.{particle}, "
-            f"targetBlock.getLocation(), {count}, {offset_x}, {offset_y}, {offset_z}, {speed});"
-        )
-        lines.append("        }")
-    elif target == "event_world":
-        if event_name in WORLD_EVENT_NAMES:
-            lines.append(
-                f"        event.getWorld().spawnParticle(Particle.{particle}, "
-                f"event.getWorld().getSpawnLocation(), {count}, {offset_x}, {offset_y}, {offset_z}, {speed});"
-            )
-        else:
-            lines.append("        if (hasEventBlock && targetBlock != null) {")
-            lines.append(
-                f"            targetBlock.getWorld().spawnParticle(Particle.{particle}, "
-                f"targetBlock.getWorld().getSpawnLocation(), {count}, {offset_x}, {offset_y}, {offset_z}, {speed});"
-            )
-            lines.append("        } else if (hasEventEntity && targetEntity != null) {")
-            lines.append(
-                f"            targetEntity.getWorld().spawnParticle(Particle.{particle}, "
-                f"targetEntity.getWorld().getSpawnLocation(), {count}, {offset_x}, {offset_y}, {offset_z}, {speed});"
-            )
-            lines.append("        } else if (player != null) {")
-            lines.append(
-                f"            player.getWorld().spawnParticle(Particle.{particle}, "
-                f"player.getWorld().getSpawnLocation(), {count}, {offset_x}, {offset_y}, {offset_z}, {speed});"
-            )
-            lines.append("        }")
-    else:
-        lines.append("        if (hasEventEntity && targetEntity != null) {")
-        lines.append(
-            f"            targetEntity.getWorld().spawnParticle(Particle.{particle}, "
-            f"targetEntity.getLocation(), {count}, {offset_x}, {offset_y}, {offset_z}, {speed});"
-        )
-        lines.append("        } else if (hasEventBlock && targetBlock != null) {")
-        lines.append(
-            f"            targetBlock.getWorld().spawnParticle(Particle.{particle}, "
-            f"targetBlock.getLocation(), {count}, {offset_x}, {offset_y}, {offset_z}, {speed});"
-        )
-        lines.append("        } else if (player != null) {")
-        lines.append(
-            f"            player.getWorld().spawnParticle(Particle.{particle}, "
-            f"player.getLocation(), {count}, {offset_x}, {offset_y}, {offset_z}, {speed});"
+
+    def spawn(body: Body, world: str, location: str) -> None:
+        body.append(
+            f"{world}.spawnParticle(Particle.{particle}, "
+            f"{location}, {count}, {offset_x}, {offset_y}, {offset_z}, {speed});"
         )
-        lines.append("        }")
-        if event_name in WORLD_EVENT_NAMES:
-            lines.append("        else {")
-            lines.append(
-                f"            event.getWorld().spawnParticle(Particle.{particle}, "
-                f"event.getWorld().getSpawnLocation(), {count}, {offset_x}, {offset_y}, {offset_z}, {speed});"
-            )
-            lines.append("        }")
+
+    # Particles are purely visual, so spawn points need no loaded-chunk guard
+    _at_target_location(lines, props, event_name, spawn, guard_spawn=False)
 
 
-def _gen_execute_command(lines: List[str], props: dict, is_command: bool) -> None:
+def _gen_execute_command(lines: Body, props: dict, is_command: bool) -> None:
     command = sanitize_java_string(props.get("command", ""))
     if "%player%" in command:
         command = command.replace("%player%", '" + player.getName() + "')
     command = replace_arg_placeholders(command, is_command)
-    lines.append(f'        player.performCommand("{command}");')
+    lines.append(f'player.performCommand("{command}");')
 
 
-def _gen_execute_console_command(lines: List[str], props: dict, is_command: bool) -> None:
+def _gen_execute_console_command(lines: Body, props: dict, ctx: ActionContext) -> None:
     command = sanitize_java_string(props.get("command", ""))
     if "%player%" in command:
         command = command.replace("%player%", '" + player.getName() + "')
-    command = replace_arg_placeholders(command, is_command)
+    command = replace_arg_placeholders(command, ctx.is_command)
+    if ctx.target.folia:
+        # Console commands must run on the global region thread
+        lines.append(
+            "Bukkit.getGlobalRegionScheduler().execute("
+            "org.bukkit.plugin.java.JavaPlugin.getProvidingPlugin(getClass()), "
+            f'() -> Bukkit.dispatchCommand(Bukkit.getConsoleSender(), "{command}"));'
+        )
+        return
     lines.append(
-        f'        Bukkit.dispatchCommand(Bukkit.getConsoleSender(), "{command}");'
+        f'Bukkit.dispatchCommand(Bukkit.getConsoleSender(), "{command}");'
     )
 
 
-def _gen_set_time(lines: List[str], props: dict, event_name: str, is_command: bool) -> None:
-    time = props.get("time", "6000")
+# Handler-scope variables an action can target, with the guard that they exist
+_HOLDER_GUARDS = {
+    "player": "player != null",
+    "targetEntity": "hasEventEntity && targetEntity != null",
+    "targetBlock": "hasEventBlock && targetBlock != null",
+}
+_TARGET_HOLDERS = {"player": "player", "event_entity": "targetEntity", "event_block": "targetBlock"}
+_AUTO_HOLDERS = ("targetEntity", "targetBlock", "player")
+_WORLD_HOLDERS = ("targetBlock", "targetEntity", "player")
+
+
+def _holder_chain(lines: Body, holders: Sequence[str], apply: Callable[[Body, str], None]) -> None:
+    """``if``/``else if`` over ``holders``, applying to the first one that exists."""
+    for i, holder in enumerate(holders):
+        guard = _HOLDER_GUARDS[holder]
+        apply(lines.else_if(guard) if i else lines.if_(guard), holder)
+
+
+def _in_target_world(
+    lines: Body, props: dict, event_name: str, apply: Callable[[Body, str], None]
+) -> None:
+    """Apply a world-wide action to the world the ``target`` property selects.
+
+    ``apply`` receives the body to append to and the ``World`` expression.
+    """
     target = sanitize_java_string(props.get("target", "auto")).lower()
-    if target == "player":
-        lines.append("        if (player != null) {")
-        lines.append(f"            player.getWorld().setTime({time});")
-        lines.append("        }")
-    elif target == "event_entity":
-        lines.append("        if (hasEventEntity && targetEntity != null) {")
-        lines.append(f"            targetEntity.getWorld().setTime({time});")
-        lines.append("        }")
-    elif target == "event_block":
-        lines.append("        if (hasEventBlock && targetBlock != null) {")
-        lines.append(f"            targetBlock.getWorld().setTime({time});")
-        lines.append("        }")
+    holder = _TARGET_HOLDERS.get(target)
+    if holder:
+        apply(lines.if_(_HOLDER_GUARDS[holder]), f"{holder}.getWorld()")
+    elif event_name in WORLD_EVENT_NAMES:
+        apply(lines, "event.getWorld()")
+    else:
+        holders = _WORLD_HOLDERS if target == "event_world" else _AUTO_HOLDERS
+        _holder_chain(lines, holders, lambda body, h: apply(body, f"{h}.getWorld()"))
+
+
+def _at_target_location(
+    lines: Body,
+    props: dict,
+    event_name: str,
+    apply: Callable[[Body, str, str], None],
+    guard_spawn: bool = True,
+) -> None:
+    """Apply a located action at the target the ``target`` property selects.
+
+    ``apply`` receives the body, the ``World`` expression and the ``Location``.
+    ``event_world`` targets the world spawn point, which may sit in an
+    unloaded chunk; with ``guard_spawn`` the action is skipped there rather
+    than forcing a synchronous chunk load.
+    """
+    target = sanitize_java_string(props.get("target", "auto")).lower()
+    holder = _TARGET_HOLDERS.get(target)
+
+    def at_spawn(body: Body, world: str) -> None:
+        location = f"{world}.getSpawnLocation()"
+        if guard_spawn:
+            body = body.if_(f"{location}.isChunkLoaded()")
+        apply(body, world, location)
+
+    if holder:
+        apply(lines.if_(_HOLDER_GUARDS[holder]), f"{holder}.getWorld()", f"{holder}.getLocation()")
     elif target == "event_world":
         if event_name in WORLD_EVENT_NAMES:
-            lines.append(f"        event.getWorld().setTime({time});")
+            at_spawn(lines, "event.getWorld()")
         else:
-            lines.append("        if (hasEventBlock && targetBlock != null) {")
-            lines.append(f"            targetBlock.getWorld().setTime({time});")
-            lines.append("        } else if (hasEventEntity && targetEntity != null) {")
-            lines.append(f"            targetEntity.getWorld().setTime({time});")
-            lines.append("        } else if (player != null) {")
-            lines.append(f"            player.getWorld().setTime({time});")
-            lines.append("        }")
+            _holder_chain(lines, _WORLD_HOLDERS, lambda body, h: at_spawn(body, f"{h}.getWorld()"))
     else:
+        _holder_chain(
+            lines, _AUTO_HOLDERS, lambda body, h: apply(body, f"{h}.getWorld()", f"{h}.getLocation()")
+        )
         if event_name in WORLD_EVENT_NAMES:
-            lines.append(f"        event.getWorld().setTime({time});")
-        else:
-            lines.append("        if (hasEventEntity && targetEntity != null) {")
-            lines.append(f"            targetEntity.getWorld().setTime({time});")
-            lines.append("        } else if (hasEventBlock && targetBlock != null) {")
-            lines.append(f"            targetBlock.getWorld().setTime({time});")
-            lines.append("        } else if (player != null) {")
-            lines.append(f"            player.getWorld().setTime({time});")
-            lines.append("        }")
+            at_spawn(lines.else_(), "event.getWorld()")
 
 
-def _gen_set_weather(lines: List[str], props: dict, event_name: str, is_command: bool) -> None:
+def _gen_set_time(lines: Body, props: dict, event_name: str, is_command: bool) -> None:
+    time = props.get("time", "6000")
+
+    def set_time(body: Body, world: str) -> None:
+        body.append(f"{world}.setTime({time});")
+
+    _in_target_world(lines, props, event_name, set_time)
+
+
+def _gen_set_weather(lines: Body, props: dict, event_name: str, is_command: bool) -> None:
     storm = props.get("storm", "false").lower()
     duration = props.get("duration", "6000")
-    target = sanitize_java_string(props.get("target", "auto")).lower()
-    if target == "player":
-        lines.append("        if (player != null) {")
-        lines.append(f"            player.getWorld().setStorm({storm});")
-        lines.append(f"            player.getWorld().setWeatherDuration({duration});")
-        lines.append("        }")
-    elif target == "event_entity":
-        lines.append("        if (hasEventEntity && targetEntity != null) {")
-        lines.append(f"            targetEntity.getWorld().setStorm({storm});")
-        lines.append(f"            targetEntity.getWorld().setWeatherDuration({duration});")
-        lines.append("        }")
-    elif target == "event_block":
-        lines.append("        if (hasEventBlock && targetBlock != null) {")
-        lines.append(f"            targetBlock.getWorld().setStorm({storm});")
-        lines.append(f"            targetBlock.getWorld().setWeatherDuration({duration});")
-        lines.append("        }")
-    elif target == "event_world":
-        if event_name in WORLD_EVENT_NAMES:
-            lines.append(f"        event.getWorld().setStorm({storm});")
-            lines.append(f"        event.getWorld().setWeatherDuration({duration});")
-        else:
-            lines.append("        if (hasEventBlock && targetBlock != null) {")
-            lines.append(f"            targetBlock.getWorld().setStorm({storm});")
-            lines.append(f"            targetBlock.getWorld().setWeatherDuration({duration});")
-            lines.append("        } else if (hasEventEntity && targetEntity != null) {")
-            lines.append(f"            targetEntity.getWorld().setStorm({storm});")
-            lines.append(f"            targetEntity.getWorld().setWeatherDuration({duration});")
-            lines.append("        } else if (player != null) {")
-            lines.append(f"            player.getWorld().setStorm({storm});")
-            lines.append(f"            player.getWorld().setWeatherDuration({duration});")
-            lines.append("        }")
-    else:
-        if event_name in WORLD_EVENT_NAMES:
-            lines.append(f"        event.getWorld().setStorm({storm});")
-            lines.append(f"        event.getWorld().setWeatherDuration({duration});")
-        else:
-            lines.append("        if (hasEventEntity && targetEntity != null) {")
-            lines.append(f"            targetEntity.getWorld().setStorm({storm});")
-            lines.append(f"            targetEntity.getWorld().setWeatherDuration({duration});")
-            lines.append("        } else if (hasEventBlock && targetBlock != null) {")
-            lines.append(f"            targetBlock.getWorld().setStorm({storm});")
-            lines.append(f"            targetBlock.getWorld().setWeatherDuration({duration});")
-            lines.append("        } else if (player != null) {")
-            lines.append(f"            player.getWorld().setStorm({storm});")
-            lines.append(f"            player.getWorld().setWeatherDuration({duration});")
-            lines.append("        }")
-
-
-def _gen_set_thunder(lines: List[str], props: dict, event_name: str, is_command: bool) -> None:
+
+    def set_weather(body: Body, world: str) -> None:
+        body.append(f"{world}.setStorm({storm});")
+        body.append(f"{world}.setWeatherDuration({duration});")
+
+    _in_target_world(lines, props, event_name, set_weather)
+
+
+def _gen_set_thunder(lines: Body, props: dict, event_name: str, is_command: bool) -> None:
     thunder = props.get("thunder", "false").lower()
     duration = props.get("duration", "6000")
-    target = sanitize_java_string(props.get("target", "auto")).lower()
-    if target == "player":
-        lines.append("        if (player != null) {")
-        lines.append(f"            player.getWorld().setThundering({thunder});")
-        lines.append(f"            player.getWorld().setThunderDuration({duration});")
-        lines.append("        }")
-    elif target == "event_entity":
-        lines.append("        if (hasEventEntity && targetEntity != null) {")
-        lines.append(f"            targetEntity.getWorld().setThundering({thunder});")
-        lines.append(f"            targetEntity.getWorld().setThunderDuration({duration});")
-        lines.append("        }")
-    elif target == "event_block":
-        lines.append("        if (hasEventBlock && targetBlock != null) {")
-        lines.append(f"            targetBlock.getWorld().setThundering({thunder});")
-        lines.append(f"            targetBlock.getWorld().setThunderDuration({duration});")
-        lines.append("        }")
-    elif target == "event_world":
-        if event_name in WORLD_EVENT_NAMES:
-            lines.append(f"        event.getWorld().setThundering({thunder});")
-            lines.append(f"        event.getWorld().setThunderDuration({duration});")
-        else:
-            lines.append("        if (hasEventBlock && targetBlock != null) {")
-            lines.append(f"            targetBlock.getWorld().setThundering({thunder});")
-            lines.append(f"            targetBlock.getWorld().setThunderDuration({duration});")
-            lines.append("        } else if (hasEventEntity && targetEntity != null) {")
-            lines.append(f"            targetEntity.getWorld().setThundering({thunder});")
-            lines.append(f"            targetEntity.getWorld().setThunderDuration({duration});")
-            lines.append("        } else if (player != null) {")
-            lines.append(f"            player.getWorld().setThundering({thunder});")
-            lines.append(f"            player.getWorld().setThunderDuration({duration});")
-            lines.append("        }")
-    else:
-        if event_name in WORLD_EVENT_NAMES:
-            lines.append(f"        event.getWorld().setThundering({thunder});")
-            lines.append(f"        event.getWorld().setThunderDuration({duration});")
-        else:
-            lines.append("        if (hasEventEntity && targetEntity != null) {")
-            lines.append(f"            targetEntity.getWorld().setThundering({thunder});")
-            lines.append(f"            targetEntity.getWorld().setThunderDuration({duration});")
-            lines.append("        } else if (hasEventBlock && targetBlock != null) {")
-            lines.append(f"            targetBlock.getWorld().setThundering({thunder});")
-            lines.append(f"            targetBlock.getWorld().setThunderDuration({duration});")
-            lines.append("        } else if (player != null) {")
-            lines.append(f"            player.getWorld().setThundering({thunder});")
-            lines.append(f"            player.getWorld().setThunderDuration({duration});")
-            lines.append("        }")
-
-
-def _gen_spawn_entity(lines: List[str], props: dict, event_name: str, is_command: bool) -> None:
+
+    def set_thunder(body: Body, world: str) -> None:
+        body.append(f"{world}.setThundering({thunder});")
+        body.append(f"{world}.setThunderDuration({duration});")
+
+    _in_target_world(lines, props, event_name, set_thunder)
+
+
+def _gen_spawn_entity(lines: Body, props: dict, event_name: str, is_command: bool) -> None:
     entity_type = sanitize_java_string(props.get("entityType", "ZOMBIE")).upper()
-    target = sanitize_java_string(props.get("target", "auto")).lower()
-    if target == "player":
-        lines.append("        if (player != null) {")
-        lines.append(
-            f"            player.getWorld().spawnEntity(player.getLocation(), EntityType.{entity_type});"
-        )
-        lines.append("        }")
-    elif target == "event_entity":
-        lines.append("        if (hasEventEntity && targetEntity != null) {")
-        lines.append(
-            f"            targetEntity.getWorld().spawnEntity(targetEntity.getLocation(), EntityType.{entity_type});"
-        )
-        lines.append("        }")
-    elif target == "event_block":
-        lines.append("        if (hasEventBlock && targetBlock != null) {")
-        lines.append(
-            f"            targetBlock.getWorld().spawnEntity(targetBlock.getLocation(), EntityType.{entity_type});"
-        )
-        lines.append("        }")
-    elif target == "event_world":
-        if event_name in WORLD_EVENT_NAMES:
-            lines.append(
-                f"        event.getWorld().spawnEntity(event.getWorld().getSpawnLocation(), EntityType.{entity_type});"
-            )
-        else:
-            lines.append("        if (hasEventBlock && targetBlock != null) {")
-            lines.append(
-                f"            targetBlock.getWorld().spawnEntity(targetBlock.getWorld().getSpawnLocation(), EntityType.{entity_type});"
-            )
-            lines.append("        } else if (hasEventEntity && targetEntity != null) {")
-            lines.append(
-                f"            targetEntity.getWorld().spawnEntity(targetEntity.getWorld().getSpawnLocation(), EntityType.{entity_type});"
-            )
-            lines.append("        } else if (player != null) {")
-            lines.append(
-                f"            player.getWorld().spawnEntity(player.getWorld().getSpawnLocation(), EntityType.{entity_type});"
-            )
-            lines.append("        }")
-    else:
-        lines.append("        if (hasEventEntity && targetEntity != null) {")
-        lines.append(
-            f"            targetEntity.getWorld().spawnEntity(targetEntity.getLocation(), EntityType.{entity_type});"
-        )
-        lines.append("        } else if (hasEventBlock && targetBlock != null) {")
-        lines.append(
-            f"            targetBlock.getWorld().spawnEntity(targetBlock.getLocation(), EntityType.{entity_type});"
-        )
-        lines.append("        } else if (player != null) {")
-        lines.append(
-            f"            player.getWorld().spawnEntity(player.getLocation(), EntityType.{entity_type});"
-        )
-        lines.append("        }")
-        if event_name in WORLD_EVENT_NAMES:
-            lines.append("        else {")
-            lines.append(
-                f"            event.getWorld().spawnEntity(event.getWorld().getSpawnLocation(), EntityType.{entity_type});"
-            )
-            lines.append("        }")
 
+    def spawn(body: Body, world: str, location: str) -> None:
+        body.append(f"{world}.spawnEntity({location}, EntityType.{entity_type});")
+
+    _at_target_location(lines, props, event_name, spawn)
 
-def _gen_strike_lightning(lines: List[str], props: dict, event_name: str, is_command: bool) -> None:
+
+def _gen_strike_lightning(lines: Body, props: dict, event_name: str, is_command: bool) -> None:
     damage = props.get("damage", "true").lower()
-    target = sanitize_java_string(props.get("target", "auto")).lower()
     lightning_call = "strikeLightning" if damage == "true" else "strikeLightningEffect"
-    if target == "player":
-        lines.append("        if (player != null) {")
-        lines.append(f"            player.getWorld().{lightning_call}(player.getLocation());")
-        lines.append("        }")
-    elif target == "event_entity":
-        lines.append("        if (hasEventEntity && targetEntity != null) {")
-        lines.append(f"            targetEntity.getWorld().{lightning_call}(targetEntity.getLocation());")
-        lines.append("        }")
-    elif target == "event_block":
-        lines.append("        if (hasEventBlock && targetBlock != null) {")
-        lines.append(f"            targetBlock.getWorld().{lightning_call}(targetBlock.getLocation());")
-        lines.append("        }")
-    elif target == "event_world":
-        if event_name in WORLD_EVENT_NAMES:
-            lines.append(f"        event.getWorld().{lightning_call}(event.getWorld().getSpawnLocation());")
-        else:
-            lines.append("        if (hasEventBlock && targetBlock != null) {")
-            lines.append(
-                f"            targetBlock.getWorld().{lightning_call}(targetBlock.getWorld().getSpawnLocation());"
-            )
-            lines.append("        } else if (hasEventEntity && targetEntity != null) {")
-            lines.append(
-                f"            targetEntity.getWorld().{lightning_call}(targetEntity.getWorld().getSpawnLocation());"
-            )
-            lines.append("        } else if (player != null) {")
-            lines.append(
-                f"            player.getWorld().{lightning_call}(player.getWorld().getSpawnLocation());"
-            )
-            lines.append("        }")
-    else:
-        lines.append("        if (hasEventEntity && targetEntity != null) {")
-        lines.append(f"            targetEntity.getWorld().{lightning_call}(targetEntity.getLocation());")
-        lines.append("        } else if (hasEventBlock && targetBlock != null) {")
-        lines.append(f"            targetBlock.getWorld().{lightning_call}(targetBlock.getLocation());")
-        lines.append("        } else if (player != null) {")
-        lines.append(f"            player.getWorld().{lightning_call}(player.getLocation());")
-        lines.append("        }")
-        if event_name in WORLD_EVENT_NAMES:
-            lines.append("        else {")
-            lines.append(f"            event.getWorld().{lightning_call}(event.getWorld().getSpawnLocation());")
-            lines.append("        }")
+
+    def strike(body: Body, world: str, location: str) -> None:
+        body.append(f"{world}.{lightning_call}({location});")
+
+    _at_target_location(lines, props, event_name, strike)
 
 
-def _gen_create_explosion(lines: List[str], props: dict, event_name: str, is_command: bool) -> None:
+def _gen_create_explosion(lines: Body, props: dict, event_name: str, is_command: bool) -> None:
     power = props.get("power", "4.0")
     fire = props.get("fire", "false").lower()
     break_blocks = props.get("breakBlocks", "false").lower()
-    target = sanitize_java_string(props.get("target", "auto")).lower()
-    if target == "player":
-        lines.append("        if (player != null) {")
-        lines.append(
-            f"            player.getWorld().createExplosion(player.getLocation(), {power}f, {fire}, {break_blocks});"
-        )
-        lines.append("        }")
-    elif target == "event_entity":
-        lines.append("        if (hasEventEntity && targetEntity != null) {")
-        lines.append(
-            f"            targetEntity.getWorld().createExplosion(targetEntity.getLocation(), {power}f, {fire}, {break_blocks});"
-        )
-        lines.append("        }")
-    elif target == "event_block":
-        lines.append("        if (hasEventBlock && targetBlock != null) {")
-        lines.append(
-            f"            targetBlock.getWorld().createExplosion(targetBlock.getLocation(), {power}f, {fire}, {break_blocks});"
-        )
-        lines.append("        }")
-    elif target == "event_world":
-        if event_name in WORLD_EVENT_NAMES:
-            lines.append(
-                f"        event.getWorld().createExplosion(event.getWorld().getSpawnLocation(), {power}f, {fire}, {break_blocks});"
-            )
-        else:
-            lines.append("        if (hasEventBlock && targetBlock != null) {")
-            lines.append(
-                f"            targetBlock.getWorld().createExplosion(targetBlock.getWorld().getSpawnLocation(), {power}f, {fire}, {break_blocks});"
-            )
-            lines.append("        } else if (hasEventEntity && targetEntity != null) {")
-            lines.append(
-                f"            targetEntity.getWorld().createExplosion(targetEntity.getWorld().getSpawnLocation(), {power}f, {fire}, {break_blocks});"
-            )
-            lines.append("        } else if (player != null) {")
-            lines.append(
-                f"            player.getWorld().createExplosion(player.getWorld().getSpawnLocation(), {power}f, {fire}, {break_blocks});"
-            )
-            lines.append("        }")
-    else:
-        lines.append("        if (hasEventEntity && targetEntity != null) {")
-        lines.append(
-            f"            targetEntity.getWorld().createExplosion(targetEntity.getLocation(), {power}f, {fire}, {break_blocks});"
-        )
-        lines.append("        } else if (hasEventBlock && targetBlock != null) {")
-        lines.append(
-            f"            targetBlock.getWorld().createExplosion(targetBlock.getLocation(), {power}f, {fire}, {break_blocks});"
-        )
-        lines.append("        } else if (player != null) {")
-        lines.append(
-            f"            player.getWorld().createExplosion(player.getLocation(), {power}f, {fire}, {break_blocks});"
-        )
-        lines.append("        }")
-        if event_name in WORLD_EVENT_NAMES:
-            lines.append("        else {")
-            lines.append(
-                f"            event.getWorld().createExplosion(event.getWorld().getSpawnLocation(), {power}f, {fire}, {break_blocks});"
-            )
-            lines.append("        }")
 
+    def explode(body: Body, world: str, location: str) -> None:
+        body.append(f"{world}.createExplosion({location}, {power}f, {fire}, {break_blocks});")
 
-def _gen_fill_region(lines: List[str], props: dict, event_name: str, is_command: bool) -> None:
+    _at_target_location(lines, props, event_name, explode)
+
+
+def _gen_fill_region(lines: Body, props: dict, ctx: ActionContext) -> None:
+    event_name = ctx.event_name
+    continuation = ctx.continuation
     x1 = props.get("x1", "0")
     y1 = props.get("y1", "64")
     z1 = props.get("z1", "0")
@@ -1108,208 +757,191 @@ def _gen_fill_region(lines: List[str], props: dict, event_name: str, is_command:
             world_expr = "(hasEventEntity && targetEntity != null) ? targetEntity.getWorld() : (hasEventBlock && targetBlock != null) ? targetBlock.getWorld() : (player != null ? player.getWorld() : null)"
             world_guard = f"({world_expr}) != null"
 
-    lines.append(f"        if ({world_guard}) {{")
-    lines.append(f"            for (int x = {x1}; x <= {x2}; x++) {{")
-    lines.append(f"                for (int y = {y1}; y <= {y2}; y++) {{")
-    lines.append(f"                    for (int z = {z1}; z <= {z2}; z++) {{")
-    lines.append(
-        f"                        {world_expr}.getBlockAt(x, y, z).setType(Material.{block_type});"
+    budget = str(props.get("blocksPerTick", "")).strip()
+    if not budget.isdigit() or int(budget) <= 0:
+        budget = str(FILL_DEFAULT_BLOCKS_PER_TICK)
+    load_chunks = "true" if to_bool(props.get("loadChunks"), False) else "false"
+    on_complete = continuation if _fill_waits(props) and continuation else "null"
+    completion = on_complete
+    if ctx.target.folia and on_complete != "null":
+        # The filler finishes on a region thread; hop back to the player's
+        completion = (
+            f"(player != null ? () -> player.getScheduler().run(plugin, task -> {on_complete}.run(), null)"
+            f" : {on_complete})"
+        )
+
+    # Spread over ticks by the generated RegionFiller instead of one nested loop
+    lines.if_(world_guard).append(
+        f"RegionFiller.fill(plugin, {world_expr}, {x1}, {y1}, {z1}, {x2}, {y2}, {z2}, "
+        f"Material.{block_type}, {budget}, {load_chunks}, {completion});"
     )
-    lines.append("                    }")
-    lines.append("                }")
-    lines.append("            }")
-    lines.append("        }")
+    if on_complete != "null":
+        lines.else_().append(f"{on_complete}.run();")
+
 
+FILL_DEFAULT_BLOCKS_PER_TICK = 2048
 
-def _gen_allow_flight(lines: List[str], props: dict) -> None:
+
+def _fill_waits(props: dict) -> bool:
+    return to_bool(props.get("waitForCompletion"), False)
+
+
+def _gen_allow_flight(lines: Body, props: dict) -> None:
     allow = props.get("allow", "true").lower()
     start_flying = props.get("startFlying", "false").lower()
     speed = props.get("speed", "0.2")
-    lines.append(f"        player.setAllowFlight({allow});")
-    lines.append(f"        player.setFlySpeed({speed}f);")
+    lines.append(f"player.setAllowFlight({allow});")
+    lines.append(f"player.setFlySpeed({speed}f);")
     if start_flying == "true":
-        lines.append("        player.setFlying(true);")
+        lines.append("player.setFlying(true);")
 
 
-def _gen_grant_permission(lines: List[str], props: dict) -> None:
+def _gen_grant_permission(lines: Body, props: dict) -> None:
     permission = sanitize_java_string(props.get("permission", ""))
     value = props.get("value", "true").lower()
-    lines.append(f'        player.addAttachment(plugin, "{permission}", {value});')
+    lines.append(f'player.addAttachment(plugin, "{permission}", {value});')
 
 
-def _gen_set_metadata(lines: List[str], props: dict) -> None:
+def _gen_set_metadata(lines: Body, props: dict) -> None:
     key = sanitize_java_string(props.get("key", "key"))
     value = sanitize_java_string(props.get("value", "value"))
     lines.append(
-        f'        player.setMetadata("{key}", new FixedMetadataValue(plugin, "{value}"));'
+        f'player.setMetadata("{key}", new FixedMetadataValue(plugin, "{value}"));'
     )
 
 
-def _gen_damage_entity(lines: List[str], props: dict) -> None:
+def _gen_damage_entity(lines: Body, props: dict) -> None:
     amount = props.get("amount", "5.0")
-    lines.append("        if (targetEntity != null) {")
-    lines.append(f"            targetEntity.damage({amount});")
-    lines.append("        }")
+    lines.if_("targetEntity != null").append(f"targetEntity.damage({amount});")
 
 
-def _gen_set_entity_health(lines: List[str], props: dict) -> None:
+def _gen_set_entity_health(lines: Body, props: dict) -> None:
     health = props.get("health", "20.0")
-    lines.append("        if (living != null) {")
-    lines.append(f"            living.setHealth({health});")
-    lines.append("        }")
+    lines.if_("living != null").append(f"living.setHealth({health});")
 
 
-def _gen_teleport_entity(lines: List[str], props: dict) -> None:
+def _gen_teleport_entity(lines: Body, props: dict, ctx: ActionContext) -> None:
     x = props.get("x", "0")
     y = props.get("y", "64")
     z = props.get("z", "0")
     world_name = sanitize_java_string(props.get("world", ""))
-    lines.append("        if (targetEntity != null) {")
     if world_name:
-        lines.append(
-            f'            if (Bukkit.getWorld("{world_name}") != null) {{'
-            f" targetEntity.teleport(new Location(Bukkit.getWorld(\"{world_name}\"), {x}, {y}, {z})); }}"
+        _teleport(
+            lines.if_(f'targetEntity != null && Bukkit.getWorld("{world_name}") != null'), ctx,
+            "targetEntity", f'new Location(Bukkit.getWorld("{world_name}"), {x}, {y}, {z})',
         )
     else:
-        lines.append(
-            f"            targetEntity.teleport(new Location(targetEntity.getWorld(), {x}, {y}, {z}));"
+        _teleport(
+            lines.if_("targetEntity != null"), ctx,
+            "targetEntity", f"new Location(targetEntity.getWorld(), {x}, {y}, {z})",
         )
-    lines.append("        }")
+    _continue_otherwise(lines, ctx)
 
 
-def _gen_set_entity_velocity(lines: List[str], props: dict) -> None:
+def _gen_set_entity_velocity(lines: Body, props: dict) -> None:
     x = props.get("x", "0")
     y = props.get("y", "1")
     z = props.get("z", "0")
-    lines.append("        if (targetEntity != null) {")
-    lines.append(f"            targetEntity.setVelocity(new Vector({x}, {y}, {z}));")
-    lines.append("        }")
+    lines.if_("targetEntity != null").append(f"targetEntity.setVelocity(new Vector({x}, {y}, {z}));")
 
 
-def _gen_apply_entity_potion_effect(lines: List[str], props: dict) -> None:
+def _gen_apply_entity_potion_effect(lines: Body, props: dict) -> None:
     effect_type = sanitize_java_string(props.get("effectType", "SPEED")).upper()
     duration = props.get("duration", "200")
     amplifier = props.get("amplifier", "1")
-    lines.append("        if (living != null) {")
-    lines.append(
-        f"            living.addPotionEffect(new PotionEffect(PotionEffectType.{effect_type}, {duration}, {amplifier}));"
+    lines.if_("living != null").append(
+        f"living.addPotionEffect(new PotionEffect(PotionEffectType.{effect_type}, {duration}, {amplifier}));"
     )
-    lines.append("        }")
 
 
-def _gen_set_entity_on_fire(lines: List[str], props: dict) -> None:
+def _gen_set_entity_on_fire(lines: Body, props: dict) -> None:
     ticks = props.get("ticks", "100")
-    lines.append("        if (targetEntity != null) {")
-    lines.append(f"            targetEntity.setFireTicks({ticks});")
-    lines.append("        }")
+    lines.if_("targetEntity != null").append(f"targetEntity.setFireTicks({ticks});")
 
 
-def _gen_set_entity_custom_name(lines: List[str], props: dict) -> None:
+def _gen_set_entity_custom_name(lines: Body, props: dict) -> None:
     name = sanitize_java_string(props.get("name", ""))
-    lines.append("        if (living != null) {")
-    lines.append(f'            living.setCustomName("{name}");')
-    lines.append("            living.setCustomNameVisible(true);")
-    lines.append("        }")
+    named = lines.if_("living != null")
+    named.append(f'living.setCustomName("{name}");')
+    named.append("living.setCustomNameVisible(true);")
 
 
-def _gen_set_entity_equipment(lines: List[str], props: dict) -> None:
-    helmet = sanitize_java_string(props.get("helmet", "")).upper()
-    chestplate = sanitize_java_string(props.get("chestplate", "")).upper()
-    leggings = sanitize_java_string(props.get("leggings", "")).upper()
-    boots = sanitize_java_string(props.get("boots", "")).upper()
-    main_hand = sanitize_java_string(props.get("mainHand", "")).upper()
-    off_hand = sanitize_java_string(props.get("offHand", "")).upper()
-    lines.append("        if (living != null && living.getEquipment() != null) {")
-    if helmet:
-        lines.append(f"            living.getEquipment().setHelmet(new ItemStack(Material.{helmet}, 1));")
-    if chestplate:
-        lines.append(
-            f"            living.getEquipment().setChestplate(new ItemStack(Material.{chestplate}, 1));"
-        )
-    if leggings:
-        lines.append(
-            f"            living.getEquipment().setLeggings(new ItemStack(Material.{leggings}, 1));"
-        )
-    if boots:
-        lines.append(f"            living.getEquipment().setBoots(new ItemStack(Material.{boots}, 1));")
-    if main_hand:
-        lines.append(
-            f"            living.getEquipment().setItemInMainHand(new ItemStack(Material.{main_hand}, 1));"
-        )
-    if off_hand:
-        lines.append(
-            f"            living.getEquipment().setItemInOffHand(new ItemStack(Material.{off_hand}, 1));"
-        )
-    lines.append("        }")
-
-
-def _gen_delay_action(lines: List[str], blocks: List[Block], block: Block, event_name: str) -> None:
-    delay_ticks = block.properties.get("delayTicks", "20")
-    remaining_idx = blocks.index(block) + 1
-    remaining_blocks = blocks[remaining_idx:]
-    if remaining_blocks:
-        inner_code = generate_action_code(remaining_blocks, event_name)
-        indented = "\n".join(
-            "    " + line if line.strip() else line
-            for line in inner_code.rstrip("\n").split("\n")
-        )
-        lines.append("        new BukkitRunnable() {")
-        lines.append("            @Override")
-        lines.append("            public void run() {")
-        lines.append(indented)
-        lines.append("            }")
-        lines.append(f"        }}.runTaskLater(JavaPlugin.getProvidingPlugin(this.getClass()), {delay_ticks});")
-
-
-def _gen_repeat_action(lines: List[str], blocks: List[Block], block: Block, event_name: str) -> None:
-    interval_ticks = block.properties.get("intervalTicks", "20")
-    repeat_count = block.properties.get("repeatCount", "0")
-    remaining_idx = blocks.index(block) + 1
-    remaining_blocks = blocks[remaining_idx:]
-    if remaining_blocks:
-        inner_code = generate_action_code(remaining_blocks, event_name)
-        indented = "\n".join(
-            "    " + line if line.strip() else line
-            for line in inner_code.rstrip("\n").split("\n")
-        )
-        lines.append("        new BukkitRunnable() {")
-        use_count = repeat_count and repeat_count != "0"
-        if use_count:
-            lines.append(f"            int count = 0;")
-        lines.append("            @Override")
-        lines.append("            public void run() {")
-        if use_count:
-            lines.append(f"                if (count >= {repeat_count}) {{ this.cancel(); return; }}")
-            lines.append("                count++;")
-        lines.append(indented)
-        lines.append("            }")
-        lines.append(f"        }}.runTaskTimer(JavaPlugin.getProvidingPlugin(this.getClass()), 0, {interval_ticks});")
-
-
-def _gen_set_cooldown(lines: List[str], props: dict) -> None:
-    cd_name = sanitize_java_string(props.get("cooldownName", "default"))
+def _gen_set_entity_equipment(lines: Body, props: dict) -> None:
+    slots = (
+        ("helmet", "Helmet"), ("chestplate", "Chestplate"), ("leggings", "Leggings"),
+        ("boots", "Boots"), ("mainHand", "ItemInMainHand"), ("offHand", "ItemInOffHand"),
+    )
+    equip = lines.if_("living != null && living.getEquipment() != null")
+    for prop, setter in slots:
+        material = sanitize_java_string(props.get(prop, "")).upper()
+        if material:
+            equip.append(f"living.getEquipment().set{setter}(new ItemStack(Material.{material}, 1));")
+
+
+def _gen_delay_action(lines: Body, props: dict, continuation: Optional[str]) -> None:
+    if continuation is None:
+        return
+    delay_ticks = props.get("delayTicks", "20")
+    # One shared TaskWheel tick instead of a scheduler task per firing
+    lines.append(f"TaskWheel.schedule(player, {delay_ticks}, {continuation});")
+
+
+def _gen_repeat_action(lines: Body, props: dict, continuation: Optional[str]) -> None:
+    if continuation is None:
+        return
+    interval_ticks = props.get("intervalTicks", "20")
+    repeat_count = props.get("repeatCount", "0") or "0"
+    lines.append(f"TaskWheel.repeat(player, 0, {interval_ticks}, {repeat_count}, {continuation});")
+
+
+COOLDOWN_ACTIONS = frozenset({"SetCooldown", "CheckCooldown"})
+
+
+def cooldown_names(block: Block) -> List[str]:
+    """Cooldown names ``block`` reads or sets, as they appear in the Java code."""
+    return _cooldown_names(block.name, block.properties)
+
+
+def _cooldown_names(name: str, props: dict) -> List[str]:
+    if name in COOLDOWN_ACTIONS:
+        return [sanitize_java_string(props.get("cooldownName", "default"))]
+    if name != "BranchIf":
+        return []
+    names = []
+    for prefix in ("first", "second"):
+        if str(props.get(f"{prefix}Type", "")).strip() == "CheckCooldown":
+            cooldown = sanitize_java_string(str(props.get(f"{prefix}CooldownName", "default")))
+            if cooldown:
+                names.append(cooldown)
+    return names
+
+
+def _gen_set_cooldown(lines: Body, props: dict) -> None:
+    cd_id = cooldown_constant(sanitize_java_string(props.get("cooldownName", "default")))
     duration = props.get("duration", "5")
-    lines.append(f'        CooldownManager.setCooldown("{cd_name}", player.getUniqueId(), {duration} * 1000L);')
+    lines.append(f"CooldownManager.setCooldown(CooldownManager.{cd_id}, player.getUniqueId(), {duration} * 1000L);")
 
 
-def _gen_check_cooldown(lines: List[str], props: dict) -> None:
-    cd_name = sanitize_java_string(props.get("cooldownName", "default"))
+def _gen_check_cooldown(lines: Body, props: dict) -> None:
+    cd_id = cooldown_constant(sanitize_java_string(props.get("cooldownName", "default")))
     cd_message = props.get("cooldownMessage", "")
-    lines.append(f'        if (CooldownManager.isOnCooldown("{cd_name}", player.getUniqueId())) {{')
+    on_cooldown = lines.if_(f"CooldownManager.isOnCooldown(CooldownManager.{cd_id}, player.getUniqueId())")
     if cd_message:
         safe_msg = sanitize_java_string(cd_message)
         if "%remaining%" in safe_msg:
-            safe_msg = safe_msg.replace("%remaining%", '" + CooldownManager.getRemainingSeconds("' + cd_name + '", player.getUniqueId()) + "')
-        lines.append(f'            player.sendMessage("{safe_msg}");')
-    lines.append(f'            return;')
-    lines.append(f'        }}')
+            safe_msg = safe_msg.replace(
+                "%remaining%",
+                f'" + CooldownManager.getRemainingSeconds(CooldownManager.{cd_id}, player.getUniqueId()) + "',
+            )
+        on_cooldown.append(f'player.sendMessage("{safe_msg}");')
+    on_cooldown.append("return;")
 
 
 # ---------------------------------------------------------------------------
 # GUI Menu helpers
 # ---------------------------------------------------------------------------
 
-def _gen_create_gui(lines: List[str], props: dict) -> None:
+def _gen_create_gui(lines: Body, props: dict) -> None:
     title = sanitize_java_string(props.get("guiTitle", "Menu"))
     rows = props.get("guiRows", "3")
     try:
@@ -1317,63 +949,64 @@ def _gen_create_gui(lines: List[str], props: dict) -> None:
         slots = normalized_rows * 9
     except (ValueError, TypeError):
         slots = 27
-    lines.append(f'        gui = Bukkit.createInventory(null, {slots}, "{title}");')
+    lines.append(f'gui = Bukkit.createInventory(null, {slots}, "{title}");')
 
 
-def _gen_add_gui_item(lines: List[str], props: dict) -> None:
+def _gen_add_gui_item(lines: Body, props: dict, fields: Optional[StaticFields]) -> None:
     slot = props.get("slot", "0")
     item_type = sanitize_java_string(props.get("itemType", "STONE")).upper()
     display_name = props.get("displayName", "")
     amount = props.get("amount", "1")
-    lines.append("        if (gui != null) {")
-    if display_name:
+    with_gui = lines.if_("gui != null")
+    if display_name and fields is not None and _is_int_literal(amount):
+        safe_name = sanitize_java_string(display_name)
+        template = _item_template(fields, item_type, amount, "guiMeta", [
+            f'guiMeta.setDisplayName(org.bukkit.ChatColor.translateAlternateColorCodes(\'&\', "{safe_name}"));',
+        ])
+        with_gui.append(f"gui.setItem({slot}, {template}.clone());")
+    elif display_name:
         safe_name = sanitize_java_string(display_name)
-        lines.append(f"            ItemStack guiItem = new ItemStack(Material.{item_type}, {amount});")
-        lines.append(f"            ItemMeta guiMeta = guiItem.getItemMeta();")
-        lines.append(f"            if (guiMeta != null) {{")
-        lines.append(f'                guiMeta.setDisplayName(org.bukkit.ChatColor.translateAlternateColorCodes(\'&\', "{safe_name}"));')
-        lines.append(f"                guiItem.setItemMeta(guiMeta);")
-        lines.append(f"            }}")
-        lines.append(f"            gui.setItem({slot}, guiItem);")
+        with_gui.append(f"ItemStack guiItem = new ItemStack(Material.{item_type}, {amount});")
+        with_gui.append("ItemMeta guiMeta = guiItem.getItemMeta();")
+        with_meta = with_gui.if_("guiMeta != null")
+        with_meta.append(f'guiMeta.setDisplayName(org.bukkit.ChatColor.translateAlternateColorCodes(\'&\', "{safe_name}"));')
+        with_meta.append("guiItem.setItemMeta(guiMeta);")
+        with_gui.append(f"gui.setItem({slot}, guiItem);")
     else:
-        lines.append(f"            gui.setItem({slot}, new ItemStack(Material.{item_type}, {amount}));")
-    lines.append("        }")
+        with_gui.append(f"gui.setItem({slot}, new ItemStack(Material.{item_type}, {amount}));")
 
 
 # ---------------------------------------------------------------------------
 # Boss Bar helpers
 # ---------------------------------------------------------------------------
 
-def _gen_create_boss_bar(lines: List[str], props: dict) -> None:
+def _gen_create_boss_bar(lines: Body, props: dict) -> None:
     raw_title = str(props.get("title", "Boss Bar"))
     title = sanitize_java_string(props.get("title", "Boss Bar"))
     color = sanitize_java_string(props.get("color", "RED")).upper()
     style = sanitize_java_string(props.get("style", "SOLID")).upper()
     progress = props.get("progress", "1.0")
     key_slug = _boss_bar_key_slug(raw_title)
-    lines.append(f'        NamespacedKey bossBarKey = new NamespacedKey(plugin, "{key_slug}");')
-    lines.append(f"        KeyedBossBar bossBar = Bukkit.getBossBar(bossBarKey);")
-    lines.append(f"        if (bossBar == null) {{")
-    lines.append(f'            bossBar = Bukkit.createBossBar(bossBarKey, "{title}", BarColor.{color}, BarStyle.{style});')
-    lines.append(f"        }}")
-    lines.append(f'        bossBar.setTitle("{title}");')
-    lines.append(f"        bossBar.setColor(BarColor.{color});")
-    lines.append(f"        bossBar.setStyle(BarStyle.{style});")
-    lines.append(f"        bossBar.setProgress({progress});")
-    lines.append(f"        bossBar.addPlayer(player);")
-
-
-def _gen_remove_boss_bar(lines: List[str], props: dict) -> None:
+    lines.append(f'NamespacedKey bossBarKey = new NamespacedKey(plugin, "{key_slug}");')
+    lines.append("KeyedBossBar bossBar = Bukkit.getBossBar(bossBarKey);")
+    lines.if_("bossBar == null").append(
+        f'bossBar = Bukkit.createBossBar(bossBarKey, "{title}", BarColor.{color}, BarStyle.{style});'
+    )
+    lines.append(f'bossBar.setTitle("{title}");')
+    lines.append(f"bossBar.setColor(BarColor.{color});")
+    lines.append(f"bossBar.setStyle(BarStyle.{style});")
+    lines.append(f"bossBar.setProgress({progress});")
+    lines.append("bossBar.addPlayer(player);")
+
+
+def _gen_remove_boss_bar(lines: Body, props: dict) -> None:
     raw_title = str(props.get("title", "Boss Bar"))
     key_slug = _boss_bar_key_slug(raw_title)
-    lines.append(f'        NamespacedKey bossBarKey = new NamespacedKey(plugin, "{key_slug}");')
-    lines.append(f"        KeyedBossBar bossBar = Bukkit.getBossBar(bossBarKey);")
-    lines.append(f"        if (bossBar != null) {{")
-    lines.append(f"            bossBar.removePlayer(player);")
-    lines.append(f"            if (bossBar.getPlayers().isEmpty()) {{")
-    lines.append(f"                Bukkit.removeBossBar(bossBarKey);")
-    lines.append(f"            }}")
-    lines.append(f"        }}")
+    lines.append(f'NamespacedKey bossBarKey = new NamespacedKey(plugin, "{key_slug}");')
+    lines.append("KeyedBossBar bossBar = Bukkit.getBossBar(bossBarKey);")
+    shown = lines.if_("bossBar != null")
+    shown.append("bossBar.removePlayer(player);")
+    shown.if_("bossBar.getPlayers().isEmpty()").append("Bukkit.removeBossBar(bossBarKey);")
 
 
 def _boss_bar_key_slug(raw_title: str) -> str:
@@ -1385,25 +1018,20 @@ def _boss_bar_key_slug(raw_title: str) -> str:
 # Scoreboard helpers
 # ---------------------------------------------------------------------------
 
-def _gen_set_scoreboard(lines: List[str], props: dict) -> None:
+def _gen_set_scoreboard(lines: Body, props: dict) -> None:
     title = sanitize_java_string(props.get("title", "Scoreboard"))
     lines_raw = props.get("lines", "")
     score_lines = [sanitize_java_string(l.strip()) for l in lines_raw.split("|") if l.strip()]
-    lines.append(f"        {{")
-    lines.append(f"            Scoreboard board = Bukkit.getScoreboardManager().getNewScoreboard();")
-    lines.append(f'            Objective obj = board.registerNewObjective("display", "dummy", "{title}");')
-    lines.append(f"            obj.setDisplaySlot(DisplaySlot.SIDEBAR);")
-    for i, score_line in enumerate(reversed(score_lines)):
-        lines.append(f'            obj.getScore("{score_line}").setScore({i});')
-    lines.append(f"            player.setScoreboard(board);")
-    lines.append(f"        }}")
+    # The player's board is reused; SidebarBoards only sends changed lines
+    args = "".join(f', "{score_line}"' for score_line in score_lines)
+    lines.append(f'SidebarBoards.show(player, "{title}"{args});')
 
 
 # ---------------------------------------------------------------------------
 # Config & Data Persistence helpers
 # ---------------------------------------------------------------------------
 
-def _gen_save_config(lines: List[str], props: dict, is_command: bool) -> None:
+def _gen_save_config(lines: Body, props: dict, is_command: bool) -> None:
     path = sanitize_java_string(props.get("path", "data.key"))
     value = sanitize_java_string(props.get("value", ""))
     if "%player%" in path:
@@ -1412,77 +1040,62 @@ def _gen_save_config(lines: List[str], props: dict, is_command: bool) -> None:
     if "%player%" in value:
         value = value.replace("%player%", '" + (player != null ? player.getName() : "console") + "')
     value = replace_arg_placeholders(value, is_command)
-    lines.append(f'        plugin.getConfig().set("{path}", "{value}");')
-    lines.append(f"        plugin.saveConfig();")
+    lines.append(f'plugin.getConfig().set("{path}", "{value}");')
+    lines.append(f"plugin.saveConfig();")
 
 
-def _gen_send_config_value(lines: List[str], props: dict, is_command: bool) -> None:
+def _gen_send_config_value(lines: Body, props: dict, is_command: bool) -> None:
     path = sanitize_java_string(props.get("path", "data.key"))
     msg_format = sanitize_java_string(props.get("messageFormat", "Value: %value%"))
     if "%player%" in path:
         path = path.replace("%player%", '" + (player != null ? player.getName() : "console") + "')
     path = replace_arg_placeholders(path, is_command)
-    lines.append(f'        String configVal = String.valueOf(plugin.getConfig().get("{path}", ""));')
+    lines.append(f'String configVal = String.valueOf(plugin.getConfig().get("{path}", ""));')
     java_msg = msg_format.replace("%value%", '" + configVal + "')
-    lines.append(f'        player.sendMessage("{java_msg}");')
+    lines.append(f'player.sendMessage("{java_msg}");')
 
 
 # ---------------------------------------------------------------------------
 # Temporary variables helpers
 # ---------------------------------------------------------------------------
 
-def _gen_set_temp_var(lines: List[str], props: dict, is_command: bool) -> None:
+def _gen_set_temp_var(lines: Body, props: dict, is_command: bool) -> None:
     key = sanitize_java_string(props.get("varName", "temp_key"))
     value = sanitize_java_string(props.get("value", ""))
     if "%player%" in value:
         value = value.replace("%player%", '" + (player != null ? player.getName() : "console") + "')
     value = replace_arg_placeholders(value, is_command)
-    lines.append(f'        tempVars.put("{key}", "{value}");')
+    lines.append(f'tempVars.put("{key}", "{value}");')
 
 
-def _gen_get_temp_var(lines: List[str], props: dict, is_command: bool) -> None:
+def _gen_get_temp_var(lines: Body, props: dict, is_command: bool) -> None:
     key = sanitize_java_string(props.get("varName", "temp_key"))
     msg_format = sanitize_java_string(props.get("messageFormat", "%value%"))
     if "%player%" in key:
         key = key.replace("%player%", '" + (player != null ? player.getName() : "console") + "')
     key = replace_arg_placeholders(key, is_command)
-    lines.append(f'        String tempValue = tempVars.getOrDefault("{key}", "");')
+    lines.append(f'String tempValue = tempVars.getOrDefault("{key}", "");')
     java_msg = msg_format.replace("%value%", '" + tempValue + "')
-    lines.append(f'        player.sendMessage("{java_msg}");')
+    lines.append(f'player.sendMessage("{java_msg}");')
 
 
 # ---------------------------------------------------------------------------
 # Custom Recipes helpers
 # ---------------------------------------------------------------------------
 
-def _gen_add_shapeless_recipe(lines: List[str], props: dict) -> None:
-    recipe_key = sanitize_java_string(props.get("recipeKey", "custom_recipe")).lower()
-    result_item = sanitize_java_string(props.get("resultItem", "DIAMOND")).upper()
-    result_amount = props.get("resultAmount", "1")
-    ingredients_raw = props.get("ingredients", "COAL")
-    ingredient_list = [sanitize_java_string(i.strip()).upper() for i in ingredients_raw.split(",") if i.strip()]
-    lines.append(f"        {{")
-    lines.append(f'            NamespacedKey key = new NamespacedKey(plugin, "{recipe_key}");')
-    lines.append(f"            ShapelessRecipe recipe = new ShapelessRecipe(key, new ItemStack(Material.{result_item}, {result_amount}));")
-    for ingredient in ingredient_list:
-        lines.append(f"            recipe.addIngredient(Material.{ingredient});")
-    lines.append(f"            Bukkit.addRecipe(recipe);")
-    lines.append(f"        }}")
-
-
 def _gen_set_armor(lines, props):
     helmet = sanitize_java_string(props.get("helmet", "")).upper()
     chestplate = sanitize_java_string(props.get("chestplate", "")).upper()
     leggings = sanitize_java_string(props.get("leggings", "")).upper()
     boots = sanitize_java_string(props.get("boots", "")).upper()
     if helmet:
-        lines.append(f"        player.getInventory().setHelmet(new ItemStack(Material.{helmet}, 1));")
+        lines.append(f"player.getInventory().setHelmet(new ItemStack(Material.{helmet}, 1));")
     if chestplate:
-        lines.append(f"        player.getInventory().setChestplate(new ItemStack(Material.{chestplate}, 1));")
+        lines.append(f"player.getInventory().setChestplate(new ItemStack(Material.{chestplate}, 1));")
     if leggings:
-        lines.append(f"        player.getInventory().setLeggings(new ItemStack(Material.{leggings}, 1));")
+        lines.append(f"player.getInventory().setLeggings(new ItemStack(Material.{leggings}, 1));")
     if boots:
-        lines.append(f"        player.getInventory().setBoots(new ItemStack(Material.{boots}, 1));")
+        lines.append(f"player.getInventory().setBoots(new ItemStack(Material.{boots}, 1));")
 
 
 def _gen_launch_projectile(lines, props):
@@ -1499,21 +1112,20 @@ def _gen_launch_projectile(lines, props):
         "TRIDENT": "Trident",
     }
     proj_class = proj_class_map.get(projectile, "Snowball")
-    lines.append(f"        org.bukkit.entity.{proj_class} proj = player.launchProjectile(org.bukkit.entity.{proj_class}.class);")
-    lines.append(f"        proj.setVelocity(player.getLocation().getDirection().multiply({speed}));")
+    lines.append(f"org.bukkit.entity.{proj_class} proj = player.launchProjectile(org.bukkit.entity.{proj_class}.class);")
+    lines.append(f"proj.setVelocity(player.getLocation().getDirection().multiply({speed}));")
 
 
 def _gen_spawn_firework(lines, props):
     color = sanitize_java_string(props.get("color", "RED")).upper()
     effect_type = sanitize_java_string(props.get("fireworkType", "BALL")).upper()
     power = props.get("power", "1")
-    lines.append("        {")
-    lines.append("            org.bukkit.entity.Firework fw = (org.bukkit.entity.Firework) player.getWorld().spawnEntity(player.getLocation(), EntityType.FIREWORK_ROCKET);")
-    lines.append("            org.bukkit.inventory.meta.FireworkMeta fwMeta = fw.getFireworkMeta();")
-    lines.append(f"            fwMeta.addEffect(org.bukkit.FireworkEffect.builder().withColor(org.bukkit.Color.{color}).with(org.bukkit.FireworkEffect.Type.{effect_type}).build());")
-    lines.append(f"            fwMeta.setPower({power});")
-    lines.append("            fw.setFireworkMeta(fwMeta);")
-    lines.append("        }")
+    scope = lines.block("{")
+    scope.append("org.bukkit.entity.Firework fw = (org.bukkit.entity.Firework) player.getWorld().spawnEntity(player.getLocation(), EntityType.FIREWORK_ROCKET);")
+    scope.append("org.bukkit.inventory.meta.FireworkMeta fwMeta = fw.getFireworkMeta();")
+    scope.append(f"fwMeta.addEffect(org.bukkit.FireworkEffect.builder().withColor(org.bukkit.Color.{color}).with(org.bukkit.FireworkEffect.Type.{effect_type}).build());")
+    scope.append(f"fwMeta.setPower({power});")
+    scope.append("fw.setFireworkMeta(fwMeta);")
 
 
 def _gen_set_spawn_location(lines, props):
@@ -1521,9 +1133,9 @@ def _gen_set_spawn_location(lines, props):
     y = props.get("y", "")
     z = props.get("z", "")
     if x and y and z:
-        lines.append(f"        player.setBedSpawnLocation(new Location(player.getWorld(), {x}, {y}, {z}), true);")
+        lines.append(f"player.setBedSpawnLocation(new Location(player.getWorld(), {x}, {y}, {z}), true);")
     else:
-        lines.append("        player.setBedSpawnLocation(player.getLocation(), true);")
+        lines.append("player.setBedSpawnLocation(player.getLocation(), true);")
 
 
 def _gen_send_tab_header_footer(lines, props, is_command):
@@ -1535,60 +1147,79 @@ def _gen_send_tab_header_footer(lines, props, is_command):
     if "%player%" in footer:
         footer = footer.replace("%player%", '" + player.getName() + "')
     footer = replace_arg_placeholders(footer, is_command)
-    lines.append(f'        player.setPlayerListHeaderFooter("{header}", "{footer}");')
+    lines.append(f'player.setPlayerListHeaderFooter("{header}", "{footer}");')
 
 
 def _gen_set_world_border(lines, props, event_name, is_command):
     size = props.get("size", "1000")
     center_x = props.get("centerX", "0")
     center_z = props.get("centerZ", "0")
-    lines.append("        {")
-    lines.append("            org.bukkit.WorldBorder border = player.getWorld().getWorldBorder();")
-    lines.append(f"            border.setCenter({center_x}, {center_z});")
-    lines.append(f"            border.setSize({size});")
-    lines.append("        }")
+    scope = lines.block("{")
+    scope.append("org.bukkit.WorldBorder border = player.getWorld().getWorldBorder();")
+    scope.append(f"border.setCenter({center_x}, {center_z});")
+    scope.append(f"border.setSize({size});")
 
 
 def _gen_spawn_falling_block(lines, props, event_name, is_command):
     block_type = sanitize_java_string(props.get("blockType", "SAND")).upper()
-    lines.append("        {")
-    lines.append(f"            org.bukkit.block.data.BlockData fallData = org.bukkit.Bukkit.createBlockData(Material.{block_type});")
-    lines.append("            player.getWorld().spawnFallingBlock(player.getLocation().add(0, 5, 0), fallData);")
-    lines.append("        }")
+    scope = lines.block("{")
+    scope.append(f"org.bukkit.block.data.BlockData fallData = org.bukkit.Bukkit.createBlockData(Material.{block_type});")
+    scope.append("player.getWorld().spawnFallingBlock(player.getLocation().add(0, 5, 0), fallData);")
 
 
 def _gen_open_book(lines, props, is_command):
     title = sanitize_java_string(props.get("title", "Book"))
     author = sanitize_java_string(props.get("author", "Server"))
     content = sanitize_java_string(props.get("content", "Hello!"))
-    lines.append("        {")
-    lines.append(f'            ItemStack book = new ItemStack(Material.WRITTEN_BOOK, 1);')
-    lines.append(f"            org.bukkit.inventory.meta.BookMeta bookMeta = (org.bukkit.inventory.meta.BookMeta) book.getItemMeta();")
-    lines.append(f'            bookMeta.setTitle("{title}");')
-    lines.append(f'            bookMeta.setAuthor("{author}");')
-    lines.append(f'            bookMeta.addPage("{content}");')
-    lines.append(f"            book.setItemMeta(bookMeta);")
-    lines.append(f"            player.openBook(book);")
-    lines.append("        }")
+    scope = lines.block("{")
+    scope.append("ItemStack book = new ItemStack(Material.WRITTEN_BOOK, 1);")
+    scope.append("org.bukkit.inventory.meta.BookMeta bookMeta = (org.bukkit.inventory.meta.BookMeta) book.getItemMeta();")
+    scope.append(f'bookMeta.setTitle("{title}");')
+    scope.append(f'bookMeta.setAuthor("{author}");')
+    scope.append(f'bookMeta.addPage("{content}");')
+    scope.append("book.setItemMeta(bookMeta);")
+    scope.append("player.openBook(book);")
 
 
 def _gen_set_resource_pack(lines, props):
     url = sanitize_java_string(props.get("url", ""))
-    lines.append(f'        player.setResourcePack("{url}");')
+    lines.append(f'player.setResourcePack("{url}");')
+
+
+RECIPE_ACTIONS = frozenset({"AddShapedRecipe", "AddShapelessRecipe"})
+_RECIPE_KEY_DEFAULTS = {"AddShapedRecipe": "custom_shaped", "AddShapelessRecipe": "custom_recipe"}
 
 
-def _gen_add_shaped_recipe(lines, props):
-    recipe_key = sanitize_java_string(props.get("recipeKey", "custom_shaped")).lower()
+def recipe_key(block: Block) -> str:
+    """The namespaced key (without plugin namespace) a recipe block registers."""
+    props = block.properties or {}
+    return sanitize_java_string(props.get("recipeKey", _RECIPE_KEY_DEFAULTS[block.name])).lower()
+
+
+def recipe_registration(block: Block) -> Body:
+    """Statements building ``key`` and ``recipe`` for a recipe block.
+
+    Used by the generated ``RecipeRegistry``; ``plugin`` must be in scope.
+    """
+    props = block.properties or {}
     result_item = sanitize_java_string(props.get("resultItem", "DIAMOND")).upper()
     result_amount = props.get("resultAmount", "1")
+    lines = Body()
+    lines.append(f'NamespacedKey key = new NamespacedKey(plugin, "{recipe_key(block)}");')
+    if block.name == "AddShapelessRecipe":
+        ingredients_raw = props.get("ingredients", "COAL")
+        ingredient_list = [sanitize_java_string(i.strip()).upper() for i in ingredients_raw.split(",") if i.strip()]
+        lines.append(f"ShapelessRecipe recipe = new ShapelessRecipe(key, new ItemStack(Material.{result_item}, {result_amount}));")
+        for ingredient in ingredient_list:
+            lines.append(f"recipe.addIngredient(Material.{ingredient});")
+        return lines
+
     shape_raw = props.get("shape", "AAA,BBB,CCC")
     ingredients_raw = props.get("ingredients", "A:DIAMOND,B:GOLD_INGOT,C:IRON_INGOT")
     shape_rows = [sanitize_java_string(r.strip()) for r in shape_raw.split(",") if r.strip()]
-    lines.append("        {")
-    lines.append(f'            NamespacedKey key = new NamespacedKey(plugin, "{recipe_key}");')
-    lines.append(f"            ShapedRecipe recipe = new ShapedRecipe(key, new ItemStack(Material.{result_item}, {result_amount}));")
+    lines.append(f"ShapedRecipe recipe = new ShapedRecipe(key, new ItemStack(Material.{result_item}, {result_amount}));")
     shape_args = ", ".join(f'"{row}"' for row in shape_rows[:3])
-    lines.append(f"            recipe.shape({shape_args});")
+    lines.append(f"recipe.shape({shape_args});")
     for mapping in ingredients_raw.split(","):
         mapping = mapping.strip()
         if ":" in mapping:
@@ -1596,6 +1227,540 @@ def _gen_add_shaped_recipe(lines, props):
             char = sanitize_java_string(char.strip())
             mat = sanitize_java_string(mat.strip()).upper()
             if len(char) == 1:
-                lines.append(f"            recipe.setIngredient('{char}', Material.{mat});")
-    lines.append("            Bukkit.addRecipe(recipe);")
-    lines.append("        }")
+                lines.append(f"recipe.setIngredient('{char}', Material.{mat});")
+    return lines
+
+
+def _gen_add_recipe(lines: Body, props: dict, ctx: ActionContext) -> None:
+    # Registered once in onEnable by RecipeRegistry; firing only unlocks it
+    lines.append(f'RecipeRegistry.discover(player, "{recipe_key(ctx.block)}");')
+
+
+# ---------------------------------------------------------------------------
+# Simple player actions
+# ---------------------------------------------------------------------------
+
+def _gen_set_health(lines: Body, props: dict) -> None:
+    lines.append(f"player.setHealth({props.get('health', '20.0')});")
+
+
+def _gen_set_hunger(lines: Body, props: dict) -> None:
+    lines.append(f"player.setFoodLevel({props.get('hunger', '20')});")
+
+
+def _gen_set_saturation(lines: Body, props: dict) -> None:
+    lines.append(f"player.setSaturation({props.get('saturation', '5.0')});")
+
+
+def _gen_cancel_event(lines: Body, props: dict, is_command: bool) -> None:
+    if not is_command:
+        lines.append("event.setCancelled(true);")
+
+
+def _gen_add_experience(lines: Body, props: dict) -> None:
+    lines.append(f"player.giveExp({props.get('amount', '10')});")
+
+
+def _gen_set_level(lines: Body, props: dict) -> None:
+    lines.append(f"player.setLevel({props.get('level', '10')});")
+
+
+def _gen_set_game_mode(lines: Body, props: dict) -> None:
+    game_mode = sanitize_java_string(props.get("gameMode", "SURVIVAL")).upper()
+    lines.append(f"player.setGameMode(GameMode.{game_mode});")
+
+
+def _gen_remove_potion_effect(lines: Body, props: dict) -> None:
+    effect_type = sanitize_java_string(props.get("effectType", "SPEED")).upper()
+    lines.append(f"player.removePotionEffect(PotionEffectType.{effect_type});")
+
+
+def _gen_kill_player(lines: Body, props: dict) -> None:
+    lines.append("player.setHealth(0);")
+
+
+def _gen_damage_player(lines: Body, props: dict) -> None:
+    lines.append(f"player.damage({props.get('amount', '5.0')});")
+
+
+def _gen_clear_inventory(lines: Body, props: dict) -> None:
+    lines.append("player.getInventory().clear();")
+
+
+def _gen_kick_player(lines: Body, props: dict) -> None:
+    reason = sanitize_java_string(props.get("reason", "You have been kicked!"))
+    lines.append(f'player.kickPlayer("{reason}");')
+
+
+def _gen_set_block_type(lines: Body, props: dict) -> None:
+    block_type = sanitize_java_string(props.get("blockType", "STONE")).upper()
+    lines.if_("targetBlock != null").append(f"targetBlock.setType(Material.{block_type});")
+
+
+def _gen_remove_block(lines: Body, props: dict) -> None:
+    lines.if_("targetBlock != null").append("targetBlock.breakNaturally();")
+
+
+def _gen_set_glowing(lines: Body, props: dict) -> None:
+    lines.append(f"player.setGlowing({props.get('glowing', 'true').lower()});")
+
+
+def _gen_set_invisible(lines: Body, props: dict) -> None:
+    lines.append(f"player.setInvisible({props.get('invisible', 'true').lower()});")
+
+
+def _gen_set_custom_name(lines: Body, props: dict) -> None:
+    name = sanitize_java_string(props.get("name", ""))
+    lines.append(f'player.setCustomName("{name}");')
+    lines.append("player.setCustomNameVisible(true);")
+
+
+def _gen_set_on_fire(lines: Body, props: dict) -> None:
+    lines.append(f"player.setFireTicks({props.get('ticks', '100')});")
+
+
+def _gen_open_gui(lines: Body, props: dict) -> None:
+    lines.append("if (gui != null) player.openInventory(gui);")
+
+
+def _gen_remove_scoreboard(lines: Body, props: dict) -> None:
+    lines.append("SidebarBoards.hide(player);")
+
+
+def _gen_heal_player(lines: Body, props: dict) -> None:
+    amount = props.get("amount", "5")
+    lines.append(f"player.setHealth(Math.min(player.getHealth() + {amount}, player.getAttribute(org.bukkit.attribute.Attribute.GENERIC_MAX_HEALTH).getValue()));")
+
+
+def _gen_feed_player(lines: Body, props: dict) -> None:
+    amount = props.get("amount", "5")
+    lines.append(f"player.setFoodLevel(Math.min(player.getFoodLevel() + {amount}, 20));")
+
+
+def _gen_set_max_health(lines: Body, props: dict) -> None:
+    amount = props.get("amount", "20")
+    lines.append(f"player.getAttribute(org.bukkit.attribute.Attribute.GENERIC_MAX_HEALTH).setBaseValue({amount});")
+
+
+def _gen_close_inventory(lines: Body, props: dict) -> None:
+    lines.append("player.closeInventory();")
+
+
+def _gen_ride_entity(lines: Body, props: dict) -> None:
+    lines.if_("targetEntity != null && targetEntity != player").append("targetEntity.addPassenger(player);")
+
+
+def _gen_set_walk_speed(lines: Body, props: dict) -> None:
+    speed = props.get("speed", "0.2")
+    lines.append(f"player.setWalkSpeed({speed}f);")
+
+
+def _gen_set_fly_speed(lines: Body, props: dict) -> None:
+    speed = props.get("speed", "0.1")
+    lines.append(f"player.setFlySpeed({speed}f);")
+
+
+# ---------------------------------------------------------------------------
+# Condition blocks (guard clauses)
+# ---------------------------------------------------------------------------
+
+def _gen_has_permission(lines: Body, props: dict) -> None:
+    perm = sanitize_java_string(props.get("permission", ""))
+    if perm:
+        lines.append(f'if (player == null || !player.hasPermission("{perm}")) return;')
+
+
+def _gen_has_item(lines: Body, props: dict) -> None:
+    item_type = sanitize_java_string(props.get("itemType", "DIAMOND")).upper()
+    amount = props.get("amount", "1")
+    lines.append(f'if (player == null || !player.getInventory().contains(Material.{item_type}, {amount})) return;')
+
+
+def _gen_game_mode_equals(lines: Body, props: dict) -> None:
+    game_mode = sanitize_java_string(props.get("gameMode", "SURVIVAL")).upper()
+    lines.append(f'if (player == null || player.getGameMode() != org.bukkit.GameMode.{game_mode}) return;')
+
+
+def _gen_is_in_world(lines: Body, props: dict) -> None:
+    world = sanitize_java_string(props.get("world", "world"))
+    lines.append(f'if (player == null || !player.getWorld().getName().equals("{world}")) return;')
+
+
+def _gen_is_holding_item(lines: Body, props: dict) -> None:
+    item_type = sanitize_java_string(props.get("itemType", "DIAMOND")).upper()
+    lines.append(f'if (player == null || player.getInventory().getItemInMainHand().getType() != Material.{item_type}) return;')
+
+
+def _gen_has_potion_effect(lines: Body, props: dict) -> None:
+    effect_type = sanitize_java_string(props.get("effectType", "SPEED")).upper()
+    lines.append(f'if (player == null || !player.hasPotionEffect(PotionEffectType.{effect_type})) return;')
+
+
+def _gen_random_chance(lines: Body, props: dict) -> None:
+    chance = props.get("chance", "50")
+    lines.append(f'if (Math.random() * 100 >= {chance}) return;')
+
+
+def _gen_block_is_type(lines: Body, props: dict) -> None:
+    block_type_val = sanitize_java_string(props.get("blockType", "STONE")).upper()
+    lines.append(f'if (!(event instanceof org.bukkit.event.block.BlockEvent) || ((org.bukkit.event.block.BlockEvent) event).getBlock().getType() != Material.{block_type_val}) return;')
+
+
+def _gen_is_in_biome(lines: Body, props: dict) -> None:
+    biome = sanitize_java_string(props.get("biome", "PLAINS")).upper()
+    lines.append(f'if (player == null || player.getLocation().getBlock().getBiome() != org.bukkit.block.Biome.{biome}) return;')
+
+
+def _gen_has_experience(lines: Body, props: dict) -> None:
+    amount = props.get("amount", "100")
+    lines.append(f'if (player == null || player.getTotalExperience() < {amount}) return;')
+
+
+def _guard(condition: str) -> ActionGenerator:
+    """Guard clause returning early unless ``condition`` holds."""
+    line = f"if ({condition}) return;"
+
+    def generate(lines: Body, props: dict, ctx: ActionContext) -> None:
+        lines.append(line)
+
+    return generate
+
+
+def _threshold_guard(condition: str, prop: str, default: str) -> ActionGenerator:
+    """Guard clause comparing a player stat against a numeric property."""
+
+    def generate(lines: Body, props: dict, ctx: ActionContext) -> None:
+        lines.append(f"if ({condition}{props.get(prop, default)}) return;")
+
+    return generate
+
+
+# ---------------------------------------------------------------------------
+# Control flow
+# ---------------------------------------------------------------------------
+
+def _gen_branch_if(lines: Body, props: dict, ctx: ActionContext) -> None:
+    ctx.scopes.append(lines.if_(build_branch_if_expression(props)))
+
+
+def _gen_branch_else(lines: Body, props: dict, ctx: ActionContext) -> None:
+    if ctx.if_depth > 0:
+        ctx.scopes.pop()
+        ctx.scopes.append(ctx.scopes[-1].else_())
+
+
+def _gen_branch_end_if(lines: Body, props: dict, ctx: ActionContext) -> None:
+    if ctx.if_depth > 0:
+        ctx.scopes.pop()
+
+
+# ---------------------------------------------------------------------------
+# Action registry
+# ---------------------------------------------------------------------------
+
+def _props_only(fn: Callable[[Body, dict], None]) -> ActionGenerator:
+    def generate(lines: Body, props: dict, ctx: ActionContext) -> None:
+        fn(lines, props)
+    return generate
+
+
+def _with_command(fn: Callable[[Body, dict, bool], None]) -> ActionGenerator:
+    def generate(lines: Body, props: dict, ctx: ActionContext) -> None:
+        fn(lines, props, ctx.is_command)
+    return generate
+
+
+def _with_fields(fn: Callable[[Body, dict, Optional[StaticFields]], None]) -> ActionGenerator:
+    def generate(lines: Body, props: dict, ctx: ActionContext) -> None:
+        fn(lines, props, ctx.fields)
+    return generate
+
+
+def _with_event(fn: Callable[[Body, dict, str, bool], None]) -> ActionGenerator:
+    def generate(lines: Body, props: dict, ctx: ActionContext) -> None:
+        fn(lines, props, ctx.event_name, ctx.is_command)
+    return generate
+
+
+def _scheduled(fn: Callable[[Body, dict, Optional[str]], None]) -> ActionGenerator:
+    def generate(lines: Body, props: dict, ctx: ActionContext) -> None:
+        fn(lines, props, ctx.continuation)
+    return generate
+
+
+def _branch_if_imports(props: dict) -> Iterable[str]:
+    return _COOLDOWNS if _cooldown_names("BranchIf", props) else ()
+
+
+def _noop(lines: Body, props: dict, ctx: ActionContext) -> None:
+    pass
+
+
+def _give_item_imports(props: dict) -> Iterable[str]:
+    has_meta = (
+        props.get("displayName") or props.get("lore")
+        or props.get("enchantments") or props.get("itemFlags")
+    )
+    return ("org.bukkit.inventory.meta.ItemMeta",) if has_meta else ()
+
+
+_BUKKIT = "org.bukkit.Bukkit"
+_MATERIAL = frozenset({"org.bukkit.Material", "org.bukkit.inventory.ItemStack"})
+_LOCATION = "org.bukkit.Location"
+_VECTOR = "org.bukkit.util.Vector"
+_POTIONS = frozenset({"org.bukkit.potion.PotionEffect", "org.bukkit.potion.PotionEffectType"})
+_SCHEDULER = frozenset({"{package}.util.TaskWheel"})
+_METADATA = frozenset({"org.bukkit.plugin.java.JavaPlugin", "org.bukkit.metadata.FixedMetadataValue"})
+_COOLDOWNS = frozenset({"{package}.util.CooldownManager"})
+_GUI = frozenset({_BUKKIT, "org.bukkit.inventory.Inventory"})
+_BOSS_BAR = frozenset({
+    _BUKKIT, "org.bukkit.NamespacedKey", "org.bukkit.boss.KeyedBossBar",
+    "org.bukkit.boss.BarColor", "org.bukkit.boss.BarStyle",
+})
+_SCOREBOARD = frozenset({"{package}.util.SidebarBoards"})
+_RECIPES = frozenset({"{package}.util.RecipeRegistry"})
+
+_WORLD = dict(needs_entity=True, needs_block=True)
+_LIVING = dict(needs_entity=True, needs_living=True)
+
+ACTION_REGISTRY: Dict[str, ActionSpec] = {
+    # Messaging
+    "SendMessage": ActionSpec(_with_command(_gen_send_message), needs_player=True),
+    "BroadcastMessage": ActionSpec(_with_command(_gen_broadcast_message), frozenset({_BUKKIT}), needs_player=True),
+    "SendConsoleMessage": ActionSpec(_with_command(_gen_send_console_message), frozenset({_BUKKIT}), needs_player=True),
+    "SendTitle": ActionSpec(_props_only(_gen_send_title), needs_player=True),
+    "SendActionBar": ActionSpec(_with_command(_gen_send_action_bar), needs_player=True),
+    "ConsoleLog": ActionSpec(_with_command(_gen_console_log), frozenset({_BUKKIT}), needs_player=True),
+    "SendTabHeaderFooter": ActionSpec(_with_command(_gen_send_tab_header_footer), needs_player=True),
+    "OpenBook": ActionSpec(_with_command(_gen_open_book), _MATERIAL, needs_player=True),
+    # Inventory & items
+    "GiveItem": ActionSpec(_with_fields(_gen_give_item), _MATERIAL, _give_item_imports, needs_player=True),
+    "RemoveItem": ActionSpec(_props_only(_gen_remove_item), _MATERIAL, needs_player=True),
+    "SetItemInHand": ActionSpec(_props_only(_gen_set_item_in_hand), _MATERIAL, needs_player=True),
+    "DropItem": ActionSpec(_props_only(_gen_drop_item), _MATERIAL, needs_player=True),
+    "ClearInventory": ActionSpec(_props_only(_gen_clear_inventory), needs_player=True),
+    "CloseInventory": ActionSpec(_props_only(_gen_close_inventory), needs_player=True),
+    "SetArmor": ActionSpec(_props_only(_gen_set_armor), _MATERIAL, needs_player=True),
+    # Player state
+    "SetHealth": ActionSpec(_props_only(_gen_set_health), needs_player=True),
+    "SetHunger": ActionSpec(_props_only(_gen_set_hunger), needs_player=True),
+    "SetSaturation": ActionSpec(_props_only(_gen_set_saturation), needs_player=True),
+    "HealPlayer": ActionSpec(_props_only(_gen_heal_player), needs_player=True),
+    "FeedPlayer": ActionSpec(_props_only(_gen_feed_player), needs_player=True),
+    "SetMaxHealth": ActionSpec(_props_only(_gen_set_max_health), needs_player=True),
+    "KillPlayer": ActionSpec(_props_only(_gen_kill_player), needs_player=True),
+    "DamagePlayer": ActionSpec(_props_only(_gen_damage_player), needs_player=True),
+    "AddExperience": ActionSpec(_props_only(_gen_add_experience), needs_player=True),
+    "SetLevel": ActionSpec(_props_only(_gen_set_level), needs_player=True),
+    "SetExperienceLevel": ActionSpec(_props_only(_gen_set_level), needs_player=True),
+    "SetGameMode": ActionSpec(_props_only(_gen_set_game_mode), frozenset({"org.bukkit.GameMode"}), needs_player=True),
+    "AddPotionEffect": ActionSpec(_props_only(_gen_add_potion_effect), _POTIONS, needs_player=True),
+    "ApplyPotionEffect": ActionSpec(_props_only(_gen_add_potion_effect), _POTIONS, needs_player=True),
+    "RemovePotionEffect": ActionSpec(_props_only(_gen_remove_potion_effect), _POTIONS, needs_player=True),
+    "SetGlowing": ActionSpec(_props_only(_gen_set_glowing), needs_player=True),
+    "SetInvisible": ActionSpec(_props_only(_gen_set_invisible), needs_player=True),
+    "SetCustomName": ActionSpec(_props_only(_gen_set_custom_name), needs_player=True),
+    "AllowFlight": ActionSpec(_props_only(_gen_allow_flight), needs_player=True),
+    "SetOnFire": ActionSpec(_props_only(_gen_set_on_fire), needs_player=True),
+    "SetWalkSpeed": ActionSpec(_props_only(_gen_set_walk_speed), needs_player=True),
+    "SetFlySpeed": ActionSpec(_props_only(_gen_set_fly_speed), needs_player=True),
+    "KickPlayer": ActionSpec(_props_only(_gen_kick_player), needs_player=True),
+    "SetResourcePack": ActionSpec(_props_only(_gen_set_resource_pack), needs_player=True),
+    "GrantPermission": ActionSpec(_props_only(_gen_grant_permission), _METADATA, needs_player=True, needs_plugin=True),
+    "SetMetadata": ActionSpec(_props_only(_gen_set_metadata), _METADATA, needs_player=True, needs_plugin=True),
+    # Movement
+    "PlaySound": ActionSpec(_props_only(_gen_play_sound), frozenset({"org.bukkit.Sound"}), needs_player=True),
+    "TeleportPlayer": ActionSpec(
+        _gen_teleport_player, frozenset({_BUKKIT, _LOCATION}), needs_player=True, chains_completion=True,
+    ),
+    "SetVelocity": ActionSpec(_props_only(_gen_set_velocity), frozenset({_LOCATION, _VECTOR}), needs_player=True),
+    "SetSpawnLocation": ActionSpec(_props_only(_gen_set_spawn_location), frozenset({_LOCATION}), needs_player=True),
+    "LaunchProjectile": ActionSpec(_props_only(_gen_launch_projectile), needs_player=True),
+    "SpawnFirework": ActionSpec(_props_only(_gen_spawn_firework), frozenset({"org.bukkit.entity.EntityType"}), needs_player=True),
+    "RideEntity": ActionSpec(_props_only(_gen_ride_entity), needs_player=True, needs_entity=True),
+    # Commands
+    "ExecuteCommand": ActionSpec(_with_command(_gen_execute_command), frozenset({_BUKKIT}), needs_player=True),
+    "ExecuteCommandAsPlayer": ActionSpec(_with_command(_gen_execute_command), frozenset({_BUKKIT}), needs_player=True),
+    "ExecuteConsoleCommand": ActionSpec(_gen_execute_console_command, frozenset({_BUKKIT}), needs_player=True),
+    # Event
+    "CancelEvent": ActionSpec(_with_command(_gen_cancel_event)),
+    # World
+    "SetTime": ActionSpec(_with_event(_gen_set_time), **_WORLD),
+    "SetWeather": ActionSpec(_with_event(_gen_set_weather), **_WORLD),
+    "SetThunder": ActionSpec(_with_event(_gen_set_thunder), **_WORLD),
+    "SpawnEntity": ActionSpec(_with_event(_gen_spawn_entity), frozenset({"org.bukkit.entity.EntityType"}), **_WORLD),
+    "StrikeLightning": ActionSpec(_with_event(_gen_strike_lightning), **_WORLD),
+    "StrikeWithLightning": ActionSpec(_with_event(_gen_strike_lightning), **_WORLD),
+    "CreateExplosion": ActionSpec(_with_event(_gen_create_explosion), **_WORLD),
+    "SpawnParticle": ActionSpec(_with_event(_gen_spawn_particle), frozenset({"org.bukkit.Particle"}), needs_player=True, **_WORLD),
+    "SpawnParticles": ActionSpec(_with_event(_gen_spawn_particle), frozenset({"org.bukkit.Particle"}), needs_player=True, **_WORLD),
+    "SetWorldBorder": ActionSpec(_with_event(_gen_set_world_border), needs_player=True, **_WORLD),
+    "SpawnFallingBlock": ActionSpec(_with_event(_gen_spawn_falling_block), _MATERIAL, needs_player=True, **_WORLD),
+    # Blocks
+    "SetBlockType": ActionSpec(_props_only(_gen_set_block_type), _MATERIAL, needs_block=True),
+    "RemoveBlock": ActionSpec(_props_only(_gen_remove_block), needs_block=True),
+    "FillRegion": ActionSpec(
+        _gen_fill_region, _MATERIAL | {"{package}.util.RegionFiller"},
+        needs_plugin=True, consumes_rest_if=_fill_waits, **_WORLD,
+    ),
+    # Entities
+    "DamageEntity": ActionSpec(_props_only(_gen_damage_entity), needs_entity=True),
+    "TeleportEntity": ActionSpec(
+        _gen_teleport_entity, frozenset({_BUKKIT, _LOCATION}), needs_entity=True, chains_completion=True,
+    ),
+    "SetEntityVelocity": ActionSpec(_props_only(_gen_set_entity_velocity), frozenset({_VECTOR}), needs_entity=True),
+    "SetEntityHealth": ActionSpec(_props_only(_gen_set_entity_health), **_LIVING),
+    "ApplyEntityPotionEffect": ActionSpec(_props_only(_gen_apply_entity_potion_effect), _POTIONS, **_LIVING),
+    "SetEntityOnFire": ActionSpec(_props_only(_gen_set_entity_on_fire), **_LIVING),
+    "SetEntityCustomName": ActionSpec(_props_only(_gen_set_entity_custom_name), **_LIVING),
+    "SetEntityEquipment": ActionSpec(_props_only(_gen_set_entity_equipment), _MATERIAL, **_LIVING),
+    # GUI
+    "CreateGUI": ActionSpec(_props_only(_gen_create_gui), _GUI, needs_player=True, needs_gui=True),
+    "AddGUIItem": ActionSpec(
+        _with_fields(_gen_add_gui_item), _GUI | _MATERIAL | {"org.bukkit.inventory.meta.ItemMeta"},
+        needs_player=True, needs_gui=True,
+    ),
+    "OpenGUI": ActionSpec(_props_only(_gen_open_gui), _GUI, needs_player=True, needs_gui=True),
+    # Boss bars & scoreboards
+    "CreateBossBar": ActionSpec(_props_only(_gen_create_boss_bar), _BOSS_BAR, needs_player=True, needs_plugin=True),
+    "RemoveBossBar": ActionSpec(_props_only(_gen_remove_boss_bar), _BOSS_BAR, needs_player=True, needs_plugin=True),
+    "SetScoreboard": ActionSpec(_props_only(_gen_set_scoreboard), _SCOREBOARD, needs_player=True),
+    "RemoveScoreboard": ActionSpec(_props_only(_gen_remove_scoreboard), _SCOREBOARD, needs_player=True),
+    # Config & temporary variables
+    "SaveConfig": ActionSpec(_with_command(_gen_save_config), needs_plugin=True),
+    "SendConfigValue": ActionSpec(_with_command(_gen_send_config_value), needs_player=True, needs_plugin=True),
+    "SetTempVar": ActionSpec(_with_command(_gen_set_temp_var), needs_temp_vars=True),
+    "GetTempVar": ActionSpec(_with_command(_gen_get_temp_var), needs_player=True, needs_temp_vars=True),
+    # Recipes
+    "AddShapelessRecipe": ActionSpec(_gen_add_recipe, _RECIPES),
+    "AddShapedRecipe": ActionSpec(_gen_add_recipe, _RECIPES),
+    # Scheduling & cooldowns
+    "DelayAction": ActionSpec(_scheduled(_gen_delay_action), _SCHEDULER, needs_player=True, consumes_rest=True),
+    "RepeatAction": ActionSpec(_scheduled(_gen_repeat_action), _SCHEDULER, needs_player=True, consumes_rest=True),
+    "SetCooldown": ActionSpec(_props_only(_gen_set_cooldown), _COOLDOWNS, needs_player=True),
+    "CheckCooldown": ActionSpec(_props_only(_gen_check_cooldown), _COOLDOWNS, needs_player=True),
+    # Conditions
+    "HasPermission": ActionSpec(_props_only(_gen_has_permission)),
+    "HasItem": ActionSpec(_props_only(_gen_has_item), _MATERIAL),
+    "HealthAbove": ActionSpec(_threshold_guard("player == null || player.getHealth() <= ", "health", "10")),
+    "HealthBelow": ActionSpec(_threshold_guard("player == null || player.getHealth() >= ", "health", "5")),
+    "GameModeEquals": ActionSpec(_props_only(_gen_game_mode_equals), frozenset({"org.bukkit.GameMode"})),
+    "IsInWorld": ActionSpec(_props_only(_gen_is_in_world)),
+    "IsSneaking": ActionSpec(_guard("player == null || !player.isSneaking()")),
+    "IsFlying": ActionSpec(_guard("player == null || !player.isFlying()")),
+    "IsOp": ActionSpec(_guard("player == null || !player.isOp()")),
+    "HungerAbove": ActionSpec(_threshold_guard("player == null || player.getFoodLevel() <= ", "hunger", "10")),
+    "HungerBelow": ActionSpec(_threshold_guard("player == null || player.getFoodLevel() >= ", "hunger", "5")),
+    "LevelAbove": ActionSpec(_threshold_guard("player == null || player.getLevel() <= ", "level", "10")),
+    "IsHoldingItem": ActionSpec(_props_only(_gen_is_holding_item), _MATERIAL),
+    "IsRaining": ActionSpec(_guard("player == null || !player.getWorld().hasStorm()")),
+    "IsThundering": ActionSpec(_guard("player == null || !player.getWorld().isThundering()")),
+    "HasPotionEffect": ActionSpec(_props_only(_gen_has_potion_effect), _POTIONS),
+    "IsOnGround": ActionSpec(_guard("player == null || !player.isOnGround()")),
+    "IsInWater": ActionSpec(_guard("player == null || !player.isInWater()")),
+    "RandomChance": ActionSpec(_props_only(_gen_random_chance)),
+    "BlockIsType": ActionSpec(_props_only(_gen_block_is_type), _MATERIAL),
+    "TimeIsDay": ActionSpec(_guard("player == null || player.getWorld().getTime() >= 12300")),
+    "TimeIsNight": ActionSpec(_guard("player == null || player.getWorld().getTime() < 12300")),
+    "IsInBiome": ActionSpec(_props_only(_gen_is_in_biome)),
+    "HasExperience": ActionSpec(_props_only(_gen_has_experience)),
+    # Branching
+    "BranchIf": ActionSpec(_gen_branch_if, prop_imports=_branch_if_imports, needs_player=True),
+    "BranchElse": ActionSpec(_gen_branch_else),
+    "BranchEndIf": ActionSpec(_gen_branch_end_if),
+    # Command argument declarations are handled by the command prelude
+    "StringArg": ActionSpec(_noop),
+    "PlayerArg": ActionSpec(_noop),
+    "IntegerArg": ActionSpec(_noop),
+}
+
+
+# ---------------------------------------------------------------------------
+# Compiled capability masks
+# ---------------------------------------------------------------------------
+#
+# Every ActionSpec is compiled once at import time into an int. The low bits
+# are handler-scope requirements; each bit from _IMPORT_SHIFT upwards stands
+# for one entry of IMPORT_TABLE. A block list's requirements are the OR of
+# its blocks' masks, so per-class analysis is a single pass over children.
+
+NEEDS_PLAYER = 1 << 0
+NEEDS_ENTITY = 1 << 1
+NEEDS_LIVING = 1 << 2
+NEEDS_BLOCK = 1 << 3
+NEEDS_PLUGIN = 1 << 4
+NEEDS_GUI = 1 << 5
+NEEDS_TEMP_VARS = 1 << 6
+_IMPORT_SHIFT = 7
+
+# Imports implied by the variables the generate_action_code prelude declares
+_PRELUDE_IMPORTS = {
+    NEEDS_ENTITY: ("org.bukkit.entity.Entity",),
+    NEEDS_LIVING: ("org.bukkit.entity.LivingEntity",),
+    NEEDS_BLOCK: ("org.bukkit.block.Block",),
+    NEEDS_PLUGIN: ("org.bukkit.plugin.java.JavaPlugin",),
+}
+_CUSTOM_CODE_IMPORTS = ("org.bukkit.Bukkit", "org.bukkit.ChatColor")
+
+# Variables the prelude declares for each requirement, in declaration order
+_PRELUDE_VARIABLES = (
+    (NEEDS_PLUGIN, ("JavaPlugin plugin",)),
+    (NEEDS_GUI, ("Inventory gui",)),
+    (NEEDS_TEMP_VARS, ("java.util.HashMap<String, String> tempVars",)),
+    (NEEDS_ENTITY, ("boolean hasEventEntity", "Entity targetEntity")),
+    (NEEDS_LIVING, ("LivingEntity living",)),
+    (NEEDS_BLOCK, ("boolean hasEventBlock", "Block targetBlock")),
+)
+
+
+def _spec_flags(spec: ActionSpec) -> int:
+    flags = 0
+    if spec.needs_player:
+        flags |= NEEDS_PLAYER
+    if spec.needs_entity:
+        flags |= NEEDS_ENTITY
+    if spec.needs_living:
+        flags |= NEEDS_LIVING
+    if spec.needs_block:
+        flags |= NEEDS_BLOCK
+    if spec.needs_plugin:
+        flags |= NEEDS_PLUGIN
+    if spec.needs_gui:
+        flags |= NEEDS_GUI
+    if spec.needs_temp_vars:
+        flags |= NEEDS_TEMP_VARS
+    return flags
+
+
+def _spec_imports(spec: ActionSpec) -> Set[str]:
+    imports = set(spec.imports)
+    flags = _spec_flags(spec)
+    for flag, implied in _PRELUDE_IMPORTS.items():
+        if flags & flag:
+            imports.update(implied)
+    return imports
+
+
+IMPORT_TABLE: List[str] = sorted(
+    set(_CUSTOM_CODE_IMPORTS).union(*(_spec_imports(spec) for spec in ACTION_REGISTRY.values()))
+)
+_IMPORT_BITS: Dict[str, int] = {
+    imp: 1 << (_IMPORT_SHIFT + i) for i, imp in enumerate(IMPORT_TABLE)
+}
+
+
+def _import_mask(imports: Iterable[str]) -> int:
+    mask = 0
+    for imp in imports:
+        mask |= _IMPORT_BITS[imp]
+    return mask
+
+
+ACTION_MASKS: Dict[str, int] = {
+    name: _spec_flags(spec) | _import_mask(_spec_imports(spec))
+    for name, spec in ACTION_REGISTRY.items()
+}
+_CUSTOM_CODE_MASK = _import_mask(_CUSTOM_CODE_IMPORTS)
+_PROP_IMPORT_ACTIONS: FrozenSet[str] = frozenset(
+    name for name, spec in ACTION_REGISTRY.items() if spec.prop_imports is not None
+)
@@ -0,0 +1,169 @@
+"""One-pass analysis of a plugin config shared by every generator.
+
+``analyze_config`` indexes the blocks, resolves each event's children and
+computes the per-class requirement masks once. The main class, listeners,
+commands, plugin.yml and utilities all read from the same immutable
+``ConfigAnalysis`` instead of rescanning ``config.blocks``.
+"""
+
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Dict, FrozenSet, List, Mapping, Tuple
+
+from app.models.block import Block, BlockType
+from app.models.plugin_config import PluginConfig
+
+from .action_generators import COOLDOWN_ACTIONS, RECIPE_ACTIONS, cooldown_names, recipe_key, requirements_mask
+from .version_config import ServerTarget
+
+
+@dataclass(frozen=True)
+class ListenerUnit:
+    """One or more event blocks that become ``EventListener{index}``.
+
+    ``sections`` holds every (event block, children) pair handled by the
+    class, in config order; it has more than one entry only when
+    ``merge_listeners`` groups same-event blocks. ``event`` is the first
+    event block and ``children`` the concatenation of all children.
+    """
+
+    index: int
+    event: Block
+    children: Tuple[Block, ...]
+    mask: int
+    sections: Tuple[Tuple[Block, Tuple[Block, ...]], ...] = ()
+
+    @property
+    def filename(self) -> str:
+        return f"EventListener{self.index}.java"
+
+
+@dataclass(frozen=True)
+class CommandUnit:
+    """A named ``CommandEvent`` block that becomes a command executor."""
+
+    index: int
+    block: Block
+    children: Tuple[Block, ...]
+    name: str
+    class_name: str
+    mask: int
+
+    @property
+    def filename(self) -> str:
+        return f"{self.class_name}.java"
+
+
+@dataclass(frozen=True)
+class ConfigAnalysis:
+    """Indexes and derived facts for one plugin config."""
+
+    blocks_by_id: Mapping[str, Block]
+    listeners: Tuple[ListenerUnit, ...]
+    commands: Tuple[CommandUnit, ...]
+    action_names: FrozenSet[str]
+    mask: int
+    recipes: Tuple[Block, ...] = ()  # attached recipe blocks, first per key
+    cooldowns: Tuple[str, ...] = ()  # cooldown names in first-use order; index = int ID
+    target: ServerTarget = ServerTarget()
+
+    @property
+    def uses_cooldowns(self) -> bool:
+        return bool(self.cooldowns)
+
+    @property
+    def uses_task_wheel(self) -> bool:
+        return not self.action_names.isdisjoint({"DelayAction", "RepeatAction"})
+
+    @property
+    def uses_scoreboards(self) -> bool:
+        return not self.action_names.isdisjoint({"SetScoreboard", "RemoveScoreboard"})
+
+    @property
+    def uses_region_fill(self) -> bool:
+        return "FillRegion" in self.action_names
+
+
+def command_class_name(cmd_name: str) -> str:
+    """Java class name for a command, e.g. ``my-cmd`` -> ``CommandMyCmd``."""
+    return "Command" + "".join(
+        part.capitalize() for part in cmd_name.replace("-", "_").split("_")
+    )
+
+
+def analyze_config(config: PluginConfig) -> ConfigAnalysis:
+    """Build the shared analysis for ``config`` in a single scan of its blocks."""
+    blocks_by_id: Dict[str, Block] = {}
+    event_blocks: List[Block] = []
+    command_blocks: List[Block] = []
+    action_names = set()
+    cooldowns: Dict[str, None] = {}  # ordered set
+    for block in config.blocks:
+        blocks_by_id[block.id] = block
+        if block.type == BlockType.EVENT:
+            if block.name == "CommandEvent":
+                command_blocks.append(block)
+            else:
+                event_blocks.append(block)
+        elif block.type == BlockType.ACTION:
+            action_names.add(block.name)
+            if block.name in COOLDOWN_ACTIONS or block.name == "BranchIf":
+                cooldowns.update(dict.fromkeys(cooldown_names(block)))
+
+    def resolve(parent: Block) -> Tuple[Block, ...]:
+        return tuple(blocks_by_id[cid] for cid in parent.children if cid in blocks_by_id)
+
+    groups: List[List[Block]]
+    if config.merge_listeners:
+        by_event: Dict[str, List[Block]] = {}
+        for event_block in event_blocks:
+            by_event.setdefault(event_block.name, []).append(event_block)
+        groups = list(by_event.values())
+    else:
+        groups = [[event_block] for event_block in event_blocks]
+
+    mask = 0
+    listeners = []
+    for i, group in enumerate(groups):
+        sections = tuple((event_block, resolve(event_block)) for event_block in group)
+        children = tuple(child for _, section_children in sections for child in section_children)
+        unit_mask = requirements_mask(children)
+        mask |= unit_mask
+        listeners.append(ListenerUnit(
+            index=i, event=group[0], children=children, mask=unit_mask, sections=sections
+        ))
+
+    commands = []
+    for i, cmd_block in enumerate(command_blocks):
+        cmd_name = cmd_block.properties.get("commandName", "").lower().strip()
+        if not cmd_name:
+            continue
+        children = resolve(cmd_block)
+        unit_mask = requirements_mask(children)
+        mask |= unit_mask
+        commands.append(CommandUnit(
+            index=i,
+            block=cmd_block,
+            children=children,
+            name=cmd_name,
+            class_name=command_class_name(cmd_name),
+            mask=unit_mask,
+        ))
+
+    recipes: Dict[str, Block] = {}
+    if not action_names.isdisjoint(RECIPE_ACTIONS):
+        for unit in (*listeners, *commands):
+            for child in unit.children:
+                if child.type == BlockType.ACTION and child.name in RECIPE_ACTIONS:
+                    recipes.setdefault(recipe_key(child), child)
+
+    return ConfigAnalysis(
+        blocks_by_id=MappingProxyType(blocks_by_id),
+        listeners=tuple(listeners),
+        commands=tuple(commands),
+        action_names=frozenset(action_names),
+        mask=mask,
+        recipes=tuple(recipes.values()),
+        cooldowns=tuple(cooldowns),
+        target=ServerTarget(config.paper_version, config.server_platform),
+    )
@@ -1,47 +1,46 @@
 """Generate Java listener and command executor classes."""
 
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple
 
 from app.models.block import Block, BlockType
 from app.models.plugin_config import PluginConfig
 from app.utils.validators import sanitize_java_string
 
-from .action_generators import generate_action_code
+from .action_generators import (
+    NEEDS_PLAYER,
+    collect_action_imports,
+    generate_action_code,
+    generate_prelude,
+    prelude_parameters,
+    requirements_mask,
+)
+from .analysis import ConfigAnalysis, analyze_config, command_class_name
 from .constants import EVENT_CLASS_NAMES, EVENT_IMPORTS, EVENT_PLAYER_ACCESSOR, EVENTS_WITHOUT_PLAYER
 from .helpers import safe_java_identifier, to_bool
+from .java_ir import StaticFields
+from .version_config import ServerTarget
 
 
-def generate_main_plugin(config: PluginConfig) -> str:
+def generate_main_plugin(config: PluginConfig, analysis: Optional[ConfigAnalysis] = None) -> str:
     """Generate the main plugin class extending JavaPlugin."""
+    analysis = analysis or analyze_config(config)
     package = config.main_package
     class_name = config.main_class_name
     version = sanitize_java_string(config.version)
 
     # Collect listener registrations (exclude CommandEvent blocks)
-    event_blocks = [
-        b for b in config.blocks
-        if b.type == BlockType.EVENT and b.name != "CommandEvent"
-    ]
     listener_registrations = ""
-    for i, _ in enumerate(event_blocks):
+    for unit in analysis.listeners:
         listener_registrations += (
             f"        getServer().getPluginManager().registerEvents("
-            f"new {package}.listeners.EventListener{i}(), this);\n"
+            f"new {package}.listeners.EventListener{unit.index}(), this);\n"
         )
 
     # Collect command registrations
-    command_blocks = [
-        b for b in config.blocks
-        if b.type == BlockType.EVENT and b.name == "CommandEvent"
-    ]
     command_registrations = ""
-    for cmd_block in command_blocks:
-        cmd_name = cmd_block.properties.get("commandName", "").lower().strip()
-        if not cmd_name:
-            continue
-        cmd_class_name = "Command" + "".join(
-            part.capitalize() for part in cmd_name.replace("-", "_").split("_")
-        )
+    for unit in analysis.commands:
+        cmd_name = unit.name
+        cmd_class_name = unit.class_name
         executor_var = f"{cmd_class_name[0].lower()}{cmd_class_name[1:]}Executor"
         command_registrations += (
             f'        if (getCommand("{cmd_name}") != null) {{\n'
@@ -52,6 +51,35 @@ def generate_main_plugin(config: PluginConfig) -> str:
             f"        }}\n"
         )
 
+    # Shared runtime utilities are started once here and stopped on disable
+    startup = ""
+    shutdown = ""
+    if analysis.uses_task_wheel:
+        startup += (
+            "        // Shared scheduler for delayed and repeating actions\n"
+            f"        {package}.util.TaskWheel.start(this);\n\n"
+        )
+        shutdown += f"        {package}.util.TaskWheel.stop();\n"
+    if analysis.uses_cooldowns:
+        startup += (
+            "        // Sweeps expired cooldowns and releases players on quit\n"
+            f"        {package}.util.CooldownManager.start(this);\n\n"
+        )
+        shutdown += f"        {package}.util.CooldownManager.stop();\n"
+    if analysis.uses_scoreboards:
+        startup += (
+            "        // Per-player sidebars, released on quit\n"
+            f"        {package}.util.SidebarBoards.start(this);\n\n"
+        )
+        shutdown += f"        {package}.util.SidebarBoards.stop();\n"
+    if analysis.recipes:
+        # Recipes are registered once here instead of on every handler firing
+        startup += (
+            "        // Register recipes\n"
+            f"        {package}.util.RecipeRegistry.registerAll(this);\n\n"
+        )
+        shutdown += f"        {package}.util.RecipeRegistry.unregisterAll();\n"
+
     return f"""package {package};
 
 import org.bukkit.plugin.java.JavaPlugin;
@@ -62,50 +90,48 @@ public class {class_name} extends JavaPlugin {{
     public void onEnable() {{
         getLogger().info("{class_name} v{version} enabled!");
 
-        // Register listeners
+{startup}        // Register listeners
 {listener_registrations}
         // Register commands
 {command_registrations}    }}
 
     @Override
     public void onDisable() {{
-        getLogger().info("{class_name} disabled!");
+{shutdown}        getLogger().info("{class_name} disabled!");
     }}
 }}
 """
 
 
-def generate_listeners(config: PluginConfig) -> Dict[str, str]:
+def generate_listeners(config: PluginConfig, analysis: Optional[ConfigAnalysis] = None) -> Dict[str, str]:
     """Generate event listener classes. Returns {filename: java_code}.
     CommandEvent blocks are excluded -- they produce command classes instead."""
-    listeners: Dict[str, str] = {}
-    blocks_by_id = {b.id: b for b in config.blocks}
-    event_blocks = [
-        b for b in config.blocks
-        if b.type == BlockType.EVENT and b.name != "CommandEvent"
-    ]
-
-    for i, event_block in enumerate(event_blocks):
-        child_blocks = [
-            blocks_by_id[cid]
-            for cid in event_block.children
-            if cid in blocks_by_id
-        ]
-        code = generate_listener_class(
-            config.main_package, i, event_block, child_blocks
+    analysis = analysis or analyze_config(config)
+    return {
+        unit.filename: generate_listener_class(
+            config.main_package, unit.index, unit.event, unit.children,
+            mask=unit.mask, sections=unit.sections, target=analysis.target,
         )
-        listeners[f"EventListener{i}.java"] = code
-
-    return listeners
+        for unit in analysis.listeners
+    }
 
 
 def generate_listener_class(
     package: str,
     index: int,
     event_block: Block,
-    child_blocks: List[Block],
+    child_blocks: Sequence[Block],
+    mask: Optional[int] = None,
+    sections: Sequence[Tuple[Block, Sequence[Block]]] = (),
+    target: Optional[ServerTarget] = None,
 ) -> str:
-    """Generate a single event listener class."""
+    """Generate a single event listener class.
+
+    ``mask`` is the children's precomputed requirement mask, if known.
+    With more than one entry in ``sections`` (merged same-event blocks) the
+    class gets a single handler that runs each block's actions in order.
+    ``target`` is the server the plugin is generated for.
+    """
     event_name = event_block.name
     event_java_name = EVENT_CLASS_NAMES.get(event_name, event_name)
     event_import = EVENT_IMPORTS.get(event_name, f"org.bukkit.event.{event_java_name}")
@@ -120,119 +146,17 @@ def generate_listener_class(
     ]
 
     imports.append("org.bukkit.entity.Player")
+    imports.extend(collect_action_imports(child_blocks, package, is_command=False, mask=mask))
 
-    action_names = {b.name for b in child_blocks if b.type == BlockType.ACTION}
-    has_custom = any(b.type in (BlockType.CUSTOM_ACTION, BlockType.CUSTOM_CONDITION) for b in child_blocks)
-
-    needs_material = bool(action_names & {
-        "GiveItem", "DropItem", "RemoveItem", "SetItemInHand", "SetBlockType", "FillRegion",
-        "SetEntityEquipment", "HasItem", "SetArmor", "OpenBook", "SpawnFallingBlock",
-        "IsHoldingItem", "BlockIsType",
-    })
-    if needs_material:
-        imports.append("org.bukkit.Material")
-        imports.append("org.bukkit.inventory.ItemStack")
-    give_item_blocks = [b for b in child_blocks if b.name == "GiveItem"]
-    needs_item_meta = any(
-        b.properties.get("displayName") or b.properties.get("lore") or
-        b.properties.get("enchantments") or b.properties.get("itemFlags")
-        for b in give_item_blocks
-    )
-    if needs_item_meta:
-        imports.append("org.bukkit.inventory.meta.ItemMeta")
-    if (
-        "BroadcastMessage" in action_names
-        or "ConsoleLog" in action_names
-        or "SendConsoleMessage" in action_names
-        or "TeleportPlayer" in action_names
-        or "TeleportEntity" in action_names
-        or "ExecuteCommand" in action_names
-        or "ExecuteConsoleCommand" in action_names
-        or "ExecuteCommandAsPlayer" in action_names
-        or has_custom
-    ):
-        imports.append("org.bukkit.Bukkit")
-    if "PlaySound" in action_names:
-        imports.append("org.bukkit.Sound")
-    if action_names & {"TeleportPlayer", "SetVelocity", "TeleportEntity", "SetSpawnLocation"}:
+    if len(sections) > 1:
+        guards = [_generate_event_guard(block) for block, _ in sections]
+    else:
+        guards = [_generate_event_guard(event_block)]
+    if any(guards):
         imports.append("org.bukkit.Location")
-    if "SetVelocity" in action_names or "SetEntityVelocity" in action_names:
-        imports.append("org.bukkit.util.Vector")
-    if "DropItem" in action_names:
-        imports.append("org.bukkit.inventory.ItemStack")
-    if has_custom:
-        imports.append("org.bukkit.ChatColor")
-    if "SetGameMode" in action_names or "GameModeEquals" in action_names:
-        imports.append("org.bukkit.GameMode")
-    if action_names & {
-        "AddPotionEffect", "ApplyPotionEffect", "RemovePotionEffect",
-        "ApplyEntityPotionEffect", "HasPotionEffect",
-    }:
-        imports.append("org.bukkit.potion.PotionEffect")
-        imports.append("org.bukkit.potion.PotionEffectType")
-    if "SpawnParticle" in action_names or "SpawnParticles" in action_names:
-        imports.append("org.bukkit.Particle")
-    if action_names & {"SpawnEntity", "SpawnFirework"}:
-        imports.append("org.bukkit.entity.EntityType")
-    if "SetEntityHealth" in action_names or "ApplyEntityPotionEffect" in action_names or "SetEntityOnFire" in action_names or "SetEntityCustomName" in action_names or "SetEntityEquipment" in action_names:
-        imports.append("org.bukkit.entity.LivingEntity")
-    if "DamageEntity" in action_names or "TeleportEntity" in action_names or "SetEntityVelocity" in action_names:
-        imports.append("org.bukkit.entity.Entity")
-    if "DamageEntity" in action_names or "TeleportEntity" in action_names or "SetEntityVelocity" in action_names or "SetEntityHealth" in action_names or "ApplyEntityPotionEffect" in action_names or "SetEntityOnFire" in action_names or "SetEntityCustomName" in action_names or "SetEntityEquipment" in action_names:
-        imports.append("org.bukkit.event.entity.EntityEvent")
-    if "SetBlockType" in action_names or "RemoveBlock" in action_names or "FillRegion" in action_names:
-        imports.append("org.bukkit.event.block.BlockEvent")
-        imports.append("org.bukkit.block.Block")
-    if "GrantPermission" in action_names or "SetMetadata" in action_names:
-        imports.append("org.bukkit.plugin.java.JavaPlugin")
-        imports.append("org.bukkit.metadata.FixedMetadataValue")
-    needs_scheduler = bool(action_names & {"DelayAction", "RepeatAction"})
-    if needs_scheduler:
-        imports.append("org.bukkit.scheduler.BukkitRunnable")
-        imports.append("org.bukkit.plugin.java.JavaPlugin")
-    if action_names & {"SetCooldown", "CheckCooldown", "BranchIf"}:
-        imports.append(f"{package}.util.CooldownManager")
-    if action_names & {"CreateGUI", "AddGUIItem", "OpenGUI"}:
-        imports.append("org.bukkit.Bukkit")
-        imports.append("org.bukkit.inventory.Inventory")
-    if "AddGUIItem" in action_names:
-        imports.append("org.bukkit.inventory.meta.ItemMeta")
-        imports.append("org.bukkit.Material")
-        imports.append("org.bukkit.inventory.ItemStack")
-    if action_names & {"CreateBossBar", "RemoveBossBar"}:
-        imports.append("org.bukkit.Bukkit")
-        imports.append("org.bukkit.NamespacedKey")
-        imports.append("org.bukkit.boss.KeyedBossBar")
-        imports.append("org.bukkit.boss.BarColor")
-        imports.append("org.bukkit.boss.BarStyle")
-    if action_names & {"SetScoreboard", "RemoveScoreboard"}:
-        imports.append("org.bukkit.Bukkit")
-        imports.append("org.bukkit.scoreboard.Scoreboard")
-        imports.append("org.bukkit.scoreboard.Objective")
-        imports.append("org.bukkit.scoreboard.DisplaySlot")
-    if action_names & {"SaveConfig", "SendConfigValue"}:
-        imports.append("org.bukkit.plugin.java.JavaPlugin")
-    if "AddShapelessRecipe" in action_names:
-        imports.append("org.bukkit.Bukkit")
-        imports.append("org.bukkit.NamespacedKey")
-        imports.append("org.bukkit.inventory.ShapelessRecipe")
-        imports.append("org.bukkit.Material")
-        imports.append("org.bukkit.inventory.ItemStack")
-        imports.append("org.bukkit.plugin.java.JavaPlugin")
-    if "AddShapedRecipe" in action_names:
-        imports.append("org.bukkit.Bukkit")
-        imports.append("org.bukkit.NamespacedKey")
-        imports.append("org.bukkit.inventory.ShapedRecipe")
-        imports.append("org.bukkit.Material")
-        imports.append("org.bukkit.inventory.ItemStack")
-        imports.append("org.bukkit.plugin.java.JavaPlugin")
 
     import_lines = "\n".join(f"import {imp};" for imp in sorted(set(imports)))
 
-    # Generate action code
-    action_code = generate_action_code(child_blocks, event_name)
-    event_prelude = _generate_event_prelude(event_block)
-
     # Generate player variable line (or null check for entity events)
     if has_no_player:
         if "instanceof Player" in player_accessor:
@@ -242,19 +166,121 @@ def generate_listener_class(
     else:
         player_line = f"        Player player = {player_accessor};\n"
 
+    fields = StaticFields()
+    if len(sections) > 1:
+        handler_body, methods = _merged_handler(
+            event_name, event_java_name, sections, guards, player_line, fields, target
+        )
+    else:
+        # Generate action code
+        action_code = generate_action_code(child_blocks, event_name, fields, target)
+        event_prelude = _generate_event_prelude(event_block)
+        handler_body = f"{guards[0]}{player_line}{event_prelude}{action_code}"
+        methods = ""
+
     return f"""package {package}.listeners;
 
 {import_lines}
 
 public class EventListener{index} implements Listener {{
-
+{fields.declarations()}
     @EventHandler
     public void on{event_name}({event_java_name} event) {{
-{player_line}{event_prelude}{action_code}    }}
-}}
+{handler_body}    }}
+{methods}{fields.factories()}}}
 """
 
 
+def _merged_handler(
+    event_name: str,
+    event_java_name: str,
+    sections: Sequence[Tuple[Block, Sequence[Block]]],
+    guards: List[str],
+    player_line: str,
+    fields: StaticFields,
+    target: Optional[ServerTarget] = None,
+) -> Tuple[str, str]:
+    """Return (handler body, section methods) for merged same-event blocks.
+
+    The guard, when every block shares it, the player lookup and the prelude
+    for all blocks' actions run once in the handler; the prelude's variables
+    are passed to each block's private method. Each block's own guards and
+    actions go in that method, so an early ``return`` in one block never
+    skips the others.
+    """
+    shared_guard = guards[0] if len(set(guards)) == 1 else ""
+    mask = 0
+    for _, children in sections:
+        mask |= requirements_mask(children)
+    # A block that needs no player still runs when the player is missing, so
+    # each method keeps its own player check
+    shared = mask & ~NEEDS_PLAYER
+    params = prelude_parameters(shared)
+    arguments = ", ".join(["event", "player", *(param.rsplit(" ", 1)[1] for param in params)])
+    signature = ", ".join([f"{event_java_name} event", "Player player", *params])
+
+    calls = []
+    methods = []
+    for i, ((block, children), guard) in enumerate(zip(sections, guards)):
+        section_guard = "" if shared_guard else guard
+        action_code = generate_action_code(children, event_name, fields, target, declared=shared)
+        event_prelude = _generate_event_prelude(block)
+        calls.append(f"        handle{i}({arguments});\n")
+        methods.append(
+            f"\n    private void handle{i}({signature}) {{\n"
+            f"{section_guard}{event_prelude}{action_code}    }}\n"
+        )
+    prelude = generate_prelude(shared)
+    return f"{shared_guard}{player_line}{prelude}{''.join(calls)}", "".join(methods)
+
+
+# PlayerMoveEvent "moveFilter" values -> condition under which the handler
+# returns early. Head rotation alone fires the event too, so even "position"
+# skips it.
+_MOVE_FILTER_UNCHANGED = {
+    "block": (
+        "moveFrom.getBlockX() == moveTo.getBlockX()"
+        " && moveFrom.getBlockY() == moveTo.getBlockY()"
+        " && moveFrom.getBlockZ() == moveTo.getBlockZ()"
+    ),
+    "chunk": (
+        "(moveFrom.getBlockX() >> 4) == (moveTo.getBlockX() >> 4)"
+        " && (moveFrom.getBlockZ() >> 4) == (moveTo.getBlockZ() >> 4)"
+    ),
+    "position": (
+        "moveFrom.getX() == moveTo.getX()"
+        " && moveFrom.getY() == moveTo.getY()"
+        " && moveFrom.getZ() == moveTo.getZ()"
+    ),
+}
+_MOVE_FILTER_ALIASES = {"any": "position"}
+_MOVE_FILTER_OFF = {"off", "none", "false", "0", "no"}
+
+
+def _generate_event_guard(event_block: Block) -> str:
+    """Generate the cheap early exit that runs before the player lookup.
+
+    PlayerMoveEvent fires for every position and rotation packet, so unless
+    ``moveFilter`` is off the handler returns unless the player crossed a
+    block boundary (default), a chunk boundary, or changed position at all.
+    """
+    if event_block.name != "PlayerMoveEvent":
+        return ""
+
+    raw = str((event_block.properties or {}).get("moveFilter", "") or "block").strip().lower()
+    if raw in _MOVE_FILTER_OFF:
+        return ""
+    granularity = _MOVE_FILTER_ALIASES.get(raw, raw)
+    unchanged = _MOVE_FILTER_UNCHANGED.get(granularity, _MOVE_FILTER_UNCHANGED["block"])
+    return (
+        "        Location moveFrom = event.getFrom();\n"
+        "        Location moveTo = event.getTo();\n"
+        "        if (moveTo == null) return;\n"
+        f"        if ({unchanged}\n"
+        "                && moveFrom.getWorld() == moveTo.getWorld()) return;\n"
+    )
+
+
 def _generate_event_prelude(event_block: Block) -> str:
     """Generate event-specific guard/prelude code before actions."""
     if event_block.name != "OnGUIClick":
@@ -284,53 +310,43 @@ def _generate_event_prelude(event_block: Block) -> str:
     return "\n".join(lines) + "\n"
 
 
-def generate_commands(config: PluginConfig) -> Dict[str, str]:
+def generate_commands(config: PluginConfig, analysis: Optional[ConfigAnalysis] = None) -> Dict[str, str]:
     """Generate command executor classes. Returns {filename: java_code}."""
-    commands: Dict[str, str] = {}
-    blocks_by_id = {b.id: b for b in config.blocks}
-    command_blocks = [
-        b for b in config.blocks
-        if b.type == BlockType.EVENT and b.name == "CommandEvent"
-    ]
-
-    for i, cmd_block in enumerate(command_blocks):
-        cmd_name_raw = cmd_block.properties.get("commandName", "").strip()
-        if not cmd_name_raw:
-            continue
-        child_blocks = [
-            blocks_by_id[cid]
-            for cid in cmd_block.children
-            if cid in blocks_by_id
-        ]
-        code, class_name, cmd_name = generate_command_class(
-            config.main_package, cmd_block, child_blocks, i
-        )
-        commands[f"{class_name}.java"] = code
-
-    return commands
+    analysis = analysis or analyze_config(config)
+    return {
+        unit.filename: generate_command_class(
+            config.main_package, unit.block, unit.children, unit.index,
+            mask=unit.mask, target=analysis.target,
+        )[0]
+        for unit in analysis.commands
+    }
 
 
 def generate_command_class(
     package: str,
     cmd_block: Block,
-    child_blocks: List[Block],
+    child_blocks: Sequence[Block],
     index: int,
+    mask: Optional[int] = None,
+    target: Optional[ServerTarget] = None,
 ) -> tuple:
     """Generate a single command executor class.
 
+    ``mask`` is the children's precomputed requirement mask, if known;
+    ``target`` is the server the plugin is generated for.
+
     Returns:
         (java_code, class_name, command_name)
     """
     props = cmd_block.properties
     cmd_name = props.get("commandName", "").lower().strip() or "mycommand"
 
-    class_name = "Command" + "".join(
-        part.capitalize() for part in cmd_name.replace("-", "_").split("_")
-    )
+    class_name = command_class_name(cmd_name)
 
     arg_blocks, runtime_blocks = split_command_blocks(child_blocks)
     arg_prelude = generate_command_arg_prelude(arg_blocks)
-    action_code = generate_action_code(runtime_blocks, "CommandEvent")
+    fields = StaticFields()
+    action_code = generate_action_code(runtime_blocks, "CommandEvent", fields, target)
 
     # Build imports
     tab_completions_raw = props.get("commandTabCompletions", "")
@@ -353,133 +369,9 @@ def generate_command_class(
         imports.append("java.util.ArrayList")
         imports.append("java.util.Arrays")
 
-    action_names = {b.name for b in runtime_blocks if b.type == BlockType.ACTION}
-    has_custom = any(
-        b.type in (BlockType.CUSTOM_ACTION, BlockType.CUSTOM_CONDITION)
-        for b in runtime_blocks
-    )
-
-    needs_material = bool(
-        action_names
-        & {
-            "GiveItem", "DropItem", "RemoveItem", "SetItemInHand",
-            "SetBlockType", "FillRegion", "SetEntityEquipment", "HasItem",
-            "SetArmor", "OpenBook", "SpawnFallingBlock",
-            "IsHoldingItem", "BlockIsType",
-        }
-    )
-    if needs_material:
-        imports.append("org.bukkit.Material")
-        imports.append("org.bukkit.inventory.ItemStack")
-    give_item_blocks = [b for b in runtime_blocks if b.name == "GiveItem"]
-    needs_item_meta = any(
-        b.properties.get("displayName") or b.properties.get("lore") or
-        b.properties.get("enchantments") or b.properties.get("itemFlags")
-        for b in give_item_blocks
-    )
-    if needs_item_meta:
-        imports.append("org.bukkit.inventory.meta.ItemMeta")
-    if (
-        "BroadcastMessage" in action_names
-        or "ConsoleLog" in action_names
-        or "SendConsoleMessage" in action_names
-        or "TeleportPlayer" in action_names
-        or "TeleportEntity" in action_names
-        or "ExecuteCommand" in action_names
-        or "ExecuteConsoleCommand" in action_names
-        or "ExecuteCommandAsPlayer" in action_names
-        or has_custom
-    ):
-        imports.append("org.bukkit.Bukkit")
+    imports.extend(collect_action_imports(runtime_blocks, package, is_command=True, mask=mask))
     if any(b.name == "PlayerArg" for b in arg_blocks):
         imports.append("org.bukkit.Bukkit")
-    if "PlaySound" in action_names:
-        imports.append("org.bukkit.Sound")
-    if action_names & {"TeleportPlayer", "SetVelocity", "TeleportEntity", "SetSpawnLocation"}:
-        imports.append("org.bukkit.Location")
-    if "SetVelocity" in action_names or "SetEntityVelocity" in action_names:
-        imports.append("org.bukkit.util.Vector")
-    if "DropItem" in action_names:
-        imports.append("org.bukkit.inventory.ItemStack")
-    if has_custom:
-        imports.append("org.bukkit.ChatColor")
-    if "SetGameMode" in action_names or "GameModeEquals" in action_names:
-        imports.append("org.bukkit.GameMode")
-    if action_names & {
-        "AddPotionEffect", "ApplyPotionEffect", "RemovePotionEffect",
-        "ApplyEntityPotionEffect", "HasPotionEffect",
-    }:
-        imports.append("org.bukkit.potion.PotionEffect")
-        imports.append("org.bukkit.potion.PotionEffectType")
-    if "SpawnParticle" in action_names or "SpawnParticles" in action_names:
-        imports.append("org.bukkit.Particle")
-    if action_names & {"SpawnEntity", "SpawnFirework"}:
-        imports.append("org.bukkit.entity.EntityType")
-    if "GrantPermission" in action_names or "SetMetadata" in action_names:
-        imports.append("org.bukkit.plugin.java.JavaPlugin")
-        imports.append("org.bukkit.metadata.FixedMetadataValue")
-    needs_scheduler = bool(action_names & {"DelayAction", "RepeatAction"})
-    if needs_scheduler:
-        imports.append("org.bukkit.scheduler.BukkitRunnable")
-        imports.append("org.bukkit.plugin.java.JavaPlugin")
-    needs_entity = bool(action_names & {
-        "DamageEntity", "SetEntityHealth", "TeleportEntity", "SetEntityVelocity",
-        "ApplyEntityPotionEffect", "SetEntityOnFire", "SetEntityCustomName",
-        "SetEntityEquipment", "SetTime", "SetWeather", "SetThunder",
-        "SpawnEntity", "StrikeLightning", "StrikeWithLightning",
-        "CreateExplosion", "SpawnParticle", "SpawnParticles", "FillRegion",
-    })
-    needs_living = bool(action_names & {
-        "SetEntityHealth", "ApplyEntityPotionEffect", "SetEntityOnFire",
-        "SetEntityCustomName", "SetEntityEquipment",
-    })
-    needs_block = bool(action_names & {
-        "SetBlockType", "RemoveBlock", "FillRegion", "SetTime", "SetWeather",
-        "SetThunder", "SpawnEntity", "StrikeLightning", "StrikeWithLightning",
-        "CreateExplosion", "SpawnParticle", "SpawnParticles",
-    })
-    if needs_entity:
-        imports.append("org.bukkit.entity.Entity")
-    if needs_living:
-        imports.append("org.bukkit.entity.LivingEntity")
-    if needs_block:
-        imports.append("org.bukkit.block.Block")
-    if action_names & {"SetCooldown", "CheckCooldown", "BranchIf"}:
-        imports.append(f"{package}.util.CooldownManager")
-    if action_names & {"CreateGUI", "AddGUIItem", "OpenGUI"}:
-        imports.append("org.bukkit.Bukkit")
-        imports.append("org.bukkit.inventory.Inventory")
-    if "AddGUIItem" in action_names:
-        imports.append("org.bukkit.inventory.meta.ItemMeta")
-        imports.append("org.bukkit.Material")
-        imports.append("org.bukkit.inventory.ItemStack")
-    if action_names & {"CreateBossBar", "RemoveBossBar"}:
-        imports.append("org.bukkit.Bukkit")
-        imports.append("org.bukkit.NamespacedKey")
-        imports.append("org.bukkit.boss.KeyedBossBar")
-        imports.append("org.bukkit.boss.BarColor")
-        imports.append("org.bukkit.boss.BarStyle")
-    if action_names & {"SetScoreboard", "RemoveScoreboard"}:
-        imports.append("org.bukkit.Bukkit")
-        imports.append("org.bukkit.scoreboard.Scoreboard")
-        imports.append("org.bukkit.scoreboard.Objective")
-        imports.append("org.bukkit.scoreboard.DisplaySlot")
-    if action_names & {"SaveConfig", "SendConfigValue"}:
-        imports.append("org.bukkit.plugin.java.JavaPlugin")
-    if "AddShapelessRecipe" in action_names:
-        imports.append("org.bukkit.Bukkit")
-        imports.append("org.bukkit.NamespacedKey")
-        imports.append("org.bukkit.inventory.ShapelessRecipe")
-        imports.append("org.bukkit.Material")
-        imports.append("org.bukkit.inventory.ItemStack")
-        imports.append("org.bukkit.plugin.java.JavaPlugin")
-    if "AddShapedRecipe" in action_names:
-        imports.append("org.bukkit.Bukkit")
-        imports.append("org.bukkit.NamespacedKey")
-        imports.append("org.bukkit.inventory.ShapedRecipe")
-        imports.append("org.bukkit.Material")
-        imports.append("org.bukkit.inventory.ItemStack")
-        imports.append("org.bukkit.plugin.java.JavaPlugin")
 
     import_lines = "\n".join(f"import {imp};" for imp in sorted(set(imports)))
 
@@ -518,7 +410,7 @@ def generate_command_class(
 {import_lines}
 
 public class {class_name} implements CommandExecutor, TabCompleter {{
-
+{fields.declarations()}
     @Override
     public boolean onCommand(CommandSender sender, Command command, String label, String[] args) {{
         if (!(sender instanceof Player)) {{
@@ -530,13 +422,13 @@ public class {class_name} implements CommandExecutor, TabCompleter {{
 {arg_prelude}{action_code}
         return true;
     }}
-{tab_completions_code}
+{tab_completions_code}{fields.factories()}
 }}
 """
     return code, class_name, cmd_name
 
 
-def split_command_blocks(blocks: List[Block]) -> Tuple[List[Block], List[Block]]:
+def split_command_blocks(blocks: Sequence[Block]) -> Tuple[List[Block], List[Block]]:
     """Split command child blocks into arg declarations and runtime actions."""
     arg_names = {"StringArg", "PlayerArg", "IntegerArg"}
     arg_blocks: List[Block] = []
@@ -1,6 +1,7 @@
 """Small utility / helper functions used across the code-generation package."""
 
 import re
+import zlib
 from typing import Any, Dict
 
 from app.utils.validators import sanitize_java_string
@@ -47,6 +48,19 @@ def safe_java_identifier(raw: str, fallback: str) -> str:
     return base
 
 
+def cooldown_constant(name: str) -> str:
+    """Name of the generated ``CooldownManager`` int constant for a cooldown.
+
+    Derived from the name alone so each class can reference it without
+    knowing the other cooldowns; names that do not map one-to-one onto an
+    identifier get a CRC suffix to stay distinct.
+    """
+    ident = re.sub(r"[^A-Za-z0-9]", "_", name).upper() or "UNNAMED"
+    if re.fullmatch(r"[a-z0-9_]+", name):
+        return f"CD_{ident}"
+    return f"CD_{ident}_{zlib.crc32(name.encode('utf-8')):08X}"
+
+
 def build_branch_if_expression(props: Dict[str, Any]) -> str:
     """Build a Java boolean expression for BranchIf from one or two conditions."""
     primary = build_branch_condition(
@@ -108,7 +122,8 @@ def build_branch_condition(
     if cond_type == "CheckCooldown":
         cooldown = sanitize_java_string(str(props.get(f"{prefix}CooldownName", "default")))
         return (
-            f'(player != null && !CooldownManager.isOnCooldown("{cooldown}", player.getUniqueId()))'
+            f"(player != null && !CooldownManager.isOnCooldown("
+            f"CooldownManager.{cooldown_constant(cooldown)}, player.getUniqueId()))"
             if cooldown
             else "true"
         )
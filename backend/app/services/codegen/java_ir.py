@@ -0,0 +1,182 @@
+"""Lightweight intermediate representation for generated Java statements.
+
+Action generators build a tree of ``Line``, ``Block`` and ``If`` nodes
+instead of pre-indented strings. Text never carries indentation or the
+braces of the scope it sits in: ``emit`` owns both, walks the tree once and
+writes every line into a single buffer, so nesting a body inside a branch,
+runnable or continuation never re-indents anything.
+
+``StaticFields`` collects the class-level constants generators hoist out of
+handler bodies.
+"""
+
+from dataclasses import dataclass
+from io import StringIO
+from typing import Dict, Iterator, List, Optional, TextIO, Tuple, Union
+
+INDENT = "    "
+
+
+@dataclass
+class Line:
+    """One statement (or statement fragment) relative to its block."""
+
+    text: str
+
+
+@dataclass
+class Block:
+    """A brace-delimited scope: header line, indented body, footer line."""
+
+    header: str
+    body: "Body"
+    footer: str = "}"
+
+
+@dataclass
+class If:
+    """An ``if`` / ``else if`` / ``else`` chain; the ``else`` arm has no condition."""
+
+    arms: List[Tuple[Optional[str], "Body"]]
+
+
+Node = Union[Line, Block, If]
+
+
+class Body:
+    """Ordered statements of one Java scope.
+
+    ``append`` adds a statement; ``block`` and ``if_``/``else_if``/``else_``
+    open nested scopes and return their bodies.
+    """
+
+    __slots__ = ("nodes",)
+
+    def __init__(self) -> None:
+        self.nodes: List[Node] = []
+
+    def append(self, text: str) -> None:
+        self.nodes.append(Line(text))
+
+    def block(self, header: str, footer: str = "}") -> "Body":
+        """Open a nested scope and return its body."""
+        body = Body()
+        self.nodes.append(Block(header, body, footer))
+        return body
+
+    def if_(self, condition: str) -> "Body":
+        """Open an ``if`` chain and return the body of its first arm."""
+        body = Body()
+        self.nodes.append(If([(condition, body)]))
+        return body
+
+    def else_if(self, condition: str) -> "Body":
+        """Add an ``else if`` arm to the chain opened last in this body."""
+        return self._add_arm(condition)
+
+    def else_(self) -> "Body":
+        """Add the ``else`` arm to the chain opened last in this body."""
+        return self._add_arm(None)
+
+    def _add_arm(self, condition: Optional[str]) -> "Body":
+        if not self.nodes or not isinstance(self.nodes[-1], If):
+            raise ValueError("else without a preceding if")
+        body = Body()
+        self.nodes[-1].arms.append((condition, body))
+        return body
+
+    def extend(self, other: "Body") -> None:
+        self.nodes.extend(other.nodes)
+
+    def __iter__(self) -> Iterator[Node]:
+        return iter(self.nodes)
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+
+def emit(body: Body, out: TextIO, depth: int = 0) -> None:
+    """Write ``body`` to ``out`` indented ``depth`` levels."""
+    prefix = INDENT * depth
+    for node in body.nodes:
+        if isinstance(node, Line):
+            out.write(prefix)
+            out.write(node.text)
+            out.write("\n")
+        elif isinstance(node, If):
+            for i, (condition, arm) in enumerate(node.arms):
+                out.write(prefix)
+                if i:
+                    out.write("} else {\n" if condition is None else f"}} else if ({condition}) {{\n")
+                else:
+                    out.write(f"if ({condition}) {{\n")
+                emit(arm, out, depth + 1)
+            out.write(prefix)
+            out.write("}\n")
+        else:
+            out.write(prefix)
+            out.write(node.header)
+            out.write("\n")
+            emit(node.body, out, depth + 1)
+            out.write(prefix)
+            out.write(node.footer)
+            out.write("\n")
+
+
+def render(body: Body, depth: int = 0) -> str:
+    """Emit ``body`` into a fresh string."""
+    out = StringIO()
+    emit(body, out, depth)
+    return out.getvalue()
+
+
+class StaticFields:
+    """``private static final`` constants hoisted out of one generated class.
+
+    Each constant is built once, when the class is loaded, by a private
+    static factory whose body is the ``Body`` passed to ``add``. Identical
+    constants share one field.
+    """
+
+    __slots__ = ("_names", "_fields")
+
+    def __init__(self) -> None:
+        self._names: Dict[Tuple[str, str], str] = {}
+        self._fields: List[Tuple[str, str, str, Body]] = []
+
+    def add(self, java_type: str, prefix: str, factory: Body) -> str:
+        """Register a constant built by ``factory`` and return its field name.
+
+        ``factory`` must end with a ``return`` of a ``java_type`` value.
+        """
+        key = (java_type, render(factory))
+        name = self._names.get(key)
+        if name is None:
+            name = f"{prefix.upper()}_{len(self._fields)}"
+            self._names[key] = name
+            self._fields.append((java_type, name, prefix, factory))
+        return name
+
+    def __len__(self) -> int:
+        return len(self._fields)
+
+    def declarations(self) -> str:
+        """Field declarations at class-member depth, one per line."""
+        return "".join(
+            f"{INDENT}private static final {java_type} {name} = {self._factory_name(name, prefix)}();\n"
+            for java_type, name, prefix, _ in self._fields
+        )
+
+    def factories(self) -> str:
+        """The factory methods, each preceded by a blank line."""
+        out = StringIO()
+        for java_type, name, prefix, factory in self._fields:
+            out.write("\n")
+            out.write(f"{INDENT}private static {java_type} {self._factory_name(name, prefix)}() {{\n")
+            emit(factory, out, 2)
+            out.write(f"{INDENT}}}\n")
+        return out.getvalue()
+
+    @staticmethod
+    def _factory_name(name: str, prefix: str) -> str:
+        return f"create{prefix.capitalize()}{name.rsplit('_', 1)[1]}"
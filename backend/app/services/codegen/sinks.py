@@ -0,0 +1,62 @@
+"""Destinations for streamed code generation.
+
+``CodeGeneratorService.generate_to`` hands each generated file to a sink as
+soon as it is produced, as a short sequence of text chunks (for example the
+watermark header followed by the class body). Sinks write the chunks
+straight through, so no project-wide dict of sources is ever built.
+"""
+
+import zipfile
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, Iterable
+
+
+class CodeSink(ABC):
+    """Receives generated files keyed by project-relative path."""
+
+    @abstractmethod
+    def write(self, path: str, chunks: Iterable[str]) -> None:
+        """Write one file whose contents are the concatenated ``chunks``."""
+
+
+class DirectorySink(CodeSink):
+    """Writes files under a project directory, creating folders as needed."""
+
+    def __init__(self, base_dir: Path) -> None:
+        self.base_dir = Path(base_dir)
+        self._dirs = set()
+
+    def write(self, path: str, chunks: Iterable[str]) -> None:
+        target = self.base_dir / path
+        if target.parent not in self._dirs:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            self._dirs.add(target.parent)
+        with target.open("w", encoding="utf-8") as fh:
+            for chunk in chunks:
+                fh.write(chunk)
+
+
+class ZipSink(CodeSink):
+    """Writes each file as an entry of an open ``ZipFile``."""
+
+    def __init__(self, archive: zipfile.ZipFile, prefix: str = "") -> None:
+        self.archive = archive
+        self.prefix = prefix
+
+    def write(self, path: str, chunks: Iterable[str]) -> None:
+        info = zipfile.ZipInfo(self.prefix + path)
+        info.compress_type = zipfile.ZIP_DEFLATED
+        with self.archive.open(info, "w") as entry:
+            for chunk in chunks:
+                entry.write(chunk.encode("utf-8"))
+
+
+class MemorySink(CodeSink):
+    """Collects files into a flat ``{path: content}`` dict."""
+
+    def __init__(self) -> None:
+        self.files: Dict[str, str] = {}
+
+    def write(self, path: str, chunks: Iterable[str]) -> None:
+        self.files[path] = "".join(chunks)
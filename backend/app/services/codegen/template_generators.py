@@ -1,13 +1,21 @@
-"""Generate config/template files: plugin.yml, pom.xml, CooldownManager."""
+"""Generate config/template files: plugin.yml, pom.xml, CooldownManager,
+RecipeRegistry, RegionFiller, SidebarBoards, TaskWheel."""
 
-from app.models.block import Block, BlockType
+from typing import Optional, Sequence
+
+from app.models.block import Block
 from app.models.plugin_config import PluginConfig
+from app.services.codegen.action_generators import recipe_key, recipe_registration
+from app.services.codegen.analysis import ConfigAnalysis, analyze_config
+from app.services.codegen.helpers import cooldown_constant
+from app.services.codegen.java_ir import Body, render
 from app.services.codegen.version_config import get_version_config
 from app.utils.validators import sanitize_java_string
 
 
-def generate_plugin_yml(config: PluginConfig) -> str:
+def generate_plugin_yml(config: PluginConfig, analysis: Optional[ConfigAnalysis] = None) -> str:
     """Generate the plugin.yml manifest file."""
+    analysis = analysis or analyze_config(config)
     ver = get_version_config(config.paper_version)
     yml = (
         f"name: {config.main_class_name}\n"
@@ -18,17 +26,14 @@ def generate_plugin_yml(config: PluginConfig) -> str:
         f"  - {config.author}\n"
         f"api-version: {ver['api_version']}\n"
     )
+    if analysis.target.folia:
+        yml += "folia-supported: true\n"
 
-    command_blocks = [
-        b for b in config.blocks
-        if b.type == BlockType.EVENT and b.name == "CommandEvent"
-        and b.properties.get("commandName", "").strip()
-    ]
-    if command_blocks:
+    if analysis.commands:
         yml += "commands:\n"
-        for cmd_block in command_blocks:
-            props = cmd_block.properties
-            cmd_name = props.get("commandName", "").lower().strip()
+        for unit in analysis.commands:
+            props = unit.block.properties
+            cmd_name = unit.name
             description = props.get("commandDescription", "")
             usage = props.get("commandUsage", f"/{cmd_name}")
             permission = props.get("commandPermission", "")
@@ -103,45 +108,834 @@ def generate_pom_xml(config: PluginConfig) -> str:
 """
 
 
-def generate_cooldown_manager(package: str) -> str:
+def generate_cooldown_manager(package: str, names: Sequence[str] = (), folia: bool = False) -> str:
     """Generate a shared CooldownManager utility class.
 
-    Uses ConcurrentHashMap for thread safety (AsyncPlayerChatEvent etc.
-    run off the main thread).
+    Cooldown names are interned at codegen time: each one in ``names`` gets
+    an int constant (see ``helpers.cooldown_constant``) indexing a per-player
+    array of expiry times, so a player costs one map entry however many
+    cooldowns they hold. A background task started in ``onEnable`` drops
+    players whose cooldowns have all expired, as does leaving the server;
+    unexpired cooldowns survive a relog. Access is thread safe
+    (AsyncPlayerChatEvent etc. run off the main thread).
     """
+    constants = "".join(
+        f"    public static final int {cooldown_constant(name)} = {i}; // {name}\n"
+        for i, name in enumerate(names)
+    )
+    if folia:
+        task_imports = (
+            "import io.papermc.paper.threadedregions.scheduler.ScheduledTask;\n"
+            "import java.util.concurrent.TimeUnit;\n"
+        )
+        task_type = "ScheduledTask"
+        schedule = (
+            "Bukkit.getAsyncScheduler().runAtFixedRate(\n"
+            "            plugin, task -> sweep(), SWEEP_INTERVAL_SECONDS, SWEEP_INTERVAL_SECONDS, TimeUnit.SECONDS)"
+        )
+    else:
+        task_imports = "import org.bukkit.scheduler.BukkitTask;\n"
+        task_type = "BukkitTask"
+        schedule = (
+            "Bukkit.getScheduler().runTaskTimerAsynchronously(\n"
+            "            plugin, CooldownManager::sweep, SWEEP_INTERVAL_SECONDS * 20L, SWEEP_INTERVAL_SECONDS * 20L)"
+        )
     return f"""package {package}.util;
 
 import java.util.UUID;
 import java.util.concurrent.ConcurrentHashMap;
+import java.util.concurrent.atomic.AtomicLongArray;
+import org.bukkit.Bukkit;
+import org.bukkit.event.EventHandler;
+import org.bukkit.event.HandlerList;
+import org.bukkit.event.Listener;
+import org.bukkit.event.player.PlayerQuitEvent;
+import org.bukkit.plugin.java.JavaPlugin;
+{task_imports}
+public final class CooldownManager implements Listener {{
 
-public final class CooldownManager {{
+{constants}
+    private static final int COUNT = {max(len(names), 1)};
+    private static final long SWEEP_INTERVAL_SECONDS = 60L;
+    private static final CooldownManager INSTANCE = new CooldownManager();
 
-    private static final ConcurrentHashMap<String, ConcurrentHashMap<UUID, Long>> cooldowns = new ConcurrentHashMap<>();
+    // Expiry time in epoch millis per cooldown ID; 0 = not on cooldown
+    private static final ConcurrentHashMap<UUID, AtomicLongArray> expiries = new ConcurrentHashMap<>();
+    private static {task_type} sweeper;
 
     private CooldownManager() {{}}
 
-    public static void setCooldown(String name, UUID playerId, long durationMs) {{
-        cooldowns.computeIfAbsent(name, k -> new ConcurrentHashMap<>())
-                 .put(playerId, System.currentTimeMillis() + durationMs);
+    public static void start(JavaPlugin plugin) {{
+        if (sweeper != null) return;
+        sweeper = {schedule};
+        Bukkit.getPluginManager().registerEvents(INSTANCE, plugin);
+    }}
+
+    public static void stop() {{
+        if (sweeper != null) {{
+            sweeper.cancel();
+            sweeper = null;
+        }}
+        HandlerList.unregisterAll(INSTANCE);
+        expiries.clear();
+    }}
+
+    public static void setCooldown(int id, UUID playerId, long durationMs) {{
+        long expiry = System.currentTimeMillis() + durationMs;
+        // compute() serializes with the sweep, which could otherwise drop a fresh entry
+        expiries.compute(playerId, (key, slots) -> {{
+            if (slots == null) slots = new AtomicLongArray(COUNT);
+            slots.set(id, expiry);
+            return slots;
+        }});
     }}
 
-    public static boolean isOnCooldown(String name, UUID playerId) {{
-        ConcurrentHashMap<UUID, Long> map = cooldowns.get(name);
-        if (map == null) return false;
-        Long expiry = map.get(playerId);
-        if (expiry == null) return false;
-        if (System.currentTimeMillis() < expiry) return true;
-        map.remove(playerId);
-        return false;
+    public static boolean isOnCooldown(int id, UUID playerId) {{
+        AtomicLongArray slots = expiries.get(playerId);
+        return slots != null && System.currentTimeMillis() < slots.get(id);
     }}
 
-    public static long getRemainingSeconds(String name, UUID playerId) {{
-        ConcurrentHashMap<UUID, Long> map = cooldowns.get(name);
-        if (map == null) return 0;
-        Long expiry = map.get(playerId);
-        if (expiry == null) return 0;
-        long remaining = (expiry - System.currentTimeMillis()) / 1000;
+    public static long getRemainingSeconds(int id, UUID playerId) {{
+        AtomicLongArray slots = expiries.get(playerId);
+        if (slots == null) return 0;
+        long remaining = (slots.get(id) - System.currentTimeMillis()) / 1000;
         return Math.max(remaining, 0);
     }}
+
+    /** Forget every player whose cooldowns have all expired. */
+    public static void sweep() {{
+        long now = System.currentTimeMillis();
+        for (UUID playerId : expiries.keySet()) {{
+            release(playerId, now);
+        }}
+    }}
+
+    @EventHandler
+    public void onQuit(PlayerQuitEvent event) {{
+        release(event.getPlayer().getUniqueId(), System.currentTimeMillis());
+    }}
+
+    private static void release(UUID playerId, long now) {{
+        expiries.computeIfPresent(playerId, (key, slots) -> {{
+            for (int i = 0; i < slots.length(); i++) {{
+                if (slots.get(i) > now) return slots;
+            }}
+            return null;
+        }});
+    }}
+}}
+"""
+
+
+def generate_recipe_registry(package: str, recipes: Sequence[Block]) -> str:
+    """Generate the RecipeRegistry utility class.
+
+    Recipes are added once from ``onEnable`` (replacing any copy left by a
+    reload) and removed in ``onDisable``. Recipe blocks in handlers only
+    call ``discover`` to unlock the recipe for the player.
+    """
+    registrations = Body()
+    for block in recipes:
+        scope = registrations.block("{")
+        scope.extend(recipe_registration(block))
+        scope.append("Bukkit.removeRecipe(key);")
+        scope.append("Bukkit.addRecipe(recipe);")
+        scope.append(f'KEYS.put("{recipe_key(block)}", key);')
+    recipe_imports = sorted({
+        "org.bukkit.inventory.ShapedRecipe" if b.name == "AddShapedRecipe"
+        else "org.bukkit.inventory.ShapelessRecipe"
+        for b in recipes
+    })
+    import_lines = "".join(f"import {imp};\n" for imp in recipe_imports)
+    return f"""package {package}.util;
+
+import java.util.HashMap;
+import java.util.Map;
+import org.bukkit.Bukkit;
+import org.bukkit.Material;
+import org.bukkit.NamespacedKey;
+import org.bukkit.entity.Player;
+import org.bukkit.inventory.ItemStack;
+{import_lines}import org.bukkit.plugin.java.JavaPlugin;
+
+public final class RecipeRegistry {{
+
+    private static final Map<String, NamespacedKey> KEYS = new HashMap<>();
+
+    private RecipeRegistry() {{}}
+
+    public static void registerAll(JavaPlugin plugin) {{
+{render(registrations, depth=2)}    }}
+
+    public static void unregisterAll() {{
+        for (NamespacedKey key : KEYS.values()) {{
+            Bukkit.removeRecipe(key);
+        }}
+        KEYS.clear();
+    }}
+
+    public static void discover(Player player, String recipeKey) {{
+        NamespacedKey key = KEYS.get(recipeKey);
+        if (player != null && key != null) {{
+            player.discoverRecipe(key);
+        }}
+    }}
+}}
+"""
+
+
+def generate_region_filler(package: str, folia: bool = False) -> str:
+    """Generate the RegionFiller utility used by FillRegion.
+
+    Fills run as a repeating task that places at most ``blocksPerTick``
+    blocks per tick, one chunk column at a time. Chunks that are not loaded
+    are skipped (also if they unload mid-fill) unless ``loadChunks`` is set.
+    ``onComplete`` runs on the main thread once the whole region is done.
+    With ``folia`` each step runs on the region scheduler of its chunk.
+    """
+    if folia:
+        return _generate_folia_region_filler(package)
+    return f"""package {package}.util;
+
+import org.bukkit.Material;
+import org.bukkit.World;
+import org.bukkit.plugin.java.JavaPlugin;
+import org.bukkit.scheduler.BukkitRunnable;
+
+public final class RegionFiller extends BukkitRunnable {{
+
+    private final World world;
+    private final Material material;
+    private final int minX, minY, minZ, maxX, maxY, maxZ;
+    private final int blocksPerTick;
+    private final boolean loadChunks;
+    private final Runnable onComplete;
+
+    private int chunkX, chunkZ;
+    private boolean inChunk;
+    private int x, y, z;
+
+    private RegionFiller(World world, int x1, int y1, int z1, int x2, int y2, int z2,
+                         Material material, int blocksPerTick, boolean loadChunks, Runnable onComplete) {{
+        this.world = world;
+        this.material = material;
+        this.minX = Math.min(x1, x2);
+        this.minY = Math.max(Math.min(y1, y2), world.getMinHeight());
+        this.minZ = Math.min(z1, z2);
+        this.maxX = Math.max(x1, x2);
+        this.maxY = Math.min(Math.max(y1, y2), world.getMaxHeight() - 1);
+        this.maxZ = Math.max(z1, z2);
+        this.blocksPerTick = Math.max(1, blocksPerTick);
+        this.loadChunks = loadChunks;
+        this.onComplete = onComplete;
+        this.chunkX = minX >> 4;
+        this.chunkZ = minZ >> 4;
+    }}
+
+    public static RegionFiller fill(JavaPlugin plugin, World world, int x1, int y1, int z1, int x2, int y2, int z2,
+                                    Material material, int blocksPerTick, boolean loadChunks, Runnable onComplete) {{
+        RegionFiller filler = new RegionFiller(
+            world, x1, y1, z1, x2, y2, z2, material, blocksPerTick, loadChunks, onComplete);
+        filler.runTaskTimer(plugin, 0L, 1L);
+        return filler;
+    }}
+
+    @Override
+    public void run() {{
+        int budget = blocksPerTick;
+        if (inChunk && !loadChunks && !world.isChunkLoaded(chunkX, chunkZ)) {{
+            nextChunk();
+        }}
+        while (budget > 0) {{
+            if (!inChunk) {{
+                if (chunkX > (maxX >> 4) || minY > maxY) {{
+                    finish();
+                    return;
+                }}
+                if (!loadChunks && !world.isChunkLoaded(chunkX, chunkZ)) {{
+                    nextChunk();
+                    budget--;
+                    continue;
+                }}
+                x = Math.max(minX, chunkX << 4);
+                z = Math.max(minZ, chunkZ << 4);
+                y = minY;
+                inChunk = true;
+            }}
+            world.getBlockAt(x, y, z).setType(material);
+            budget--;
+            if (++y > maxY) {{
+                y = minY;
+                if (++z > Math.min(maxZ, (chunkZ << 4) + 15)) {{
+                    z = Math.max(minZ, chunkZ << 4);
+                    if (++x > Math.min(maxX, (chunkX << 4) + 15)) {{
+                        nextChunk();
+                    }}
+                }}
+            }}
+        }}
+    }}
+
+    private void nextChunk() {{
+        inChunk = false;
+        if (++chunkZ > (maxZ >> 4)) {{
+            chunkZ = minZ >> 4;
+            chunkX++;
+        }}
+    }}
+
+    private void finish() {{
+        cancel();
+        if (onComplete != null) {{
+            onComplete.run();
+        }}
+    }}
+}}
+"""
+
+
+def _generate_folia_region_filler(package: str) -> str:
+    """RegionFiller for Folia: the same API, stepped on region threads.
+
+    Every step is scheduled on the region that owns the current chunk, so
+    block writes never leave their owning thread. ``onComplete`` runs on the
+    region thread of the last chunk.
+    """
+    return f"""package {package}.util;
+
+import org.bukkit.Bukkit;
+import org.bukkit.Material;
+import org.bukkit.World;
+import org.bukkit.plugin.java.JavaPlugin;
+
+public final class RegionFiller {{
+
+    private final JavaPlugin plugin;
+    private final World world;
+    private final Material material;
+    private final int minX, minY, minZ, maxX, maxY, maxZ;
+    private final int blocksPerTick;
+    private final boolean loadChunks;
+    private final Runnable onComplete;
+
+    private int chunkX, chunkZ;
+    private boolean inChunk;
+    private int x, y, z;
+    private volatile boolean cancelled;
+
+    private RegionFiller(JavaPlugin plugin, World world, int x1, int y1, int z1, int x2, int y2, int z2,
+                         Material material, int blocksPerTick, boolean loadChunks, Runnable onComplete) {{
+        this.plugin = plugin;
+        this.world = world;
+        this.material = material;
+        this.minX = Math.min(x1, x2);
+        this.minY = Math.max(Math.min(y1, y2), world.getMinHeight());
+        this.minZ = Math.min(z1, z2);
+        this.maxX = Math.max(x1, x2);
+        this.maxY = Math.min(Math.max(y1, y2), world.getMaxHeight() - 1);
+        this.maxZ = Math.max(z1, z2);
+        this.blocksPerTick = Math.max(1, blocksPerTick);
+        this.loadChunks = loadChunks;
+        this.onComplete = onComplete;
+        this.chunkX = minX >> 4;
+        this.chunkZ = minZ >> 4;
+    }}
+
+    public static RegionFiller fill(JavaPlugin plugin, World world, int x1, int y1, int z1, int x2, int y2, int z2,
+                                    Material material, int blocksPerTick, boolean loadChunks, Runnable onComplete) {{
+        RegionFiller filler = new RegionFiller(
+            plugin, world, x1, y1, z1, x2, y2, z2, material, blocksPerTick, loadChunks, onComplete);
+        filler.scheduleStep();
+        return filler;
+    }}
+
+    public void cancel() {{
+        cancelled = true;
+    }}
+
+    private void scheduleStep() {{
+        if (cancelled) return;
+        if (chunkX > (maxX >> 4) || minY > maxY) {{
+            if (onComplete != null) {{
+                onComplete.run();
+            }}
+            return;
+        }}
+        Bukkit.getRegionScheduler().runDelayed(plugin, world, chunkX, chunkZ, task -> step(), 1L);
+    }}
+
+    // Runs on the region thread that owns (chunkX, chunkZ)
+    private void step() {{
+        if (cancelled) return;
+        if (!loadChunks && !world.isChunkLoaded(chunkX, chunkZ)) {{
+            nextChunk();
+            scheduleStep();
+            return;
+        }}
+        if (!inChunk) {{
+            x = Math.max(minX, chunkX << 4);
+            z = Math.max(minZ, chunkZ << 4);
+            y = minY;
+            inChunk = true;
+        }}
+        for (int budget = blocksPerTick; budget > 0 && inChunk; budget--) {{
+            world.getBlockAt(x, y, z).setType(material);
+            if (++y > maxY) {{
+                y = minY;
+                if (++z > Math.min(maxZ, (chunkZ << 4) + 15)) {{
+                    z = Math.max(minZ, chunkZ << 4);
+                    if (++x > Math.min(maxX, (chunkX << 4) + 15)) {{
+                        nextChunk();
+                    }}
+                }}
+            }}
+        }}
+        scheduleStep();
+    }}
+
+    private void nextChunk() {{
+        inChunk = false;
+        if (++chunkZ > (maxZ >> 4)) {{
+            chunkZ = minZ >> 4;
+            chunkX++;
+        }}
+    }}
+}}
+"""
+
+
+def generate_sidebar_boards(package: str) -> str:
+    """Generate the SidebarBoards utility used by SetScoreboard/RemoveScoreboard.
+
+    Each player gets one scoreboard, created on first use and dropped when
+    they quit. ``show`` returns early when nothing changed and otherwise
+    only resets or sets the scores of lines that differ, instead of
+    building and sending a whole new scoreboard on every firing.
+    """
+    return f"""package {package}.util;
+
+import java.util.Arrays;
+import java.util.HashMap;
+import java.util.Map;
+import java.util.UUID;
+import java.util.concurrent.ConcurrentHashMap;
+import org.bukkit.Bukkit;
+import org.bukkit.entity.Player;
+import org.bukkit.event.EventHandler;
+import org.bukkit.event.HandlerList;
+import org.bukkit.event.Listener;
+import org.bukkit.event.player.PlayerQuitEvent;
+import org.bukkit.plugin.java.JavaPlugin;
+import org.bukkit.scoreboard.DisplaySlot;
+import org.bukkit.scoreboard.Objective;
+import org.bukkit.scoreboard.Scoreboard;
+
+public final class SidebarBoards implements Listener {{
+
+    private static final SidebarBoards INSTANCE = new SidebarBoards();
+    private static final Map<UUID, Board> boards = new ConcurrentHashMap<>();
+
+    private static final class Board {{
+        private final Scoreboard scoreboard;
+        private final Objective objective;
+        private final Map<String, Integer> scores = new HashMap<>();
+        private String title;
+        private String[] lines = new String[0];
+
+        private Board(String title) {{
+            this.scoreboard = Bukkit.getScoreboardManager().getNewScoreboard();
+            this.objective = scoreboard.registerNewObjective("display", "dummy", title);
+            this.objective.setDisplaySlot(DisplaySlot.SIDEBAR);
+            this.title = title;
+        }}
+    }}
+
+    private SidebarBoards() {{}}
+
+    public static void start(JavaPlugin plugin) {{
+        Bukkit.getPluginManager().registerEvents(INSTANCE, plugin);
+    }}
+
+    public static void stop() {{
+        HandlerList.unregisterAll(INSTANCE);
+        boards.clear();
+    }}
+
+    /** Show {{@code lines}} (top first) in the player's sidebar. */
+    public static void show(Player player, String title, String... lines) {{
+        Board board = boards.computeIfAbsent(player.getUniqueId(), id -> new Board(title));
+        synchronized (board) {{
+            if (!board.title.equals(title)) {{
+                board.objective.setDisplayName(title);
+                board.title = title;
+            }}
+            if (!Arrays.equals(board.lines, lines)) {{
+                Map<String, Integer> wanted = new HashMap<>();
+                for (int i = 0; i < lines.length; i++) {{
+                    wanted.putIfAbsent(lines[i], lines.length - 1 - i);
+                }}
+                board.scores.entrySet().removeIf(entry -> {{
+                    if (wanted.containsKey(entry.getKey())) return false;
+                    board.scoreboard.resetScores(entry.getKey());
+                    return true;
+                }});
+                for (Map.Entry<String, Integer> entry : wanted.entrySet()) {{
+                    Integer previous = board.scores.put(entry.getKey(), entry.getValue());
+                    if (!entry.getValue().equals(previous)) {{
+                        board.objective.getScore(entry.getKey()).setScore(entry.getValue());
+                    }}
+                }}
+                board.lines = lines.clone();
+            }}
+        }}
+        if (player.getScoreboard() != board.scoreboard) {{
+            player.setScoreboard(board.scoreboard);
+        }}
+    }}
+
+    /** Put the player back on the server's main scoreboard and forget theirs. */
+    public static void hide(Player player) {{
+        boards.remove(player.getUniqueId());
+        player.setScoreboard(Bukkit.getScoreboardManager().getMainScoreboard());
+    }}
+
+    @EventHandler
+    public void onQuit(PlayerQuitEvent event) {{
+        boards.remove(event.getPlayer().getUniqueId());
+    }}
+}}
+"""
+
+
+def generate_task_wheel(package: str, folia: bool = False) -> str:
+    """Generate the TaskWheel utility used by DelayAction and RepeatAction.
+
+    One repeating scheduler task (started in ``onEnable``) drives a hashed
+    timing wheel of small entries, instead of one ``BukkitRunnable`` per
+    firing. Entries can be submitted from any thread, can be cancelled, and
+    are dropped when the player that scheduled them quits. With ``folia``
+    the same API is backed by the entity and global region schedulers.
+    """
+    if folia:
+        return _generate_folia_task_wheel(package)
+    return f"""package {package}.util;
+
+import java.util.ArrayList;
+import java.util.HashMap;
+import java.util.HashSet;
+import java.util.Iterator;
+import java.util.List;
+import java.util.Map;
+import java.util.Set;
+import java.util.UUID;
+import java.util.concurrent.ConcurrentLinkedQueue;
+import java.util.logging.Level;
+import org.bukkit.Bukkit;
+import org.bukkit.entity.Player;
+import org.bukkit.event.EventHandler;
+import org.bukkit.event.HandlerList;
+import org.bukkit.event.Listener;
+import org.bukkit.event.player.PlayerQuitEvent;
+import org.bukkit.plugin.java.JavaPlugin;
+import org.bukkit.scheduler.BukkitTask;
+
+public final class TaskWheel implements Listener {{
+
+    private static final int SLOTS = 256;
+    private static final TaskWheel INSTANCE = new TaskWheel();
+
+    public static final class Entry {{
+        private final UUID owner;
+        private final Runnable action;
+        private final long delay;
+        private final long interval;
+        private int remaining;
+        private long due;
+        private volatile boolean cancelled;
+
+        private Entry(UUID owner, Runnable action, long delay, long interval, int remaining) {{
+            this.owner = owner;
+            this.action = action;
+            this.delay = delay;
+            this.interval = interval;
+            this.remaining = remaining;
+        }}
+
+        public void cancel() {{
+            cancelled = true;
+        }}
+
+        public boolean isCancelled() {{
+            return cancelled;
+        }}
+    }}
+
+    private final List<List<Entry>> buckets = new ArrayList<>(SLOTS);
+    private final ConcurrentLinkedQueue<Entry> incoming = new ConcurrentLinkedQueue<>();
+    private final Map<UUID, Set<Entry>> byOwner = new HashMap<>();
+    private final List<Entry> ready = new ArrayList<>();
+    private JavaPlugin plugin;
+    private BukkitTask task;
+    private long tick;
+
+    private TaskWheel() {{
+        for (int i = 0; i < SLOTS; i++) {{
+            buckets.add(new ArrayList<>());
+        }}
+    }}
+
+    public static void start(JavaPlugin plugin) {{
+        if (INSTANCE.task != null) return;
+        INSTANCE.plugin = plugin;
+        INSTANCE.task = Bukkit.getScheduler().runTaskTimer(plugin, INSTANCE::advance, 1L, 1L);
+        Bukkit.getPluginManager().registerEvents(INSTANCE, plugin);
+    }}
+
+    public static void stop() {{
+        if (INSTANCE.task != null) {{
+            INSTANCE.task.cancel();
+            INSTANCE.task = null;
+        }}
+        HandlerList.unregisterAll(INSTANCE);
+        for (List<Entry> bucket : INSTANCE.buckets) {{
+            bucket.clear();
+        }}
+        INSTANCE.incoming.clear();
+        INSTANCE.byOwner.clear();
+    }}
+
+    /** Run {{@code action}} once after {{@code delayTicks}}. */
+    public static Entry schedule(Player owner, long delayTicks, Runnable action) {{
+        return submit(owner, delayTicks, 1L, 1, action);
+    }}
+
+    /** Run {{@code action}} every {{@code intervalTicks}}, {{@code times}} times (0 = until cancelled). */
+    public static Entry repeat(Player owner, long delayTicks, long intervalTicks, int times, Runnable action) {{
+        return submit(owner, delayTicks, intervalTicks, times > 0 ? times : -1, action);
+    }}
+
+    public static void cancelAll(UUID owner) {{
+        INSTANCE.drainIncoming();
+        Set<Entry> owned = INSTANCE.byOwner.remove(owner);
+        if (owned == null) return;
+        for (Entry entry : owned) {{
+            entry.cancelled = true;
+        }}
+    }}
+
+    private static Entry submit(Player owner, long delayTicks, long intervalTicks, int times, Runnable action) {{
+        Entry entry = new Entry(
+            owner != null ? owner.getUniqueId() : null,
+            action,
+            Math.max(1L, delayTicks),
+            Math.max(1L, intervalTicks),
+            times
+        );
+        INSTANCE.incoming.add(entry);
+        return entry;
+    }}
+
+    @EventHandler
+    public void onQuit(PlayerQuitEvent event) {{
+        cancelAll(event.getPlayer().getUniqueId());
+    }}
+
+    private void drainIncoming() {{
+        Entry entry;
+        while ((entry = incoming.poll()) != null) {{
+            if (entry.cancelled) continue;
+            entry.due = tick + entry.delay;
+            place(entry);
+            if (entry.owner != null) {{
+                byOwner.computeIfAbsent(entry.owner, k -> new HashSet<>()).add(entry);
+            }}
+        }}
+    }}
+
+    private void place(Entry entry) {{
+        buckets.get((int) (entry.due & (SLOTS - 1))).add(entry);
+    }}
+
+    private void forget(Entry entry) {{
+        if (entry.owner == null) return;
+        Set<Entry> owned = byOwner.get(entry.owner);
+        if (owned != null && owned.remove(entry) && owned.isEmpty()) {{
+            byOwner.remove(entry.owner);
+        }}
+    }}
+
+    private void advance() {{
+        drainIncoming();
+        tick++;
+        List<Entry> bucket = buckets.get((int) (tick & (SLOTS - 1)));
+        if (bucket.isEmpty()) return;
+
+        Iterator<Entry> it = bucket.iterator();
+        while (it.hasNext()) {{
+            Entry entry = it.next();
+            if (entry.cancelled) {{
+                it.remove();
+                forget(entry);
+            }} else if (entry.due == tick) {{
+                it.remove();
+                ready.add(entry);
+            }}
+        }}
+
+        for (Entry entry : ready) {{
+            if (!entry.cancelled) {{
+                try {{
+                    entry.action.run();
+                }} catch (Throwable t) {{
+                    plugin.getLogger().log(Level.WARNING, "Scheduled action failed", t);
+                }}
+                if (entry.remaining > 0) {{
+                    entry.remaining--;
+                }}
+            }}
+            if (entry.cancelled || entry.remaining == 0) {{
+                forget(entry);
+            }} else {{
+                entry.due = tick + entry.interval;
+                place(entry);
+            }}
+        }}
+        ready.clear();
+    }}
+}}
+"""
+
+
+def _generate_folia_task_wheel(package: str) -> str:
+    """TaskWheel for Folia, where there is no single main thread to drive a wheel.
+
+    Player-owned entries run on the player's entity scheduler, so they follow
+    the player across regions and are retired when the player leaves; other
+    entries run on the global region scheduler. Live entries are tracked per
+    owner so ``cancelAll`` and ``stop`` can cancel their scheduled tasks.
+    """
+    return f"""package {package}.util;
+
+import io.papermc.paper.threadedregions.scheduler.ScheduledTask;
+import java.util.Map;
+import java.util.Set;
+import java.util.UUID;
+import java.util.concurrent.ConcurrentHashMap;
+import java.util.function.Consumer;
+import org.bukkit.Bukkit;
+import org.bukkit.entity.Player;
+import org.bukkit.plugin.java.JavaPlugin;
+
+public final class TaskWheel {{
+
+    private static final Set<Entry> LIVE = ConcurrentHashMap.newKeySet();
+    private static final Map<UUID, Set<Entry>> BY_OWNER = new ConcurrentHashMap<>();
+    private static JavaPlugin plugin;
+
+    public static final class Entry {{
+        private final UUID owner;
+        private int remaining;
+        private volatile ScheduledTask task;
+        private volatile boolean cancelled;
+
+        private Entry(UUID owner, int remaining) {{
+            this.owner = owner;
+            this.remaining = remaining;
+        }}
+
+        public void cancel() {{
+            cancelled = true;
+            ScheduledTask current = task;
+            if (current != null) {{
+                current.cancel();
+            }}
+            forget(this);
+        }}
+
+        public boolean isCancelled() {{
+            return cancelled;
+        }}
+    }}
+
+    private TaskWheel() {{
+    }}
+
+    public static void start(JavaPlugin owner) {{
+        plugin = owner;
+    }}
+
+    public static void stop() {{
+        if (plugin == null) return;
+        for (Entry entry : LIVE) {{
+            entry.cancel();
+        }}
+        LIVE.clear();
+        BY_OWNER.clear();
+        Bukkit.getGlobalRegionScheduler().cancelTasks(plugin);
+        plugin = null;
+    }}
+
+    /** Run {{@code action}} once after {{@code delayTicks}}. */
+    public static Entry schedule(Player owner, long delayTicks, Runnable action) {{
+        return submit(owner, delayTicks, 0L, 1, action);
+    }}
+
+    /** Run {{@code action}} every {{@code intervalTicks}}, {{@code times}} times (0 = until cancelled). */
+    public static Entry repeat(Player owner, long delayTicks, long intervalTicks, int times, Runnable action) {{
+        return submit(owner, delayTicks, Math.max(1L, intervalTicks), times > 0 ? times : -1, action);
+    }}
+
+    public static void cancelAll(UUID owner) {{
+        Set<Entry> owned = BY_OWNER.remove(owner);
+        if (owned == null) return;
+        for (Entry entry : owned) {{
+            entry.cancel();
+        }}
+    }}
+
+    private static Entry submit(Player owner, long delayTicks, long intervalTicks, int times, Runnable action) {{
+        Entry entry = new Entry(owner != null ? owner.getUniqueId() : null, times);
+        LIVE.add(entry);
+        if (entry.owner != null) {{
+            BY_OWNER.computeIfAbsent(entry.owner, k -> ConcurrentHashMap.newKeySet()).add(entry);
+        }}
+        Consumer<ScheduledTask> body = task -> {{
+            if (entry.cancelled) {{
+                task.cancel();
+                forget(entry);
+                return;
+            }}
+            if (entry.remaining > 0 && --entry.remaining == 0) {{
+                task.cancel();
+                forget(entry);
+            }}
+            action.run();
+        }};
+        long delay = Math.max(1L, delayTicks);
+        if (owner != null) {{
+            // The retired callback runs when the player leaves before the entry finishes
+            entry.task = intervalTicks > 0
+                ? owner.getScheduler().runAtFixedRate(plugin, body, () -> forget(entry), delay, intervalTicks)
+                : owner.getScheduler().runDelayed(plugin, body, () -> forget(entry), delay);
+        }} else {{
+            entry.task = intervalTicks > 0
+                ? Bukkit.getGlobalRegionScheduler().runAtFixedRate(plugin, body, delay, intervalTicks)
+                : Bukkit.getGlobalRegionScheduler().runDelayed(plugin, body, delay);
+        }}
+        if (entry.task == null) {{
+            // The owner was already removed; the entity scheduler did not accept the task
+            forget(entry);
+        }}
+        return entry;
+    }}
+
+    private static void forget(Entry entry) {{
+        LIVE.remove(entry);
+        if (entry.owner == null) return;
+        Set<Entry> owned = BY_OWNER.get(entry.owner);
+        if (owned != null && owned.remove(entry) && owned.isEmpty()) {{
+            BY_OWNER.remove(entry.owner, owned);
+        }}
+    }}
 }}
 """
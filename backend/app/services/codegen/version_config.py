@@ -1,11 +1,13 @@
 """Configuration for supported Paper API versions and their build properties."""
 
+from dataclasses import dataclass
+
 PAPER_VERSIONS = {
-    "1.20.1": {"maven_version": "1.20.1-R0.1-SNAPSHOT", "api_version": "1.20", "java_version": "17"},
-    "1.20.4": {"maven_version": "1.20.4-R0.1-SNAPSHOT", "api_version": "1.20", "java_version": "17"},
-    "1.20.6": {"maven_version": "1.20.6-R0.1-SNAPSHOT", "api_version": "1.20", "java_version": "17"},
-    "1.21.1": {"maven_version": "1.21.1-R0.1-SNAPSHOT", "api_version": "1.21", "java_version": "21"},
-    "1.21.4": {"maven_version": "1.21.4-R0.1-SNAPSHOT", "api_version": "1.21", "java_version": "21"},
+    "1.20.1": {"maven_version": "1.20.1-R0.1-SNAPSHOT", "api_version": "1.20", "java_version": "17", "async_teleport": True},
+    "1.20.4": {"maven_version": "1.20.4-R0.1-SNAPSHOT", "api_version": "1.20", "java_version": "17", "async_teleport": True},
+    "1.20.6": {"maven_version": "1.20.6-R0.1-SNAPSHOT", "api_version": "1.20", "java_version": "17", "async_teleport": True},
+    "1.21.1": {"maven_version": "1.21.1-R0.1-SNAPSHOT", "api_version": "1.21", "java_version": "21", "async_teleport": True},
+    "1.21.4": {"maven_version": "1.21.4-R0.1-SNAPSHOT", "api_version": "1.21", "java_version": "21", "async_teleport": True},
 }
 
 SUPPORTED_VERSIONS = sorted(PAPER_VERSIONS.keys())
@@ -16,3 +18,29 @@ DEFAULT_VERSION = "1.21.1"
 def get_version_config(version_str: str) -> dict:
     """Return the config for a given version, falling back to DEFAULT_VERSION if not found."""
     return PAPER_VERSIONS.get(version_str, PAPER_VERSIONS[DEFAULT_VERSION])
+
+
+SERVER_PLATFORMS = ("paper", "folia")
+
+DEFAULT_PLATFORM = "paper"
+
+
+@dataclass(frozen=True)
+class ServerTarget:
+    """The server the generated code targets: Paper API version and platform.
+
+    On ``folia`` the world is ticked by region threads, so generated code
+    uses the entity/region/global schedulers instead of the Bukkit scheduler.
+    """
+
+    paper_version: str = DEFAULT_VERSION
+    platform: str = DEFAULT_PLATFORM
+
+    @property
+    def folia(self) -> bool:
+        return self.platform == "folia"
+
+    @property
+    def async_teleport(self) -> bool:
+        """Whether ``Entity.teleportAsync`` is available (and, on Folia, required)."""
+        return self.folia or get_version_config(self.paper_version).get("async_teleport", False)
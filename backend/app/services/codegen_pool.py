@@ -0,0 +1,168 @@
+"""Code generation off the event loop, optionally across worker processes.
+
+Codegen is pure Python and CPU-bound. On the default thread pool concurrent
+jobs serialize on the GIL and compete with request handling, so with
+``CODEGEN_PROCESSES > 0`` it runs in a pool of warm worker processes
+instead. Each worker imports the codegen modules once at start-up and
+streams the generated files straight into the build directory, so no
+sources are sent back. Arguments are pickled by the executor's feeder
+thread, never on the event loop.
+
+Configs with at least ``CODEGEN_FANOUT_MIN_CLASSES`` listener and command
+classes are split into shards so one huge config is generated on every
+worker in parallel. One task gets the config for the project-wide files;
+each class shard gets only its analysis units, whose blocks are all it
+needs. With ``CODEGEN_PROCESSES = 0`` (the default) codegen
+runs in-process on a thread, exactly as before.
+"""
+
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.config import settings
+from app.models.plugin_config import PluginConfig
+from app.services.code_generator import CodeGeneratorService, java_root
+from app.services.codegen.analysis import CommandUnit, ListenerUnit, analyze_config
+from app.services.codegen.sinks import DirectorySink
+from app.services.codegen.version_config import ServerTarget
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+_worker_generator: Optional[CodeGeneratorService] = None
+
+
+# -- Worker side -------------------------------------------------------------
+
+
+def _init_worker() -> None:
+    """Process initializer: build the generator so the first job is warm."""
+    global _worker_generator
+    _worker_generator = CodeGeneratorService()
+
+
+def _ping() -> bool:
+    return True
+
+
+def _write_project(config: PluginConfig, build_dir: str, watermark: bool, parts: Dict[str, Any]) -> int:
+    return _worker_generator.generate_to(config, DirectorySink(Path(build_dir)), watermark, **parts)
+
+
+def _write_classes(
+    root: str,
+    package: str,
+    target: ServerTarget,
+    listeners: Sequence[ListenerUnit],
+    commands: Sequence[CommandUnit],
+    build_dir: str,
+    watermark: bool,
+) -> int:
+    files = _worker_generator.iter_class_files(root, package, target, listeners, commands)
+    return _worker_generator.write_to(DirectorySink(Path(build_dir)), files, watermark)
+
+
+def _split(total: int, parts: int) -> List[Tuple[int, int]]:
+    """Split ``range(total)`` into ``parts`` contiguous (start, stop) ranges."""
+    size, extra = divmod(total, parts)
+    ranges = []
+    start = 0
+    for i in range(parts):
+        stop = start + size + (1 if i < extra else 0)
+        ranges.append((start, stop))
+        start = stop
+    return ranges
+
+
+# -- Parent side -------------------------------------------------------------
+
+
+class CodegenPool:
+    """Runs code generation on a thread or on warm worker processes."""
+
+    def __init__(self, processes: int, fanout_min_classes: int) -> None:
+        self.processes = processes
+        self.fanout_min_classes = fanout_min_classes
+        self._code_generator = CodeGeneratorService()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def uses_processes(self) -> bool:
+        return self.processes > 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn: the API process runs threads, which fork does not copy safely
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.processes,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                )
+            return self._executor
+
+    async def start(self) -> None:
+        """Spawn and warm every worker process up front."""
+        if not self.uses_processes:
+            return
+        executor = self._get_executor()
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(
+            loop.run_in_executor(executor, _ping) for _ in range(self.processes)
+        ))
+        logger.info("Codegen process pool ready: %d workers", self.processes)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    async def write_project(self, config: PluginConfig, build_dir: Path, watermark: bool = False) -> int:
+        """Generate the Maven project for ``config`` into ``build_dir``.
+
+        Returns the number of files written.
+        """
+        loop = asyncio.get_running_loop()
+        if not self.uses_processes:
+            return await loop.run_in_executor(
+                None,
+                lambda: self._code_generator.generate_to(config, DirectorySink(build_dir), watermark),
+            )
+
+        executor = self._get_executor()
+        analysis = await loop.run_in_executor(None, analyze_config, config)
+        class_count = len(analysis.listeners) + len(analysis.commands)
+        if self.processes < 2 or class_count < self.fanout_min_classes:
+            return await loop.run_in_executor(
+                executor, _write_project, config, str(build_dir), watermark, {}
+            )
+
+        # Fan out: one task for the project-wide files, one per class shard.
+        tasks = [loop.run_in_executor(
+            executor, _write_project, config, str(build_dir), watermark,
+            {"listeners": slice(0, 0), "commands": slice(0, 0)},
+        )]
+        root = java_root(config)
+        for (l_start, l_stop), (c_start, c_stop) in zip(
+            _split(len(analysis.listeners), self.processes),
+            _split(len(analysis.commands), self.processes),
+        ):
+            tasks.append(loop.run_in_executor(
+                executor, _write_classes, root, config.main_package, analysis.target,
+                analysis.listeners[l_start:l_stop], analysis.commands[c_start:c_stop],
+                str(build_dir), watermark,
+            ))
+        counts = await asyncio.gather(*tasks)
+        return sum(counts)
+
+
+codegen_pool = CodegenPool(
+    processes=settings.CODEGEN_PROCESSES,
+    fanout_min_classes=settings.CODEGEN_FANOUT_MIN_CLASSES,
+)
@@ -0,0 +1,140 @@
+"""Persistent registry of JARs produced by the synchronous build path.
+
+The index lives in a small SQLite database next to the JAR files in
+``DOWNLOADS_DIR`` so every uvicorn worker on the host sees the same entries
+and they survive restarts. Entries expire after ``DOWNLOAD_EXPIRY_HOURS`` and
+the oldest ones are evicted once the registered JARs exceed
+``DOWNLOADS_MAX_BYTES``; eviction always deletes the JAR file too.
+"""
+
+import sqlite3
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import List, Tuple
+
+from app.config import settings
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+REGISTRY_FILENAME = ".download-registry.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS downloads (
+    download_id TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    size_bytes INTEGER NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_downloads_created_at ON downloads (created_at);
+"""
+
+
+class DownloadRegistry:
+    """Maps download IDs to JAR paths with TTL and byte-budget eviction."""
+
+    def __init__(self, db_path: Path | None = None) -> None:
+        # Resolved lazily so DOWNLOADS_DIR overrides made after import apply.
+        self._db_path = db_path
+        self._schema_ready_for: Path | None = None
+
+    @property
+    def db_path(self) -> Path:
+        return self._db_path or settings.DOWNLOADS_DIR / REGISTRY_FILENAME
+
+    def _connect(self) -> sqlite3.Connection:
+        db_path = self.db_path
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(db_path), timeout=10.0, isolation_level=None)
+        if self._schema_ready_for != db_path:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            self._schema_ready_for = db_path
+        return conn
+
+    def register(self, download_id: str, jar_path: Path) -> None:
+        """Record a freshly built JAR, then evict anything over budget.
+
+        The new entry itself is never a budget victim here, so its download
+        ID stays valid until it expires or a later registration evicts it.
+        """
+        size = jar_path.stat().st_size
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO downloads (download_id, path, size_bytes, created_at) "
+                "VALUES (?, ?, ?, ?)",
+                (download_id, str(jar_path), size, time.time()),
+            )
+        self.evict(keep=download_id)
+
+    def get(self, download_id: str) -> Path | None:
+        """Look up a JAR path by download ID. Expired entries are not returned."""
+        cutoff = time.time() - settings.DOWNLOAD_EXPIRY_HOURS * 3600
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT path, created_at FROM downloads WHERE download_id = ?",
+                (download_id,),
+            ).fetchone()
+        if row is None or row[1] < cutoff:
+            return None
+        return Path(row[0])
+
+    def evict(self, keep: str | None = None) -> int:
+        """Delete expired entries and the oldest ones beyond the byte budget.
+
+        Args:
+            keep: Download ID exempt from byte-budget eviction (it still
+                expires normally).
+
+        Returns:
+            Number of entries removed.
+        """
+        cutoff = time.time() - settings.DOWNLOAD_EXPIRY_HOURS * 3600
+        max_bytes = settings.DOWNLOADS_MAX_BYTES
+        victims: List[Tuple[str, str]] = []
+
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                victims.extend(conn.execute(
+                    "SELECT download_id, path FROM downloads WHERE created_at < ?",
+                    (cutoff,),
+                ).fetchall())
+                conn.execute("DELETE FROM downloads WHERE created_at < ?", (cutoff,))
+
+                if max_bytes > 0:
+                    total = conn.execute(
+                        "SELECT COALESCE(SUM(size_bytes), 0) FROM downloads"
+                    ).fetchone()[0]
+                    if total > max_bytes:
+                        rows = conn.execute(
+                            "SELECT download_id, path, size_bytes FROM downloads "
+                            "ORDER BY created_at ASC, rowid ASC"
+                        )
+                        for download_id, path, size in rows:
+                            if total <= max_bytes:
+                                break
+                            if download_id == keep:
+                                continue
+                            victims.append((download_id, path))
+                            total -= size
+                        conn.executemany(
+                            "DELETE FROM downloads WHERE download_id = ?",
+                            [(download_id,) for download_id, _ in victims],
+                        )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+        for download_id, path in victims:
+            try:
+                Path(path).unlink(missing_ok=True)
+            except OSError as e:
+                logger.warning("Failed to delete evicted download %s: %s", path, e)
+            logger.info("Evicted download %s", download_id)
+        return len(victims)
+
+
+download_registry = DownloadRegistry()
@@ -0,0 +1,464 @@
+"""Data backend for build jobs, quota, auth and artifacts.
+
+``DATA_BACKEND`` selects one implementation at startup:
+
+- ``supabase``: the Supabase tables, RPCs, Auth and Storage
+- ``local``: the SQLite file at ``LOCAL_DB_PATH`` (see ``local_backend``)
+  with artifacts under ``DOWNLOADS_DIR``
+- ``auto`` (default): Supabase when ``SUPABASE_URL`` and
+  ``SUPABASE_SERVICE_ROLE_KEY`` are both set. Otherwise development installs
+  without ``REQUIRE_AUTH`` fall back to local with a warning, and production
+  or authenticated installs refuse to start.
+
+``BuildJobService``, ``ArtifactStorageService`` and ``require_auth`` call
+``get_job_backend()`` and never branch on the backend themselves.
+"""
+
+import asyncio
+import shutil
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from app.config import settings
+from app.services.supabase_client import get_supabase_admin
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+BUCKET_NAME = "build-artifacts"
+
+_job_backend = None
+_backend_lock = threading.Lock()
+
+
+class JobBackend(ABC):
+    """Storage for build jobs, user quota, API auth and build artifacts."""
+
+    name: str = ""
+
+    def is_configured(self) -> bool:
+        """Whether the backend can serve requests (used by the startup check)."""
+        return True
+
+    @abstractmethod
+    async def enqueue_job(
+        self, config: dict, user_id: Optional[str], plugin_name: str, config_hash: Optional[str]
+    ) -> str:
+        """Insert a queued job and return its ID."""
+
+    @abstractmethod
+    async def get_job(self, job_id: str) -> Optional[dict]:
+        """Return a job row, or None."""
+
+    @abstractmethod
+    async def update_job(self, job_id: str, **fields) -> None:
+        """Update job columns."""
+
+    @abstractmethod
+    async def claim_next_job(self, worker_id: str) -> Optional[str]:
+        """Claim the oldest claimable queued job."""
+
+    @abstractmethod
+    async def recover_stuck_jobs(self, timeout_minutes: int) -> int:
+        """Requeue running jobs with a stale heartbeat. Returns the count."""
+
+    @abstractmethod
+    async def get_user_profile(self, user_id: str) -> Optional[dict]:
+        """Return the profile row with the user's tier, or None."""
+
+    @abstractmethod
+    async def find_reusable_artifact(self, config_hash: str) -> Optional[dict]:
+        """Return artifact fields of a succeeded, unexpired job with this hash."""
+
+    @abstractmethod
+    async def get_expired_artifacts(self) -> list:
+        """Return ``id`` and ``artifact_storage_path`` of expired artifacts."""
+
+    @abstractmethod
+    async def count_artifact_references(self, storage_path: str, exclude_job_id: str) -> int:
+        """Count jobs other than ``exclude_job_id`` that point at ``storage_path``."""
+
+    @abstractmethod
+    async def increment_build_count(self, user_id: str, max_builds: int) -> bool:
+        """Reserve one build of the user's quota."""
+
+    @abstractmethod
+    async def decrement_build_count(self, user_id: str) -> None:
+        """Refund one build of the user's quota."""
+
+    @abstractmethod
+    async def authenticate(self, token: str) -> Optional[dict]:
+        """Return the user dict for a bearer token, or None if it is invalid."""
+
+    async def upload_artifact(self, job_id: str, jar_path: Path, filename: str) -> str:
+        """Store a JAR and return its storage path."""
+        return self._save_local_artifact(job_id, jar_path, filename)
+
+    async def get_artifact_url(self, storage_path: str) -> str:
+        """Return a download URL for a stored artifact."""
+        return f"/api/download-artifact/{Path(storage_path).name}"
+
+    async def delete_artifact(self, storage_path: str) -> None:
+        """Delete a stored artifact."""
+        self._delete_local_artifact(storage_path)
+
+    @staticmethod
+    def _save_local_artifact(job_id: str, jar_path: Path, filename: str) -> str:
+        dest = settings.DOWNLOADS_DIR / f"{job_id}-{filename}"
+        settings.DOWNLOADS_DIR.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(jar_path, dest)
+        logger.info("Saved artifact locally: %s", dest)
+        return str(dest)
+
+    @staticmethod
+    def _delete_local_artifact(storage_path: str) -> None:
+        local_path = Path(storage_path)
+        if local_path.exists():
+            local_path.unlink()
+            logger.info("Deleted local artifact: %s", local_path)
+
+
+class LocalJobBackend(JobBackend):
+    """SQLite backend. Calls run on a worker thread to keep the event loop free."""
+
+    name = "local"
+
+    def __init__(self, db):
+        self.db = db
+
+    async def enqueue_job(self, config, user_id, plugin_name, config_hash):
+        return await asyncio.to_thread(
+            self.db.enqueue_build_job, user_id, config, plugin_name, config_hash
+        )
+
+    async def get_job(self, job_id):
+        return await asyncio.to_thread(self.db.get_job, job_id)
+
+    async def update_job(self, job_id, **fields):
+        await asyncio.to_thread(self.db.update_job, job_id, **fields)
+
+    async def claim_next_job(self, worker_id):
+        return await asyncio.to_thread(self.db.claim_next_build_job, worker_id)
+
+    async def recover_stuck_jobs(self, timeout_minutes):
+        return await asyncio.to_thread(self.db.recover_stuck_build_jobs, timeout_minutes)
+
+    async def get_user_profile(self, user_id):
+        return await asyncio.to_thread(self.db.get_user_profile, user_id)
+
+    async def find_reusable_artifact(self, config_hash):
+        return await asyncio.to_thread(self.db.find_reusable_artifact, config_hash)
+
+    async def get_expired_artifacts(self):
+        return await asyncio.to_thread(self.db.get_expired_artifacts)
+
+    async def count_artifact_references(self, storage_path, exclude_job_id):
+        return await asyncio.to_thread(
+            self.db.count_artifact_references, storage_path, exclude_job_id
+        )
+
+    async def increment_build_count(self, user_id, max_builds):
+        return await asyncio.to_thread(self.db.increment_build_count, user_id, max_builds)
+
+    async def decrement_build_count(self, user_id):
+        await asyncio.to_thread(self.db.decrement_build_count, user_id)
+
+    async def authenticate(self, token):
+        return await asyncio.to_thread(self.db.get_user_by_token, token)
+
+
+class SupabaseJobBackend(JobBackend):
+    """Supabase tables and RPCs, Supabase Auth and Storage.
+
+    When the client is unavailable, reads return empty results, writes are
+    no-ops and quota is not enforced, matching local-only dev behaviour.
+    """
+
+    name = "supabase"
+
+    def __init__(self):
+        # build_jobs.config_hash arrives with migration 003; until the first
+        # write or read proves it missing, assume the schema is current.
+        self._has_config_hash = True
+
+    def is_configured(self) -> bool:
+        return get_supabase_admin() is not None
+
+    def _config_hash_missing(self, error: Exception) -> bool:
+        """Record a missing config_hash column (pre-003 schema) from ``error``."""
+        if 'config_hash' not in str(error):
+            return False
+        if self._has_config_hash:
+            logger.warning(
+                "build_jobs.config_hash is missing; apply migrations/003_build_job_dedup.sql "
+                "to coalesce duplicate builds. Continuing without it."
+            )
+        self._has_config_hash = False
+        return True
+
+    async def enqueue_job(self, config, user_id, plugin_name, config_hash):
+        supabase = get_supabase_admin()
+        if not supabase:
+            raise RuntimeError("Supabase not configured")
+
+        # Use the atomic enqueue function if available, else direct insert
+        try:
+            result = supabase.rpc('enqueue_build_job', {
+                'p_user_id': user_id,
+                'p_plugin_config': config,
+                'p_plugin_name': plugin_name,
+                'p_config_hash': config_hash,
+            }).execute()
+            if result.data:
+                return str(result.data)
+        except Exception as e:
+            if 'Queue limit exceeded' in str(e):
+                raise
+            logger.warning("enqueue_build_job RPC not available, using direct insert: %s", e)
+
+        # Fallback: direct insert
+        row = {
+            'user_id': user_id,
+            'plugin_config': config,
+            'plugin_name': plugin_name,
+        }
+        if self._has_config_hash:
+            try:
+                result = supabase.table('build_jobs').insert(
+                    {**row, 'config_hash': config_hash}
+                ).execute()
+                return str(result.data[0]['id'])
+            except Exception as e:
+                if not self._config_hash_missing(e):
+                    raise
+        result = supabase.table('build_jobs').insert(row).execute()
+        return str(result.data[0]['id'])
+
+    async def get_job(self, job_id):
+        supabase = get_supabase_admin()
+        if not supabase:
+            return None
+        result = supabase.table('build_jobs').select('*').eq('id', job_id).single().execute()
+        return result.data
+
+    async def update_job(self, job_id, **fields):
+        supabase = get_supabase_admin()
+        if not supabase:
+            return
+        fields['updated_at'] = datetime.utcnow().isoformat()
+        if 'config_hash' in fields and self._has_config_hash:
+            try:
+                supabase.table('build_jobs').update(fields).eq('id', job_id).execute()
+                return
+            except Exception as e:
+                if not self._config_hash_missing(e):
+                    raise
+        fields.pop('config_hash', None)
+        if len(fields) > 1:
+            supabase.table('build_jobs').update(fields).eq('id', job_id).execute()
+
+    async def claim_next_job(self, worker_id):
+        supabase = get_supabase_admin()
+        if not supabase:
+            return None
+        result = supabase.rpc('claim_next_build_job', {
+            'p_worker_id': worker_id,
+        }).execute()
+        return str(result.data) if result.data else None
+
+    async def recover_stuck_jobs(self, timeout_minutes):
+        supabase = get_supabase_admin()
+        if not supabase:
+            return 0
+        try:
+            result = supabase.rpc('recover_stuck_build_jobs', {
+                'p_timeout_minutes': timeout_minutes,
+            }).execute()
+            return result.data or 0
+        except Exception as e:
+            logger.error("recover_stuck_build_jobs failed: %s", e)
+            return 0
+
+    async def get_user_profile(self, user_id):
+        supabase = get_supabase_admin()
+        if not supabase:
+            return None
+        result = supabase.table('profiles').select(
+            'subscription_tier, builds_used_this_period'
+        ).eq('id', user_id).single().execute()
+        return result.data
+
+    async def find_reusable_artifact(self, config_hash):
+        supabase = get_supabase_admin()
+        if not supabase or not self._has_config_hash:
+            return None
+        try:
+            result = supabase.table('build_jobs').select(
+                'artifact_storage_path, jar_filename, artifact_size_bytes, artifact_expires_at'
+            ).eq('config_hash', config_hash).eq('status', 'succeeded').gt(
+                'artifact_expires_at', datetime.utcnow().isoformat()
+            ).not_.is_('artifact_storage_path', 'null').order(
+                'completed_at', desc=True
+            ).limit(1).execute()
+        except Exception as e:
+            if self._config_hash_missing(e):
+                return None
+            raise
+        return result.data[0] if result.data else None
+
+    async def get_expired_artifacts(self):
+        supabase = get_supabase_admin()
+        if not supabase:
+            return []
+        result = supabase.table('build_jobs').select(
+            'id, artifact_storage_path'
+        ).eq('status', 'succeeded').lt(
+            'artifact_expires_at', datetime.utcnow().isoformat()
+        ).not_.is_('artifact_storage_path', 'null').execute()
+        return result.data or []
+
+    async def count_artifact_references(self, storage_path, exclude_job_id):
+        supabase = get_supabase_admin()
+        if not supabase:
+            return 0
+        result = supabase.table('build_jobs').select('id', count='exact').eq(
+            'artifact_storage_path', storage_path
+        ).neq('id', exclude_job_id).execute()
+        return result.count or 0
+
+    async def increment_build_count(self, user_id, max_builds):
+        supabase = get_supabase_admin()
+        if not supabase:
+            return True
+        result = supabase.rpc(
+            "increment_build_count", {"p_user_id": user_id, "p_max_builds": max_builds}
+        ).execute()
+        return bool(result.data)
+
+    async def decrement_build_count(self, user_id):
+        supabase = get_supabase_admin()
+        if supabase:
+            supabase.rpc("decrement_build_count", {"p_user_id": user_id}).execute()
+
+    async def authenticate(self, token):
+        try:
+            supabase = get_supabase_admin()
+            if not supabase:
+                raise RuntimeError("Supabase not configured")
+            user_response = supabase.auth.get_user(token)
+            user = user_response.user
+            user_id = str(user.id)
+            user_dict = {"id": user_id, "email": user.email}
+        except Exception as e:
+            logger.warning("Auth failed: %s", e)
+            return None
+
+        # Fetch subscription tier from profiles table
+        try:
+            profile = supabase.table("profiles").select(
+                "subscription_tier, subscription_status, cancel_at_period_end, current_period_end"
+            ).eq("id", user_id).single().execute()
+            if profile.data:
+                if profile.data.get("subscription_tier"):
+                    user_dict["subscription_tier"] = profile.data["subscription_tier"]
+                user_dict["subscription_status"] = profile.data.get("subscription_status")
+                user_dict["cancel_at_period_end"] = bool(profile.data.get("cancel_at_period_end", False))
+                user_dict["current_period_end"] = profile.data.get("current_period_end")
+        except Exception as profile_err:
+            logger.warning("Failed to fetch profile for tier info: %s", profile_err)
+
+        return user_dict
+
+    @staticmethod
+    def _in_storage(storage_path: str) -> bool:
+        return not storage_path.startswith('/') and not storage_path.startswith('./')
+
+    async def upload_artifact(self, job_id, jar_path, filename):
+        supabase = get_supabase_admin()
+        if supabase:
+            storage_path = f"builds/{job_id}/{filename}"
+            try:
+                with open(jar_path, 'rb') as f:
+                    supabase.storage.from_(BUCKET_NAME).upload(
+                        storage_path, f.read(),
+                        file_options={"content-type": "application/java-archive"}
+                    )
+                logger.info("Uploaded artifact to Supabase Storage: %s", storage_path)
+                return storage_path
+            except Exception as e:
+                logger.warning("Supabase Storage upload failed, falling back to local: %s", e)
+        return self._save_local_artifact(job_id, jar_path, filename)
+
+    async def get_artifact_url(self, storage_path):
+        supabase = get_supabase_admin()
+        if supabase and self._in_storage(storage_path):
+            try:
+                result = supabase.storage.from_(BUCKET_NAME).create_signed_url(
+                    storage_path, 3600  # 1 hour TTL
+                )
+                if result.get('signedURL'):
+                    return result['signedURL']
+            except Exception as e:
+                logger.warning("Failed to create signed URL: %s", e)
+        return await super().get_artifact_url(storage_path)
+
+    async def delete_artifact(self, storage_path):
+        supabase = get_supabase_admin()
+        if supabase and self._in_storage(storage_path):
+            try:
+                supabase.storage.from_(BUCKET_NAME).remove([storage_path])
+                logger.info("Deleted artifact from Supabase Storage: %s", storage_path)
+                return
+            except Exception as e:
+                logger.warning("Failed to delete from Supabase Storage: %s", e)
+        self._delete_local_artifact(storage_path)
+
+
+def uses_local_backend() -> bool:
+    """Whether ``DATA_BACKEND`` selects the local SQLite backend.
+
+    ``auto`` only falls back to SQLite for development installs without
+    auth. In production or with ``REQUIRE_AUTH`` a missing Supabase setting
+    is a startup error; set ``DATA_BACKEND=local`` to opt in explicitly.
+    """
+    backend = settings.DATA_BACKEND.lower()
+    if backend != "auto":
+        return backend == "local"
+    if settings.SUPABASE_URL and settings.SUPABASE_SERVICE_ROLE_KEY:
+        return False
+    if settings.ENVIRONMENT == "production" or settings.REQUIRE_AUTH:
+        raise RuntimeError(
+            "FATAL: DATA_BACKEND=auto but SUPABASE_URL or SUPABASE_SERVICE_ROLE_KEY is not set. "
+            "Configure Supabase, or set DATA_BACKEND=local to store jobs, users and quota "
+            "in the local SQLite file."
+        )
+    return True
+
+
+def get_job_backend() -> JobBackend:
+    """Return the data backend, selecting it from settings on first use."""
+    global _job_backend
+
+    if _job_backend is not None:
+        return _job_backend
+    with _backend_lock:
+        if _job_backend is None:
+            if uses_local_backend():
+                from app.services.local_backend import LocalBackend
+                backend = LocalJobBackend(LocalBackend(settings.LOCAL_DB_PATH))
+                if settings.DATA_BACKEND.lower() == "auto":
+                    logger.warning(
+                        "DATA_BACKEND=auto and Supabase is not configured: jobs, users and "
+                        "quota are stored in the local SQLite file %s",
+                        settings.LOCAL_DB_PATH,
+                    )
+                else:
+                    logger.info("Using local data backend: %s", settings.LOCAL_DB_PATH)
+            else:
+                backend = SupabaseJobBackend()
+                logger.info("Using Supabase data backend")
+            _job_backend = backend
+    return _job_backend
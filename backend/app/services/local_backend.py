@@ -0,0 +1,323 @@
+"""SQLite stand-in for the Supabase tables and RPCs used by the backend.
+
+Single-node installs, tests and offline load runs use this instead of
+Supabase (see ``DATA_BACKEND``). It mirrors the semantics of the SQL
+functions in ``migrations/``:
+
+- ``enqueue_build_job``: per-user limit of 5 queued/running jobs
+- ``claim_next_build_job``: oldest queued job whose ``config_hash`` is not
+  already running
+- ``recover_stuck_build_jobs``: requeue running jobs with a stale heartbeat
+- ``increment_build_count`` / ``decrement_build_count``: period-aware quota
+
+Users authenticate with a bearer token stored on their profile row; create
+one with ``python -m app.services.local_backend add-user``. The app reaches
+it through ``job_backend.LocalJobBackend``, which runs each call on a worker
+thread and stores artifacts under ``DOWNLOADS_DIR``.
+"""
+
+import argparse
+import json
+import secrets
+import sqlite3
+import threading
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, List, Optional
+
+MAX_QUEUED_JOBS = 5
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS profiles (
+    id TEXT PRIMARY KEY,
+    email TEXT NOT NULL,
+    api_token TEXT UNIQUE,
+    subscription_tier TEXT NOT NULL DEFAULT 'free',
+    subscription_status TEXT DEFAULT 'active',
+    cancel_at_period_end INTEGER NOT NULL DEFAULT 0,
+    current_period_end TEXT,
+    builds_used_this_period INTEGER NOT NULL DEFAULT 0,
+    build_period_start TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS build_jobs (
+    id TEXT PRIMARY KEY,
+    user_id TEXT,
+    plugin_config TEXT NOT NULL,
+    plugin_name TEXT NOT NULL DEFAULT 'Untitled',
+    status TEXT NOT NULL DEFAULT 'queued',
+    worker_id TEXT,
+    build_dir TEXT,
+    error_message TEXT,
+    jar_filename TEXT,
+    artifact_storage_path TEXT,
+    artifact_size_bytes INTEGER,
+    artifact_expires_at TEXT,
+    heartbeat_at TEXT,
+    completed_at TEXT,
+    config_hash TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_build_jobs_status ON build_jobs (status, created_at);
+CREATE INDEX IF NOT EXISTS idx_build_jobs_user ON build_jobs (user_id);
+CREATE INDEX IF NOT EXISTS idx_build_jobs_config_hash ON build_jobs (config_hash, status);
+"""
+
+_JOB_COLUMNS = frozenset({
+    "user_id", "plugin_config", "plugin_name", "status", "worker_id", "build_dir",
+    "error_message", "jar_filename", "artifact_storage_path", "artifact_size_bytes",
+    "artifact_expires_at", "heartbeat_at", "completed_at", "config_hash", "updated_at",
+})
+
+
+def _now() -> str:
+    return datetime.utcnow().isoformat()
+
+
+def _month_start() -> str:
+    return datetime.utcnow().replace(day=1, hour=0, minute=0, second=0, microsecond=0).isoformat()
+
+
+class LocalBackend:
+    """Build queue, quota and token auth in one SQLite file.
+
+    A single connection is shared behind a lock, so every method is an
+    atomic transaction, like the SQL functions it replaces.
+    """
+
+    def __init__(self, db_path: Path | str) -> None:
+        self.db_path = str(db_path)
+        if self.db_path != ":memory:":
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.executescript(_SCHEMA)
+
+    def _transaction(self):
+        return _Transaction(self._conn, self._lock)
+
+    # -- Build jobs -----------------------------------------------------------
+
+    def enqueue_build_job(
+        self,
+        user_id: Optional[str],
+        plugin_config: dict,
+        plugin_name: str,
+        config_hash: Optional[str] = None,
+    ) -> str:
+        with self._transaction() as db:
+            if user_id is not None:
+                (in_progress,) = db.execute(
+                    "SELECT count(*) FROM build_jobs WHERE user_id = ? AND status IN ('queued', 'running')",
+                    (user_id,),
+                ).fetchone()
+                if in_progress >= MAX_QUEUED_JOBS:
+                    raise RuntimeError(f"Queue limit exceeded: you have {in_progress} jobs in progress")
+            job_id = str(uuid.uuid4())
+            now = _now()
+            db.execute(
+                "INSERT INTO build_jobs (id, user_id, plugin_config, plugin_name, config_hash, created_at, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, user_id, json.dumps(plugin_config), plugin_name, config_hash, now, now),
+            )
+        return job_id
+
+    def claim_next_build_job(self, worker_id: str) -> Optional[str]:
+        with self._transaction() as db:
+            row = db.execute(
+                """
+                SELECT q.id FROM build_jobs q
+                WHERE q.status = 'queued'
+                  AND (
+                    q.config_hash IS NULL
+                    OR NOT EXISTS (
+                      SELECT 1 FROM build_jobs r
+                      WHERE r.status = 'running' AND r.config_hash = q.config_hash
+                    )
+                  )
+                ORDER BY q.created_at ASC, q.rowid ASC
+                LIMIT 1
+                """
+            ).fetchone()
+            if row is None:
+                return None
+            now = _now()
+            db.execute(
+                "UPDATE build_jobs SET status = 'running', worker_id = ?, heartbeat_at = ?, updated_at = ?"
+                " WHERE id = ?",
+                (worker_id, now, now, row["id"]),
+            )
+            return row["id"]
+
+    def recover_stuck_build_jobs(self, timeout_minutes: int = 10) -> int:
+        cutoff = (datetime.utcnow() - timedelta(minutes=timeout_minutes)).isoformat()
+        with self._transaction() as db:
+            cursor = db.execute(
+                "UPDATE build_jobs SET status = 'queued', worker_id = NULL, heartbeat_at = NULL, updated_at = ?"
+                " WHERE status = 'running' AND heartbeat_at < ?",
+                (_now(), cutoff),
+            )
+            return cursor.rowcount
+
+    def get_job(self, job_id: str) -> Optional[dict]:
+        with self._transaction() as db:
+            row = db.execute("SELECT * FROM build_jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["plugin_config"] = json.loads(job["plugin_config"])
+        return job
+
+    def update_job(self, job_id: str, **fields: Any) -> None:
+        unknown = set(fields) - _JOB_COLUMNS
+        if unknown:
+            raise ValueError(f"Unknown build_jobs columns: {', '.join(sorted(unknown))}")
+        if "plugin_config" in fields:
+            fields["plugin_config"] = json.dumps(fields["plugin_config"])
+        fields.setdefault("updated_at", _now())
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._transaction() as db:
+            db.execute(f"UPDATE build_jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+
+    def find_reusable_artifact(self, config_hash: str) -> Optional[dict]:
+        with self._transaction() as db:
+            row = db.execute(
+                "SELECT artifact_storage_path, jar_filename, artifact_size_bytes, artifact_expires_at"
+                " FROM build_jobs WHERE config_hash = ? AND status = 'succeeded'"
+                " AND artifact_expires_at > ? AND artifact_storage_path IS NOT NULL"
+                " ORDER BY completed_at DESC LIMIT 1",
+                (config_hash, _now()),
+            ).fetchone()
+        return dict(row) if row else None
+
+    def get_expired_artifacts(self) -> List[dict]:
+        with self._transaction() as db:
+            rows = db.execute(
+                "SELECT id, artifact_storage_path FROM build_jobs WHERE status = 'succeeded'"
+                " AND artifact_expires_at < ? AND artifact_storage_path IS NOT NULL",
+                (_now(),),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def count_artifact_references(self, storage_path: str, exclude_job_id: str) -> int:
+        with self._transaction() as db:
+            row = db.execute(
+                "SELECT count(*) FROM build_jobs WHERE artifact_storage_path = ? AND id != ?",
+                (storage_path, exclude_job_id),
+            ).fetchone()
+        return row[0]
+
+    # -- Profiles, quota and auth ----------------------------------------------
+
+    def add_user(self, email: str, subscription_tier: str = "free", token: Optional[str] = None) -> dict:
+        """Create a local user. Returns the profile including its API token."""
+        user_id = str(uuid.uuid4())
+        token = token or secrets.token_urlsafe(32)
+        now = _now()
+        with self._transaction() as db:
+            db.execute(
+                "INSERT INTO profiles (id, email, api_token, subscription_tier, build_period_start,"
+                " created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (user_id, email, token, subscription_tier, _month_start(), now, now),
+            )
+        return {"id": user_id, "email": email, "api_token": token, "subscription_tier": subscription_tier}
+
+    def get_user_profile(self, user_id: str) -> Optional[dict]:
+        with self._transaction() as db:
+            row = db.execute(
+                "SELECT subscription_tier, subscription_status, cancel_at_period_end, current_period_end,"
+                " builds_used_this_period FROM profiles WHERE id = ?",
+                (user_id,),
+            ).fetchone()
+        return dict(row) if row else None
+
+    def get_user_by_token(self, token: str) -> Optional[dict]:
+        """The user dict ``require_auth`` returns, or None for an unknown token."""
+        with self._transaction() as db:
+            row = db.execute(
+                "SELECT id, email, subscription_tier, subscription_status, cancel_at_period_end,"
+                " current_period_end FROM profiles WHERE api_token = ?",
+                (token,),
+            ).fetchone()
+        if row is None:
+            return None
+        user = dict(row)
+        user["cancel_at_period_end"] = bool(user["cancel_at_period_end"])
+        return user
+
+    def increment_build_count(self, user_id: str, max_builds: int) -> bool:
+        now = _now()
+        with self._transaction() as db:
+            row = db.execute(
+                "SELECT current_period_end, build_period_start FROM profiles WHERE id = ?", (user_id,)
+            ).fetchone()
+            if row is None:
+                return False
+            if row["current_period_end"] is not None:
+                if row["current_period_end"] < now:
+                    db.execute("UPDATE profiles SET builds_used_this_period = 0 WHERE id = ?", (user_id,))
+            elif row["build_period_start"] < _month_start():
+                db.execute(
+                    "UPDATE profiles SET builds_used_this_period = 0, build_period_start = ? WHERE id = ?",
+                    (_month_start(), user_id),
+                )
+            cursor = db.execute(
+                "UPDATE profiles SET builds_used_this_period = builds_used_this_period + 1, updated_at = ?"
+                " WHERE id = ? AND builds_used_this_period < ?",
+                (now, user_id, max_builds),
+            )
+            return cursor.rowcount == 1
+
+    def decrement_build_count(self, user_id: str) -> None:
+        with self._transaction() as db:
+            db.execute(
+                "UPDATE profiles SET builds_used_this_period = MAX(builds_used_this_period - 1, 0),"
+                " updated_at = ? WHERE id = ?",
+                (_now(), user_id),
+            )
+
+
+class _Transaction:
+    """Lock the shared connection and wrap the block in BEGIN/COMMIT."""
+
+    def __init__(self, conn: sqlite3.Connection, lock: threading.Lock) -> None:
+        self._conn = conn
+        self._lock = lock
+
+    def __enter__(self) -> sqlite3.Connection:
+        self._lock.acquire()
+        self._conn.execute("BEGIN IMMEDIATE")
+        return self._conn
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        try:
+            self._conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        finally:
+            self._lock.release()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    from app.config import settings
+
+    parser = argparse.ArgumentParser(description="Manage the local backend database.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    add = sub.add_parser("add-user", help="create a user and print its API token")
+    add.add_argument("--email", required=True)
+    add.add_argument("--tier", default="free", choices=["free", "premium", "pro"])
+    args = parser.parse_args(argv)
+
+    backend = LocalBackend(settings.LOCAL_DB_PATH)
+    user = backend.add_user(args.email, args.tier)
+    print(f"user_id={user['id']}")
+    print(f"token={user['api_token']}")
+
+
+if __name__ == "__main__":
+    main()
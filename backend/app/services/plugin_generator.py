@@ -1,50 +1,80 @@
 """Orchestrates the plugin generation pipeline."""
 
+import asyncio
 import shutil
 import uuid
 from pathlib import Path
-from typing import Dict
 
 from app.config import settings
-from app.models.exceptions import GenerationError
+from app.models.exceptions import BuildCapacityError, GenerationError
 from app.models.plugin_config import PluginConfig
+from app.services.build_capacity import build_executor, build_slots
 from app.services.code_generator import CodeGeneratorService
-from app.services.file_writer import FileWriterService
+from app.services.download_registry import download_registry
+from app.services.codegen.sinks import DirectorySink
 from app.services.maven_builder import MavenBuilderService
+from app.services.single_flight import SingleFlight
+from app.utils.hashing import config_fingerprint
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
-# In-memory mapping of download IDs to JAR file paths
-_download_registry: Dict[str, Path] = {}
-
 
 class PluginGeneratorService:
     """Orchestrates the entire plugin generation pipeline."""
 
     def __init__(self) -> None:
         self.code_generator = CodeGeneratorService()
-        self.file_writer = FileWriterService()
         self.maven_builder = MavenBuilderService()
+        self._in_flight = SingleFlight()
 
     async def generate(self, config: PluginConfig, watermark: bool = False) -> str:
         """
         Generate a plugin from configuration.
 
+        Identical requests (same canonical config, watermark flag and Paper
+        version) that arrive while a build is still running attach to that
+        build and receive the same download ID.
+
+        The build itself is blocking (Maven subprocess, file copies), so it
+        runs on the shared build executor while holding one of the node's
+        build slots.
+
         Returns:
             Download ID for retrieving the generated JAR.
+
+        Raises:
+            BuildCapacityError: If every build slot is already in use.
         """
+        key = config_fingerprint(config, watermark=watermark)
+        if self._in_flight.in_flight(key):
+            logger.info("Attaching to in-flight build for plugin '%s'", config.name)
+        return await self._in_flight.run(key, lambda: self._build(config, watermark))
+
+    async def _build(self, config: PluginConfig, watermark: bool) -> str:
+        """Build one plugin on the executor under a build slot."""
+        if not build_slots.try_acquire():
+            raise BuildCapacityError(
+                "All build slots are busy. Please retry shortly."
+            )
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                build_executor, self._generate_blocking, config, watermark
+            )
+        finally:
+            build_slots.release()
+
+    def _generate_blocking(self, config: PluginConfig, watermark: bool) -> str:
+        """Run the full pipeline synchronously. Called on the build executor."""
         build_id = uuid.uuid4().hex[:12]
         temp_dir = settings.TEMP_DIR / f"plugin-{build_id}"
 
         try:
-            # 1. Generate source code
+            # 1-2. Generate source code straight into the project directory
             logger.info("Generating code for plugin '%s'", config.name)
-            files = self.code_generator.generate_all(config, watermark=watermark)
-
-            # 2. Write files to disk
             temp_dir.mkdir(parents=True, exist_ok=True)
-            self.file_writer.write_files(temp_dir, config, files)
+            self.code_generator.generate_to(config, DirectorySink(temp_dir), watermark=watermark)
 
             # 3. Run Maven build
             jar_path = self.maven_builder.build(temp_dir)
@@ -59,7 +89,7 @@ class PluginGeneratorService:
             shutil.copy2(jar_path, dest_path)
 
             # 5. Register download
-            _download_registry[download_id] = dest_path
+            download_registry.register(download_id, dest_path)
             logger.info(
                 "Plugin '%s' built successfully. Download ID: %s",
                 config.name,
@@ -84,4 +114,4 @@ class PluginGeneratorService:
 
 def get_download_path(download_id: str) -> Path | None:
     """Look up a JAR path by download ID."""
-    return _download_registry.get(download_id)
+    return download_registry.get(download_id)
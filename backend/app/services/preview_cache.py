@@ -0,0 +1,64 @@
+"""Byte-bounded LRU cache for ``/api/preview-code`` results."""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from app.config import settings
+from app.services.preview_service import PreviewSnapshot
+
+
+def _files_size(files: Dict[str, str]) -> int:
+    return sum(len(path) + len(content) for path, content in files.items())
+
+
+class PreviewCache:
+    """Maps a config fingerprint to its preview snapshot.
+
+    Least recently used entries are dropped once the cached file contents
+    exceed ``max_bytes``. Entries larger than the whole budget are never
+    stored.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[PreviewSnapshot, int]]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[PreviewSnapshot]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key: str, snapshot: PreviewSnapshot) -> None:
+        size = _files_size(snapshot.files)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= previous[1]
+            self._entries[key] = (snapshot, size)
+            self._size += size
+            while self._size > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._size -= evicted_size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+preview_cache = PreviewCache(settings.PREVIEW_CACHE_MAX_BYTES)
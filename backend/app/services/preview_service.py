@@ -0,0 +1,184 @@
+"""Full and incremental code previews.
+
+A preview is a flat ``{project_path: content}`` map. Each snapshot also
+records, for every listener and command class, a digest of the inputs that
+class was generated from. An incremental preview regenerates only classes
+whose digest changed (or that contain a block the client marked as
+changed) and reuses the rest from the base snapshot.
+"""
+
+import hashlib
+import json
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Tuple
+
+from app.models.block import Block
+from app.models.plugin_config import PluginConfig
+from app.services.code_generator import WATERMARK_COMMENT, CodeGeneratorService, java_root
+from app.services.codegen.analysis import ConfigAnalysis, analyze_config
+from app.services.codegen.class_generators import generate_command_class, generate_listener_class
+from app.services.codegen.sinks import MemorySink
+
+
+@dataclass(frozen=True)
+class PreviewSnapshot:
+    """Flattened preview files plus per-class input digests."""
+
+    files: Dict[str, str]
+    class_inputs: Dict[str, str] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class _ClassUnit:
+    """One generated listener/command class and the blocks it depends on."""
+
+    path: str
+    kind: str
+    index: int
+    root: Block
+    children: Tuple[Block, ...]
+    mask: int
+    sections: Tuple[Tuple[Block, Tuple[Block, ...]], ...] = ()
+
+    @property
+    def block_ids(self) -> Iterable[str]:
+        yield self.root.id
+        for block, _ in self.sections:
+            yield block.id
+        for child in self.children:
+            yield child.id
+
+
+def diff_files(
+    base: Dict[str, str], new: Dict[str, str]
+) -> Tuple[Dict[str, str], Dict[str, str], List[str]]:
+    """Return (added, changed, removed) between two file maps."""
+    added = {path: content for path, content in new.items() if path not in base}
+    changed = {
+        path: content
+        for path, content in new.items()
+        if path in base and base[path] != content
+    }
+    removed = sorted(path for path in base if path not in new)
+    return added, changed, removed
+
+
+class PreviewService:
+    """Builds preview snapshots, optionally reusing a previous snapshot."""
+
+    def __init__(self, code_generator: CodeGeneratorService | None = None) -> None:
+        self.code_generator = code_generator or CodeGeneratorService()
+
+    def full(self, config: PluginConfig, watermark: bool = False) -> PreviewSnapshot:
+        """Generate every file from scratch."""
+        analysis = analyze_config(config)
+        sink = MemorySink()
+        self.code_generator.generate_to(config, sink, watermark=watermark, analysis=analysis)
+        class_inputs = {
+            unit.path: _unit_digest(config, unit, watermark)
+            for unit in _class_units(config, analysis)
+        }
+        return PreviewSnapshot(files=sink.files, class_inputs=class_inputs)
+
+    def incremental(
+        self,
+        config: PluginConfig,
+        base: PreviewSnapshot,
+        changed_block_ids: Iterable[str] = (),
+        watermark: bool = False,
+    ) -> PreviewSnapshot:
+        """Regenerate only the classes affected by the edit.
+
+        Listener and command classes are reused from ``base`` when their
+        input digest is unchanged and none of their blocks is listed in
+        ``changed_block_ids``. The main class, plugin.yml, pom.xml and
+        utilities are cheap project-wide files and are always regenerated.
+        """
+        dirty = set(changed_block_ids)
+        files: Dict[str, str] = {}
+        class_inputs: Dict[str, str] = {}
+        package = config.main_package
+        analysis = analyze_config(config)
+
+        for unit in _class_units(config, analysis):
+            digest = _unit_digest(config, unit, watermark)
+            class_inputs[unit.path] = digest
+            reusable = (
+                base.class_inputs.get(unit.path) == digest
+                and unit.path in base.files
+                and dirty.isdisjoint(unit.block_ids)
+            )
+            if reusable:
+                files[unit.path] = base.files[unit.path]
+                continue
+
+            if unit.kind == "listener":
+                code = generate_listener_class(
+                    package, unit.index, unit.root, unit.children,
+                    mask=unit.mask, sections=unit.sections, target=analysis.target,
+                )
+            else:
+                code, _, _ = generate_command_class(
+                    package, unit.root, unit.children, unit.index,
+                    mask=unit.mask, target=analysis.target,
+                )
+            files[unit.path] = WATERMARK_COMMENT + code if watermark else code
+
+        root = java_root(config)
+        main_java = self.code_generator.generate_main_plugin(config, analysis)
+        utilities = self.code_generator.generate_utilities(config, analysis)
+        if watermark:
+            main_java = WATERMARK_COMMENT + main_java
+            utilities = {k: WATERMARK_COMMENT + v for k, v in utilities.items()}
+        files[f"{root}/{config.main_class_name}.java"] = main_java
+        for filename, content in utilities.items():
+            files[f"{root}/util/{filename}"] = content
+        files["src/main/resources/plugin.yml"] = self.code_generator.generate_plugin_yml(config, analysis)
+        files["pom.xml"] = self.code_generator.generate_pom_xml(config)
+
+        return PreviewSnapshot(files=files, class_inputs=class_inputs)
+
+
+def _class_units(config: PluginConfig, analysis: ConfigAnalysis) -> List[_ClassUnit]:
+    """Listener and command classes with their project paths."""
+    root = java_root(config)
+    units = [
+        _ClassUnit(
+            path=f"{root}/listeners/{unit.filename}",
+            kind="listener",
+            index=unit.index,
+            root=unit.event,
+            children=unit.children,
+            mask=unit.mask,
+            sections=unit.sections,
+        )
+        for unit in analysis.listeners
+    ]
+    units.extend(
+        _ClassUnit(
+            path=f"{root}/commands/{unit.filename}",
+            kind="command",
+            index=unit.index,
+            root=unit.block,
+            children=unit.children,
+            mask=unit.mask,
+        )
+        for unit in analysis.commands
+    )
+    return units
+
+
+def _unit_digest(config: PluginConfig, unit: _ClassUnit, watermark: bool) -> str:
+    payload = {
+        "package": config.main_package,
+        "paper_version": config.paper_version,
+        "server_platform": config.server_platform,
+        "watermark": watermark,
+        "index": unit.index if unit.kind == "listener" else None,
+        "root": unit.root.model_dump(mode="json"),
+        "merged": [block.model_dump(mode="json") for block, _ in unit.sections[1:]],
+        "children": [child.model_dump(mode="json") for child in unit.children],
+    }
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
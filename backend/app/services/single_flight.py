@@ -0,0 +1,34 @@
+"""Collapse concurrent identical async operations into one execution."""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+
+class SingleFlight:
+    """Run at most one call per key at a time; concurrent callers share it.
+
+    The first caller for a key starts the operation; callers arriving while
+    it is still running await the same task and receive the same result or
+    exception. The shared task is shielded, so one caller being cancelled
+    (e.g. a client disconnect) does not abort the work for the others.
+    """
+
+    def __init__(self) -> None:
+        self._calls: Dict[str, asyncio.Future] = {}
+
+    def in_flight(self, key: str) -> bool:
+        """Return True if an operation for ``key`` is currently running."""
+        return key in self._calls
+
+    async def run(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+
+            def _forget(done: asyncio.Future, key: str = key) -> None:
+                if self._calls.get(key) is done:
+                    del self._calls[key]
+
+            task.add_done_callback(_forget)
+        return await asyncio.shield(task)
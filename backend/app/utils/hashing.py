@@ -0,0 +1,21 @@
+"""Stable content hashes for plugin configurations."""
+
+import hashlib
+import json
+
+from app.models.plugin_config import PluginConfig
+
+
+def config_fingerprint(config: PluginConfig, watermark: bool = False) -> str:
+    """Return a canonical SHA-256 hex digest of everything that shapes a build.
+
+    Two configs that serialize to the same JSON (key order ignored) produce
+    the same generated sources, so they can share one build or preview.
+    """
+    payload = {
+        "config": config.model_dump(mode="json"),
+        "paper_version": config.paper_version,
+        "watermark": bool(watermark),
+    }
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
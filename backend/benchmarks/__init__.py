@@ -0,0 +1 @@
+"""Performance benchmarks for the backend (not part of the pytest suite)."""
@@ -0,0 +1,309 @@
+"""End-to-end build throughput benchmark.
+
+Drives the real ``BuildWorker`` loop (claiming, single-flight, codegen,
+Maven subprocess, upload, status updates) against an in-memory job queue
+and artifact store, with ``MAVEN_PATH`` pointed at a fake Maven script that
+sleeps or burns CPU and then drops a JAR into ``target/``. Runs fully
+offline.
+
+Run from ``backend/``::
+
+    python -m benchmarks.build_bench                          # 1,2,4 slots
+    python -m benchmarks.build_bench --concurrency 1 3 --jobs 50
+    python -m benchmarks.build_bench --maven-mode cpu --maven-seconds 2
+    python -m benchmarks.build_bench --rate 2                 # 2 jobs/s arrivals
+
+For every ``MAX_CONCURRENT_BUILDS`` value it reports throughput (jobs per
+minute), queue wait (enqueue -> claim) and end-to-end latency (enqueue ->
+succeeded) percentiles.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import math
+import os
+import stat
+import sys
+import tempfile
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Deque, Dict, Iterator, List, Optional, Sequence
+
+from app.config import settings
+from app.services import build_worker as build_worker_module
+from app.services.build_capacity import BuildSlots
+from app.services.build_worker import BuildWorker
+
+from . import synthetic
+
+FAKE_MAVEN = '''\
+#!{python}
+"""Fake ``mvn clean package``: wait, then write target/<name>.jar."""
+import os, pathlib, time
+
+mode = os.environ.get("BENCH_MAVEN_MODE", "sleep")
+seconds = float(os.environ.get("BENCH_MAVEN_SECONDS", "1.0"))
+jar_bytes = int(os.environ.get("BENCH_MAVEN_JAR_BYTES", "65536"))
+
+if mode == "cpu":
+    deadline = time.process_time() + seconds
+    x = 0
+    while time.process_time() < deadline:
+        x = (x * 31 + 7) % 1000003
+else:
+    time.sleep(seconds)
+
+target = pathlib.Path("target")
+target.mkdir(exist_ok=True)
+(target / "bench-plugin-1.0.0.jar").write_bytes(os.urandom(jar_bytes))
+'''
+
+
+# -- In-memory stand-ins -----------------------------------------------------
+
+
+@dataclass
+class JobTiming:
+    enqueued: float
+    claimed: Optional[float] = None
+    finished: Optional[float] = None
+    status: str = "queued"
+
+
+class InMemoryJobs:
+    """The subset of ``BuildJobService`` the worker calls, backed by dicts."""
+
+    def __init__(self) -> None:
+        self.jobs: Dict[str, dict] = {}
+        self.timings: Dict[str, JobTiming] = {}
+        self.queue: Deque[str] = deque()
+        self.done = asyncio.Event()
+        self.expected = 0
+        self.finished = 0
+
+    def enqueue(self, config: dict) -> str:
+        job_id = str(uuid.uuid4())
+        self.jobs[job_id] = {"id": job_id, "plugin_config": config, "user_id": None, "status": "queued"}
+        self.timings[job_id] = JobTiming(enqueued=time.perf_counter())
+        self.queue.append(job_id)
+        return job_id
+
+    async def claim_next_job(self, worker_id: str) -> Optional[str]:
+        if not self.queue:
+            return None
+        job_id = self.queue.popleft()
+        self.jobs[job_id]["status"] = "running"
+        self.timings[job_id].claimed = time.perf_counter()
+        return job_id
+
+    async def get_job(self, job_id: str) -> Optional[dict]:
+        return self.jobs.get(job_id)
+
+    async def update_job(self, job_id: str, **fields) -> None:
+        self.jobs[job_id].update(fields)
+        status = fields.get("status")
+        if status in ("succeeded", "failed"):
+            timing = self.timings[job_id]
+            timing.finished = time.perf_counter()
+            timing.status = status
+            self.finished += 1
+            if self.finished >= self.expected:
+                self.done.set()
+
+    async def update_heartbeat(self, job_id: str) -> None:
+        pass
+
+    async def get_user_profile(self, user_id: str) -> dict:
+        return {"subscription_tier": "free"}
+
+    async def find_reusable_artifact(self, config_hash: str) -> Optional[dict]:
+        return None
+
+    async def recover_stuck_jobs(self) -> int:
+        return 0
+
+    async def decrement_build_count(self, user_id: str) -> None:
+        pass
+
+
+class InMemoryArtifacts:
+    """Keeps uploaded JAR sizes instead of storing them anywhere."""
+
+    def __init__(self) -> None:
+        self.uploaded: Dict[str, int] = {}
+
+    async def upload(self, job_id: str, jar_path: Path, filename: str) -> str:
+        path = f"builds/{job_id}/{filename}"
+        self.uploaded[path] = jar_path.stat().st_size
+        return path
+
+    async def cleanup_expired(self) -> None:
+        pass
+
+
+@contextlib.contextmanager
+def _patched(target, **attrs) -> Iterator[None]:
+    saved = {name: getattr(target, name) for name in attrs}
+    for name, value in attrs.items():
+        setattr(target, name, value)
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(target, name, value)
+
+
+# -- Harness -----------------------------------------------------------------
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile; 0 for an empty sample."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def _summary(values: List[float]) -> Dict[str, float]:
+    return {
+        "p50": round(percentile(values, 50), 3),
+        "p90": round(percentile(values, 90), 3),
+        "p99": round(percentile(values, 99), 3),
+        "max": round(max(values, default=0.0), 3),
+    }
+
+
+async def run_once(
+    concurrency: int,
+    jobs: int,
+    config_blocks: int,
+    rate: Optional[float],
+) -> Dict[str, object]:
+    """Push ``jobs`` unique configs through one worker with ``concurrency`` slots."""
+    store = InMemoryJobs()
+    store.expected = jobs
+    artifacts = InMemoryArtifacts()
+
+    with _patched(
+        build_worker_module,
+        build_job_service=store,
+        artifact_storage=artifacts,
+    ):
+        worker = BuildWorker()
+        worker._slots = BuildSlots(concurrency)
+        await worker.start()
+        started = time.perf_counter()
+        try:
+            for i in range(jobs):
+                # Unique names so single-flight and artifact reuse never kick in
+                config = synthetic.catalog_config(config_blocks).model_dump(mode="json")
+                config["name"] = f"Bench{i}"
+                store.enqueue(config)
+                worker.notify()
+                if rate:
+                    await asyncio.sleep(1 / rate)
+            await store.done.wait()
+        finally:
+            await worker.stop()
+        elapsed = time.perf_counter() - started
+
+    timings = list(store.timings.values())
+    failed = [t for t in timings if t.status != "succeeded"]
+    return {
+        "concurrency": concurrency,
+        "jobs": jobs,
+        "failed": len(failed),
+        "elapsed_s": round(elapsed, 3),
+        "jobs_per_min": round(jobs / elapsed * 60, 2),
+        "queue_wait_s": _summary([t.claimed - t.enqueued for t in timings if t.claimed]),
+        "latency_s": _summary([t.finished - t.enqueued for t in timings if t.finished]),
+    }
+
+
+def install_fake_maven(directory: Path) -> Path:
+    script = directory / "fake-mvn"
+    script.write_text(FAKE_MAVEN.format(python=sys.executable), encoding="utf-8")
+    script.chmod(script.stat().st_mode | stat.S_IXUSR)
+    return script
+
+
+def run(
+    concurrency: Sequence[int],
+    jobs: int = 20,
+    maven_mode: str = "sleep",
+    maven_seconds: float = 1.0,
+    config_blocks: int = 100,
+    rate: Optional[float] = None,
+) -> List[Dict[str, object]]:
+    results = []
+    with tempfile.TemporaryDirectory(prefix="build-bench-") as tmp:
+        maven = install_fake_maven(Path(tmp))
+        env = {
+            "BENCH_MAVEN_MODE": maven_mode,
+            "BENCH_MAVEN_SECONDS": str(maven_seconds),
+        }
+        saved_env = {key: os.environ.get(key) for key in env}
+        os.environ.update(env)
+        try:
+            with _patched(settings, MAVEN_PATH=str(maven)):
+                for slots in concurrency:
+                    results.append(asyncio.run(run_once(slots, jobs, config_blocks, rate)))
+        finally:
+            for key, value in saved_env.items():
+                if value is None:
+                    os.environ.pop(key, None)
+                else:
+                    os.environ[key] = value
+    return results
+
+
+def _print_table(results: List[Dict[str, object]]) -> None:
+    print(
+        f"{'slots':>5}  {'jobs/min':>9}  {'failed':>6}  "
+        f"{'wait p50':>9}  {'wait p99':>9}  {'e2e p50':>8}  {'e2e p90':>8}  {'e2e p99':>8}"
+    )
+    for r in results:
+        wait, e2e = r["queue_wait_s"], r["latency_s"]
+        print(
+            f"{r['concurrency']:>5}  {r['jobs_per_min']:>9.1f}  {r['failed']:>6}  "
+            f"{wait['p50']:>9.2f}  {wait['p99']:>9.2f}  "
+            f"{e2e['p50']:>8.2f}  {e2e['p90']:>8.2f}  {e2e['p99']:>8.2f}"
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--jobs", type=int, default=20)
+    parser.add_argument("--maven-mode", choices=["sleep", "cpu"], default="sleep")
+    parser.add_argument("--maven-seconds", type=float, default=1.0)
+    parser.add_argument("--config-blocks", type=int, default=100)
+    parser.add_argument("--rate", type=float, help="arrival rate in jobs/s (default: all at once)")
+    parser.add_argument("--json", action="store_true", help="print raw results as JSON")
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.INFO)
+    results = run(
+        args.concurrency,
+        jobs=args.jobs,
+        maven_mode=args.maven_mode,
+        maven_seconds=args.maven_seconds,
+        config_blocks=args.config_blocks,
+        rate=args.rate,
+    )
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        _print_table(results)
+    return 1 if any(r["failed"] for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
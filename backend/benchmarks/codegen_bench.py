@@ -0,0 +1,234 @@
+"""Code generation microbenchmarks.
+
+Times and memory-profiles the codegen entry points against synthetic
+configs (see ``benchmarks.synthetic``) and compares the results with a
+stored baseline.
+
+Run from ``backend/``::
+
+    python -m benchmarks.codegen_bench                  # run and print
+    python -m benchmarks.codegen_bench --save           # update the baseline
+    python -m benchmarks.codegen_bench --compare        # fail on regressions
+    python -m benchmarks.codegen_bench --quick -k delay # subset, fewer sizes
+
+Each case reports the median and fastest of ``--repeat`` runs; regressions
+are judged on the fastest run, which is far less sensitive to filesystem
+and scheduler noise, and timing differences under ``--min-delta-ms`` are
+ignored. Baselines are machine-specific: record them on the machine you
+compare on. Peak memory is measured with ``tracemalloc`` in a
+separate run so tracing does not skew the timings.
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from app.models.block import BlockType
+from app.models.plugin_config import PluginConfig
+from app.services.code_generator import CodeGeneratorService
+from app.services.codegen.action_generators import generate_action_code
+from app.services.codegen.sinks import DirectorySink
+from app.services.preview_service import PreviewService
+
+from . import synthetic
+
+BASELINE_PATH = Path(__file__).parent / "baselines" / "codegen.json"
+
+SIZES = (10, 100, 1_000, 10_000)
+QUICK_SIZES = (10, 100)
+DELAY_DEPTHS = (10, 100, 1_000)
+QUICK_DELAY_DEPTHS = (10,)
+COMMAND_COUNTS = (10, 500)
+QUICK_COMMAND_COUNTS = (10,)
+
+
+@dataclass
+class Case:
+    name: str
+    run: Callable[[], object]
+
+
+@dataclass
+class Result:
+    name: str
+    median_ms: float
+    min_ms: float
+    peak_kib: float
+
+    def to_json(self) -> Dict[str, float]:
+        return {
+            "median_ms": round(self.median_ms, 3),
+            "min_ms": round(self.min_ms, 3),
+            "peak_kib": round(self.peak_kib, 1),
+        }
+
+
+def _config_cases(label: str, config: PluginConfig, scratch: Path) -> List[Case]:
+    generator = CodeGeneratorService()
+    preview = PreviewService(generator)
+    by_id = {block.id: block for block in config.blocks}
+    # Every listener's and command's action list, as generation walks them
+    action_lists = [
+        ([by_id[cid] for cid in block.children if cid in by_id], block.name)
+        for block in config.blocks
+        if block.type == BlockType.EVENT
+    ]
+
+    def generate_actions():
+        for children, event_name in action_lists:
+            generate_action_code(children, event_name)
+
+    def generate_to_dir():
+        target = scratch / "generate_to"
+        generator.generate_to(config, DirectorySink(target))
+        shutil.rmtree(target)
+
+    return [
+        Case(f"generate_all[{label}]", lambda: generator.generate_all(config)),
+        Case(f"generate_action_code[{label}]", generate_actions),
+        Case(f"generate_to_dir[{label}]", generate_to_dir),
+        # PreviewService.full only: no fingerprinting, caching or response model
+        Case(f"preview_service_full[{label}]", lambda: preview.full(config)),
+    ]
+
+
+def build_cases(quick: bool, scratch: Path) -> List[Case]:
+    cases: List[Case] = []
+    cases += _config_cases("every_action", synthetic.every_action_config(), scratch)
+    for size in QUICK_SIZES if quick else SIZES:
+        cases += _config_cases(f"blocks={size}", synthetic.catalog_config(size), scratch)
+    for depth in QUICK_DELAY_DEPTHS if quick else DELAY_DEPTHS:
+        cases += _config_cases(f"delay_depth={depth}", synthetic.delay_chain_config(depth), scratch)
+    for count in QUICK_COMMAND_COUNTS if quick else COMMAND_COUNTS:
+        cases += _config_cases(f"commands={count}", synthetic.many_commands_config(count), scratch)
+    return cases
+
+
+def measure(case: Case, repeat: int) -> Result:
+    case.run()  # warm-up
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        case.run()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    tracemalloc.start()
+    try:
+        case.run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return Result(case.name, statistics.median(timings), min(timings), peak / 1024)
+
+
+def run(quick: bool = False, repeat: int = 5, pattern: Optional[str] = None) -> List[Result]:
+    scratch = Path(tempfile.mkdtemp(prefix="codegen-bench-"))
+    try:
+        cases = build_cases(quick, scratch)
+        if pattern:
+            cases = [case for case in cases if pattern in case.name]
+        return [measure(case, repeat) for case in cases]
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+def compare(
+    results: List[Result],
+    baseline: Dict[str, Dict[str, float]],
+    threshold: float,
+    min_delta_ms: float = 0.0,
+) -> List[str]:
+    """Return a message for every case slower or larger than ``threshold`` x baseline."""
+    regressions = []
+    for result in results:
+        base = baseline.get(result.name)
+        if not base:
+            continue
+        for metric in ("min_ms", "peak_kib"):
+            ratio = getattr(result, metric) / base[metric] if base[metric] else 1.0
+            if metric == "min_ms" and result.min_ms - base[metric] < min_delta_ms:
+                continue
+            if ratio > threshold:
+                regressions.append(
+                    f"{result.name}: {metric} {getattr(result, metric):.1f} vs "
+                    f"baseline {base[metric]:.1f} ({ratio:.2f}x)"
+                )
+    return regressions
+
+
+def _load_baseline(path: Path) -> Dict[str, Dict[str, float]]:
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8"))["results"]
+
+
+def _print_table(results: List[Result], baseline: Dict[str, Dict[str, float]]) -> None:
+    width = max((len(r.name) for r in results), default=10)
+    print(f"{'case':<{width}}  {'median ms':>10}  {'min ms':>10}  {'peak KiB':>10}  {'vs base':>8}")
+    for r in results:
+        base = baseline.get(r.name)
+        delta = f"{r.min_ms / base['min_ms']:.2f}x" if base and base["min_ms"] else "-"
+        print(
+            f"{r.name:<{width}}  {r.median_ms:>10.2f}  {r.min_ms:>10.2f}  "
+            f"{r.peak_kib:>10.1f}  {delta:>8}"
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--quick", action="store_true", help="small sizes only")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("-k", dest="pattern", help="only run cases whose name contains this")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--save", action="store_true", help="write results as the new baseline")
+    parser.add_argument("--compare", action="store_true", help="exit 1 on regressions")
+    parser.add_argument("--threshold", type=float, default=1.25)
+    parser.add_argument("--min-delta-ms", type=float, default=1.0)
+    args = parser.parse_args(argv)
+
+    # Per-file INFO logging would dominate the write benchmarks.
+    logging.disable(logging.INFO)
+    baseline = _load_baseline(args.baseline)
+    results = run(quick=args.quick, repeat=args.repeat, pattern=args.pattern)
+    _print_table(results, baseline)
+
+    if args.save:
+        merged = dict(baseline)
+        merged.update({r.name: r.to_json() for r in results})
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(
+            json.dumps(
+                {
+                    "machine": platform.platform(),
+                    "cpus": os.cpu_count(),
+                    "python": platform.python_version(),
+                    "results": merged,
+                },
+                indent=2,
+                sort_keys=True,
+            ) + "\n",
+            encoding="utf-8",
+        )
+        print(f"Saved baseline: {args.baseline}")
+
+    if args.compare:
+        regressions = compare(results, baseline, args.threshold, args.min_delta_ms)
+        for message in regressions:
+            print(f"REGRESSION {message}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
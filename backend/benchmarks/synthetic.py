@@ -0,0 +1,133 @@
+"""Synthetic plugin configs built from the block catalog.
+
+Every action comes from ``BlockDefinitionService.get_available_blocks`` with
+its placeholder values filled in, so new catalog entries are picked up by
+the benchmarks automatically.
+"""
+
+from functools import lru_cache
+from itertools import cycle
+from typing import Any, Dict, List, Tuple
+
+from app.models.block import Block, BlockType
+from app.models.plugin_config import PluginConfig
+from app.services.block_definitions import BlockDefinitionService
+
+ACTIONS_PER_EVENT = 9
+
+# Scheduling actions consume the rest of the chain; spread them out so the
+# "every action" configs stay comparable to real ones.
+_CHAINING_ACTIONS = {"DelayAction", "RepeatAction"}
+
+
+@lru_cache(maxsize=1)
+def _catalog() -> Tuple[Tuple[Dict[str, Any], ...], Tuple[Dict[str, Any], ...]]:
+    blocks = BlockDefinitionService().get_available_blocks()
+    events = tuple(
+        b for b in blocks["events"] if b["name"] not in ("CommandEvent", "OnGUIClick")
+    )
+    actions = tuple(b for b in blocks["actions"] if b["name"] not in _CHAINING_ACTIONS)
+    return events, actions
+
+
+def _properties(definition: Dict[str, Any]) -> Dict[str, str]:
+    return {prop["name"]: prop["placeholder"] for prop in definition.get("properties", [])}
+
+
+def _action(block_id: str, definition: Dict[str, Any]) -> Block:
+    return Block(
+        id=block_id,
+        type=BlockType.ACTION,
+        name=definition["name"],
+        properties=_properties(definition),
+    )
+
+
+def _config(name: str, blocks: List[Block]) -> PluginConfig:
+    return PluginConfig(
+        name=name,
+        version="1.0.0",
+        main_package="com.bench.plugin",
+        description="Synthetic benchmark plugin",
+        author="bench",
+        blocks=blocks,
+    )
+
+
+def catalog_config(total_blocks: int) -> PluginConfig:
+    """About ``total_blocks`` blocks: events cycling through the catalog, each
+    with ``ACTIONS_PER_EVENT`` actions cycling through every action type."""
+    events, actions = _catalog()
+    event_defs = cycle(events)
+    action_defs = cycle(actions)
+    blocks: List[Block] = []
+    event_count = max(1, total_blocks // (ACTIONS_PER_EVENT + 1))
+    for e in range(event_count):
+        children = [_action(f"a{e}-{i}", next(action_defs)) for i in range(ACTIONS_PER_EVENT)]
+        event_def = next(event_defs)
+        blocks.append(Block(
+            id=f"e{e}",
+            type=BlockType.EVENT,
+            name=event_def["name"],
+            properties=_properties(event_def),
+            children=[child.id for child in children],
+        ))
+        blocks.extend(children)
+    return _config(f"Catalog{total_blocks}", blocks)
+
+
+def every_action_config() -> PluginConfig:
+    """One listener whose body runs every catalog action once."""
+    _, actions = _catalog()
+    children = [_action(f"a{i}", definition) for i, definition in enumerate(actions)]
+    event = Block(
+        id="e0",
+        type=BlockType.EVENT,
+        name="PlayerJoinEvent",
+        children=[child.id for child in children],
+    )
+    return _config("EveryAction", [event, *children])
+
+
+def delay_chain_config(depth: int) -> PluginConfig:
+    """One listener with ``depth`` nested Delay/Repeat continuations."""
+    children: List[Block] = []
+    for i in range(depth):
+        name = "DelayAction" if i % 2 == 0 else "RepeatAction"
+        children.append(Block(
+            id=f"d{i}",
+            type=BlockType.ACTION,
+            name=name,
+            properties={"delayTicks": "20", "repeatCount": "2", "intervalTicks": "20"},
+        ))
+        children.append(Block(
+            id=f"m{i}",
+            type=BlockType.ACTION,
+            name="SendMessage",
+            properties={"message": f"step {i} %player%"},
+        ))
+    event = Block(
+        id="e0",
+        type=BlockType.EVENT,
+        name="PlayerJoinEvent",
+        children=[child.id for child in children],
+    )
+    return _config(f"DelayChain{depth}", [event, *children])
+
+
+def many_commands_config(count: int) -> PluginConfig:
+    """``count`` commands, each running a few catalog actions."""
+    _, actions = _catalog()
+    action_defs = cycle(actions)
+    blocks: List[Block] = []
+    for c in range(count):
+        children = [_action(f"c{c}-{i}", next(action_defs)) for i in range(3)]
+        blocks.append(Block(
+            id=f"cmd{c}",
+            type=BlockType.EVENT,
+            name="CommandEvent",
+            properties={"commandName": f"bench{c}", "description": f"Bench command {c}"},
+            children=[child.id for child in children],
+        ))
+        blocks.extend(children)
+    return _config(f"Commands{count}", blocks)
@@ -0,0 +1,78 @@
+-- Coalesce identical build jobs across workers and replicas.
+--
+-- Every job records a canonical hash of its plugin config (plus watermark
+-- flag and Paper version). A queued job is not claimed while another job
+-- with the same hash is running; once that build succeeds, the worker that
+-- claims the duplicate reuses its artifact instead of compiling again.
+
+ALTER TABLE public.build_jobs
+  ADD COLUMN IF NOT EXISTS config_hash TEXT;
+
+CREATE INDEX IF NOT EXISTS idx_build_jobs_config_hash
+  ON public.build_jobs (config_hash, status);
+
+-- Replace the 3-argument version so callers may pass the config hash.
+DROP FUNCTION IF EXISTS enqueue_build_job(UUID, JSONB, TEXT);
+
+CREATE OR REPLACE FUNCTION enqueue_build_job(
+  p_user_id UUID,
+  p_plugin_config JSONB,
+  p_plugin_name TEXT,
+  p_config_hash TEXT DEFAULT NULL
+) RETURNS UUID AS $$
+DECLARE
+  queued_count INTEGER;
+  max_queued INTEGER := 5;  -- Default, overridable per tier if needed
+  new_id UUID;
+BEGIN
+  SELECT count(*) INTO queued_count
+  FROM public.build_jobs
+  WHERE user_id = p_user_id AND status IN ('queued', 'running');
+
+  IF queued_count >= max_queued THEN
+    RAISE EXCEPTION 'Queue limit exceeded: you have % jobs in progress', queued_count;
+  END IF;
+
+  INSERT INTO public.build_jobs (user_id, plugin_config, plugin_name, config_hash)
+  VALUES (p_user_id, p_plugin_config, p_plugin_name, p_config_hash)
+  RETURNING id INTO new_id;
+
+  RETURN new_id;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- Claim the oldest queued job whose config is not already being built.
+-- The advisory lock serializes claims so two workers cannot both start
+-- the same config at once.
+CREATE OR REPLACE FUNCTION claim_next_build_job(
+  p_worker_id TEXT
+) RETURNS UUID AS $$
+DECLARE
+  claimed_id UUID;
+BEGIN
+  PERFORM pg_advisory_xact_lock(hashtext('claim_next_build_job'));
+
+  UPDATE public.build_jobs
+  SET status = 'running',
+      worker_id = p_worker_id,
+      heartbeat_at = now(),
+      updated_at = now()
+  WHERE id = (
+    SELECT q.id FROM public.build_jobs q
+    WHERE q.status = 'queued'
+      AND (
+        q.config_hash IS NULL
+        OR NOT EXISTS (
+          SELECT 1 FROM public.build_jobs r
+          WHERE r.status = 'running' AND r.config_hash = q.config_hash
+        )
+      )
+    ORDER BY q.created_at ASC
+    LIMIT 1
+    FOR UPDATE SKIP LOCKED
+  )
+  RETURNING id INTO claimed_id;
+
+  RETURN claimed_id;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
@@ -308,6 +308,191 @@ class TestGeneratePluginEndpoint:
         assert response.status_code != 422  # Not a validation error
 
 
+PREVIEW_PAYLOAD = {
+    "name": "PreviewPlugin",
+    "version": "1.0.0",
+    "main_package": "com.example.preview",
+    "description": "Test",
+    "author": "Test",
+    "blocks": [
+        {"id": "event-1", "type": "event", "name": "PlayerJoinEvent", "properties": {}, "children": ["action-1"]},
+        {"id": "action-1", "type": "action", "name": "SendMessage", "properties": {"message": "Hi"}, "children": []},
+    ],
+}
+
+
+class TestPreviewCodeEndpoint:
+    """Test code preview memoization and ETag handling."""
+
+    @pytest.fixture(autouse=True)
+    def _clear_preview_cache(self):
+        from app.services.preview_cache import preview_cache
+        preview_cache.clear()
+        yield
+        preview_cache.clear()
+
+    def test_preview_returns_files_and_etag(self, client):
+        response = client.post("/api/preview-code", json=PREVIEW_PAYLOAD)
+        assert response.status_code == 200
+        assert "src/main/resources/plugin.yml" in response.json()["files"]
+        assert response.headers["ETag"].startswith('"')
+
+    def test_repeated_preview_skips_codegen(self, client, monkeypatch):
+        from app.routes import plugin as plugin_routes
+
+        first = client.post("/api/preview-code", json=PREVIEW_PAYLOAD)
+
+        def fail_generate(*args, **kwargs):
+            raise AssertionError("codegen should not run for a cached preview")
+
+        monkeypatch.setattr(plugin_routes.code_generator, "generate_to", fail_generate)
+        second = client.post("/api/preview-code", json=PREVIEW_PAYLOAD)
+        assert second.status_code == 200
+        assert second.json() == first.json()
+        assert second.headers["ETag"] == first.headers["ETag"]
+
+    def test_if_none_match_returns_304(self, client):
+        first = client.post("/api/preview-code", json=PREVIEW_PAYLOAD)
+        etag = first.headers["ETag"]
+        response = client.post("/api/preview-code", json=PREVIEW_PAYLOAD, headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.headers["ETag"] == etag
+
+    def test_changed_config_gets_new_etag(self, client):
+        first = client.post("/api/preview-code", json=PREVIEW_PAYLOAD)
+        changed = {**PREVIEW_PAYLOAD, "description": "Changed"}
+        response = client.post(
+            "/api/preview-code", json=changed, headers={"If-None-Match": first.headers["ETag"]}
+        )
+        assert response.status_code == 200
+        assert response.headers["ETag"] != first.headers["ETag"]
+
+    def test_preview_cache_evicts_least_recently_used(self):
+        from app.services.preview_cache import PreviewCache
+        from app.services.preview_service import PreviewSnapshot
+
+        cache = PreviewCache(max_bytes=20)
+        cache.put("a", PreviewSnapshot(files={"f": "x" * 8}))
+        cache.put("b", PreviewSnapshot(files={"f": "y" * 8}))
+        assert cache.get("a") is not None  # touch "a" so "b" is the LRU entry
+        cache.put("c", PreviewSnapshot(files={"f": "z" * 8}))
+        assert "a" in cache and "c" in cache
+        assert "b" not in cache
+
+    def test_diff_with_unknown_base_returns_full_preview(self, client):
+        response = client.post(
+            "/api/preview-code/diff",
+            json={"config": PREVIEW_PAYLOAD, "base_version": "missing"},
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["full"] is True
+        assert "pom.xml" in data["added"]
+        assert data["changed"] == {} and data["removed"] == []
+
+    def test_diff_regenerates_only_edited_listener(self, client, monkeypatch):
+        from app.services import preview_service as preview_service_module
+
+        payload = {
+            **PREVIEW_PAYLOAD,
+            "blocks": PREVIEW_PAYLOAD["blocks"] + [
+                {"id": "event-2", "type": "event", "name": "PlayerQuitEvent", "properties": {}, "children": ["action-2"]},
+                {"id": "action-2", "type": "action", "name": "SendMessage", "properties": {"message": "Bye"}, "children": []},
+            ],
+        }
+        base = client.post("/api/preview-code", json=payload).json()
+
+        edited = {
+            **payload,
+            "blocks": [
+                {**b, "properties": {"message": "Hello"}} if b["id"] == "action-1" else b
+                for b in payload["blocks"]
+            ],
+        }
+        regenerated = []
+        real_listener = preview_service_module.generate_listener_class
+
+        def tracking_listener(package, index, event_block, child_blocks, **kwargs):
+            regenerated.append(event_block.id)
+            return real_listener(package, index, event_block, child_blocks, **kwargs)
+
+        monkeypatch.setattr(preview_service_module, "generate_listener_class", tracking_listener)
+        response = client.post(
+            "/api/preview-code/diff",
+            json={"config": edited, "base_version": base["version"], "changed_block_ids": ["action-1"]},
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["full"] is False
+        assert regenerated == ["event-1"]
+        listener_path = "src/main/java/com/example/preview/listeners/EventListener0.java"
+        assert list(data["changed"]) == [listener_path]
+        assert "Hello" in data["changed"][listener_path]
+        assert data["added"] == {} and data["removed"] == []
+
+    def test_diff_reports_removed_files(self, client):
+        payload = {
+            **PREVIEW_PAYLOAD,
+            "blocks": PREVIEW_PAYLOAD["blocks"] + [
+                {"id": "event-2", "type": "event", "name": "PlayerQuitEvent", "properties": {}, "children": []},
+            ],
+        }
+        base = client.post("/api/preview-code", json=payload).json()
+        response = client.post(
+            "/api/preview-code/diff",
+            json={"config": PREVIEW_PAYLOAD, "base_version": base["version"]},
+        )
+        data = response.json()
+        assert data["full"] is False
+        assert data["removed"] == ["src/main/java/com/example/preview/listeners/EventListener1.java"]
+
+    def test_incremental_matches_full_generation(self):
+        from app.models.plugin_config import PluginConfig
+        from app.services.preview_service import PreviewService
+
+        service = PreviewService()
+        base = service.full(PluginConfig(**PREVIEW_PAYLOAD), watermark=True)
+        edited = PluginConfig(**{
+            **PREVIEW_PAYLOAD,
+            "blocks": [
+                {**b, "properties": {"message": "Changed"}} if b["id"] == "action-1" else b
+                for b in PREVIEW_PAYLOAD["blocks"]
+            ],
+        })
+        incremental = service.incremental(edited, base, watermark=True)
+        assert incremental == service.full(edited, watermark=True)
+
+
+class TestBuildAdmission:
+    """Test admission control on the synchronous build endpoint."""
+
+    def test_generate_plugin_rejected_when_slots_saturated(self, client, monkeypatch):
+        """A saturated node answers 503 with Retry-After instead of blocking."""
+        from app.services.build_capacity import BuildSlots
+        from app.services import plugin_generator as plugin_generator_module
+
+        saturated = BuildSlots(1)
+        assert saturated.try_acquire()
+        monkeypatch.setattr(plugin_generator_module, "build_slots", saturated)
+
+        payload = {
+            "name": "BusyPlugin",
+            "version": "1.0.0",
+            "main_package": "com.example.busy",
+            "description": "Test",
+            "author": "Test",
+            "blocks": [
+                {"id": "event-1", "type": "event", "name": "PlayerJoinEvent", "properties": {}, "children": []},
+            ],
+        }
+        response = client.post("/api/generate-plugin", json=payload)
+        assert response.status_code == 503
+        assert "Retry-After" in response.headers
+
+        # Health checks are unaffected by build saturation
+        assert client.get("/health").status_code == 200
+
+
 class TestCORS:
     """Test CORS configuration."""
 
@@ -0,0 +1,45 @@
+"""Smoke tests for the benchmark harness so it does not rot."""
+
+from benchmarks import build_bench, codegen_bench, synthetic
+from app.services.block_definitions import BlockDefinitionService
+
+
+class TestCodegenBenchmarks:
+    """Synthetic configs are valid and the runner completes."""
+
+    def test_every_action_config_covers_catalog(self):
+        config = synthetic.every_action_config()
+        catalog = {b["name"] for b in BlockDefinitionService().get_available_blocks()["actions"]}
+        used = {b.name for b in config.blocks if b.type.value == "action"}
+        assert used == catalog - {"DelayAction", "RepeatAction"}
+
+    def test_synthetic_sizes(self):
+        assert 90 <= len(synthetic.catalog_config(100).blocks) <= 100
+        assert len(synthetic.delay_chain_config(5).blocks) == 11
+        assert len(synthetic.many_commands_config(4).blocks) == 16
+
+    def test_runner_and_compare(self):
+        results = codegen_bench.run(quick=True, repeat=1, pattern="every_action")
+        assert {r.name.split("[")[0] for r in results} == {
+            "generate_all", "generate_action_code", "generate_to_dir", "preview_service_full",
+        }
+        baseline = {r.name: {"min_ms": r.min_ms / 10, "peak_kib": r.peak_kib} for r in results}
+        regressions = codegen_bench.compare(results, baseline, threshold=1.25)
+        assert len(regressions) == len(results)
+        assert codegen_bench.compare(results, baseline, threshold=1.25, min_delta_ms=1e9) == []
+
+
+class TestBuildBenchmark:
+    """The real worker loop completes jobs against the in-memory stand-ins."""
+
+    def test_percentile_nearest_rank(self):
+        assert build_bench.percentile([], 50) == 0.0
+        assert build_bench.percentile([3, 1, 2, 4], 50) == 2
+        assert build_bench.percentile(range(1, 101), 99) == 99
+
+    def test_run_reports_every_job(self):
+        [result] = build_bench.run([2], jobs=3, maven_seconds=0.01, config_blocks=10)
+        assert result["concurrency"] == 2
+        assert result["failed"] == 0
+        assert result["jobs_per_min"] > 0
+        assert result["latency_s"]["max"] >= result["queue_wait_s"]["max"]
@@ -0,0 +1,45 @@
+"""Tests for the shared build slot accounting."""
+
+import asyncio
+
+from app.services.build_capacity import BuildSlots
+
+
+class TestBuildSlots:
+    """Test slot admission and hand-over."""
+
+    def test_try_acquire_respects_limit(self):
+        slots = BuildSlots(2)
+        assert slots.try_acquire()
+        assert slots.try_acquire()
+        assert not slots.try_acquire()
+        slots.release()
+        assert slots.try_acquire()
+
+    def test_release_hands_slot_to_waiter(self):
+        async def scenario():
+            slots = BuildSlots(1)
+            assert slots.try_acquire()
+            waiter = asyncio.create_task(slots.acquire())
+            await asyncio.sleep(0)
+            assert not waiter.done()
+            # Queued waiters take priority over new non-blocking admissions
+            slots.release()
+            assert not slots.try_acquire()
+            await waiter
+            assert slots.in_use == 1
+
+        asyncio.run(scenario())
+
+    def test_cancelled_waiter_does_not_leak_slot(self):
+        async def scenario():
+            slots = BuildSlots(1)
+            assert slots.try_acquire()
+            waiter = asyncio.create_task(slots.acquire())
+            await asyncio.sleep(0)
+            waiter.cancel()
+            await asyncio.gather(waiter, return_exceptions=True)
+            slots.release()
+            assert slots.in_use == 0
+
+        asyncio.run(scenario())
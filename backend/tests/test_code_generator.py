@@ -435,9 +435,45 @@ class TestTeleportPlayerAction:
         result = generator.generate_all(config)
         listener_code = list(result["listeners"].values())[0]
 
-        assert "player.teleport(new Location(player.getWorld(), 100, 64, -50, 0f, 0f));" in listener_code
+        assert "player.teleportAsync(new Location(player.getWorld(), 100, 64, -50, 0f, 0f));" in listener_code
         assert "import org.bukkit.Location;" in listener_code
 
+    def _listener(self, generator, base_config, *actions):
+        children = [
+            Block(id=f"action-{i}", type=BlockType.ACTION, name=name, properties=props, children=[])
+            for i, (name, props) in enumerate(actions)
+        ]
+        config = PluginConfig(**base_config, blocks=[
+            Block(id="event-1", type=BlockType.EVENT, name="PlayerJoinEvent", properties={},
+                  children=[child.id for child in children]),
+            *children,
+        ])
+        return generator.generate_all(config)["listeners"]["EventListener0.java"]
+
+    def test_following_actions_run_after_arrival(self, generator, base_config):
+        code = self._listener(
+            generator, base_config,
+            ("TeleportPlayer", {"x": "0", "y": "80", "z": "0", "world": "world_nether"}),
+            ("SendMessage", {"message": "Arrived"}),
+        )
+        assert ".whenComplete((moved, error) -> continuation1.run());" in code
+        # A missing world still runs the rest of the chain
+        assert "} else {\n            continuation1.run();" in code
+        assert code.index("final Runnable continuation1") < code.index("teleportAsync")
+        assert code.index('"Arrived"') < code.index("teleportAsync")
+
+    def test_teleport_inside_branch_does_not_split(self, generator, base_config):
+        code = self._listener(
+            generator, base_config,
+            ("BranchIf", {}),
+            ("TeleportPlayer", {"x": "0", "y": "80", "z": "0"}),
+            ("BranchEndIf", {}),
+            ("SendMessage", {"message": "Always"}),
+        )
+        assert "continuation" not in code
+        assert "player.teleportAsync(new Location(player.getWorld(), 0, 80, 0, 0f, 0f));" in code
+        assert code.index("teleportAsync") < code.index('"Always"')
+
 
 class TestAddExperienceAction:
     """Test AddExperience action code generation."""
@@ -830,6 +866,8 @@ class TestWorldEventActionGeneration:
 
         assert "if (player == null) return;" not in listener_code
         assert "event.getWorld().spawnEntity(event.getWorld().getSpawnLocation(), EntityType.AXOLOTL);" in listener_code
+        # The spawn chunk may be unloaded; never force a synchronous load
+        assert "if (event.getWorld().getSpawnLocation().isChunkLoaded()) {" in listener_code
 
     def test_weather_change_spawn_entity_player_target_is_guarded(self, generator, base_config):
         """Explicit player target should be guarded in world events."""
@@ -1251,7 +1289,7 @@ class TestDelayAction:
     """Test DelayAction code generation."""
 
     def test_delay_wraps_remaining_actions(self, generator, base_config):
-        """Test DelayAction wraps all subsequent actions in a BukkitRunnable."""
+        """Test DelayAction wraps all subsequent actions in a continuation scheduled on the TaskWheel."""
         config = PluginConfig(
             **base_config,
             blocks=[
@@ -1269,11 +1307,10 @@ class TestDelayAction:
         code = list(result["listeners"].values())[0]
 
         assert 'player.sendMessage("Before delay");' in code
-        assert "new BukkitRunnable()" in code
-        assert "runTaskLater" in code
-        assert "40" in code
+        assert "TaskWheel.schedule(player, 40, continuation1);" in code
         assert 'player.sendMessage("After delay");' in code
-        assert "import org.bukkit.scheduler.BukkitRunnable;" in code
+        assert "import com.example.testplugin.util.TaskWheel;" in code
+        assert "BukkitRunnable" not in code
 
     def test_delay_in_command_context(self, generator, base_config):
         """Test DelayAction works in command context."""
@@ -1291,17 +1328,59 @@ class TestDelayAction:
         result = generator.generate_all(config)
         code = result["commands"]["CommandDelayed.java"]
 
-        assert "new BukkitRunnable()" in code
-        assert "runTaskLater" in code
-        assert "60" in code
+        assert "TaskWheel.schedule(player, 60, continuation1);" in code
         assert 'player.sendMessage("Delayed message");' in code
 
+    def test_chained_delays_scale_linearly(self):
+        """Each block is generated once and output grows linearly with chain length."""
+        from app.services.codegen.action_generators import generate_action_code
+
+        def chain(length):
+            blocks = []
+            for i in range(length):
+                blocks.append(Block(id=f"delay-{i}", type=BlockType.ACTION, name="DelayAction",
+                                    properties={"delayTicks": "1"}))
+                blocks.append(Block(id=f"msg-{i}", type=BlockType.ACTION, name="SendMessage",
+                                    properties={"message": f"step {i}"}))
+            return generate_action_code(blocks, "PlayerJoinEvent")
+
+        short, long = chain(100), chain(1000)
+        assert long.count('player.sendMessage("step 0");') == 1
+        assert long.count('player.sendMessage("step 999");') == 1
+        assert len(long) < 11 * len(short)
+        # Nesting depth stays constant regardless of chain length
+        max_indent = max(len(line) - len(line.lstrip()) for line in long.splitlines())
+        assert max_indent <= 24
+
+    def test_delay_continuation_runs_remaining_blocks(self):
+        """Blocks after a delay live in a continuation scheduled by the delay."""
+        from app.services.codegen.action_generators import generate_action_code
+
+        blocks = [
+            Block(id="a-1", type=BlockType.ACTION, name="DelayAction", properties={"delayTicks": "5"}),
+            Block(id="a-2", type=BlockType.ACTION, name="SendMessage", properties={"message": "later"}),
+        ]
+        code = generate_action_code(blocks, "PlayerJoinEvent")
+        assert "final Runnable continuation1 = new Runnable() {" in code
+        assert "TaskWheel.schedule(player, 5, continuation1);" in code
+        assert code.index('player.sendMessage("later");') < code.index("TaskWheel.schedule(")
+
+    def test_trailing_delay_schedules_nothing(self):
+        from app.services.codegen.action_generators import generate_action_code
+
+        blocks = [
+            Block(id="a-1", type=BlockType.ACTION, name="SendMessage", properties={"message": "now"}),
+            Block(id="a-2", type=BlockType.ACTION, name="DelayAction", properties={}),
+        ]
+        code = generate_action_code(blocks, "PlayerJoinEvent")
+        assert "TaskWheel" not in code
+
 
 class TestRepeatAction:
     """Test RepeatAction code generation."""
 
     def test_repeat_wraps_remaining_actions(self, generator, base_config):
-        """Test RepeatAction wraps subsequent actions in a repeating BukkitRunnable."""
+        """Test RepeatAction wraps subsequent actions in a continuation repeated by the TaskWheel."""
         config = PluginConfig(
             **base_config,
             blocks=[
@@ -1316,11 +1395,7 @@ class TestRepeatAction:
         result = generator.generate_all(config)
         code = list(result["listeners"].values())[0]
 
-        assert "new BukkitRunnable()" in code
-        assert "runTaskTimer" in code
-        assert "20" in code
-        assert "count >= 5" in code
-        assert "this.cancel()" in code
+        assert "TaskWheel.repeat(player, 0, 20, 5, continuation1);" in code
         assert 'player.sendMessage("Repeating!");' in code
 
     def test_repeat_infinite(self, generator, base_config):
@@ -1339,8 +1414,29 @@ class TestRepeatAction:
         result = generator.generate_all(config)
         code = list(result["listeners"].values())[0]
 
-        assert "runTaskTimer" in code
-        assert "count" not in code  # No counter for infinite
+        assert "TaskWheel.repeat(player, 0, 40, 0, continuation1);" in code  # 0 = until cancelled
+
+    def test_task_wheel_started_once_and_cleaned_up(self, generator, base_config):
+        """The plugin runs one shared wheel task, stopped on disable and per player on quit."""
+        config = PluginConfig(
+            **base_config,
+            blocks=[
+                Block(id="event-1", type=BlockType.EVENT, name="PlayerJoinEvent",
+                      properties={}, children=["action-1", "action-2"]),
+                Block(id="action-1", type=BlockType.ACTION, name="RepeatAction",
+                      properties={"intervalTicks": "40"}, children=[]),
+                Block(id="action-2", type=BlockType.ACTION, name="SendMessage",
+                      properties={"message": "Forever!"}, children=[]),
+            ],
+        )
+        result = generator.generate_all(config)
+        main = result["main_java"]
+        assert "com.example.testplugin.util.TaskWheel.start(this);" in main
+        assert "com.example.testplugin.util.TaskWheel.stop();" in main
+        wheel = result["utilities"]["TaskWheel.java"]
+        assert wheel.count("runTaskTimer") == 1
+        assert "public void onQuit(PlayerQuitEvent event)" in wheel
+        assert "public static void cancelAll(UUID owner)" in wheel
 
 
 class TestGiveItemMeta:
@@ -1362,12 +1458,12 @@ class TestGiveItemMeta:
         result = generator.generate_all(config)
         code = list(result["listeners"].values())[0]
 
-        assert "ItemMeta meta = customItem.getItemMeta();" in code
+        assert "ItemMeta meta = item.getItemMeta();" in code
         assert "meta.setDisplayName" in code
         assert "translateAlternateColorCodes" in code
         assert "Legendary Sword" in code
-        assert "customItem.setItemMeta(meta);" in code
-        assert "player.getInventory().addItem(customItem);" in code
+        assert "item.setItemMeta(meta);" in code
+        assert "player.getInventory().addItem(ITEM_0.clone());" in code
 
     def test_give_item_with_lore(self, generator, base_config):
         """Test GiveItem generates lore lines from pipe-separated string."""
@@ -1465,12 +1561,63 @@ class TestGiveItemMeta:
         result = generator.generate_all(config)
         code = result["commands"]["CommandSword.java"]
 
-        assert "ItemMeta meta = customItem.getItemMeta();" in code
+        assert "private static final ItemStack ITEM_0 = createItem0();" in code
+        assert "ItemMeta meta = item.getItemMeta();" in code
         assert "Fire Sword" in code
         assert "Enchantment.FIRE_ASPECT, 2" in code
         assert "import org.bukkit.inventory.meta.ItemMeta;" in code
 
 
+class TestHoistedConstants:
+    """Test constant items being built once as static fields."""
+
+    def _listener(self, generator, base_config, *actions):
+        config = PluginConfig(
+            **base_config,
+            blocks=[
+                Block(id="event-1", type=BlockType.EVENT, name="PlayerJoinEvent",
+                      properties={}, children=[a.id for a in actions]),
+                *actions,
+            ],
+        )
+        return list(generator.generate_all(config)["listeners"].values())[0]
+
+    def test_identical_items_share_one_field(self, generator, base_config):
+        props = {"itemType": "DIAMOND", "amount": "2", "displayName": "&bGem", "lore": "Shiny"}
+        code = self._listener(
+            generator, base_config,
+            Block(id="a1", type=BlockType.ACTION, name="GiveItem", properties=props, children=[]),
+            Block(id="a2", type=BlockType.ACTION, name="GiveItem", properties=dict(props), children=[]),
+            Block(id="a3", type=BlockType.ACTION, name="GiveItem",
+                  properties={**props, "displayName": "&cOther"}, children=[]),
+        )
+        assert code.count("private static final ItemStack") == 2
+        assert code.count("player.getInventory().addItem(ITEM_0.clone());") == 2
+        assert "player.getInventory().addItem(ITEM_1.clone());" in code
+        assert "new ItemStack(Material.DIAMOND, 2)" in code
+        # Built in the factories, not in the handler
+        handler = code[code.index("@EventHandler"):code.index("private static ItemStack createItem0()")]
+        assert "translateAlternateColorCodes" not in handler
+
+    def test_non_literal_amount_stays_inline(self, generator, base_config):
+        code = self._listener(
+            generator, base_config,
+            Block(id="a1", type=BlockType.ACTION, name="GiveItem",
+                  properties={"itemType": "DIAMOND", "amount": "player.getLevel()", "displayName": "Gem"},
+                  children=[]),
+        )
+        assert "static final" not in code
+        assert "ItemStack customItem = new ItemStack(Material.DIAMOND, player.getLevel());" in code
+
+    def test_plain_items_are_not_hoisted(self, generator, base_config):
+        code = self._listener(
+            generator, base_config,
+            Block(id="a1", type=BlockType.ACTION, name="GiveItem",
+                  properties={"itemType": "DIAMOND", "amount": "1"}, children=[]),
+        )
+        assert "static final" not in code
+
+
 class TestCooldownSystem:
     """Test SetCooldown and CheckCooldown code generation with shared CooldownManager."""
 
@@ -1490,7 +1637,7 @@ class TestCooldownSystem:
         code = list(result["listeners"].values())[0]
 
         assert "CooldownManager.setCooldown" in code
-        assert "join_cd" in code
+        assert "CooldownManager.CD_JOIN_CD" in code
         assert "10 * 1000L" in code
         assert "getUniqueId()" in code
         assert "import" in code and "CooldownManager" in code
@@ -1514,7 +1661,7 @@ class TestCooldownSystem:
         code = list(result["listeners"].values())[0]
 
         assert "CooldownManager.isOnCooldown" in code
-        assert "my_cd" in code
+        assert "CooldownManager.CD_MY_CD" in code
         assert "player.sendMessage" in code
         assert "CooldownManager.getRemainingSeconds" in code
         assert "return;" in code
@@ -1580,9 +1727,57 @@ class TestCooldownSystem:
 
         assert "CooldownManager.isOnCooldown" in code
         assert "CooldownManager.setCooldown" in code
-        assert "heal_cd" in code
+        assert "CooldownManager.CD_HEAL_CD" in code
         assert "import" in code and "CooldownManager" in code
 
+    def test_cooldown_names_interned_to_int_ids(self, generator, base_config):
+        """Every cooldown name, including BranchIf checks, gets one int constant."""
+        config = PluginConfig(
+            **base_config,
+            blocks=[
+                Block(id="event-1", type=BlockType.EVENT, name="PlayerJoinEvent",
+                      properties={}, children=["action-1", "action-2", "action-3"]),
+                Block(id="action-1", type=BlockType.ACTION, name="SetCooldown",
+                      properties={"cooldownName": "arena", "duration": "5"}, children=[]),
+                Block(id="action-2", type=BlockType.ACTION, name="BranchIf",
+                      properties={"firstType": "CheckCooldown", "firstCooldownName": "Arena-2"}, children=[]),
+                Block(id="action-3", type=BlockType.ACTION, name="SetCooldown",
+                      properties={"cooldownName": "arena", "duration": "9"}, children=[]),
+            ],
+        )
+        result = generator.generate_all(config)
+        util_code = result["utilities"]["CooldownManager.java"]
+        code = result["listeners"]["EventListener0.java"]
+
+        assert "public static final int CD_ARENA = 0; // arena" in util_code
+        assert util_code.count("public static final int CD_") == 2
+        assert "private static final int COUNT = 2;" in util_code
+        assert "CooldownManager.CD_ARENA_2_" in code
+        assert "ConcurrentHashMap<String" not in util_code
+
+    def test_cooldown_manager_sweeps_and_releases_on_quit(self, generator, base_config):
+        """Expired entries are swept periodically and dropped when the player leaves."""
+        config = PluginConfig(
+            **base_config,
+            blocks=[
+                Block(id="event-1", type=BlockType.EVENT, name="PlayerJoinEvent",
+                      properties={}, children=["action-1"]),
+                Block(id="action-1", type=BlockType.ACTION, name="SetCooldown",
+                      properties={"cooldownName": "test", "duration": "5"}, children=[]),
+            ],
+        )
+        result = generator.generate_all(config)
+        util_code = result["utilities"]["CooldownManager.java"]
+
+        assert "com.example.testplugin.util.CooldownManager.start(this);" in result["main_java"]
+        assert "com.example.testplugin.util.CooldownManager.stop();" in result["main_java"]
+        assert "runTaskTimerAsynchronously" in util_code
+        assert "public void onQuit(PlayerQuitEvent event)" in util_code
+        assert "public static void sweep()" in util_code
+
+        folia = generator.generate_all(config.model_copy(update={"server_platform": "folia"}))
+        assert "Bukkit.getAsyncScheduler().runAtFixedRate(" in folia["utilities"]["CooldownManager.java"]
+
     def test_check_cooldown_without_message(self, generator, base_config):
         """Test CheckCooldown without a message still returns."""
         config = PluginConfig(
@@ -1843,7 +2038,7 @@ class TestCustomGUIMenus:
         )
         result = generator.generate_all(config)
         code = list(result["listeners"].values())[0]
-        assert "gui.setItem(4, guiItem)" in code
+        assert "gui.setItem(4, ITEM_0.clone());" in code
         assert "Material.DIAMOND" in code
         assert "Buy Me" in code
 
@@ -2219,14 +2414,29 @@ class TestScoreboards:
         )
         result = generator.generate_all(config)
         code = list(result["listeners"].values())[0]
-        assert "getNewScoreboard()" in code
-        assert '"display"' in code
-        assert '"Stats"' in code
-        assert '"Kills: 0"' in code
-        assert '"Deaths: 0"' in code
-        assert '"Score: 100"' in code
-        assert "DisplaySlot.SIDEBAR" in code
-        assert "player.setScoreboard(board)" in code
+        assert 'SidebarBoards.show(player, "Stats", "Kills: 0", "Deaths: 0", "Score: 100");' in code
+        assert "getNewScoreboard()" not in code
+
+    def test_sidebar_boards_reused_and_released(self, generator, base_config):
+        """One lazily created board per player, diffed updates, released on quit."""
+        config = PluginConfig(
+            **base_config,
+            blocks=[
+                Block(id="event-1", type=BlockType.EVENT, name="PlayerMoveEvent",
+                      properties={}, children=["action-1"]),
+                Block(id="action-1", type=BlockType.ACTION, name="SetScoreboard",
+                      properties={"title": "Stats", "lines": "Kills: 0"}, children=[]),
+            ],
+        )
+        result = generator.generate_all(config)
+        util_code = result["utilities"]["SidebarBoards.java"]
+        assert util_code.count("getNewScoreboard()") == 1
+        assert "computeIfAbsent(player.getUniqueId()" in util_code
+        assert "if (!Arrays.equals(board.lines, lines))" in util_code
+        assert "board.scoreboard.resetScores(entry.getKey());" in util_code
+        assert "public void onQuit(PlayerQuitEvent event)" in util_code
+        assert "com.example.testplugin.util.SidebarBoards.start(this);" in result["main_java"]
+        assert "com.example.testplugin.util.SidebarBoards.stop();" in result["main_java"]
 
     def test_remove_scoreboard(self, generator, base_config):
         """Test RemoveScoreboard generates correct code."""
@@ -2251,7 +2461,7 @@ class TestScoreboards:
         )
         result = generator.generate_all(config)
         code = list(result["listeners"].values())[0]
-        assert "player.setScoreboard(Bukkit.getScoreboardManager().getNewScoreboard())" in code
+        assert "SidebarBoards.hide(player);" in code
 
     def test_scoreboard_imports(self, generator, base_config):
         """Test scoreboard actions add correct imports."""
@@ -2276,9 +2486,8 @@ class TestScoreboards:
         )
         result = generator.generate_all(config)
         code = list(result["listeners"].values())[0]
-        assert "import org.bukkit.scoreboard.Scoreboard;" in code
-        assert "import org.bukkit.scoreboard.Objective;" in code
-        assert "import org.bukkit.scoreboard.DisplaySlot;" in code
+        assert "import com.example.testplugin.util.SidebarBoards;" in code
+        assert "import org.bukkit.scoreboard.Scoreboard;" not in code
 
     def test_scoreboard_in_command(self, generator, base_config):
         """Test scoreboard works in command context."""
@@ -2303,8 +2512,9 @@ class TestScoreboards:
         )
         result = generator.generate_all(config)
         code = result["commands"]["CommandStats.java"]
-        assert "getNewScoreboard()" in code
-        assert "import org.bukkit.scoreboard.Scoreboard;" in code
+        assert 'SidebarBoards.show(player, "Stats", "Kills: 0");' in code
+        assert "import com.example.testplugin.util.SidebarBoards;" in code
+        assert "SidebarBoards.java" in result["utilities"]
 
 
 class TestConfigPersistence:
@@ -2495,7 +2705,7 @@ class TestCustomRecipes:
             ],
         )
         result = generator.generate_all(config)
-        code = list(result["listeners"].values())[0]
+        code = result["utilities"]["RecipeRegistry.java"]
         assert 'NamespacedKey key = new NamespacedKey(plugin, "diamond_from_coal")' in code
         assert "ShapelessRecipe recipe = new ShapelessRecipe(key, new ItemStack(Material.DIAMOND, 1))" in code
         assert "recipe.addIngredient(Material.COAL)" in code
@@ -2527,9 +2737,12 @@ class TestCustomRecipes:
             ],
         )
         result = generator.generate_all(config)
-        code = list(result["listeners"].values())[0]
+        code = result["utilities"]["RecipeRegistry.java"]
         assert "import org.bukkit.NamespacedKey;" in code
         assert "import org.bukkit.inventory.ShapelessRecipe;" in code
+        assert "import org.bukkit.inventory.ShapedRecipe;" not in code
+        listener = list(result["listeners"].values())[0]
+        assert "import com.example.testplugin.util.RecipeRegistry;" in listener
 
     def test_recipe_in_command(self, generator, base_config):
         """Test recipe actions work in command context."""
@@ -2559,8 +2772,107 @@ class TestCustomRecipes:
         )
         result = generator.generate_all(config)
         code = result["commands"]["CommandAddrecipe.java"]
-        assert "ShapelessRecipe" in code
-        assert "import org.bukkit.NamespacedKey;" in code
+        assert 'RecipeRegistry.discover(player, "my_recipe");' in code
+        assert "ShapelessRecipe" in result["utilities"]["RecipeRegistry.java"]
+
+    def test_recipes_register_once_on_enable(self, generator, base_config):
+        """Handlers only unlock recipes; onEnable registers each key once."""
+        shaped = {
+            "recipeKey": "Gem_Block",
+            "resultItem": "EMERALD_BLOCK",
+            "shape": "AA,AA",
+            "ingredients": "A:EMERALD",
+        }
+        config = PluginConfig(
+            **base_config,
+            blocks=[
+                Block(id="join", type=BlockType.EVENT, name="PlayerJoinEvent",
+                      properties={}, children=["r1"]),
+                Block(id="quit", type=BlockType.EVENT, name="PlayerRespawnEvent",
+                      properties={}, children=["r2"]),
+                Block(id="r1", type=BlockType.ACTION, name="AddShapedRecipe", properties=shaped, children=[]),
+                Block(id="r2", type=BlockType.ACTION, name="AddShapedRecipe", properties=shaped, children=[]),
+                Block(id="orphan", type=BlockType.ACTION, name="AddShapelessRecipe",
+                      properties={"recipeKey": "unused"}, children=[]),
+            ],
+        )
+        result = generator.generate_all(config)
+        registry = result["utilities"]["RecipeRegistry.java"]
+        assert registry.count("Bukkit.addRecipe(recipe);") == 1
+        assert 'recipe.shape("AA", "AA");' in registry
+        assert 'KEYS.put("gem_block", key);' in registry
+        assert '"unused"' not in registry
+
+        for listener in result["listeners"].values():
+            assert 'RecipeRegistry.discover(player, "gem_block");' in listener
+            assert "addRecipe" not in listener
+        main = result["main_java"]
+        assert "com.example.testplugin.util.RecipeRegistry.registerAll(this);" in main
+        assert "com.example.testplugin.util.RecipeRegistry.unregisterAll();" in main
+
+    def test_no_registry_without_recipes(self, generator, base_config):
+        config = PluginConfig(
+            **base_config,
+            blocks=[Block(id="join", type=BlockType.EVENT, name="PlayerJoinEvent", properties={}, children=[])],
+        )
+        result = generator.generate_all(config)
+        assert "RecipeRegistry.java" not in result["utilities"]
+        assert "RecipeRegistry" not in result["main_java"]
+
+
+class TestFillRegion:
+    """Test FillRegion running as a tick-budgeted RegionFiller task."""
+
+    def _result(self, generator, base_config, fill_props, after=()):
+        config = PluginConfig(
+            **base_config,
+            blocks=[
+                Block(id="event-1", type=BlockType.EVENT, name="PlayerJoinEvent",
+                      properties={}, children=["fill", *(a.id for a in after)]),
+                Block(id="fill", type=BlockType.ACTION, name="FillRegion",
+                      properties={"x1": "0", "y1": "60", "z1": "0", "x2": "49", "y2": "109", "z2": "49",
+                                  "blockType": "glass", "target": "player", **fill_props},
+                      children=[]),
+                *after,
+            ],
+        )
+        return generator.generate_all(config)
+
+    def test_fill_is_delegated_to_region_filler(self, generator, base_config):
+        result = self._result(generator, base_config, {})
+        code = list(result["listeners"].values())[0]
+        assert "for (int x" not in code
+        assert (
+            "RegionFiller.fill(plugin, player.getWorld(), 0, 60, 0, 49, 109, 49, "
+            "Material.GLASS, 2048, false, null);"
+        ) in code
+        assert "import com.example.testplugin.util.RegionFiller;" in code
+        filler = result["utilities"]["RegionFiller.java"]
+        assert "public final class RegionFiller extends BukkitRunnable" in filler
+        assert "world.isChunkLoaded(chunkX, chunkZ)" in filler
+
+    def test_budget_and_chunk_loading_options(self, generator, base_config):
+        result = self._result(generator, base_config, {"blocksPerTick": "500", "loadChunks": "true"})
+        code = list(result["listeners"].values())[0]
+        assert "Material.GLASS, 500, true, null);" in code
+
+        result = self._result(generator, base_config, {"blocksPerTick": "lots"})
+        assert "Material.GLASS, 2048, false, null);" in list(result["listeners"].values())[0]
+
+    def test_wait_for_completion_chains_following_actions(self, generator, base_config):
+        after = [Block(id="msg", type=BlockType.ACTION, name="SendMessage",
+                       properties={"message": "Done"}, children=[])]
+        result = self._result(generator, base_config, {"waitForCompletion": "true"}, after)
+        code = list(result["listeners"].values())[0]
+        assert "final Runnable continuation1 = new Runnable() {" in code
+        assert "Material.GLASS, 2048, false, continuation1);" in code
+        assert code.index('player.sendMessage("Done");') < code.index("RegionFiller.fill(")
+
+        # Without waiting, the message is sent right after the fill starts
+        result = self._result(generator, base_config, {}, after)
+        code = list(result["listeners"].values())[0]
+        assert "continuation1" not in code
+        assert code.index("RegionFiller.fill(") < code.index('player.sendMessage("Done");')
 
 
 class TestOnGUIClickEvent:
@@ -2624,6 +2936,189 @@ class TestOnGUIClickEvent:
         assert "event.setCancelled(true);" not in code
 
 
+class TestPlayerMoveFilter:
+    """Test the PlayerMoveEvent early exit."""
+
+    def _listener(self, generator, base_config, properties):
+        config = PluginConfig(
+            **base_config,
+            blocks=[
+                Block(
+                    id="event-1",
+                    type=BlockType.EVENT,
+                    name="PlayerMoveEvent",
+                    properties=properties,
+                    children=["action-1"],
+                ),
+                Block(
+                    id="action-1",
+                    type=BlockType.ACTION,
+                    name="SendMessage",
+                    properties={"message": "Moved"},
+                    children=[],
+                ),
+            ],
+        )
+        return list(generator.generate_all(config)["listeners"].values())[0]
+
+    def test_block_filter_is_default_and_runs_first(self, generator, base_config):
+        """Without a moveFilter the handler exits unless the block changed."""
+        code = self._listener(generator, base_config, {})
+        assert "import org.bukkit.Location;" in code
+        assert "moveFrom.getBlockX() == moveTo.getBlockX()" in code
+        assert "moveFrom.getWorld() == moveTo.getWorld()) return;" in code
+        assert code.index("Location moveFrom = event.getFrom();") < code.index("Player player =")
+
+    def test_chunk_filter(self, generator, base_config):
+        code = self._listener(generator, base_config, {"moveFilter": "chunk"})
+        assert "(moveFrom.getBlockX() >> 4) == (moveTo.getBlockX() >> 4)" in code
+        assert "getBlockY()" not in code
+
+    def test_position_filter_ignores_rotation_only(self, generator, base_config):
+        code = self._listener(generator, base_config, {"moveFilter": "any"})
+        assert "moveFrom.getX() == moveTo.getX()" in code
+        assert "getBlockX()" not in code
+
+    def test_filter_off(self, generator, base_config):
+        code = self._listener(generator, base_config, {"moveFilter": "off"})
+        assert "moveFrom" not in code
+        assert "import org.bukkit.Location;" not in code
+
+
+class TestMergedListeners:
+    """Test merge_listeners grouping same-event blocks into one class."""
+
+    def _config(self, base_config, **overrides):
+        return PluginConfig(**base_config, merge_listeners=True, blocks=[
+            Block(id="join-1", type=BlockType.EVENT, name="PlayerJoinEvent", properties={}, children=["msg-1"]),
+            Block(id="quit", type=BlockType.EVENT, name="PlayerQuitEvent", properties={}, children=["msg-q"]),
+            Block(id="join-2", type=BlockType.EVENT, name="PlayerJoinEvent", properties={}, children=["msg-2"]),
+            Block(id="msg-1", type=BlockType.ACTION, name="SendMessage", properties={"message": "First"}, children=[]),
+            Block(id="msg-2", type=BlockType.ACTION, name="SendMessage", properties={"message": "Second"}, children=[]),
+            Block(id="msg-q", type=BlockType.ACTION, name="SendMessage", properties={"message": "Bye"}, children=[]),
+            *overrides.get("extra", []),
+        ])
+
+    def test_same_event_blocks_share_one_handler(self, generator, base_config):
+        result = generator.generate_all(self._config(base_config))
+
+        assert sorted(result["listeners"]) == ["EventListener0.java", "EventListener1.java"]
+        join = result["listeners"]["EventListener0.java"]
+        assert join.count("@EventHandler") == 1
+        assert join.count("Player player = event.getPlayer();") == 1
+        assert join.index("handle0(event, player);") < join.index("handle1(event, player);")
+        assert join.index('"First"') < join.index('"Second"')
+        assert "private void handle1(PlayerJoinEvent event, Player player) {" in join
+        assert "PlayerQuitEvent" in result["listeners"]["EventListener1.java"]
+        assert result["main_java"].count("registerEvents(") == 2
+
+    def test_shared_move_guard_runs_once_before_player_lookup(self, generator, base_config):
+        config = PluginConfig(**base_config, merge_listeners=True, blocks=[
+            Block(id="m1", type=BlockType.EVENT, name="PlayerMoveEvent", properties={}, children=["a"]),
+            Block(id="m2", type=BlockType.EVENT, name="PlayerMoveEvent", properties={}, children=["b"]),
+            Block(id="a", type=BlockType.ACTION, name="SendMessage", properties={"message": "A"}, children=[]),
+            Block(id="b", type=BlockType.ACTION, name="SendMessage", properties={"message": "B"}, children=[]),
+        ])
+        code = generator.generate_all(config)["listeners"]["EventListener0.java"]
+        assert code.count("Location moveFrom") == 1
+        assert code.index("Location moveFrom") < code.index("Player player =")
+
+        config.blocks[1].properties["moveFilter"] = "chunk"
+        code = generator.generate_all(config)["listeners"]["EventListener0.java"]
+        # Different granularities keep their own guard inside each block's method
+        assert code.count("Location moveFrom") == 2
+        assert code.index("Player player =") < code.index("Location moveFrom")
+
+    def test_merged_handler_declares_one_prelude(self, generator, base_config):
+        config = PluginConfig(**base_config, merge_listeners=True, blocks=[
+            Block(id="j1", type=BlockType.EVENT, name="PlayerJoinEvent", properties={}, children=["a"]),
+            Block(id="j2", type=BlockType.EVENT, name="PlayerJoinEvent", properties={}, children=["b", "c"]),
+            Block(id="a", type=BlockType.ACTION, name="DamageEntity", properties={}, children=[]),
+            Block(id="b", type=BlockType.ACTION, name="SetBlockType", properties={}, children=[]),
+            Block(id="c", type=BlockType.ACTION, name="SetEntityHealth", properties={}, children=[]),
+        ])
+        code = generator.generate_all(config)["listeners"]["EventListener0.java"]
+
+        for declaration in ("Entity targetEntity =", "LivingEntity living =", "Block targetBlock ="):
+            assert code.count(declaration) == 1
+        assert code.index("Entity targetEntity =") < code.index("handle0(")
+        assert "handle1(event, player, hasEventEntity, targetEntity, living, hasEventBlock, targetBlock);" in code
+        assert (
+            "private void handle0(PlayerJoinEvent event, Player player, boolean hasEventEntity, "
+            "Entity targetEntity, LivingEntity living, boolean hasEventBlock, Block targetBlock) {"
+        ) in code
+
+    def test_merging_is_off_by_default(self, generator, base_config):
+        config = self._config(base_config).model_copy(update={"merge_listeners": False})
+        assert len(generator.generate_all(config)["listeners"]) == 3
+
+    def test_incremental_preview_tracks_merged_blocks(self, base_config):
+        from app.services.preview_service import PreviewService
+
+        service = PreviewService()
+        config = self._config(base_config)
+        base = service.full(config)
+        edited = config.model_copy(deep=True)
+        edited.blocks[2].properties["ignored"] = "x"
+        edited.blocks[4].properties["message"] = "Changed"
+
+        incremental = service.incremental(edited, base, changed_block_ids=["msg-2"])
+        assert incremental == service.full(edited)
+        assert any("Changed" in content for content in incremental.files.values())
+
+
+class TestFoliaTarget:
+    """Test server_platform="folia" output."""
+
+    def _config(self, base_config, platform="folia"):
+        return PluginConfig(**base_config, server_platform=platform, blocks=[
+            Block(id="join", type=BlockType.EVENT, name="PlayerJoinEvent", properties={},
+                  children=["tp", "cmd", "wait", "fill", "msg"]),
+            Block(id="tp", type=BlockType.ACTION, name="TeleportPlayer",
+                  properties={"x": "0", "y": "80", "z": "0"}, children=[]),
+            Block(id="cmd", type=BlockType.ACTION, name="ExecuteConsoleCommand",
+                  properties={"command": "say hi %player%"}, children=[]),
+            Block(id="wait", type=BlockType.ACTION, name="DelayAction",
+                  properties={"delayTicks": "20"}, children=[]),
+            Block(id="fill", type=BlockType.ACTION, name="FillRegion",
+                  properties={"waitForCompletion": "true"}, children=[]),
+            Block(id="msg", type=BlockType.ACTION, name="SendMessage",
+                  properties={"message": "Done"}, children=[]),
+        ])
+
+    def test_unknown_platform_rejected(self, base_config):
+        with pytest.raises(ValueError, match="Unsupported server platform"):
+            self._config(base_config, platform="spigot")
+
+    def test_folia_uses_region_aware_calls(self, generator, base_config):
+        result = generator.generate_all(self._config(base_config))
+        listener = result["listeners"]["EventListener0.java"]
+
+        assert "folia-supported: true" in result["plugin_yml"]
+        assert "player.teleportAsync(new Location(" in listener
+        assert "Bukkit.getGlobalRegionScheduler().execute(" in listener
+        assert "player.getScheduler().run(plugin, task -> continuation3.run(), null)" in listener
+        wheel = result["utilities"]["TaskWheel.java"]
+        assert "owner.getScheduler().runDelayed(plugin, body, () -> forget(entry), delay)" in wheel
+        assert "runTaskTimer" not in wheel
+        # Entity tasks are tracked so cancelAll and stop() can cancel them
+        cancel_all = wheel[wheel.index("public static void cancelAll"):wheel.index("private static Entry submit")]
+        assert "BY_OWNER.remove(owner)" in cancel_all and "entry.cancel();" in cancel_all
+        stop = wheel[wheel.index("public static void stop()"):wheel.index("/** Run")]
+        assert "for (Entry entry : LIVE)" in stop
+        filler = result["utilities"]["RegionFiller.java"]
+        assert "Bukkit.getRegionScheduler().runDelayed(plugin, world, chunkX, chunkZ" in filler
+        assert "BukkitRunnable" not in filler
+
+    def test_paper_output_has_no_folia_calls(self, generator, base_config):
+        result = generator.generate_all(self._config(base_config, platform="paper"))
+        listener = result["listeners"]["EventListener0.java"]
+
+        assert "folia-supported" not in result["plugin_yml"]
+        assert "getGlobalRegionScheduler" not in listener
+        assert "runTaskTimer" in result["utilities"]["TaskWheel.java"]
+
+
 class TestTempVariables:
     """Test temporary variable action code generation."""
 
@@ -2694,3 +3189,228 @@ class TestTempVariables:
         code = result["commands"]["CommandSetvar.java"]
         assert "args.length > 0 ? args[0] : \"\"" in code
         assert 'String tempValue = tempVars.getOrDefault("picked", "");' in code
+
+
+class TestActionRegistry:
+    """Test the action dispatch registry."""
+
+    def test_every_catalog_action_is_registered(self):
+        from app.services.block_definitions import BlockDefinitionService
+        from app.services.codegen.action_generators import ACTION_REGISTRY
+
+        catalog = BlockDefinitionService().get_available_blocks()
+        missing = [b["name"] for b in catalog["actions"] if b["name"] not in ACTION_REGISTRY]
+        assert missing == []
+
+    def test_unknown_action_generates_nothing(self):
+        from app.services.codegen.action_generators import generate_action_code
+
+        blocks = [Block(id="a-1", type=BlockType.ACTION, name="NoSuchAction", properties={})]
+        assert generate_action_code(blocks, "PlayerJoinEvent") == ""
+
+    def test_prelude_variables_are_imported(self, generator, base_config):
+        config = PluginConfig(
+            **base_config,
+            blocks=[
+                Block(id="cmd-1", type=BlockType.EVENT, name="CommandEvent",
+                      properties={"commandName": "ride"}, children=["action-1"]),
+                Block(id="action-1", type=BlockType.ACTION, name="RideEntity", properties={}),
+            ],
+        )
+        code = generator.generate_all(config)["commands"]["CommandRide.java"]
+        assert "Entity targetEntity = player;" in code
+        assert "import org.bukkit.entity.Entity;" in code
+
+    def test_requirements_mask_is_union_of_children(self):
+        from app.services.codegen.action_generators import (
+            ACTION_MASKS, NEEDS_ENTITY, NEEDS_LIVING, NEEDS_PLAYER, requirements_mask,
+        )
+
+        blocks = [
+            Block(id="a-1", type=BlockType.ACTION, name="SendMessage", properties={}),
+            Block(id="a-2", type=BlockType.ACTION, name="SetEntityHealth", properties={}),
+        ]
+        mask = requirements_mask(blocks)
+        assert mask == ACTION_MASKS["SendMessage"] | ACTION_MASKS["SetEntityHealth"]
+        assert mask & NEEDS_PLAYER and mask & NEEDS_ENTITY and mask & NEEDS_LIVING
+
+    def test_import_table_covers_declared_imports(self):
+        from app.services.codegen.action_generators import (
+            ACTION_REGISTRY, collect_action_imports,
+        )
+
+        for name, spec in ACTION_REGISTRY.items():
+            block = Block(id="a-1", type=BlockType.ACTION, name=name, properties={})
+            imports = collect_action_imports([block], "com.example", is_command=True)
+            expected = {imp.replace("{package}", "com.example") for imp in spec.imports}
+            assert expected <= imports, name
+
+
+class TestJavaIR:
+    """Test the statement IR and emitter used by action generators."""
+
+    def test_nested_blocks_are_indented_by_emitter(self):
+        from app.services.codegen.java_ir import Body, render
+
+        body = Body()
+        body.append("int x = 0;")
+        loop = body.block("for (int i = 0; i < 3; i++) {")
+        loop.block("if (i > 1) {").append("x += i;")
+        body.append("return x;")
+
+        assert render(body, depth=2) == (
+            "        int x = 0;\n"
+            "        for (int i = 0; i < 3; i++) {\n"
+            "            if (i > 1) {\n"
+            "                x += i;\n"
+            "            }\n"
+            "        }\n"
+            "        return x;\n"
+        )
+
+    def test_block_footer_is_customizable(self):
+        from app.services.codegen.java_ir import Body, render
+
+        body = Body()
+        body.block("Runnable r = new Runnable() {", "};").append("// noop")
+        assert render(body) == "Runnable r = new Runnable() {\n    // noop\n};\n"
+
+    def test_if_chain_is_braced_by_emitter(self):
+        from app.services.codegen.java_ir import Body, render
+
+        body = Body()
+        body.if_("a").append("x();")
+        body.else_if("b").if_("c").append("y();")
+        body.else_().append("z();")
+        assert render(body) == (
+            "if (a) {\n"
+            "    x();\n"
+            "} else if (b) {\n"
+            "    if (c) {\n"
+            "        y();\n"
+            "    }\n"
+            "} else {\n"
+            "    z();\n"
+            "}\n"
+        )
+
+    def test_else_requires_preceding_if(self):
+        from app.services.codegen.java_ir import Body
+
+        body = Body()
+        body.append("x();")
+        with pytest.raises(ValueError):
+            body.else_()
+
+    def test_generated_action_text_carries_no_indentation(self):
+        from app.services.codegen.action_generators import ACTION_REGISTRY, _generate_segment
+        from app.services.codegen.java_ir import Block as BlockNode, Line
+
+        def texts(body):
+            for node in body.nodes:
+                if isinstance(node, Line):
+                    yield node.text
+                elif isinstance(node, BlockNode):
+                    yield from texts(node.body)
+                else:
+                    for _, arm in node.arms:
+                        yield from texts(arm)
+
+        for name in ACTION_REGISTRY:
+            blocks = [Block(id="a", type=BlockType.ACTION, name=name, properties={}, children=[])]
+            for event in ("PlayerJoinEvent", "WeatherChangeEvent", "CommandEvent"):
+                prelude, body = _generate_segment(blocks, ~0, event, event == "CommandEvent", "continuation1")
+                for text in [*texts(prelude), *texts(body)]:
+                    assert not text.startswith(" "), (name, event, text)
+                    assert text.strip() not in ("{", "}", "} else {"), (name, event, text)
+
+
+class TestConfigAnalysis:
+    """Test the shared single-pass config analysis."""
+
+    def test_analysis_groups_listeners_and_commands(self, base_config):
+        from app.services.codegen.analysis import analyze_config
+
+        config = PluginConfig(**base_config, blocks=[
+            Block(id="join", type=BlockType.EVENT, name="PlayerJoinEvent", properties={}, children=["msg"]),
+            Block(id="cmd", type=BlockType.EVENT, name="CommandEvent",
+                  properties={"commandName": "my-cmd"}, children=["cd", "missing"]),
+            Block(id="msg", type=BlockType.ACTION, name="SendMessage", properties={"message": "hi"}, children=[]),
+            Block(id="cd", type=BlockType.ACTION, name="SetCooldown", properties={}, children=[]),
+        ])
+        analysis = analyze_config(config)
+
+        assert [u.event.id for u in analysis.listeners] == ["join"]
+        assert [c.id for c in analysis.listeners[0].children] == ["msg"]
+        assert [(c.name, c.class_name) for c in analysis.commands] == [("my-cmd", "CommandMyCmd")]
+        assert [c.id for c in analysis.commands[0].children] == ["cd"]
+        assert analysis.uses_cooldowns
+
+    def test_generate_all_scans_blocks_once(self, generator, base_config, monkeypatch):
+        from app.services import code_generator as code_generator_module
+        from app.services.codegen import analysis as analysis_module
+
+        calls = []
+
+        def counting_analyze(config):
+            calls.append(config)
+            return analysis_module.analyze_config(config)
+
+        monkeypatch.setattr(code_generator_module, "analyze_config", counting_analyze)
+        config = PluginConfig(**base_config, blocks=[
+            Block(id="join", type=BlockType.EVENT, name="PlayerJoinEvent", properties={}, children=[]),
+        ])
+        result = generator.generate_all(config)
+
+        assert len(calls) == 1
+        assert "EventListener0.java" in result["listeners"]
+
+
+class TestStreamingGeneration:
+    """Test generate_to and the code sinks."""
+
+    def _config(self, base_config):
+        return PluginConfig(**base_config, blocks=[
+            Block(id="join", type=BlockType.EVENT, name="PlayerJoinEvent", properties={}, children=["msg"]),
+            Block(id="msg", type=BlockType.ACTION, name="SendMessage", properties={"message": "hi"}, children=[]),
+            Block(id="cd", type=BlockType.ACTION, name="SetCooldown", properties={}, children=[]),
+        ])
+
+    def test_streamed_files_match_generate_all(self, generator, base_config):
+        from app.services.code_generator import WATERMARK_COMMENT
+        from app.services.codegen.sinks import MemorySink
+
+        config = self._config(base_config)
+        result = generator.generate_all(config, watermark=True)
+        sink = MemorySink()
+        count = generator.generate_to(config, sink, watermark=True)
+
+        root = "src/main/java/com/example/testplugin"
+        assert count == len(sink.files)
+        assert sink.files[f"{root}/{config.main_class_name}.java"] == result["main_java"]
+        assert sink.files[f"{root}/listeners/EventListener0.java"] == result["listeners"]["EventListener0.java"]
+        assert sink.files[f"{root}/util/CooldownManager.java"] == result["utilities"]["CooldownManager.java"]
+        assert sink.files["src/main/resources/plugin.yml"] == result["plugin_yml"]
+        assert not sink.files["pom.xml"].startswith(WATERMARK_COMMENT)
+
+    def test_directory_and_zip_sinks(self, generator, base_config, tmp_path):
+        import zipfile
+
+        from app.services.codegen.sinks import DirectorySink, MemorySink, ZipSink
+
+        config = self._config(base_config)
+        expected = MemorySink()
+        generator.generate_to(config, expected)
+
+        generator.generate_to(config, DirectorySink(tmp_path / "project"))
+        for path, content in expected.files.items():
+            assert (tmp_path / "project" / path).read_text(encoding="utf-8") == content
+
+        archive_path = tmp_path / "sources.zip"
+        with zipfile.ZipFile(archive_path, "w") as archive:
+            generator.generate_to(config, ZipSink(archive, prefix="TestPlugin/"))
+        with zipfile.ZipFile(archive_path) as archive:
+            assert {
+                name.removeprefix("TestPlugin/"): archive.read(name).decode("utf-8")
+                for name in archive.namelist()
+            } == expected.files
@@ -0,0 +1,82 @@
+"""Tests for thread/process code generation."""
+
+import asyncio
+import pickle
+
+import pytest
+
+from app.models.block import Block, BlockType
+from app.models.plugin_config import PluginConfig
+from app.services.code_generator import CodeGeneratorService, java_root
+from app.services.codegen.analysis import analyze_config
+from app.services.codegen.sinks import MemorySink
+from app.services.codegen_pool import CodegenPool, _init_worker, _split, _write_classes
+
+
+def _config(listeners: int, commands: int) -> PluginConfig:
+    blocks = []
+    for i in range(listeners):
+        blocks.append(Block(id=f"ev-{i}", type=BlockType.EVENT, name="PlayerJoinEvent",
+                            properties={}, children=[f"msg-{i}"]))
+        blocks.append(Block(id=f"msg-{i}", type=BlockType.ACTION, name="SendMessage",
+                            properties={"message": f"hello {i}"}, children=[]))
+    for i in range(commands):
+        blocks.append(Block(id=f"cmd-{i}", type=BlockType.EVENT, name="CommandEvent",
+                            properties={"commandName": f"cmd{i}"}, children=[f"cd-{i}"]))
+        blocks.append(Block(id=f"cd-{i}", type=BlockType.ACTION, name="SetCooldown",
+                            properties={}, children=[]))
+    return PluginConfig(name="PoolPlugin", version="1.0.0",
+                        main_package="com.example.pool", description="Pool test",
+                        author="Tester", blocks=blocks)
+
+
+class TestCodegenPool:
+    """Process-pool output must match in-process generation."""
+
+    def test_split_covers_range_contiguously(self):
+        assert _split(7, 3) == [(0, 3), (3, 5), (5, 7)]
+        assert _split(1, 3) == [(0, 1), (1, 1), (1, 1)]
+
+    @pytest.mark.parametrize("processes, fanout_min_classes", [(0, 1), (2, 1), (2, 1000)])
+    def test_written_project_matches_generator(self, tmp_path, processes, fanout_min_classes):
+        config = _config(5, 3)
+        expected = MemorySink()
+        CodeGeneratorService().generate_to(config, expected, watermark=True)
+        pool = CodegenPool(processes=processes, fanout_min_classes=fanout_min_classes)
+
+        async def scenario():
+            await pool.start()
+            return await pool.write_project(config, tmp_path, watermark=True)
+
+        try:
+            count = asyncio.run(scenario())
+        finally:
+            pool.shutdown()
+
+        written = {
+            path.relative_to(tmp_path).as_posix(): path.read_text(encoding="utf-8")
+            for path in tmp_path.rglob("*") if path.is_file()
+        }
+        assert count == len(expected.files)
+        assert written == expected.files
+
+    def test_class_shard_carries_only_its_units(self, tmp_path):
+        config = _config(4, 2)
+        analysis = analyze_config(config)
+        listeners, commands = analysis.listeners[1:2], analysis.commands[:1]
+        payload = pickle.dumps((listeners, commands))
+        assert b"hello 1" in payload
+        assert b"hello 0" not in payload and b"cmd1" not in payload
+
+        _init_worker()
+        count = _write_classes(
+            java_root(config), config.main_package, analysis.target,
+            listeners, commands, str(tmp_path), False,
+        )
+        expected = CodeGeneratorService().generate_all(config)
+        written = {path.name: path.read_text(encoding="utf-8") for path in tmp_path.rglob("*.java")}
+        assert count == 2
+        assert written == {
+            "EventListener1.java": expected["listeners"]["EventListener1.java"],
+            "CommandCmd0.java": expected["commands"]["CommandCmd0.java"],
+        }
@@ -0,0 +1,77 @@
+"""Tests for the persistent sync-build download registry."""
+
+import time
+
+import pytest
+from app.config import settings
+from app.services.download_registry import DownloadRegistry
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    """Create a registry whose index and JARs live under a temp directory."""
+    monkeypatch.setattr(settings, "DOWNLOADS_DIR", tmp_path)
+    monkeypatch.setattr(settings, "DOWNLOAD_EXPIRY_HOURS", 24)
+    monkeypatch.setattr(settings, "DOWNLOADS_MAX_BYTES", 0)
+    return DownloadRegistry()
+
+
+def _make_jar(directory, name, size):
+    path = directory / name
+    path.write_bytes(b"x" * size)
+    return path
+
+
+class TestDownloadRegistry:
+    """Test registration, lookup and eviction."""
+
+    def test_register_and_get(self, registry, tmp_path):
+        jar = _make_jar(tmp_path, "abc-plugin-1.0.0.jar", 10)
+        registry.register("abc", jar)
+        assert registry.get("abc") == jar
+        assert registry.get("missing") is None
+
+    def test_shared_between_instances(self, registry, tmp_path):
+        """A second registry (another worker process) sees the same entries."""
+        jar = _make_jar(tmp_path, "abc-plugin-1.0.0.jar", 10)
+        registry.register("abc", jar)
+        assert DownloadRegistry().get("abc") == jar
+
+    def test_expired_entries_are_evicted_with_jar(self, registry, tmp_path, monkeypatch):
+        jar = _make_jar(tmp_path, "old-plugin-1.0.0.jar", 10)
+        registry.register("old", jar)
+
+        real_time = time.time
+        monkeypatch.setattr(time, "time", lambda: real_time() + 25 * 3600)
+        assert registry.get("old") is None
+        assert registry.evict() == 1
+        assert not jar.exists()
+
+    def test_byte_budget_evicts_oldest_first(self, registry, tmp_path, monkeypatch):
+        monkeypatch.setattr(settings, "DOWNLOADS_MAX_BYTES", 25)
+        first = _make_jar(tmp_path, "a.jar", 10)
+        second = _make_jar(tmp_path, "b.jar", 10)
+        third = _make_jar(tmp_path, "c.jar", 10)
+        registry.register("a", first)
+        registry.register("b", second)
+        registry.register("c", third)
+
+        assert registry.get("a") is None
+        assert not first.exists()
+        assert registry.get("b") == second
+        assert registry.get("c") == third
+
+    def test_byte_budget_keeps_just_registered_download(self, registry, tmp_path, monkeypatch):
+        monkeypatch.setattr(settings, "DOWNLOADS_MAX_BYTES", 15)
+        older = _make_jar(tmp_path, "a.jar", 10)
+        large = _make_jar(tmp_path, "b.jar", 20)
+        registry.register("a", older)
+        registry.register("b", large)
+
+        # Over budget on its own, but the caller is about to hand out its ID
+        assert registry.get("a") is None
+        assert registry.get("b") == large
+        assert large.exists()
+
+        assert registry.evict() == 1
+        assert not large.exists()
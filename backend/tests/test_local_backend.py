@@ -0,0 +1,139 @@
+"""Tests for the SQLite stand-in of the Supabase queue, quota and auth."""
+
+import asyncio
+
+import pytest
+from app.services import job_backend
+from app.services.build_job_service import BuildJobService
+from app.services.local_backend import MAX_QUEUED_JOBS, LocalBackend
+
+
+@pytest.fixture
+def backend(tmp_path):
+    return LocalBackend(tmp_path / "local.sqlite3")
+
+
+class TestLocalBackendQueue:
+    """Queue RPCs mirror the SQL functions in migrations/."""
+
+    def test_enqueue_enforces_per_user_limit(self, backend):
+        for i in range(MAX_QUEUED_JOBS):
+            backend.enqueue_build_job("user-1", {"n": i}, f"P{i}")
+        with pytest.raises(RuntimeError, match="Queue limit exceeded"):
+            backend.enqueue_build_job("user-1", {}, "Over")
+        # Anonymous jobs and other users are unaffected
+        backend.enqueue_build_job(None, {}, "Anon")
+        backend.enqueue_build_job("user-2", {}, "Other")
+
+    def test_claim_is_fifo_and_skips_running_duplicates(self, backend):
+        first = backend.enqueue_build_job(None, {"a": 1}, "A", config_hash="h1")
+        duplicate = backend.enqueue_build_job(None, {"a": 1}, "A", config_hash="h1")
+        other = backend.enqueue_build_job(None, {"b": 2}, "B", config_hash="h2")
+
+        assert backend.claim_next_build_job("w1") == first
+        # h1 is running, so its duplicate waits and h2 goes next
+        assert backend.claim_next_build_job("w1") == other
+        assert backend.claim_next_build_job("w1") is None
+
+        backend.update_job(first, status="succeeded")
+        assert backend.claim_next_build_job("w2") == duplicate
+        job = backend.get_job(duplicate)
+        assert job["status"] == "running"
+        assert job["worker_id"] == "w2"
+        assert job["plugin_config"] == {"a": 1}
+
+    def test_recover_requeues_stale_running_jobs(self, backend):
+        stale = backend.enqueue_build_job(None, {}, "Stale")
+        fresh = backend.enqueue_build_job(None, {}, "Fresh")
+        backend.claim_next_build_job("w1")
+        backend.claim_next_build_job("w1")
+        backend.update_job(stale, heartbeat_at="2000-01-01T00:00:00")
+
+        assert backend.recover_stuck_build_jobs(10) == 1
+        assert backend.get_job(stale)["status"] == "queued"
+        assert backend.get_job(stale)["worker_id"] is None
+        assert backend.get_job(fresh)["status"] == "running"
+
+    def test_update_rejects_unknown_columns(self, backend):
+        job_id = backend.enqueue_build_job(None, {}, "P")
+        with pytest.raises(ValueError):
+            backend.update_job(job_id, **{"status = 'x'; --": 1})
+
+
+class TestLocalBackendUsers:
+    """Quota counters and token auth."""
+
+    def test_build_count_respects_limit_and_refunds(self, backend):
+        user = backend.add_user("a@example.com", "free")
+        assert backend.increment_build_count(user["id"], 2)
+        assert backend.increment_build_count(user["id"], 2)
+        assert not backend.increment_build_count(user["id"], 2)
+        backend.decrement_build_count(user["id"])
+        assert backend.increment_build_count(user["id"], 2)
+        assert backend.get_user_profile(user["id"])["builds_used_this_period"] == 2
+
+    def test_free_user_counter_resets_each_month(self, backend):
+        user = backend.add_user("a@example.com", "free")
+        assert backend.increment_build_count(user["id"], 1)
+        with backend._transaction() as db:
+            db.execute("UPDATE profiles SET build_period_start = '2000-01-01T00:00:00'")
+        assert backend.increment_build_count(user["id"], 1)
+
+    def test_token_lookup(self, backend):
+        user = backend.add_user("a@example.com", "pro", token="secret")
+        found = backend.get_user_by_token("secret")
+        assert found["id"] == user["id"]
+        assert found["subscription_tier"] == "pro"
+        assert found["cancel_at_period_end"] is False
+        assert backend.get_user_by_token("wrong") is None
+
+
+class TestBuildJobServiceLocal:
+    """BuildJobService routes through the local backend when selected."""
+
+    def test_service_uses_local_backend(self, backend, monkeypatch):
+        monkeypatch.setattr(job_backend, "_job_backend", job_backend.LocalJobBackend(backend))
+        service = BuildJobService()
+
+        async def scenario():
+            job_id = await service.enqueue_job({"x": 1}, None, "P", config_hash="h")
+            assert await service.claim_next_job("w") == job_id
+            await service.update_job(job_id, status="succeeded", artifact_storage_path="p",
+                                     artifact_expires_at="2999-01-01T00:00:00")
+            reusable = await service.find_reusable_artifact("h")
+            assert reusable["artifact_storage_path"] == "p"
+            return await service.get_job(job_id)
+
+        job = asyncio.run(scenario())
+        assert job["status"] == "succeeded"
+
+    def test_auto_selects_local_without_supabase(self, tmp_path, monkeypatch):
+        from app.config import settings
+        monkeypatch.setattr(settings, "DATA_BACKEND", "auto")
+        monkeypatch.setattr(settings, "SUPABASE_URL", "")
+        monkeypatch.setattr(settings, "LOCAL_DB_PATH", tmp_path / "auto.sqlite3")
+        monkeypatch.setattr(job_backend, "_job_backend", None)
+
+        selected = job_backend.get_job_backend()
+        assert isinstance(selected, job_backend.LocalJobBackend)
+        assert job_backend.get_job_backend() is selected
+
+    def test_cleanup_keeps_artifacts_other_jobs_reuse(self, backend, tmp_path, monkeypatch):
+        from app.services.artifact_storage import ArtifactStorageService
+        monkeypatch.setattr(job_backend, "_job_backend", job_backend.LocalJobBackend(backend))
+        jar = tmp_path / "shared.jar"
+        jar.write_bytes(b"jar")
+        original = backend.enqueue_build_job(None, {}, "P", config_hash="h")
+        reuser = backend.enqueue_build_job(None, {}, "P", config_hash="h")
+        for job_id, expires in ((original, "2000-01-01T00:00:00"), (reuser, "2999-01-01T00:00:00")):
+            backend.update_job(job_id, status="succeeded", artifact_storage_path=str(jar),
+                               artifact_expires_at=expires)
+
+        storage = ArtifactStorageService()
+        asyncio.run(storage.cleanup_expired())
+        assert jar.exists()
+        assert backend.get_job(original)["artifact_storage_path"] is None
+
+        backend.update_job(reuser, artifact_expires_at="2000-01-01T00:00:00")
+        asyncio.run(storage.cleanup_expired())
+        assert not jar.exists()
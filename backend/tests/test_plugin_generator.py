@@ -0,0 +1,82 @@
+"""Tests for the synchronous plugin generation pipeline."""
+
+import asyncio
+
+import pytest
+from app.models.block import Block, BlockType
+from app.models.plugin_config import PluginConfig
+from app.services.plugin_generator import PluginGeneratorService
+from app.utils.hashing import config_fingerprint
+
+
+@pytest.fixture
+def config():
+    """Create a minimal plugin config."""
+    return PluginConfig(
+        name="TestPlugin",
+        version="1.0.0",
+        main_package="com.example.testplugin",
+        description="A test plugin",
+        author="TestAuthor",
+        blocks=[
+            Block(id="event-1", type=BlockType.EVENT, name="PlayerJoinEvent", children=["action-1"]),
+            Block(id="action-1", type=BlockType.ACTION, name="SendMessage", properties={"message": "Hi"}),
+        ],
+    )
+
+
+class TestConfigFingerprint:
+    """Test canonical config hashing."""
+
+    def test_identical_configs_match(self, config):
+        clone = PluginConfig(**config.model_dump())
+        assert config_fingerprint(config) == config_fingerprint(clone)
+
+    def test_watermark_and_version_change_hash(self, config):
+        other_version = PluginConfig(**{**config.model_dump(), "paper_version": "1.20.4"})
+        assert config_fingerprint(config) != config_fingerprint(config, watermark=True)
+        assert config_fingerprint(config) != config_fingerprint(other_version)
+
+
+class TestSingleFlightBuilds:
+    """Test coalescing of identical in-flight builds."""
+
+    def test_concurrent_identical_builds_share_one_build(self, config, monkeypatch):
+        service = PluginGeneratorService()
+        calls = []
+
+        async def fake_build(cfg, watermark):
+            calls.append(cfg.name)
+            build_number = len(calls)
+            await asyncio.sleep(0.01)
+            return f"dl-{build_number}"
+
+        monkeypatch.setattr(service, "_build", fake_build)
+
+        async def scenario():
+            return await asyncio.gather(
+                service.generate(config),
+                service.generate(PluginConfig(**config.model_dump())),
+                service.generate(config, watermark=True),
+            )
+
+        first, second, watermarked = asyncio.run(scenario())
+        assert first == second
+        assert watermarked != first
+        assert len(calls) == 2
+
+    def test_failed_build_is_not_cached(self, config, monkeypatch):
+        service = PluginGeneratorService()
+        attempts = []
+
+        async def flaky_build(cfg, watermark):
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise RuntimeError("maven exploded")
+            return "dl-ok"
+
+        monkeypatch.setattr(service, "_build", flaky_build)
+
+        with pytest.raises(RuntimeError):
+            asyncio.run(service.generate(config))
+        assert asyncio.run(service.generate(config)) == "dl-ok"
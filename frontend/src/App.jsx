@@ -27,6 +27,7 @@ export default function App() {
   const description = usePluginStore((s) => s.description);
   const author = usePluginStore((s) => s.author);
   const paperVersion = usePluginStore((s) => s.paperVersion);
+  const serverPlatform = usePluginStore((s) => s.serverPlatform);
   const blocks = usePluginStore((s) => s.blocks);
   const selectedBlockId = usePluginStore((s) => s.selectedBlockId);
   const loading = usePluginStore((s) => s.loading);
@@ -350,6 +351,7 @@ export default function App() {
       description,
       author,
       paper_version: paperVersion,
+      server_platform: serverPlatform,
       blocks: payloadBlocks
     };
   };
@@ -509,6 +511,7 @@ export default function App() {
       if (config.author) usePluginStore.getState().setAuthor(config.author);
       if (config.blocks) usePluginStore.getState().setBlocks(config.blocks);
       if (config.paperVersion) usePluginStore.getState().setPaperVersion(config.paperVersion);
+      if (config.serverPlatform) usePluginStore.getState().setServerPlatform(config.serverPlatform);
     }
     setCurrentProjectId(project?.id || null);
     setCurrentProjectVersion(project?.version || null);
@@ -531,6 +534,7 @@ export default function App() {
       description: state.description,
       author: state.author,
       paperVersion: state.paperVersion,
+      serverPlatform: state.serverPlatform,
       blocks: state.blocks,
     };
   };
@@ -2,7 +2,7 @@ import React, { useEffect, useMemo, useState } from 'react';
 import usePluginStore from '../store/usePluginStore';
 import { InfoTooltip } from './Tooltip';
 import { suggestMainPackage, validatePluginSettings } from '../utils/pluginValidation';
-import { PAPER_VERSION_OPTIONS } from '../data/dropdownOptions';
+import { PAPER_VERSION_OPTIONS, SERVER_PLATFORM_OPTIONS } from '../data/dropdownOptions';
 
 /** Help text for each field */
 const FIELD_HELP = {
@@ -26,6 +26,8 @@ export default function PluginSettings() {
   const setAuthor = usePluginStore((s) => s.setAuthor);
   const paperVersion = usePluginStore((s) => s.paperVersion);
   const setPaperVersion = usePluginStore((s) => s.setPaperVersion);
+  const serverPlatform = usePluginStore((s) => s.serverPlatform);
+  const setServerPlatform = usePluginStore((s) => s.setServerPlatform);
   const [mainPackageTouched, setMainPackageTouched] = useState(false);
   const [collapsed, setCollapsed] = useState(false);
 
@@ -129,6 +131,25 @@ export default function PluginSettings() {
         </select>
       </div>
 
+      <div className="form-group">
+        <label className="form-label" htmlFor="plugin-server-platform">
+          Server Platform
+          <InfoTooltip text="Folia runs regions on separate threads. Choose it to generate region-aware scheduling and mark the plugin as Folia-supported." />
+        </label>
+        <select
+          id="plugin-server-platform"
+          className="form-input"
+          value={serverPlatform}
+          onChange={(e) => setServerPlatform(e.target.value)}
+        >
+          {SERVER_PLATFORM_OPTIONS.map((opt) => (
+            <option key={opt.value} value={opt.value}>
+              {opt.label}
+            </option>
+          ))}
+        </select>
+      </div>
+
       <div className="form-group">
         <label className="form-label" htmlFor="plugin-package">
           Main Package
@@ -349,6 +349,11 @@ export const PAPER_VERSION_OPTIONS = [
   { value: '1.21.4', label: '1.21.4' },
 ];
 
+export const SERVER_PLATFORM_OPTIONS = [
+  { value: 'paper', label: 'Paper' },
+  { value: 'folia', label: 'Folia' },
+];
+
 // ============================================
 // WORLDS - Fallback if backend world fetch fails
 // ============================================
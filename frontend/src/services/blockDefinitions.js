@@ -24,7 +24,7 @@ export const DEFAULT_BLOCKS = {
       name: 'PlayerMoveEvent',
       description: 'Triggered when a player moves or rotates',
       color: '#3498db',
-      properties: {},
+      properties: { moveFilter: 'block' },
       children: []
     },
     {
@@ -792,7 +792,10 @@ export const DEFAULT_BLOCKS = {
       name: 'FillRegion',
       description: 'Fill a region with blocks',
       color: '#e67e22',
-      properties: { x1: '0', y1: '64', z1: '0', x2: '10', y2: '70', z2: '10', blockType: 'STONE' },
+      properties: {
+        x1: '0', y1: '64', z1: '0', x2: '10', y2: '70', z2: '10', blockType: 'STONE',
+        blocksPerTick: '2048', loadChunks: 'false', waitForCompletion: 'false'
+      },
       children: []
     },
     {
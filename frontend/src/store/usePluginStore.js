@@ -7,6 +7,7 @@ const usePluginStore = create((set) => ({
   description: '',
   author: '',
   paperVersion: '1.21.1',
+  serverPlatform: 'paper',
 
   blocks: [],
   selectedBlockId: null,
@@ -24,6 +25,7 @@ const usePluginStore = create((set) => ({
   setDescription: (description) => set({ description }),
   setAuthor: (author) => set({ author }),
   setPaperVersion: (v) => set({ paperVersion: v }),
+  setServerPlatform: (v) => set({ serverPlatform: v }),
 
   addBlock: (block) => set((state) => ({ blocks: [...state.blocks, block] })),
   setBlocks: (blocks) =>
@@ -92,6 +94,7 @@ const usePluginStore = create((set) => ({
       description: '',
       author: '',
       paperVersion: '1.21.1',
+      serverPlatform: 'paper',
       blocks: [],
       selectedBlockId: null,
       loading: false,